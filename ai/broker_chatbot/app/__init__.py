@@ -1 +1,10 @@
 """Broker Chatbot - AI assistant for real estate brokers."""
+
+import os
+import sys
+
+# ai/shared holds code shared with the other AI services; the images copy it
+# next to app/, local runs and tests find it one level above this service
+_services_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if os.path.isdir(os.path.join(_services_dir, "shared")) and _services_dir not in sys.path:
+    sys.path.append(_services_dir)
@@ -19,6 +19,10 @@ class Settings(BaseSettings):
     # Embedding Service
     embedding_service_url: str = "http://localhost:8001"
     
+    # Embedding wire format: "binary" (raw bytes), "base64" or "json"; dtype float32 or float16
+    embedding_wire_format: str = "binary"
+    embedding_wire_dtype: str = "float32"
+    
     # Database (PostgreSQL with pgvector)
     database_host: str = "localhost"
     database_port: int = 5433
@@ -6,8 +6,11 @@ Uses the embedding microservice for embedding operations.
 from typing import List, Dict, Optional
 import httpx
 
+import numpy as np
+
 from app.config import get_settings
 from app.core.logging_config import get_logger
+from shared.embedding_wire import decode_embeddings
 
 logger = get_logger(__name__)
 
@@ -35,6 +38,14 @@ class EmbeddingAPIClient:
             logger.warning(f"Embedding service unavailable: {e}")
             return False
     
+    def _format_options(self):
+        """Query params and headers requesting the configured wire format."""
+        params = {"encoding": self.settings.embedding_wire_format}
+        if self.settings.embedding_wire_format != "json":
+            params["dtype"] = self.settings.embedding_wire_dtype
+        headers = {"Accept": "application/octet-stream"} if self.settings.embedding_wire_format == "binary" else {}
+        return params, headers
+    
     def embed_text(self, text: str) -> Optional[List[float]]:
         """Embed text using remote service.
         
@@ -44,13 +55,40 @@ class EmbeddingAPIClient:
         Returns:
             Embedding vector or None on error.
         """
+        embedding = self.embed_text_array(text)
+        return embedding.tolist() if embedding is not None else None
+    
+    def embed_texts(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Batch embed texts using remote service.
+        
+        Args:
+            texts: List of texts to embed.
+            
+        Returns:
+            List of embedding vectors or None on error.
+        """
+        embeddings = self.embed_texts_array(texts)
+        return embeddings.tolist() if embeddings is not None else None
+    
+    def embed_text_array(self, text: str) -> Optional[np.ndarray]:
+        """Embed text straight into a float32 NumPy vector.
+        
+        Args:
+            text: Input text to embed.
+            
+        Returns:
+            Embedding vector of shape (dimension,) or None on error.
+        """
         try:
+            params, headers = self._format_options()
             response = self._client.post(
                 f"{self.base_url}/embed/text",
-                json={"text": text}
+                json={"text": text},
+                params=params,
+                headers=headers
             )
             if response.status_code == 200:
-                return response.json()["embedding"]
+                return decode_embeddings(response)[0]
             else:
                 logger.warning(f"Embedding API error: {response.status_code}")
                 return None
@@ -58,22 +96,27 @@ class EmbeddingAPIClient:
             logger.warning(f"Embedding API call failed: {e}")
             return None
     
-    def embed_texts(self, texts: List[str]) -> Optional[List[List[float]]]:
-        """Batch embed texts using remote service.
+    def embed_texts_array(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Batch embed texts straight into a (count, dimension) float32 array.
         
         Args:
             texts: List of texts to embed.
             
         Returns:
-            List of embedding vectors or None on error.
+            Embedding matrix or None on error.
         """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
         try:
+            params, headers = self._format_options()
             response = self._client.post(
                 f"{self.base_url}/embed/batch",
-                json={"texts": texts}
+                json={"texts": texts},
+                params=params,
+                headers=headers
             )
             if response.status_code == 200:
-                return response.json()["embeddings"]
+                return decode_embeddings(response)
             else:
                 logger.warning(f"Batch embedding API error: {response.status_code}")
                 return None
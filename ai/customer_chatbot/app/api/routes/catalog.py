@@ -0,0 +1,45 @@
+"""
+Catalog snapshot routes.
+The backend calls the invalidation webhook when areas or projects change.
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from app.services.catalog import get_catalog_service
+from app.config import get_settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+
+@router.post("/invalidate")
+async def invalidate_catalog(x_catalog_token: Optional[str] = Header(None)):
+    """Mark the catalog snapshot stale so the next turn refetches it.
+
+    Args:
+        x_catalog_token: Shared secret, required when CATALOG_WEBHOOK_TOKEN is set.
+
+    Returns:
+        Version of the snapshot being replaced.
+    """
+    expected = get_settings().catalog_webhook_token
+    if expected and not hmac.compare_digest(x_catalog_token or "", expected):
+        raise HTTPException(status_code=403, detail="Invalid catalog token")
+
+    catalog = get_catalog_service()
+    catalog.invalidate()
+    return {"status": "invalidated", "version": catalog.get_stats()["version"]}
+
+
+@router.get("")
+async def get_catalog_stats():
+    """Catalog snapshot version, size and age.
+
+    Returns:
+        Snapshot statistics.
+    """
+    return get_catalog_service().get_stats()
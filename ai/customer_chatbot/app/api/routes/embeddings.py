@@ -0,0 +1,20 @@
+"""
+Embedding service client routes.
+Exposes the client's call counters and circuit breaker state.
+"""
+
+from fastapi import APIRouter
+
+from app.services.embedding_api_client import get_embedding_api_client
+
+router = APIRouter(prefix="/embeddings", tags=["embeddings"])
+
+
+@router.get("/stats")
+async def get_embedding_client_stats():
+    """Remote, local and fallback call counts, retries and breaker state.
+
+    Returns:
+        Client statistics.
+    """
+    return get_embedding_api_client().get_stats()
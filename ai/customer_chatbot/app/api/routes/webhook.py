@@ -14,6 +14,7 @@ from app.models.schemas import (
     WhatsAppIncomingMessage
 )
 from app.services.conversation import get_conversation_service
+from app.services.conversation_scheduler import get_conversation_scheduler
 from app.config import get_settings
 from app.core.logging_config import get_logger
 
@@ -153,3 +154,13 @@ async def get_history(phone_number: str, limit: int = 20):
     )
     
     return ConversationHistory(**result)
+
+
+@router.get("/stats")
+async def get_stats():
+    """Conversation scheduler metrics.
+    
+    Returns:
+        Queue depth, running turns and wait/run time percentiles (ms).
+    """
+    return get_conversation_scheduler().get_stats()
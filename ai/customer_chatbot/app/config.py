@@ -32,11 +32,88 @@ class Settings(BaseSettings):
     database_user: str = "admin"
     database_password: str = "password"
     database_name: str = "real_estate_crm"
+    database_pool_min_size: int = 2     # asyncpg pool (async workflow)
+    database_pool_max_size: int = 20
+    
+    # conversation_embeddings ANN index (see app/core/vector_index_manager.py)
+    vector_index_min_rows: int = 10_000             # below this, exact scans (no ANN index)
+    vector_index_hnsw_max_rows: int = 2_000_000     # above this, IVFFlat (cheaper to build)
+    vector_index_hnsw_m: int = 16
+    vector_index_hnsw_ef_construction: int = 64
+    vector_index_hnsw_ef_search: int = 40
+    vector_index_partial_min_rows: int = 2_000      # phones with this many messages get a partial HNSW index
+    vector_index_max_partial: int = 20
+    vector_index_check_every: int = 1_000           # inserts between maintenance checks
+    vector_index_maintenance_work_mem: str = "512MB"
+    
+    # Write-behind persistence of conversation turns (SQLite journal + background batches)
+    persist_write_behind: bool = True
+    persist_journal_path: str = ".cache/turn_journal.sqlite3"
+    persist_batch_size: int = 32
+    persist_flush_interval_s: float = 0.5
+    persist_max_pending: int = 10_000      # journal size at which submitters wait (backpressure)
+    persist_enqueue_timeout_s: float = 2.0
+    persist_max_attempts: int = 3          # failures of one batch before it is stored message by message
+    
+    # Catalog snapshot (areas / projects / unit types, see app/services/catalog.py)
+    catalog_ttl_s: float = 600.0              # refresh interval; POST /api/catalog/invalidate refreshes sooner
+    catalog_retry_s: float = 30.0             # retry interval after an empty fetch
+    catalog_prompt_max_projects: int = 15     # project lines in an extraction prompt
+    catalog_prompt_match_cutoff: float = 80.0 # rapidfuzz partial ratio for "mentioned in the message"
+    catalog_webhook_token: str = ""           # X-Catalog-Token required on /api/catalog/invalidate when set
+    
+    # Franco names (Arabic-script spellings of English names, see app/services/transliteration.py)
+    transliteration_key_cutoff: float = 85.0  # rapidfuzz ratio between phonetic keys for a catalog match
+    transliteration_memo_size: int = 10000    # LLM answers kept in memory (LRU)
+    transliteration_store_retry_s: float = 60.0  # memo table skipped this long after an error
+    
+    # Message analysis: "separate" (intent, extraction and inquiry router calls)
+    # or "combined" (one structured-output call, see app/graph/turn_analysis.py)
+    turn_analysis: str = "separate"
+    
+    # Workflow execution: "async" (coroutines on the event loop, non-blocking clients)
+    # or "sync" (blocking clients, turns run on the scheduler's thread pool)
+    workflow_mode: str = "async"
+    
+    # Conversation scheduler: turns serialized per phone number
+    conversation_workers: int = 16             # threads (sync mode)
+    conversation_max_concurrent: int = 500     # turns in flight (async mode)
+    conversation_metrics_window: int = 1_000   # recent turns used for wait/run percentiles
+    
+    # customer_sessions cache (see app/core/session_store.py)
+    session_cache_backend: str = "memory"   # "memory" (per process), "redis" (shared) or "none"
+    session_cache_ttl_s: float = 900.0
+    session_cache_max_entries: int = 10_000
+    redis_url: str = "redis://localhost:6379/0"
     
     # Embedding Model
     embedding_model_name: str = "mohamed2811/Muffakir_Embedding_V2"
     embedding_service_url: str = "http://localhost:8001"
     
+    # Embedding service client (see app/services/embedding_api_client.py)
+    embedding_http2: bool = True               # needs the h2 package (httpx[http2]); HTTP/1.1 keep-alive otherwise
+    embedding_pool_size: int = 20              # pooled keep-alive connections
+    embedding_timeout_s: float = 2.0           # per attempt
+    embedding_connect_timeout_s: float = 0.5   # also the /ready probe timeout
+    embedding_max_retries: int = 2             # per call, within the retry budget
+    embedding_retry_budget_ratio: float = 0.2  # retries earned per call (bucket of 10)
+    embedding_retry_backoff_s: float = 0.05    # doubled on each retry
+    embedding_breaker_failures: int = 5        # failed calls in a row that open the circuit
+    embedding_breaker_reset_s: float = 30.0    # open time before a half-open /ready probe
+    embedding_hedge_after_ms: float = 0.0      # race a local computation after this remote latency (0 = off)
+    
+    # Embedding wire format: "binary" (raw bytes), "base64" or "json"; dtype float32 or float16
+    embedding_wire_format: str = "binary"
+    embedding_wire_dtype: str = "float32"
+    
+    # Local inference backend: "torch", "onnx" or "onnx-int8" (dynamic int8 quantization)
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: str = ".cache/onnx"
+    embedding_quantization_config: str = "avx2"  # arm64 | avx2 | avx512 | avx512_vnni
+    
+    # FastSemanticMatcher pgvector tables: entities embedded and upserted per transaction
+    fast_matcher_chunk_size: int = 256
+    
     # WhatsApp API
     whatsapp_verify_token: str = ""
     whatsapp_access_token: str = ""
@@ -7,44 +7,103 @@ from typing import List
 from functools import lru_cache
 from sentence_transformers import SentenceTransformer
 import torch
+import os
+import re
 
 from app.config import get_settings
 from app.core.logging_config import get_logger
+from app.core.turn_embeddings import memoized_embed
 
 logger = get_logger(__name__)
 
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
 
 class EmbeddingService:
     """Service for generating text embeddings using Muffakir model."""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, backend: str = None):
         """Initialize the embedding model.
         
         Args:
             model_name: HuggingFace model name. Defaults to config value.
+            backend: 'torch', 'onnx' or 'onnx-int8'. Defaults to config value.
         """
         settings = get_settings()
         self.model_name = model_name or settings.embedding_model_name
+        self.backend = backend or settings.embedding_backend
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{self.backend}', expected one of {BACKENDS}")
+        self.onnx_dir = settings.embedding_onnx_dir
+        self.quantization_config = settings.embedding_quantization_config
         self._model = None
     
     @property
     def model(self) -> SentenceTransformer:
         """Lazy-load the embedding model."""
         if self._model is None:
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self._model = SentenceTransformer(self.model_name)
+            logger.info(f"Loading embedding model: {self.model_name} (backend: {self.backend})")
+            self._model = self._load_model()
             logger.info("Embedding model loaded successfully")
         return self._model
     
+    def _load_model(self) -> SentenceTransformer:
+        """Load the model for the configured backend.
+        
+        ONNX exports (and int8 quantized variants) are written once to
+        ``embedding_onnx_dir`` and reused on later startups.
+        """
+        if self.backend == "torch":
+            return SentenceTransformer(self.model_name)
+        
+        export_dir = os.path.join(self.onnx_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name))
+        if not os.path.exists(os.path.join(export_dir, "onnx", "model.onnx")):
+            logger.info(f"Exporting {self.model_name} to ONNX at {export_dir}")
+            SentenceTransformer(self.model_name, backend="onnx").save_pretrained(export_dir)
+        
+        if self.backend == "onnx":
+            return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": "onnx/model.onnx"})
+        
+        file_name = self._find_quantized_model(export_dir)
+        if file_name is None:
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+            logger.info(f"Quantizing ONNX model to int8 ({self.quantization_config})")
+            export_dynamic_quantized_onnx_model(
+                SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": "onnx/model.onnx"}),
+                self.quantization_config,
+                export_dir
+            )
+            file_name = self._find_quantized_model(export_dir)
+        return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": f"onnx/{file_name}"})
+    
+    def _find_quantized_model(self, export_dir: str):
+        """Find the int8 export for the configured quantization target."""
+        onnx_dir = os.path.join(export_dir, "onnx")
+        if not os.path.isdir(onnx_dir):
+            return None
+        # Named model_qint8_<config>.onnx or model_quint8_<config>.onnx depending on the target
+        suffix = f"int8_{self.quantization_config}.onnx"
+        for name in sorted(os.listdir(onnx_dir)):
+            if name.startswith("model_q") and name.endswith(suffix):
+                return name
+        return None
+    
     def initialize(self):
         """Pre-load the model to memory."""
         logger.info("Initializing embedding service")
         _ = self.model
         logger.info("Embedding service initialized")
     
+    @property
+    def memo_namespace(self) -> str:
+        """Identity of the vectors this service produces (model + backend)."""
+        return f"{self.model_name}#{self.backend}"
+    
     def embed_text(self, text: str) -> List[float]:
         """Convert a single text to embedding vector.
         
+        Within a conversation turn, texts already embedded are reused.
+        
         Args:
             text: Input text to embed.
             
@@ -52,23 +111,25 @@ class EmbeddingService:
             List of floats representing the embedding vector.
         """
         logger.debug(f"Embedding text (length: {len(text)} chars)")
-        embedding = self.model.encode(
-            [text],
-            convert_to_tensor=True,
-            normalize_embeddings=True
-        )
-        logger.debug(f"Generated embedding vector (dim: {len(embedding[0])})")
-        return embedding[0].tolist()
+        embedding = self.embed_texts([text])[0]
+        logger.debug(f"Generated embedding vector (dim: {len(embedding)})")
+        return embedding
     
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """Convert multiple texts to embedding vectors.
         
+        Within a conversation turn, texts already embedded are reused.
+        
         Args:
             texts: List of input texts to embed.
             
         Returns:
             List of embedding vectors.
         """
+        return memoized_embed(self.memo_namespace, texts, lambda missing: (self.memo_namespace, self._encode(missing)))
+    
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """Run the model on a batch of texts."""
         embeddings = self.model.encode(
             texts,
             convert_to_tensor=True,
@@ -86,16 +147,9 @@ class EmbeddingService:
         Returns:
             List of similarity scores.
         """
-        query_embedding = self.model.encode(
-            [query],
-            convert_to_tensor=True,
-            normalize_embeddings=True
-        )
-        passage_embeddings = self.model.encode(
-            passages,
-            convert_to_tensor=True,
-            normalize_embeddings=True
-        )
+        # One batch for query + passages; texts seen earlier in the turn are reused
+        embeddings = torch.tensor(self.embed_texts([query] + list(passages)))
+        query_embedding, passage_embeddings = embeddings[:1], embeddings[1:]
         
         cosine_scores = torch.matmul(query_embedding, passage_embeddings.T)
         return cosine_scores[0].tolist()
@@ -0,0 +1,66 @@
+"""
+I/O mode of the conversation workflow.
+Workflow nodes and the service methods they call are coroutines. In async
+mode (the default) they await non-blocking clients: httpx.AsyncClient,
+asyncpg and the LLM ``ainvoke``. Under ``blocking_io()`` the same service
+coroutines call their blocking clients (httpx.Client, psycopg2, ``invoke``)
+and never suspend, so a node can be driven to completion on a worker thread
+without an event loop. That is the WORKFLOW_MODE=sync path.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Coroutine
+import asyncio
+import functools
+
+_blocking_io: ContextVar[bool] = ContextVar("blocking_io", default=False)
+
+
+@contextmanager
+def blocking_io():
+    """Make service coroutines use their blocking clients in this context."""
+    token = _blocking_io.set(True)
+    try:
+        yield
+    finally:
+        _blocking_io.reset(token)
+
+
+def is_blocking_io() -> bool:
+    """True inside ``blocking_io()``."""
+    return _blocking_io.get()
+
+
+def run_to_completion(coro: Coroutine) -> Any:
+    """Run a coroutine that never suspends (blocking mode) and return its result.
+
+    Raises:
+        RuntimeError: If the coroutine awaited real asynchronous I/O.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError(f"{coro.__qualname__} suspended while running in blocking mode")
+
+
+def sync_variant(coro_fn: Callable[..., Awaitable]) -> Callable[..., Any]:
+    """Blocking function running ``coro_fn`` with blocking I/O."""
+    @functools.wraps(coro_fn)
+    def run(*args, **kwargs):
+        with blocking_io():
+            return run_to_completion(coro_fn(*args, **kwargs))
+    return run
+
+
+async def offload(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call a blocking or CPU-bound function without stalling the event loop.
+
+    Runs in a worker thread (with the caller's context variables) in async
+    mode, and inline under ``blocking_io()``.
+    """
+    if is_blocking_io():
+        return fn(*args, **kwargs)
+    return await asyncio.to_thread(fn, *args, **kwargs)
@@ -1,22 +1,77 @@
 """
 LLM service factory for multiple providers (Gemini, Cohere).
-Provides text generation for the chatbot responses.
+Provides text generation for the chatbot responses, schema-validated
+structured output, and per-turn usage accounting (calls, tokens, latency).
 """
 
-from typing import List, Optional, Protocol, Any
+from typing import List, Optional, Protocol, Any, Type
 from functools import lru_cache
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+from pydantic import BaseModel
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_cohere import ChatCohere
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 from app.config import get_settings
+from app.core.io_mode import is_blocking_io
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+class LLMUsage:
+    """LLM calls, tokens and time spent during one turn.
+
+    Token counts come from the provider's ``usage_metadata``; calls without
+    it count as calls only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "latency_ms": 0.0}
+
+    def record(self, response: Any, latency_s: float):
+        if isinstance(response, dict):
+            response = response.get("raw")  # with_structured_output(include_raw=True)
+        usage = getattr(response, "usage_metadata", None) or {}
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["input_tokens"] += usage.get("input_tokens", 0)
+            self.stats["output_tokens"] += usage.get("output_tokens", 0)
+            self.stats["latency_ms"] += latency_s * 1000
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self.stats, "latency_ms": round(self.stats["latency_ms"], 1)}
+
+
+_current_usage: ContextVar[Optional[LLMUsage]] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def llm_usage_scope():
+    """Account the LLM calls made in this context (one conversation turn)."""
+    usage = LLMUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_llm_usage(response: Any, started_at: float):
+    """Add a call that started at ``started_at`` (monotonic) to the current turn."""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.record(response, time.monotonic() - started_at)
+
+
 class ILLMService(ABC):
     """Interface for LLM services."""
     
@@ -31,11 +86,73 @@ class ILLMService(ABC):
         """Generate response."""
         pass
 
+    @abstractmethod
+    async def agenerate_response(
+        self,
+        user_message: str,
+        context: Optional[str] = None,
+        conversation_history: Optional[List[dict]] = None,
+        system_prompt: Optional[str] = None
+    ) -> str:
+        """Generate response without blocking the event loop."""
+        pass
+
     @abstractmethod
     def validate_connectivity(self) -> bool:
         """Check if API is working."""
         pass
 
+    def generate_structured(
+        self,
+        user_message: str,
+        schema: Type[BaseModel],
+        system_prompt: Optional[str] = None
+    ) -> BaseModel:
+        """Generate a response parsed and validated against a pydantic schema.
+        
+        Uses the provider's structured output (``self.llm``).
+        
+        Raises:
+            ValueError: If the output does not match the schema.
+        """
+        messages = self._prepare_messages(user_message, system_prompt=system_prompt)
+        logger.info(f"Generating structured {schema.__name__} for message (length: {len(user_message)})")
+        return self._parsed(self._invoke(self.llm.with_structured_output(schema, include_raw=True), messages), schema)
+
+    async def agenerate_structured(
+        self,
+        user_message: str,
+        schema: Type[BaseModel],
+        system_prompt: Optional[str] = None
+    ) -> BaseModel:
+        """Async variant of ``generate_structured``."""
+        if is_blocking_io():
+            return self.generate_structured(user_message, schema, system_prompt)
+        messages = self._prepare_messages(user_message, system_prompt=system_prompt)
+        logger.info(f"Generating structured {schema.__name__} (async) for message (length: {len(user_message)})")
+        return self._parsed(await self._ainvoke(self.llm.with_structured_output(schema, include_raw=True), messages), schema)
+
+    @staticmethod
+    def _parsed(result: dict, schema: Type[BaseModel]) -> BaseModel:
+        if result.get("parsing_error") is not None or result.get("parsed") is None:
+            raise ValueError(f"LLM output does not match {schema.__name__}: {result.get('parsing_error')}")
+        parsed = result["parsed"]
+        return parsed if isinstance(parsed, schema) else schema.model_validate(parsed)
+
+    @staticmethod
+    def _invoke(runnable: Any, messages: List[Any]) -> Any:
+        started_at = time.monotonic()
+        response = runnable.invoke(messages)
+        record_llm_usage(response, started_at)
+        return response
+
+    @staticmethod
+    async def _ainvoke(runnable: Any, messages: List[Any]) -> Any:
+        started_at = time.monotonic()
+        response = await runnable.ainvoke(messages)
+        record_llm_usage(response, started_at)
+        return response
+
     def _get_default_system_prompt(self) -> str:
         """Get the default system prompt for the real estate chatbot."""
         return """أنت مساعد ذكي لشركة عقارات. مهمتك الرئيسية هي:
@@ -119,7 +236,17 @@ class GeminiLLMService(ILLMService):
                           system_prompt: Optional[str] = None) -> str:
         messages = self._prepare_messages(user_message, context, conversation_history, system_prompt)
         logger.info(f"Generating Gemini response for message (length: {len(user_message)})")
-        response = self.llm.invoke(messages)
+        response = self._invoke(self.llm, messages)
+        return response.content
+    
+    async def agenerate_response(self, user_message: str, context: Optional[str] = None, 
+                                 conversation_history: Optional[List[dict]] = None, 
+                                 system_prompt: Optional[str] = None) -> str:
+        if is_blocking_io():
+            return self.generate_response(user_message, context, conversation_history, system_prompt)
+        messages = self._prepare_messages(user_message, context, conversation_history, system_prompt)
+        logger.info(f"Generating Gemini response (async) for message (length: {len(user_message)})")
+        response = await self._ainvoke(self.llm, messages)
         return response.content
 
 
@@ -158,7 +285,17 @@ class CohereLLMService(ILLMService):
                           system_prompt: Optional[str] = None) -> str:
         messages = self._prepare_messages(user_message, context, conversation_history, system_prompt)
         logger.info(f"Generating Cohere response for message (length: {len(user_message)})")
-        response = self.llm.invoke(messages)
+        response = self._invoke(self.llm, messages)
+        return response.content
+    
+    async def agenerate_response(self, user_message: str, context: Optional[str] = None, 
+                                 conversation_history: Optional[List[dict]] = None, 
+                                 system_prompt: Optional[str] = None) -> str:
+        if is_blocking_io():
+            return self.generate_response(user_message, context, conversation_history, system_prompt)
+        messages = self._prepare_messages(user_message, context, conversation_history, system_prompt)
+        logger.info(f"Generating Cohere response (async) for message (length: {len(user_message)})")
+        response = await self._ainvoke(self.llm, messages)
         return response.content
 
 
@@ -0,0 +1,273 @@
+"""
+Session store for customer_sessions.
+Read-through / write-through cache in front of the VectorStoreService session
+queries: hot sessions are served from an in-process LRU (or Redis, shared by
+all workers) with TTL eviction, and the saves made during one turn are
+coalesced into a single UPSERT that is skipped when nothing changed.
+"""
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+import json
+import threading
+import time
+
+from app.config import get_settings
+from app.core.io_mode import offload, sync_variant
+from app.core.logging_config import get_logger
+from app.core.vector_store import VectorStoreService, get_vector_store
+
+logger = get_logger(__name__)
+
+CACHE_BACKENDS = ("memory", "redis", "none")
+
+# Cached value for customers without a session (avoids re-querying new customers)
+_ABSENT = "null"
+
+
+class LocalSessionCache:
+    """In-process LRU of serialized sessions with TTL eviction (thread-safe)."""
+
+    def __init__(self, ttl_s: float, max_entries: int):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisSessionCache:
+    """Sessions cached in Redis (SETEX), shared by every chatbot worker."""
+
+    def __init__(self, url: str, ttl_s: float, prefix: str = "chatbot:session:"):
+        import redis  # optional dependency, only needed for SESSION_CACHE_BACKEND=redis
+
+        self.ttl_s = max(1, int(ttl_s))
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, decode_responses=True)
+        self._client.ping()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: str):
+        self._client.setex(self.prefix + key, self.ttl_s, value)
+
+    def delete(self, key: str):
+        self._client.delete(self.prefix + key)
+
+    def __len__(self) -> int:
+        return -1  # not tracked
+
+
+_pending_saves: ContextVar[Optional[Dict[str, dict]]] = ContextVar("pending_session_saves", default=None)
+
+
+class SessionStore:
+    """Cached access to customer sessions.
+
+    ``get`` reads through the cache; ``save`` writes through to Postgres, or,
+    inside ``write_scope()``, only records the session and writes the last
+    saved version once when the scope exits.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStoreService = None,
+        backend: str = None,
+        ttl_s: float = None,
+        max_entries: int = None,
+        redis_url: str = None
+    ):
+        settings = get_settings()
+        self.vector_store = vector_store or get_vector_store()
+        backend = backend or settings.session_cache_backend
+        ttl_s = ttl_s if ttl_s is not None else settings.session_cache_ttl_s
+        if backend not in CACHE_BACKENDS:
+            raise ValueError(f"Unknown session cache backend {backend!r}; expected one of {CACHE_BACKENDS}")
+
+        self.cache = None
+        if backend == "redis":
+            try:
+                self.cache = RedisSessionCache(redis_url or settings.redis_url, ttl_s)
+            except Exception as e:
+                logger.warning(f"Redis session cache unavailable, using the in-process cache: {e}")
+                backend = "memory"
+        if backend == "memory":
+            self.cache = LocalSessionCache(ttl_s, max_entries or settings.session_cache_max_entries)
+        self.backend = backend if self.cache is not None else "none"
+        self._stats = {"cache_hits": 0, "cache_misses": 0, "db_reads": 0, "db_writes": 0,
+                       "writes_coalesced": 0, "writes_skipped": 0}
+
+    def initialize(self):
+        """Probe the customer_sessions schema once (instead of per query)."""
+        self.vector_store.initialize()
+        self.vector_store.session_schema()
+
+    async def aget(self, phone_number: str) -> Optional[dict]:
+        """Session for a customer, from the cache when possible.
+
+        Args:
+            phone_number: Customer phone number.
+
+        Returns:
+            Session data dictionary or None if the customer has no session.
+        """
+        pending = _pending_saves.get()
+        if pending is not None and phone_number in pending:
+            return json.loads(pending[phone_number])
+
+        cached = await self._cache_call(self._cache_get, phone_number)
+        if cached is not None:
+            self._stats["cache_hits"] += 1
+            return json.loads(cached)
+
+        self._stats["cache_misses"] += 1
+        self._stats["db_reads"] += 1
+        session = await self.vector_store.aget_customer_session(phone_number)
+        await self._cache_call(self._cache_set, phone_number, _serialize(session))
+        return session
+
+    async def asave(self, phone_number: str, session: dict):
+        """Save a session (keys of ``VectorStoreService.save_customer_session``).
+
+        Args:
+            phone_number: Customer phone number.
+            session: extracted_requirements, last_intent, is_complete, confirmed,
+                awaiting_confirmation and confirmation_attempt.
+        """
+        value = _serialize(session)
+        pending = _pending_saves.get()
+        if pending is not None:
+            if phone_number in pending:
+                self._stats["writes_coalesced"] += 1
+            pending[phone_number] = value
+            return
+        await self._write(phone_number, value)
+
+    get = sync_variant(aget)
+    save = sync_variant(asave)
+
+    @contextmanager
+    def write_scope(self):
+        """Defer saves until the end of a turn; each session is written at most once."""
+        pending: Dict[str, str] = {}
+        token = _pending_saves.set(pending)
+        try:
+            yield
+        finally:
+            _pending_saves.reset(token)
+            sync_variant(self._write_all)(pending)
+
+    @asynccontextmanager
+    async def awrite_scope(self):
+        """Async variant of ``write_scope``."""
+        pending: Dict[str, str] = {}
+        token = _pending_saves.set(pending)
+        try:
+            yield
+        finally:
+            _pending_saves.reset(token)
+            await self._write_all(pending)
+
+    def invalidate(self, phone_number: str):
+        """Drop a cached session (e.g. after an out-of-band update)."""
+        self._cache_delete(phone_number)
+
+    def get_stats(self) -> dict:
+        """Cache and database counters."""
+        return {**self._stats, "backend": self.backend, "cached": len(self.cache) if self.cache is not None else 0}
+
+    async def _write_all(self, pending: Dict[str, str]):
+        for phone_number, value in pending.items():
+            await self._write(phone_number, value)
+
+    async def _write(self, phone_number: str, value: str):
+        if await self._cache_call(self._cache_get, phone_number) == value:
+            # Same as the stored session: nothing to write
+            self._stats["writes_skipped"] += 1
+            return
+        try:
+            await self.vector_store.asave_customer_session(phone_number, **json.loads(value))
+        except Exception:
+            # The database may or may not hold the new version; re-read it next time
+            await self._cache_call(self._cache_delete, phone_number)
+            raise
+        self._stats["db_writes"] += 1
+        await self._cache_call(self._cache_set, phone_number, value)
+
+    async def _cache_call(self, op, *args):
+        """In-process cache inline; Redis round trips off the event loop."""
+        if self.backend == "redis":
+            return await offload(op, *args)
+        return op(*args)
+
+    def _cache_get(self, phone_number: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(phone_number)
+        except Exception as e:
+            logger.warning(f"Session cache read failed for {phone_number}: {e}")
+            return None
+
+    def _cache_set(self, phone_number: str, value: str):
+        if self.cache is None:
+            return
+        try:
+            self.cache.set(phone_number, value)
+        except Exception as e:
+            logger.warning(f"Session cache write failed for {phone_number}: {e}")
+
+    def _cache_delete(self, phone_number: str):
+        if self.cache is None:
+            return
+        try:
+            self.cache.delete(phone_number)
+        except Exception as e:
+            logger.warning(f"Session cache delete failed for {phone_number}: {e}")
+
+
+def _serialize(session: Optional[dict]) -> str:
+    """Canonical JSON (cached values are copies, and compare by content)."""
+    if session is None:
+        return _ABSENT
+    return json.dumps(session, ensure_ascii=False, sort_keys=True, default=str)
+
+
+_session_store_instance = None
+
+
+def get_session_store() -> SessionStore:
+    """Get or create the session store instance."""
+    global _session_store_instance
+    if _session_store_instance is None:
+        _session_store_instance = SessionStore()
+    return _session_store_instance
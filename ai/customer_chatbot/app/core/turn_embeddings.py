@@ -0,0 +1,117 @@
+"""
+Per-turn embedding memo.
+Within one conversation turn the same text (the user message, a span the
+matchers look up, ...) is embedded at most once per model. The memo is
+request-scoped through a ContextVar, so embedding calls outside a turn
+(startup, background workers) are unaffected.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import threading
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TurnEmbeddingMemo:
+    """Embeddings computed during one turn, keyed by (namespace, text).
+
+    The namespace identifies the model that produced the vectors (local
+    model + backend, or the embedding service), so vectors from different
+    models are never mixed. ``stats`` is guarded by the same lock as the
+    vectors.
+    """
+
+    def __init__(self):
+        self._vectors: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "texts_requested": 0,
+            "texts_embedded": 0,
+            "texts_reused": 0,
+            "model_calls": 0,
+            "model_calls_avoided": 0,
+        }
+
+    def embed_many(
+        self,
+        namespace: str,
+        texts: Sequence[str],
+        compute: Callable[[List[str]], Tuple[str, Sequence[Any]]]
+    ) -> List[Any]:
+        """Return one vector per text, computing only texts not seen this turn.
+
+        Args:
+            namespace: Model identity the caller expects.
+            texts: Texts to embed (duplicates allowed).
+            compute: Batch embedding function for the missing texts; returns
+                the namespace of the model that actually produced the vectors
+                (e.g. a local fallback) along with them.
+
+        Returns:
+            Vectors in the order of ``texts``.
+        """
+        with self._lock:
+            found = {t: self._vectors[(namespace, t)] for t in texts if (namespace, t) in self._vectors}
+            missing = list(dict.fromkeys(t for t in texts if t not in found))
+            self.stats["texts_requested"] += len(texts)
+            self.stats["texts_reused"] += len(texts) - len(missing)
+            if texts and not missing:
+                self.stats["model_calls_avoided"] += 1
+
+        if missing:
+            produced_by, vectors = compute(missing)
+            with self._lock:
+                for text, vector in zip(missing, vectors):
+                    # Stored under the producing model, so a fallback vector is
+                    # never served later as one of the expected model's
+                    self._vectors[(produced_by, text)] = vector
+                    found[text] = vector
+                self.stats["model_calls"] += 1
+                self.stats["texts_embedded"] += len(missing)
+
+        return [found[t] for t in texts]
+
+    def get(self, namespace: str, text: str) -> Optional[Any]:
+        """Vector already computed this turn, if any."""
+        with self._lock:
+            return self._vectors.get((namespace, text))
+
+    def get_stats(self) -> dict:
+        """Counters for the turn (model calls made and avoided)."""
+        with self._lock:
+            return dict(self.stats)
+
+
+_current_memo: ContextVar[Optional[TurnEmbeddingMemo]] = ContextVar("turn_embedding_memo", default=None)
+
+
+@contextmanager
+def turn_scope():
+    """Activate a fresh memo for the duration of one conversation turn."""
+    memo = TurnEmbeddingMemo()
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+
+
+def current_memo() -> Optional[TurnEmbeddingMemo]:
+    """Memo of the turn being processed (None outside a turn)."""
+    return _current_memo.get()
+
+
+def memoized_embed(
+    namespace: str,
+    texts: Sequence[str],
+    compute: Callable[[List[str]], Tuple[str, Sequence[Any]]]
+) -> List[Any]:
+    """Embed through the current turn's memo, or directly outside a turn."""
+    memo = current_memo()
+    if memo is None:
+        return list(compute(list(texts))[1]) if texts else []
+    return memo.embed_many(namespace, texts, compute)
@@ -0,0 +1,328 @@
+"""
+Write-behind persistence for conversation turns.
+Turn messages are appended to a local SQLite journal and acknowledged
+immediately; a background worker embeds them in batches and bulk-inserts
+them into conversation_embeddings. Unflushed messages survive restarts and
+are replayed from the journal on the next start. A batch that keeps failing
+is stored message by message; messages the database rejects on their own
+are moved to a dead-letter table so they cannot block the queue.
+"""
+
+from typing import List, Optional
+from datetime import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import psycopg2
+
+from app.config import get_settings
+from app.core.embeddings import get_embedding_service
+from app.core.logging_config import get_logger
+from app.core.vector_store import VectorStoreService, get_vector_store
+
+logger = get_logger(__name__)
+
+# Errors caused by the message itself (NUL byte in the text, over-length
+# column, ...); anything else (connection lost, database down) is retried
+RECORD_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError, ValueError, TypeError)
+
+
+class TurnJournal:
+    """Append-only SQLite queue of pending messages (thread-safe)."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite file path (":memory:" for a non-durable journal).
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS pending (id INTEGER PRIMARY KEY AUTOINCREMENT, record TEXT NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letter "
+            "(id INTEGER PRIMARY KEY, record TEXT NOT NULL, error TEXT, failed_at TEXT NOT NULL)"
+        )
+
+    def append(self, records: List[dict]):
+        """Durably append records (one transaction)."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO pending (record) VALUES (?)",
+                [(json.dumps(r, ensure_ascii=False, default=str),) for r in records]
+            )
+            self._db.execute("COMMIT")
+
+    def peek(self, limit: int) -> List[tuple]:
+        """Oldest pending (id, record) pairs."""
+        with self._lock:
+            rows = self._db.execute("SELECT id, record FROM pending ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [(row_id, json.loads(record)) for row_id, record in rows]
+
+    def remove(self, ids: List[int]):
+        """Drop records once they are stored."""
+        with self._lock:
+            self._db.executemany("DELETE FROM pending WHERE id = ?", [(i,) for i in ids])
+
+    def dead_letter(self, row_id: int, error: str):
+        """Move a record that cannot be stored out of the queue (one transaction)."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT OR REPLACE INTO dead_letter (id, record, error, failed_at) "
+                "SELECT id, record, ?, ? FROM pending WHERE id = ?",
+                (error, datetime.now().isoformat(), row_id)
+            )
+            self._db.execute("DELETE FROM pending WHERE id = ?", (row_id,))
+            self._db.execute("COMMIT")
+
+    def dead_letters(self) -> List[tuple]:
+        """Dead-lettered (id, record, error) triples, oldest first."""
+        with self._lock:
+            rows = self._db.execute("SELECT id, record, error FROM dead_letter ORDER BY id").fetchall()
+        return [(row_id, json.loads(record), error) for row_id, record, error in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM pending").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class TurnPersister:
+    """Background writer that batches embeddings and inserts.
+
+    ``submit`` only touches the local journal. When the journal holds
+    ``max_pending`` messages, callers wait up to ``enqueue_timeout_s`` for the
+    worker to catch up and then write a batch themselves (backpressure
+    instead of dropping turns). After ``max_attempts`` failures of the same
+    batch its messages are stored one by one, and those rejected with a
+    record error are dead-lettered.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStoreService = None,
+        journal: TurnJournal = None,
+        batch_size: int = None,
+        flush_interval_s: float = None,
+        max_pending: int = None,
+        enqueue_timeout_s: float = None,
+        max_attempts: int = None
+    ):
+        settings = get_settings()
+        self.vector_store = vector_store or get_vector_store()
+        self.journal = journal if journal is not None else TurnJournal(settings.persist_journal_path)
+        self.batch_size = batch_size or settings.persist_batch_size
+        self.flush_interval_s = flush_interval_s if flush_interval_s is not None else settings.persist_flush_interval_s
+        self.max_pending = max_pending or settings.persist_max_pending
+        self.enqueue_timeout_s = enqueue_timeout_s if enqueue_timeout_s is not None else settings.persist_enqueue_timeout_s
+        self.max_attempts = max(1, max_attempts or settings.persist_max_attempts)
+
+        self._wakeup = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+        self._conn = None
+        # Journal id at the head of the failing batch and its consecutive failures
+        self._failing_head: Optional[int] = None
+        self._head_failures = 0
+        self._stats = {"submitted": 0, "stored": 0, "batches": 0, "failures": 0, "inline_flushes": 0,
+                       "dead_lettered": 0}
+
+    def start(self):
+        """Start the worker; messages left in the journal are replayed."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stopping = False
+        self._worker = threading.Thread(target=self._run, name="turn-persister", daemon=True)
+        self._worker.start()
+        pending = len(self.journal)
+        if pending:
+            logger.info(f"Replaying {pending} journaled messages")
+
+    def submit(self, records: List[dict]):
+        """Queue messages for storage without waiting for embedding or commit.
+
+        Args:
+            records: Dicts with phone_number, message_type, message_text, metadata
+                and optionally an already computed embedding.
+        """
+        if not records:
+            return
+        created_at = datetime.now().isoformat()
+        records = [{**r, "created_at": r.get("created_at") or created_at} for r in records]
+
+        deadline = time.monotonic() + self.enqueue_timeout_s
+        with self._wakeup:
+            while len(self.journal) >= self.max_pending and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wakeup.notify_all()
+                self._wakeup.wait(remaining)
+
+        self.journal.append(records)
+        self._stats["submitted"] += len(records)
+
+        if len(self.journal) > self.max_pending or self._worker is None or not self._worker.is_alive():
+            # Worker is behind (or not running): pay for one batch on this thread
+            self._stats["inline_flushes"] += 1
+            self._flush_batch()
+        else:
+            with self._wakeup:
+                self._wakeup.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until the journal is empty.
+
+        Returns:
+            True if everything was stored in time.
+        """
+        deadline = time.monotonic() + timeout
+        while len(self.journal):
+            if self._worker is None or not self._worker.is_alive():
+                if not self._flush_batch():
+                    return False
+                continue
+            if time.monotonic() >= deadline:
+                return False
+            with self._wakeup:
+                self._wakeup.notify_all()
+                self._wakeup.wait(0.05)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Flush pending messages and stop the worker."""
+        flushed = self.flush(timeout)
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+        if not flushed:
+            logger.warning(f"{len(self.journal)} messages left in the journal; they will be stored on next start")
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+
+    def get_stats(self) -> dict:
+        """Queue depth and throughput counters."""
+        return {**self._stats, "pending": len(self.journal)}
+
+    def _run(self):
+        backoff = self.flush_interval_s
+        while True:
+            with self._wakeup:
+                if self._stopping:
+                    return
+                if not len(self.journal):
+                    self._wakeup.wait(self.flush_interval_s)
+                    continue
+            try:
+                self._flush_batch(raise_errors=True)
+                backoff = self.flush_interval_s
+            except Exception as e:
+                self._stats["failures"] += 1
+                logger.error(f"Write-behind batch failed, retrying in {backoff:.1f}s: {e}")
+                deadline = time.monotonic() + backoff
+                with self._wakeup:
+                    # New submissions must not cut the backoff short; only stopping does
+                    while not self._stopping and deadline > time.monotonic():
+                        self._wakeup.wait(deadline - time.monotonic())
+                backoff = min(max(backoff * 2, 0.5), 30.0)
+
+    def _flush_batch(self, raise_errors: bool = False) -> bool:
+        """Embed and insert the oldest batch, then drop it from the journal."""
+        with self._write_lock:
+            batch = self.journal.peek(self.batch_size)
+            if not batch:
+                return True
+            ids = [row_id for row_id, _ in batch]
+            records = [record for _, record in batch]
+            embeddings = None
+            try:
+                embeddings = self._embed(records)
+                if self._batch_keeps_failing(ids[0]):
+                    stored = self._store_each(batch, embeddings)
+                else:
+                    self._store(records, embeddings)
+                    self.journal.remove(ids)
+                    stored = len(records)
+            except Exception as e:
+                self._note_failure(ids[0])
+                if raise_errors:
+                    raise
+                logger.error(f"Inline write-behind batch failed: {e}")
+                return False
+            self._failing_head, self._head_failures = None, 0
+
+        self._stats["stored"] += stored
+        self._stats["batches"] += 1
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return True
+
+    def _embed(self, records: List[dict]) -> list:
+        """One vector per record; records may carry the vector computed during their turn."""
+        missing = [r["message_text"] for r in records if r.get("embedding") is None]
+        computed = iter(get_embedding_service().embed_texts(missing) if missing else [])
+        return [r["embedding"] if r.get("embedding") is not None else next(computed) for r in records]
+
+    def _store(self, records: List[dict], embeddings: list):
+        if self._conn is None or self._conn.closed:
+            self._conn = self.vector_store.connect()
+        try:
+            self.vector_store.store_messages(records, embeddings, conn=self._conn)
+        except Exception:
+            # Reconnect on the next attempt instead of reusing a failed transaction
+            self._conn.close()
+            raise
+
+    def _note_failure(self, head_id: int):
+        if head_id == self._failing_head:
+            self._head_failures += 1
+        else:
+            self._failing_head, self._head_failures = head_id, 1
+
+    def _batch_keeps_failing(self, head_id: int) -> bool:
+        """True once the batch starting at ``head_id`` has failed ``max_attempts`` times."""
+        return head_id == self._failing_head and self._head_failures >= self.max_attempts
+
+    def _store_each(self, batch: List[tuple], embeddings: list) -> int:
+        """Store a batch message by message, dead-lettering messages rejected on their own.
+
+        Other errors propagate; messages stored so far are already off the journal.
+        """
+        stored = 0
+        for (row_id, record), embedding in zip(batch, embeddings):
+            try:
+                self._store([record], [embedding])
+            except RECORD_ERRORS as e:
+                logger.error(f"Dead-lettering journaled message {row_id} ({record.get('phone_number')}): {e}")
+                self.journal.dead_letter(row_id, f"{type(e).__name__}: {e}")
+                self._stats["dead_lettered"] += 1
+                continue
+            self.journal.remove([row_id])
+            stored += 1
+        return stored
+
+
+_turn_persister_instance = None
+
+
+def get_turn_persister() -> TurnPersister:
+    """Get or create the write-behind persister (started on first use)."""
+    global _turn_persister_instance
+    if _turn_persister_instance is None:
+        _turn_persister_instance = TurnPersister()
+        _turn_persister_instance.start()
+    return _turn_persister_instance
@@ -0,0 +1,329 @@
+"""
+ANN index management for conversation_embeddings.
+Chooses the index type from the table size (none / HNSW / IVFFlat),
+rebuilds or retunes it as the table grows, sets per-query probe parameters
+and keeps per-phone similarity search index-backed.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+import hashlib
+import math
+import re
+import threading
+
+from app.config import get_settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# HNSW needs pgvector >= 0.5.0; older servers only get IVFFlat
+HNSW_MIN_VERSION = (0, 5, 0)
+
+
+@dataclass
+class IndexPlan:
+    """Target ANN index for a table size."""
+    method: str                      # "none" | "hnsw" | "ivfflat"
+    lists: Optional[int] = None      # IVFFlat only
+    m: Optional[int] = None          # HNSW only
+    ef_construction: Optional[int] = None
+
+    def options(self) -> str:
+        """WITH (...) options for CREATE INDEX."""
+        if self.method == "hnsw":
+            return f"m = {self.m}, ef_construction = {self.ef_construction}"
+        return f"lists = {self.lists}"
+
+
+@dataclass
+class IndexState:
+    """What the database currently has."""
+    rows: int = 0
+    method: str = "none"
+    lists: Optional[int] = None
+    pgvector_version: Tuple[int, ...] = (0, 0, 0)
+    partial_phones: frozenset = frozenset()
+
+
+def parse_version(value: Optional[str]) -> Tuple[int, ...]:
+    """'0.7.4' -> (0, 7, 4)."""
+    parts = re.findall(r"\d+", value or "")
+    return tuple(int(p) for p in parts[:3]) or (0, 0, 0)
+
+
+class VectorIndexManager:
+    """Keeps the ANN index of a vector table matched to its size.
+
+    Policy (thresholds from settings):
+    - fewer than ``vector_index_min_rows`` rows: no ANN index, an exact scan
+      is fast and IVFFlat centroids trained on a near-empty table are useless
+    - up to ``vector_index_hnsw_max_rows``: HNSW (no training, good recall)
+    - above: IVFFlat with lists = rows / 1000 (sqrt(rows) past 1M rows),
+      rebuilt when the ideal list count drifts by 2x
+
+    Filtered search by phone uses a partial HNSW index for phones with many
+    messages and an exact scan over the (phone_number, created_at) btree
+    for everyone else, so it never post-filters a global ANN scan.
+    """
+
+    def __init__(
+        self,
+        connect: Callable,
+        table: str = "conversation_embeddings",
+        column: str = "embedding",
+        filter_column: str = "phone_number"
+    ):
+        """
+        Args:
+            connect: Callable returning a new psycopg2 connection (used for DDL).
+            table: Vector table name.
+            column: Vector column name.
+            filter_column: Column used for per-conversation filtering.
+        """
+        settings = get_settings()
+        self.connect = connect
+        self.table = table
+        self.column = column
+        self.filter_column = filter_column
+        self.index_name = f"idx_{table}_vector"
+        self.partial_prefix = f"idx_{table}_phone_ann_"
+
+        self.min_rows = settings.vector_index_min_rows
+        self.hnsw_max_rows = settings.vector_index_hnsw_max_rows
+        self.hnsw_m = settings.vector_index_hnsw_m
+        self.hnsw_ef_construction = settings.vector_index_hnsw_ef_construction
+        self.hnsw_ef_search = settings.vector_index_hnsw_ef_search
+        self.partial_min_rows = settings.vector_index_partial_min_rows
+        self.max_partial = settings.vector_index_max_partial
+        self.check_every = settings.vector_index_check_every
+        self.maintenance_work_mem = settings.vector_index_maintenance_work_mem
+
+        self.state = IndexState()
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    # ==================== Policy ====================
+
+    def plan_for(self, rows: int, pgvector_version: Tuple[int, ...] = HNSW_MIN_VERSION) -> IndexPlan:
+        """Pick the index type and build parameters for a row count."""
+        if rows < self.min_rows:
+            return IndexPlan("none")
+        if rows <= self.hnsw_max_rows and pgvector_version >= HNSW_MIN_VERSION:
+            return IndexPlan("hnsw", m=self.hnsw_m, ef_construction=self.hnsw_ef_construction)
+        lists = rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows))
+        return IndexPlan("ivfflat", lists=max(1, lists))
+
+    def needs_rebuild(self, state: IndexState, plan: IndexPlan) -> bool:
+        """Whether the current index no longer matches the plan."""
+        if state.method != plan.method:
+            return True
+        if plan.method == "ivfflat" and state.lists:
+            return abs(math.log2(plan.lists / state.lists)) >= 1
+        return False
+
+    def ef_search(self, limit: int) -> int:
+        """HNSW candidate list size: grows with the table and the LIMIT."""
+        ef = self.hnsw_ef_search
+        if self.state.rows > 100_000:
+            ef = int(ef * (1 + math.log10(self.state.rows / 100_000)))
+        return min(1000, max(ef, 2 * limit))
+
+    def probes(self) -> int:
+        """IVFFlat lists scanned per query (sqrt(lists))."""
+        lists = self.state.lists or 1
+        return max(1, min(lists, round(math.sqrt(lists))))
+
+    # ==================== Query side ====================
+
+    def query_settings(self, limit: int, phone_number: Optional[str] = None) -> List[str]:
+        """SET LOCAL statements to run before a similarity query.
+
+        Must run inside the query's transaction.
+        """
+        if phone_number is not None:
+            if phone_number in self.state.partial_phones:
+                return [f"SET LOCAL hnsw.ef_search = {self.ef_search(limit)}"]
+            return []  # exact scan
+        if self.state.method == "hnsw":
+            return [f"SET LOCAL hnsw.ef_search = {self.ef_search(limit)}"]
+        if self.state.method == "ivfflat":
+            return [f"SET LOCAL ivfflat.probes = {self.probes()}"]
+        return []
+
+    def build_search(
+        self,
+        query_embedding,
+        phone_number: Optional[str] = None,
+        limit: int = 5,
+        columns: str = "message_type, message_text"
+    ) -> Tuple[str, tuple]:
+        """Similarity query (and params) using the best plan for the filter.
+
+        Returns:
+            (sql, params) returning ``columns`` plus ``similarity``.
+        """
+        distance = f"{self.column} <=> %s::vector"
+        if phone_number is None or phone_number in self.state.partial_phones:
+            # Global ANN index, or the phone's own partial index
+            where = f"WHERE {self.filter_column} = %s" if phone_number is not None else ""
+            sql = f"""
+                SELECT {columns}, 1 - ({distance}) AS similarity
+                FROM {self.table}
+                {where}
+                ORDER BY {distance}
+                LIMIT %s
+            """
+            params = (query_embedding,) + ((phone_number,) if phone_number is not None else ()) + (query_embedding, limit)
+            return sql, params
+
+        # Exact scan over one conversation, fetched through the btree
+        sql = f"""
+            WITH conversation AS MATERIALIZED (
+                SELECT {columns}, {self.column}
+                FROM {self.table}
+                WHERE {self.filter_column} = %s
+            )
+            SELECT {columns}, 1 - ({distance}) AS similarity
+            FROM conversation
+            ORDER BY {distance}
+            LIMIT %s
+        """
+        return sql, (phone_number, query_embedding, query_embedding, limit)
+
+    # ==================== Maintenance ====================
+
+    def inspect(self, cur) -> IndexState:
+        """Read table size, current index and partial indexes."""
+        cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        row = cur.fetchone()
+        version = parse_version(row[0] if row else None)
+
+        cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", (self.table,))
+        rows = cur.fetchone()[0]
+        if rows < 0:  # never analyzed
+            cur.execute(f"SELECT count(*) FROM {self.table}")
+            rows = cur.fetchone()[0]
+
+        cur.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", (self.table,))
+        method, lists, partial = "none", None, set()
+        for name, definition in cur.fetchall():
+            if name == self.index_name:
+                found = re.search(r"USING (hnsw|ivfflat)", definition)
+                method = found.group(1) if found else "none"
+                found = re.search(r"lists='?(\d+)", definition)
+                lists = int(found.group(1)) if found else None
+            elif name.startswith(self.partial_prefix):
+                found = re.search(r"= '((?:[^']|'')*)'", definition)
+                if found:
+                    partial.add(found.group(1).replace("''", "'"))
+
+        return IndexState(rows=rows, method=method, lists=lists, pgvector_version=version,
+                          partial_phones=frozenset(partial))
+
+    def maintain(self, plan: Optional[IndexPlan] = None, concurrently: bool = True) -> dict:
+        """Bring the indexes in line with the current table size.
+
+        Args:
+            plan: Force a specific plan instead of the size-based policy.
+            concurrently: Build with CREATE INDEX CONCURRENTLY (no write lock).
+
+        Returns:
+            Summary of what was found and changed.
+        """
+        conn = self.connect()
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                if self.maintenance_work_mem:
+                    cur.execute("SET maintenance_work_mem = %s", (self.maintenance_work_mem,))
+                state = self.inspect(cur)
+                plan = plan or self.plan_for(state.rows, state.pgvector_version)
+                summary = {"rows": state.rows, "before": state.method, "after": plan.method, "rebuilt": False}
+
+                if self.needs_rebuild(state, plan):
+                    self._rebuild(cur, plan, concurrently)
+                    summary["rebuilt"] = True
+
+                if self.partial_min_rows > 0 and state.pgvector_version >= HNSW_MIN_VERSION:
+                    summary["partial_created"] = self._create_partial_indexes(cur, state, concurrently)
+
+                self.state = self.inspect(cur)
+        finally:
+            conn.close()
+
+        logger.info(f"Vector index maintenance on {self.table}: {summary}")
+        return summary
+
+    def schedule_maintenance(self):
+        """Run maintain() in a background thread (at most one at a time)."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._maintain_quietly, name="vector-index-maintenance", daemon=True)
+            self._worker.start()
+
+    def note_inserts(self, count: int = 1):
+        """Count inserts and schedule a maintenance check every ``check_every``."""
+        with self._lock:
+            self._inserts += count
+            due = self.check_every > 0 and self._inserts >= self.check_every
+            if due:
+                self._inserts = 0
+        if due:
+            self.schedule_maintenance()
+
+    def _maintain_quietly(self):
+        try:
+            self.maintain()
+        except Exception as e:
+            logger.error(f"Vector index maintenance failed: {e}", exc_info=True)
+
+    def _create_index_sql(self, name: str, plan: IndexPlan, concurrently: bool, where: str = "") -> str:
+        return (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{name} ON {self.table} "
+            f"USING {plan.method} ({self.column} vector_cosine_ops) WITH ({plan.options()})"
+            + (f" WHERE {where}" if where else "")
+        )
+
+    def _rebuild(self, cur, plan: IndexPlan, concurrently: bool):
+        """Swap in a new index built next to the old one."""
+        drop = f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS"
+        if plan.method == "none":
+            cur.execute(f"{drop} {self.index_name}")
+            return
+
+        staging = f"{self.index_name}_rebuild"
+        cur.execute(f"{drop} {staging}")  # leftover of an interrupted build
+        logger.info(f"Building {plan.method} index on {self.table} ({plan.options()})")
+        cur.execute(self._create_index_sql(staging, plan, concurrently))
+        cur.execute(f"{drop} {self.index_name}")
+        cur.execute(f"ALTER INDEX {staging} RENAME TO {self.index_name}")
+
+    def _create_partial_indexes(self, cur, state: IndexState, concurrently: bool) -> int:
+        """Partial HNSW indexes for the phones with the most messages."""
+        cur.execute(
+            f"""
+            SELECT {self.filter_column}, count(*) AS n
+            FROM {self.table}
+            GROUP BY {self.filter_column}
+            HAVING count(*) >= %s
+            ORDER BY n DESC
+            LIMIT %s
+            """,
+            (self.partial_min_rows, self.max_partial)
+        )
+        hot = [row[0] for row in cur.fetchall()]
+        plan = IndexPlan("hnsw", m=self.hnsw_m, ef_construction=self.hnsw_ef_construction)
+
+        created = 0
+        for phone in hot:
+            if phone in state.partial_phones:
+                continue
+            name = self.partial_prefix + hashlib.md5(phone.encode("utf-8")).hexdigest()[:12]
+            where = cur.mogrify(f"{self.filter_column} = %s", (phone,)).decode()
+            cur.execute(f"DROP INDEX IF EXISTS {name}")  # invalid leftover of an interrupted build
+            cur.execute(self._create_index_sql(name, plan, concurrently, where=where))
+            created += 1
+        return created
@@ -4,41 +4,125 @@ Handles storage and retrieval of conversation embeddings.
 """
 
 from typing import List, Optional, Tuple
+import asyncio
 import json
+import re
+import threading
+import asyncpg
+import numpy as np
 import psycopg2
 from psycopg2.extras import execute_values
 from pgvector.psycopg2 import register_vector
+from pgvector.asyncpg import register_vector as register_vector_async
 
 from app.config import get_settings
 from app.core.embeddings import get_embedding_service
+from app.core.io_mode import is_blocking_io, offload
 from app.core.logging_config import get_logger
+from app.core.vector_index_manager import VectorIndexManager
 
 logger = get_logger(__name__)
 
+# customer_sessions columns added by migrations/001_add_workflow_state.sql
+SESSION_WORKFLOW_COLUMNS = ("confirmed", "awaiting_confirmation", "confirmation_attempt")
+
+# transliteration_memo.text is VARCHAR(255); lookups and saves truncate alike
+TRANSLITERATION_KEY_LENGTH = 255
+
+HISTORY_SQL = """
+    SELECT message_type, message_text, created_at, metadata
+    FROM conversation_embeddings
+    WHERE phone_number = %s
+    ORDER BY created_at DESC
+    LIMIT %s
+"""
+
+
+def numbered_params(sql: str) -> str:
+    """Rewrite psycopg2 ``%s`` placeholders as asyncpg ``$1, $2, ...``."""
+    counter = iter(range(1, sql.count("%s") + 1))
+    return re.sub(r"%s", lambda _: f"${next(counter)}", sql)
+
 
 class VectorStoreService:
-    """Service for vector storage and retrieval using pgvector."""
+    """Service for vector storage and retrieval using pgvector.
+    
+    Blocking methods use psycopg2 (one connection per thread); the ``a``-prefixed
+    coroutines used by the async workflow run the same queries on an asyncpg
+    pool, or fall back to the blocking methods under ``blocking_io()``.
+    """
     
     def __init__(self):
         """Initialize the vector store service."""
         self.settings = get_settings()
-        self._connection = None
+        # One connection per thread: conversation turns run concurrently on the
+        # scheduler's worker pool and must not share a transaction
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self._initialized = False
+        self._session_schema: Optional[str] = None
+        self._pool = None
+        self._pool_loop = None
+        self._pool_lock = None
+        self.index_manager = VectorIndexManager(self.connect)
+    
+    def connect(self):
+        """Open a new database connection with the vector adapter registered."""
+        conn = psycopg2.connect(
+            host=self.settings.database_host,
+            port=self.settings.database_port,
+            user=self.settings.database_user,
+            password=self.settings.database_password,
+            database=self.settings.database_name
+        )
+        register_vector(conn)
+        return conn
+    
+    @property
+    def connection(self):
+        """Database connection of the calling thread (None before first use)."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._adopt_connection()
+        return conn
+    
+    @connection.setter
+    def connection(self, conn):
+        self._local.connection = conn
+        with self._connections_lock:
+            self._connections = [(owner, c) for owner, c in self._connections if not c.closed]
+            self._connections.append((threading.current_thread(), conn))
+    
+    def _adopt_connection(self):
+        """Take over the connection of a finished thread, if any.
+        
+        LangGraph runs parallel branches of a turn on short-lived threads;
+        reusing their connections keeps one connection per live thread.
+        """
+        current = threading.current_thread()
+        with self._connections_lock:
+            for i, (owner, conn) in enumerate(self._connections):
+                if not owner.is_alive() and not conn.closed:
+                    self._connections[i] = (current, conn)
+                    break
+            else:
+                return None
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            conn.close()
+            return None
+        self._local.connection = conn
+        return conn
     
     def _get_connection(self):
         """Get database connection."""
-        if self._connection is None or self._connection.closed:
+        if self.connection is None or self.connection.closed:
             logger.debug(f"Connecting to database at {self.settings.database_host}:{self.settings.database_port}")
-            self._connection = psycopg2.connect(
-                host=self.settings.database_host,
-                port=self.settings.database_port,
-                user=self.settings.database_user,
-                password=self.settings.database_password,
-                database=self.settings.database_name
-            )
-            register_vector(self._connection)
+            self.connection = self.connect()
             logger.debug("Database connection established")
-        return self._connection
+        return self.connection
     
     def initialize(self):
         """Initialize pgvector extension and create tables if needed."""
@@ -64,22 +148,28 @@ class VectorStoreService:
                 )
             """)
             
-            # Create index for similarity search
+            # Per-conversation lookups (history and filtered similarity search);
+            # supersedes the old phone_number-only index
             cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_conversation_embeddings_vector 
-                ON conversation_embeddings 
-                USING ivfflat (embedding vector_cosine_ops)
-                WITH (lists = 100)
+                CREATE INDEX IF NOT EXISTS idx_conversation_embeddings_phone_created 
+                ON conversation_embeddings (phone_number, created_at DESC)
             """)
+            cur.execute("DROP INDEX IF EXISTS idx_conversation_embeddings_phone")
             
-            # Create index for phone number lookup
+            # Franco name transliterations from the LLM (see app/services/transliteration.py)
             cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_conversation_embeddings_phone 
-                ON conversation_embeddings (phone_number)
+                CREATE TABLE IF NOT EXISTS transliteration_memo (
+                    text VARCHAR(255) PRIMARY KEY,
+                    transliteration VARCHAR(255) NOT NULL,
+                    source VARCHAR(20) NOT NULL,
+                    created_at TIMESTAMP DEFAULT NOW()
+                )
             """)
             
             conn.commit()
         
+        # The ANN index depends on the table size: chosen and (re)built in the background
+        self.index_manager.schedule_maintenance()
         self._initialized = True
     
     def store_message(
@@ -121,9 +211,58 @@ class VectorStoreService:
             message_id = cur.fetchone()[0]
             conn.commit()
         
+        self.index_manager.note_inserts()
         logger.debug(f"Message stored successfully with ID: {message_id}")
         return message_id
     
+    def store_messages(self, records: List[dict], embeddings: List[List[float]], conn=None) -> int:
+        """Bulk insert messages whose embeddings are already computed.
+        
+        Args:
+            records: Dicts with phone_number, message_type, message_text,
+                metadata and optionally created_at.
+            embeddings: One vector per record.
+            conn: Connection to use (defaults to the calling thread's).
+        
+        Returns:
+            Number of messages stored.
+        """
+        if len(records) != len(embeddings):
+            raise ValueError(f"{len(records)} records but {len(embeddings)} embeddings")
+        if not records:
+            return 0
+        self.initialize()
+        
+        conn = conn or self._get_connection()
+        rows = [
+            (
+                r["phone_number"],
+                r["message_type"],
+                r["message_text"],
+                np.asarray(embedding, dtype=np.float32),
+                json.dumps(r.get("metadata") or {}),
+                r.get("created_at"),
+            )
+            for r, embedding in zip(records, embeddings)
+        ]
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                """
+                INSERT INTO conversation_embeddings
+                (phone_number, message_type, message_text, embedding, metadata, created_at)
+                VALUES %s
+                """,
+                rows,
+                template="(%s, %s, %s, %s, %s, COALESCE(%s::timestamp, NOW()))",
+                page_size=len(rows)
+            )
+        conn.commit()
+        
+        self.index_manager.note_inserts(len(rows))
+        logger.debug(f"Stored {len(rows)} messages")
+        return len(rows)
+    
     def search_similar(
         self,
         query: str,
@@ -145,33 +284,18 @@ class VectorStoreService:
         embedding_service = get_embedding_service()
         query_embedding = embedding_service.embed_text(query)
         
+        # Index-backed plan for the filter (partial index, exact per-phone scan or global ANN)
+        phone_number = phone_number or None
+        sql, params = self.index_manager.build_search(query_embedding, phone_number, limit)
+        
         conn = self._get_connection()
         with conn.cursor() as cur:
-            if phone_number:
-                cur.execute(
-                    """
-                    SELECT message_type, message_text, 
-                           1 - (embedding <=> %s::vector) as similarity
-                    FROM conversation_embeddings
-                    WHERE phone_number = %s
-                    ORDER BY embedding <=> %s::vector
-                    LIMIT %s
-                    """,
-                    (query_embedding, phone_number, query_embedding, limit)
-                )
-            else:
-                cur.execute(
-                    """
-                    SELECT message_type, message_text, 
-                           1 - (embedding <=> %s::vector) as similarity
-                    FROM conversation_embeddings
-                    ORDER BY embedding <=> %s::vector
-                    LIMIT %s
-                    """,
-                    (query_embedding, query_embedding, limit)
-                )
-            
+            for statement in self.index_manager.query_settings(limit, phone_number):
+                cur.execute(statement)
+            cur.execute(sql, params)
             results = cur.fetchall()
+            # End the transaction so the SET LOCAL probe settings are reset
+            conn.commit()
         
         return results
     
@@ -193,21 +317,15 @@ class VectorStoreService:
         
         conn = self._get_connection()
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT message_type, message_text, created_at, metadata
-                FROM conversation_embeddings
-                WHERE phone_number = %s
-                ORDER BY created_at DESC
-                LIMIT %s
-                """,
-                (phone_number, limit)
-            )
-            
+            cur.execute(HISTORY_SQL, (phone_number, limit))
             rows = cur.fetchall()
         
-        # Reverse to get chronological order
-        messages = [
+        return self._history_messages(rows)
+    
+    @staticmethod
+    def _history_messages(rows) -> List[dict]:
+        """Chronological message dicts from newest-first history rows."""
+        return [
             {
                 "role": row[0],
                 "content": row[1],
@@ -216,8 +334,28 @@ class VectorStoreService:
             }
             for row in reversed(rows)
         ]
+    
+    def session_schema(self) -> str:
+        """Detect once which customer_sessions schema is deployed.
         
-        return messages
+        Returns:
+            "extended" when the confirmation-flow columns exist
+            (migrations/001_add_workflow_state.sql), otherwise "basic".
+        """
+        if self._session_schema is None:
+            conn = self._get_connection()
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT column_name FROM information_schema.columns
+                    WHERE table_name = 'customer_sessions' AND column_name = ANY(%s)
+                    """,
+                    (list(SESSION_WORKFLOW_COLUMNS),)
+                )
+                found = {row[0] for row in cur.fetchall()}
+            self._session_schema = "extended" if found >= set(SESSION_WORKFLOW_COLUMNS) else "basic"
+            logger.info(f"customer_sessions schema: {self._session_schema}")
+        return self._session_schema
     
     def get_customer_session(self, phone_number: str) -> Optional[dict]:
         """Retrieve persistent session for a customer.
@@ -229,58 +367,36 @@ class VectorStoreService:
             Session data dictionary or None if not found.
         """
         self.initialize()
+        sql = self._session_select()
         
         conn = self._get_connection()
         with conn.cursor() as cur:
-            # Try to get extended fields first (new schema)
-            try:
-                cur.execute(
-                    """
-                    SELECT extracted_requirements, last_intent, is_complete,
-                           confirmed, awaiting_confirmation, confirmation_attempt
-                    FROM customer_sessions
-                    WHERE phone_number = %s
-                    """,
-                    (phone_number,)
-                )
-                row = cur.fetchone()
-                
-                if row:
-                    logger.info(f"Retrieved session for {phone_number} (extended schema)")
-                    return {
-                        "extracted_requirements": row[0],
-                        "last_intent": row[1],
-                        "is_complete": row[2],
-                        "confirmed": row[3] if row[3] is not None else False,
-                        "awaiting_confirmation": row[4] if row[4] is not None else False,
-                        "confirmation_attempt": row[5] if row[5] is not None else 0
-                    }
-            except Exception as e:
-                # Fallback to old schema if columns don't exist
-                logger.debug(f"Extended columns not found, using basic schema: {e}")
-                cur.execute(
-                    """
-                    SELECT extracted_requirements, last_intent, is_complete
-                    FROM customer_sessions
-                    WHERE phone_number = %s
-                    """,
-                    (phone_number,)
-                )
-                row = cur.fetchone()
-                
-                if row:
-                    logger.info(f"Retrieved session for {phone_number} (basic schema)")
-                    return {
-                        "extracted_requirements": row[0],
-                        "last_intent": row[1],
-                        "is_complete": row[2],
-                        "confirmed": False,
-                        "awaiting_confirmation": False,
-                        "confirmation_attempt": 0
-                    }
+            cur.execute(sql, (phone_number,))
+            row = cur.fetchone()
         
-        logger.debug(f"No existing session found for {phone_number}")
-        return None
+        return self._session_from_row(phone_number, row)
+    
+    def _session_select(self) -> str:
+        columns = "extracted_requirements, last_intent, is_complete"
+        if self.session_schema() == "extended":
+            columns += ", " + ", ".join(SESSION_WORKFLOW_COLUMNS)
+        return f"SELECT {columns} FROM customer_sessions WHERE phone_number = %s"
+    
+    def _session_from_row(self, phone_number: str, row) -> Optional[dict]:
+        if not row:
+            logger.debug(f"No existing session found for {phone_number}")
+            return None
+        
+        extended = self._session_schema == "extended"
+        logger.info(f"Retrieved session for {phone_number} ({self._session_schema} schema)")
+        return {
+            "extracted_requirements": row[0],
+            "last_intent": row[1],
+            "is_complete": row[2],
+            "confirmed": bool(row[3]) if extended else False,
+            "awaiting_confirmation": bool(row[4]) if extended else False,
+            "confirmation_attempt": (row[5] or 0) if extended else 0
+        }
     
     def save_customer_session(
         self,
@@ -304,57 +420,196 @@ class VectorStoreService:
             confirmation_attempt: Number of confirmation attempts.
         """
         self.initialize()
+        sql, values = self._session_upsert(
+            phone_number, json.dumps(extracted_requirements), last_intent, is_complete,
+            confirmed, awaiting_confirmation, confirmation_attempt
+        )
         
         conn = self._get_connection()
         with conn.cursor() as cur:
-            # Try extended schema first
-            try:
+            cur.execute(sql, values)
+            conn.commit()
+        logger.info(f"Saved session for {phone_number} ({self._session_schema} schema, complete: {is_complete}, confirmed: {confirmed})")
+    
+    def _session_upsert(
+        self,
+        phone_number: str,
+        extracted_requirements,
+        last_intent: str,
+        is_complete: bool,
+        confirmed: bool,
+        awaiting_confirmation: bool,
+        confirmation_attempt: int
+    ) -> Tuple[str, tuple]:
+        columns = ["extracted_requirements", "last_intent", "is_complete"]
+        values = [extracted_requirements, last_intent, is_complete]
+        if self.session_schema() == "extended":
+            columns += list(SESSION_WORKFLOW_COLUMNS)
+            values += [confirmed, awaiting_confirmation, confirmation_attempt]
+        sql = f"""
+            INSERT INTO customer_sessions 
+            (phone_number, {", ".join(columns)}, updated_at)
+            VALUES (%s, {", ".join(["%s"] * len(columns))}, NOW())
+            ON CONFLICT (phone_number) 
+            DO UPDATE SET 
+                {", ".join(f"{c} = EXCLUDED.{c}" for c in columns)},
+                updated_at = NOW()
+        """
+        return sql, (phone_number, *values)
+    
+    def get_transliteration(self, text: str) -> Optional[str]:
+        """Memoized transliteration of a normalized Franco name, if any."""
+        self.initialize()
+        conn = self._get_connection()
+        try:
+            with conn.cursor() as cur:
                 cur.execute(
-                    """
-                    INSERT INTO customer_sessions 
-                    (phone_number, extracted_requirements, last_intent, is_complete,
-                     confirmed, awaiting_confirmation, confirmation_attempt, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
-                    ON CONFLICT (phone_number) 
-                    DO UPDATE SET 
-                        extracted_requirements = EXCLUDED.extracted_requirements,
-                        last_intent = EXCLUDED.last_intent,
-                        is_complete = EXCLUDED.is_complete,
-                        confirmed = EXCLUDED.confirmed,
-                        awaiting_confirmation = EXCLUDED.awaiting_confirmation,
-                        confirmation_attempt = EXCLUDED.confirmation_attempt,
-                        updated_at = NOW()
-                    """,
-                    (phone_number, json.dumps(extracted_requirements), last_intent, is_complete,
-                     confirmed, awaiting_confirmation, confirmation_attempt)
+                    "SELECT transliteration FROM transliteration_memo WHERE text = %s",
+                    (text[:TRANSLITERATION_KEY_LENGTH],)
                 )
-                conn.commit()
-                logger.info(f"Saved session for {phone_number} (complete: {is_complete}, confirmed: {confirmed})")
-            except Exception as e:
-                # Fallback to basic schema
-                logger.warning(f"Extended schema save failed, using basic: {e}")
-                conn.rollback()
-                cur.execute(
-                    """
-                    INSERT INTO customer_sessions 
-                    (phone_number, extracted_requirements, last_intent, is_complete, updated_at)
-                    VALUES (%s, %s, %s, %s, NOW())
-                    ON CONFLICT (phone_number) 
-                    DO UPDATE SET 
-                        extracted_requirements = EXCLUDED.extracted_requirements,
-                        last_intent = EXCLUDED.last_intent,
-                        is_complete = EXCLUDED.is_complete,
-                        updated_at = NOW()
-                    """,
-                    (phone_number, json.dumps(extracted_requirements), last_intent, is_complete)
+                row = cur.fetchone()
+            conn.commit()
+        except psycopg2.Error:
+            # Leave the thread's connection usable for the next query
+            conn.rollback()
+            raise
+        return row[0] if row else None
+    
+    def save_transliteration(self, text: str, transliteration: str, source: str):
+        """Memoize the transliteration of a normalized Franco name."""
+        self.initialize()
+        conn = self._get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO transliteration_memo (text, transliteration, source)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (text) DO UPDATE
+                    SET transliteration = EXCLUDED.transliteration, source = EXCLUDED.source
+                """, (text[:TRANSLITERATION_KEY_LENGTH], transliteration[:255], source))
+            conn.commit()
+        except psycopg2.Error:
+            conn.rollback()
+            raise
+    
+    # ========== asyncpg (WORKFLOW_MODE=async) ==========
+    
+    async def _get_pool(self) -> asyncpg.Pool:
+        """asyncpg pool of the running event loop (created on first use)."""
+        loop = asyncio.get_running_loop()
+        if self._pool_loop is not loop:
+            self._pool, self._pool_loop, self._pool_lock = None, loop, asyncio.Lock()
+        async with self._pool_lock:
+            if self._pool is None:
+                logger.debug(f"Opening asyncpg pool to {self.settings.database_host}:{self.settings.database_port}")
+                self._pool = await asyncpg.create_pool(
+                    host=self.settings.database_host,
+                    port=self.settings.database_port,
+                    user=self.settings.database_user,
+                    password=self.settings.database_password,
+                    database=self.settings.database_name,
+                    min_size=self.settings.database_pool_min_size,
+                    max_size=self.settings.database_pool_max_size,
+                    init=self._init_async_connection
                 )
-                conn.commit()
-                logger.info(f"Saved session for {phone_number} (basic schema, complete: {is_complete})")
+        return self._pool
+    
+    @staticmethod
+    async def _init_async_connection(conn):
+        # Same Python types as psycopg2: vectors and JSONB decoded
+        await register_vector_async(conn)
+        await conn.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+    
+    async def _aprepare(self):
+        """Run the blocking one-time setup (tables, schema probe) off the event loop."""
+        if not self._initialized or self._session_schema is None:
+            await offload(self.initialize)
+            await offload(self.session_schema)
+    
+    async def asearch_similar(
+        self,
+        query: str,
+        phone_number: Optional[str] = None,
+        limit: int = 5
+    ) -> List[Tuple[str, str, float]]:
+        """Async variant of ``search_similar``."""
+        if is_blocking_io():
+            return self.search_similar(query, phone_number, limit)
+        await self._aprepare()
+        
+        # Embedding is CPU-bound: computed on a worker thread
+        query_embedding = await offload(get_embedding_service().embed_text, query)
+        phone_number = phone_number or None
+        sql, params = self.index_manager.build_search(query_embedding, phone_number, limit)
+        
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for statement in self.index_manager.query_settings(limit, phone_number):
+                    await conn.execute(statement)
+                rows = await conn.fetch(numbered_params(sql), *params)
+        return [tuple(row) for row in rows]
+    
+    async def aget_conversation_history(self, phone_number: str, limit: int = 10) -> List[dict]:
+        """Async variant of ``get_conversation_history``."""
+        if is_blocking_io():
+            return self.get_conversation_history(phone_number, limit)
+        await self._aprepare()
+        
+        pool = await self._get_pool()
+        rows = await pool.fetch(numbered_params(HISTORY_SQL), phone_number, limit)
+        return self._history_messages(rows)
+    
+    async def aget_customer_session(self, phone_number: str) -> Optional[dict]:
+        """Async variant of ``get_customer_session``."""
+        if is_blocking_io():
+            return self.get_customer_session(phone_number)
+        await self._aprepare()
+        
+        pool = await self._get_pool()
+        row = await pool.fetchrow(numbered_params(self._session_select()), phone_number)
+        return self._session_from_row(phone_number, row)
+    
+    async def asave_customer_session(
+        self,
+        phone_number: str,
+        extracted_requirements: dict,
+        last_intent: str,
+        is_complete: bool,
+        confirmed: bool = False,
+        awaiting_confirmation: bool = False,
+        confirmation_attempt: int = 0
+    ):
+        """Async variant of ``save_customer_session``."""
+        if is_blocking_io():
+            return self.save_customer_session(
+                phone_number, extracted_requirements, last_intent, is_complete,
+                confirmed, awaiting_confirmation, confirmation_attempt
+            )
+        await self._aprepare()
+        
+        # The pool's JSONB codec serializes extracted_requirements
+        sql, values = self._session_upsert(
+            phone_number, extracted_requirements, last_intent, is_complete,
+            confirmed, awaiting_confirmation, confirmation_attempt
+        )
+        pool = await self._get_pool()
+        await pool.execute(numbered_params(sql), *values)
+        logger.info(f"Saved session for {phone_number} ({self._session_schema} schema, complete: {is_complete}, confirmed: {confirmed})")
+    
+    async def aclose(self):
+        """Close the asyncpg pool."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
     
     def close(self):
-        """Close the database connection."""
-        if self._connection and not self._connection.closed:
-            self._connection.close()
+        """Close the database connections of all threads."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            if not conn.closed:
+                conn.close()
 
 
 _vector_store_instance = None
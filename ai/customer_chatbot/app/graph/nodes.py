@@ -1,6 +1,9 @@
 """
 LangGraph node definitions for conversation workflow.
 Each node represents a step in the conversation processing pipeline.
+Nodes are coroutines: service calls are awaited (non-blocking clients in
+async mode, blocking clients under ``blocking_io()``) and CPU-bound matching
+is offloaded so it does not stall the event loop.
 """
 
 from typing import Dict, Any
@@ -8,16 +11,23 @@ from datetime import datetime
 import json
 
 from app.graph.state import ConversationState, ExtractedRequirements
+from app.graph.turn_analysis import ANALYSIS_SYSTEM_PROMPT, TurnAnalysis, build_analysis_prompt
+from app.config import get_settings
 from app.core.vector_store import get_vector_store
+from app.core.session_store import get_session_store
+from app.core.turn_persister import get_turn_persister
+from app.core.turn_embeddings import current_memo
 from app.core.llm import get_llm_service
+from app.core.io_mode import offload
 from app.core.embeddings import get_embedding_service
 from app.core.logging_config import get_logger
 from app.services.backend_api import get_backend_api_service
+from app.services.catalog import get_catalog_service
 
 logger = get_logger(__name__)
 
 
-def receive_message(state: ConversationState) -> ConversationState:
+async def receive_message(state: ConversationState) -> ConversationState:
     """Entry point - receives and preprocesses the user message.
     
     Args:
@@ -31,54 +41,64 @@ def receive_message(state: ConversationState) -> ConversationState:
     return state
 
 
-def load_session_state(state: ConversationState) -> ConversationState:
+async def load_session_state(state: ConversationState) -> ConversationState:
     """Load persistent session state from database.
     
     Args:
         state: Current conversation state.
         
     Returns:
-        Updated state with loaded session data.
+        State updates with loaded session data (runs in parallel with the
+        context retrieval nodes).
     """
-    vector_store = get_vector_store()
-    session_data = vector_store.get_customer_session(state["phone_number"])
+    session_data = await get_session_store().aget(state["phone_number"])
     
     if session_data:
         # Merge existing session state - core fields
-        state["extracted_requirements"] = session_data["extracted_requirements"]
-        state["is_complete"] = session_data["is_complete"]
-        # Workflow state fields (confirmation flow)
-        state["confirmed"] = session_data.get("confirmed", False)
-        state["awaiting_confirmation"] = session_data.get("awaiting_confirmation", False)
-        state["confirmation_attempt"] = session_data.get("confirmation_attempt", 0)
-        logger.info(f"Node [load_session_state]: Loaded existing session for {state['phone_number']} (confirmed: {state['confirmed']})")
-    else:
-        logger.debug(f"Node [load_session_state]: No existing session for {state['phone_number']}")
+        updates = {
+            "extracted_requirements": session_data["extracted_requirements"],
+            "is_complete": session_data["is_complete"],
+            # Workflow state fields (confirmation flow)
+            "confirmed": session_data.get("confirmed", False),
+            "awaiting_confirmation": session_data.get("awaiting_confirmation", False),
+            "confirmation_attempt": session_data.get("confirmation_attempt", 0),
+        }
+        logger.info(f"Node [load_session_state]: Loaded existing session for {state['phone_number']} (confirmed: {updates['confirmed']})")
+        return updates
     
-    return state
+    logger.debug(f"Node [load_session_state]: No existing session for {state['phone_number']}")
+    return {}
 
 
-def retrieve_context(state: ConversationState) -> ConversationState:
-    """Retrieve relevant context from vector store.
+async def retrieve_history(state: ConversationState) -> ConversationState:
+    """Retrieve the recent conversation history from the vector store.
     
     Args:
         state: Current conversation state.
         
     Returns:
-        Updated state with conversation history and retrieved context.
+        State updates with conversation history.
     """
-    vector_store = get_vector_store()
-    
-    # Get conversation history
-    history = vector_store.get_conversation_history(
+    history = await get_vector_store().aget_conversation_history(
         phone_number=state["phone_number"],
         limit=10
     )
     
-    state["conversation_history"] = history
+    logger.debug(f"Node [retrieve_history]: Found {len(history)} history messages")
+    return {"conversation_history": history}
+
+
+async def retrieve_context(state: ConversationState) -> ConversationState:
+    """Retrieve relevant context from vector store.
     
+    Args:
+        state: Current conversation state.
+        
+    Returns:
+        State updates with retrieved context (similar past messages).
+    """
     # Search for similar past conversations
-    similar_messages = vector_store.search_similar(
+    similar_messages = await get_vector_store().asearch_similar(
         query=state["user_message"],
         phone_number=state["phone_number"],
         limit=3
@@ -90,10 +110,9 @@ def retrieve_context(state: ConversationState) -> ConversationState:
         for msg_type, msg_text, score in similar_messages
         if score > 0.5  # Only include relevant matches
     ]
-    state["retrieved_context"] = context
     
-    logger.debug(f"Node [retrieve_context]: Found {len(history)} history messages and {len(context)} context snippets")
-    return state
+    logger.debug(f"Node [retrieve_context]: Found {len(context)} context snippets")
+    return {"retrieved_context": context}
 
 
 def build_workflow_hint(state: ConversationState) -> str:
@@ -224,7 +243,7 @@ def refine_intent(raw_intent: str, state: ConversationState) -> str:
     return raw_intent
 
 
-def detect_intent(state: ConversationState) -> ConversationState:
+async def detect_intent(state: ConversationState) -> ConversationState:
     """Detect the intent of the user message using state-aware classification.
     
     This function combines:
@@ -235,7 +254,7 @@ def detect_intent(state: ConversationState) -> ConversationState:
         state: Current conversation state.
         
     Returns:
-        Updated state with detected intent.
+        State update with the detected intent (runs in parallel with extract_requirements).
     """
     llm_service = get_llm_service()
     
@@ -266,7 +285,7 @@ def detect_intent(state: ConversationState) -> ConversationState:
 2. لا تختر 'follow_up' إذا كان هناك سؤال عن معلومات (Data Fetching needed).
 3. أجب بنوع النية فقط (كلمة واحدة)."""
 
-    response = llm_service.generate_response(
+    response = await llm_service.agenerate_response(
         user_message=intent_prompt,
         system_prompt="أنت محلل نوايا. أجب بكلمة واحدة فقط."
     )
@@ -289,15 +308,134 @@ def detect_intent(state: ConversationState) -> ConversationState:
     
     # Apply rule-based refinements
     final_intent = refine_intent(detected, state)
-    state["intent"] = final_intent
     
     logger.debug(f"Node [detect_intent]: Workflow hint used:\n{workflow_hint}")
     logger.debug(f"Node [detect_intent]: Raw LLM Response: {response}")
     logger.info(f"Node [detect_intent]: Raw: {detected} -> Final: {final_intent}")
-    return state
+    return {"intent": final_intent}
+
+
+async def _catalog_maps(state: ConversationState) -> tuple:
+    """Area / project / unit type listings used to translate names in extraction prompts.
+    
+    Served from the catalog snapshot, limited to the entities the message mentions
+    (plus the projects of the conversation's area).
+    """
+    settings = get_settings()
+    snapshot = await get_catalog_service().aget()
+    return await offload(
+        snapshot.prompt_fragments,
+        state["user_message"],
+        area_id=state.get("extracted_requirements", {}).get("area_id"),
+        max_projects=settings.catalog_prompt_max_projects,
+        cutoff=settings.catalog_prompt_match_cutoff,
+    )
+
+
+async def _merge_requirements(state: ConversationState, new_requirements: dict, matcher) -> Dict[str, Any]:
+    """Merge newly extracted requirements into the session's (fuzzy-matching area/project).
+    
+    Args:
+        state: Current conversation state.
+        new_requirements: Fields extracted from the message.
+        matcher: Name matcher service.
+        
+    Returns:
+        State updates.
+    """
+    updates: Dict[str, Any] = {}
+    
+    # MERGE with existing requirements
+    existing = state.get("extracted_requirements", {})
+    merged = {**existing}
+    
+    # PROACTIVE FUZZY MATCHING: Match area/project against DB and ask for confirmation
+    pending_confirmation_needed = False
+    confirmation_messages = []
+    
+    for key, value in new_requirements.items():
+        if value is not None and value != "null":
+            if key in ["customer_name", "customer_email"]:
+                updates[key] = value
+            elif key == "customer_phone":
+                pass  # We have phone from webhook
+            else:
+                # CRITICAL: Fuzzy match area/project immediately
+                if key == "area" and value:
+                    match_result = await offload(matcher.match_area, value)
+                    if match_result.matched:
+                        # Got exact match → use English name
+                        merged["area"] = match_result.value
+                        merged["area_id"] = match_result.id
+                        # Ask user to confirm if input was Arabic
+                        if value != match_result.value:  # Different = was Arabic
+                            confirmation_messages.append(f"المنطقة: **{match_result.value}**")
+                            pending_confirmation_needed = True
+                    elif match_result.alternatives:
+                        # Ambiguous → ask user to choose
+                        updates["area_alternatives"] = match_result.alternatives
+                        updates["area_original"] = value
+                        pending_confirmation_needed = True
+                        confirmation_messages.append(f"المنطقة '{value}' - يرجى التوضيح")
+                    else:
+                        # No match → keep as-is for now
+                        merged["area"] = value
+                
+                elif key == "project" and value:
+                    area_id = merged.get("area_id")  # Use area_id if available
+                    match_result = await offload(matcher.match_project, value, area_id=area_id)
+                    if match_result.matched:
+                        merged["project"] = match_result.value
+                        merged["project_id"] = match_result.id
+                        if value != match_result.value:
+                            confirmation_messages.append(f"المشروع: **{match_result.value}**")
+                            pending_confirmation_needed = True
+                    elif match_result.alternatives:
+                        updates["project_alternatives"] = match_result.alternatives
+                        updates["project_original"] = value
+                        pending_confirmation_needed = True
+                        confirmation_messages.append(f"المشروع '{value}' - يرجى التوضيح")
+                    else:
+                        merged["project"] = value
+                
+                else:
+                    # Other fields → merge directly
+                    merged[key] = value
+    
+    updates["extracted_requirements"] = merged
+    
+    # If we need confirmation, generate a confirmation message
+    if pending_confirmation_needed and confirmation_messages:
+        confirmation_text = "\n".join(confirmation_messages)
+        updates["awaiting_name_confirmation"] = True
+        updates["clarification_question"] = f"""فهمت منك:\n{confirmation_text}\n\n**انت قصدك كده صح؟** اكتب 'نعم' للتأكيد أو صحح المعلومة."""
+    
+    
+    # FIX: Infinite Loop Break - Auto-confirm if contact info provided during confirmation OR closing phase
+    # We check if awaiting_confirmation OR (is_complete and not confirmed) - meaning we are in "booking" phase
+    in_confirmation_phase = state.get("awaiting_confirmation") or (state.get("is_complete") and not state.get("confirmed"))
+    
+    if in_confirmation_phase:
+        # Check if name or phone was JUST extracted
+        new_name = new_requirements.get("customer_name")
+        new_phone = new_requirements.get("customer_phone")
+        
+        # If we were missing them, and now we have them -> Auto Confirm
+        missing_before = state.get("missing_fields", [])
+        has_new_contact = (new_name and "customer_name" in missing_before) or \
+                          (new_phone and "customer_phone" in missing_before) or \
+                          (new_name and new_phone)
+                          
+        if has_new_contact:
+            updates["confirmed"] = True
+            logger.info(f"Node [extract_requirements]: Auto-confirming request - User provided contact info: {new_name}, {new_phone}")
+
+    logger.info(f"Node [extract_requirements]: Merged requirements - {len(merged)} fields, Confirmation needed: {pending_confirmation_needed}")
+    
+    return updates
 
 
-def extract_requirements(state: ConversationState) -> ConversationState:
+async def extract_requirements(state: ConversationState) -> ConversationState:
     """Extract customer requirements from message using LLM.
     NOW WITH DB-BASED TRANSLATION: Arabic → English
     
@@ -305,33 +443,15 @@ def extract_requirements(state: ConversationState) -> ConversationState:
         state: Current conversation state.
         
     Returns:
-        Updated state with extracted requirements in ENGLISH.
+        State updates: extracted requirements in ENGLISH (runs in parallel with detect_intent).
     """
     from app.services.name_matcher import get_name_matcher_service
-    from app.services.backend_api import get_backend_api_service
     
+    updates: Dict[str, Any] = {}
     llm_service = get_llm_service()
-    matcher = get_name_matcher_service()
-    backend_api = get_backend_api_service()
+    matcher = await offload(get_name_matcher_service)
     
-    # FETCH DB VALUES for translation mapping
-    try:
-        areas = backend_api.get_areas()
-        projects = backend_api.get_projects()
-        unit_types = backend_api.get_unit_types()
-        
-        # Build translation maps
-        area_map = "\n".join([f"- Arabic: '{a.get('name_ar', a['name'])}' → English: '{a['name']}' (ID: {a['area_id']})" 
-                              for a in areas if a.get('name') and a.get('area_id')])  # Check area_id exists
-        project_map = "\n".join([f"- '{p['name']}' (ID: {p['project_id']}, Area: {p.get('area', {}).get('name', 'N/A')})" 
-                                 for p in projects[:20] if p.get('name') and p.get('project_id')])  # Limit to avoid token overflow
-        unit_type_map = "\n".join([f"- Arabic: 'شقة' → 'Apartment', 'فيلا' → 'Villa', 'دوبلكس' → 'Duplex', 'استوديو' → 'Studio'"])
-        
-    except Exception as e:
-        logger.warning(f"Failed to fetch DB values for extraction: {e}")
-        area_map = "- North Coast, New Capital, Tagamoo, Madinty, Sharm El Sheikh"
-        project_map = "- Hawabay, Crystal Resort, etc."
-        unit_type_map = "- Apartment, Villa, Duplex, Studio"
+    area_map, project_map, unit_type_map = await _catalog_maps(state)
     
     extraction_prompt = f"""استخرج متطلبات العميل العقارية من الرسالة التالية وترجمها للإنجليزية.
 
@@ -384,7 +504,7 @@ def extract_requirements(state: ConversationState) -> ConversationState:
 
 أرجع JSON فقط:"""
 
-    response = llm_service.generate_response(
+    response = await llm_service.agenerate_response(
         user_message=extraction_prompt,
         system_prompt="أنت محلل بيانات عقارية. أرجع JSON صالح فقط مع ترجمة الأسماء للإنجليزية."
     )
@@ -400,102 +520,56 @@ def extract_requirements(state: ConversationState) -> ConversationState:
         
         new_requirements = json.loads(json_str)
         
-        # MERGE with existing requirements
-        existing = state.get("extracted_requirements", {})
-        merged = {**existing}
-        
-        # PROACTIVE FUZZY MATCHING: Match area/project against DB and ask for confirmation
-        pending_confirmation_needed = False
-        confirmation_messages = []
-        
-        for key, value in new_requirements.items():
-            if value is not None and value != "null":
-                if key in ["customer_name", "customer_email"]:
-                    state[key] = value
-                elif key == "customer_phone":
-                    pass  # We have phone from webhook
-                else:
-                    # CRITICAL: Fuzzy match area/project immediately
-                    if key == "area" and value:
-                        match_result = matcher.match_area(value)
-                        if match_result.matched:
-                            # Got exact match → use English name
-                            merged["area"] = match_result.value
-                            merged["area_id"] = match_result.id
-                            # Ask user to confirm if input was Arabic
-                            if value != match_result.value:  # Different = was Arabic
-                                confirmation_messages.append(f"المنطقة: **{match_result.value}**")
-                                pending_confirmation_needed = True
-                        elif match_result.alternatives:
-                            # Ambiguous → ask user to choose
-                            state["area_alternatives"] = match_result.alternatives
-                            state["area_original"] = value
-                            pending_confirmation_needed = True
-                            confirmation_messages.append(f"المنطقة '{value}' - يرجى التوضيح")
-                        else:
-                            # No match → keep as-is for now
-                            merged["area"] = value
-                    
-                    elif key == "project" and value:
-                        area_id = merged.get("area_id")  # Use area_id if available
-                        match_result = matcher.match_project(value, area_id=area_id)
-                        if match_result.matched:
-                            merged["project"] = match_result.value
-                            merged["project_id"] = match_result.id
-                            if value != match_result.value:
-                                confirmation_messages.append(f"المشروع: **{match_result.value}**")
-                                pending_confirmation_needed = True
-                        elif match_result.alternatives:
-                            state["project_alternatives"] = match_result.alternatives
-                            state["project_original"] = value
-                            pending_confirmation_needed = True
-                            confirmation_messages.append(f"المشروع '{value}' - يرجى التوضيح")
-                        else:
-                            merged["project"] = value
-                    
-                    else:
-                        # Other fields → merge directly
-                        merged[key] = value
-        
-        state["extracted_requirements"] = merged
-        
-        # If we need confirmation, generate a confirmation message
-        if pending_confirmation_needed and confirmation_messages:
-            confirmation_text = "\n".join(confirmation_messages)
-            state["awaiting_name_confirmation"] = True
-            state["clarification_question"] = f"""فهمت منك:\n{confirmation_text}\n\n**انت قصدك كده صح؟** اكتب 'نعم' للتأكيد أو صحح المعلومة."""
-        
-        
-        # FIX: Infinite Loop Break - Auto-confirm if contact info provided during confirmation OR closing phase
-        # We check if awaiting_confirmation OR (is_complete and not confirmed) - meaning we are in "booking" phase
-        in_confirmation_phase = state.get("awaiting_confirmation") or (state.get("is_complete") and not state.get("confirmed"))
-        
-        if in_confirmation_phase:
-            # Check if name or phone was JUST extracted
-            new_name = new_requirements.get("customer_name")
-            new_phone = new_requirements.get("customer_phone")
-            
-            # If we were missing them, and now we have them -> Auto Confirm
-            missing_before = state.get("missing_fields", [])
-            has_new_contact = (new_name and "customer_name" in missing_before) or \
-                              (new_phone and "customer_phone" in missing_before) or \
-                              (new_name and new_phone)
-                              
-            if has_new_contact:
-                state["confirmed"] = True
-                logger.info(f"Node [extract_requirements]: Auto-confirming request - User provided contact info: {new_name}, {new_phone}")
-
-        logger.info(f"Node [extract_requirements]: Merged requirements - {len(merged)} fields, Confirmation needed: {pending_confirmation_needed}")
+        updates.update(await _merge_requirements(state, new_requirements, matcher))
     except json.JSONDecodeError:
         logger.error("Node [extract_requirements]: Failed to parse LLM response as JSON")
         if "extracted_requirements" not in state:
-            state["extracted_requirements"] = {}
-        state["error"] = "Failed to parse requirements"
+            updates["extracted_requirements"] = {}
+        updates["error"] = "Failed to parse requirements"
     
-    return state
+    return updates
+
+
+async def analyze_turn(state: ConversationState) -> ConversationState:
+    """Detect intent, extract requirements and classify inquiries in one structured LLM call.
+    
+    Used instead of detect_intent + extract_requirements with TURN_ANALYSIS=combined.
+    ``refine_intent`` and the requirement merge run on the result as in the
+    separate nodes; the inquiry classification is reused by handle_inquiry.
+    
+    Args:
+        state: Current conversation state.
+        
+    Returns:
+        State updates (intent, requirements, inquiry classification).
+    """
+    from app.services.name_matcher import get_name_matcher_service
+    
+    llm_service = get_llm_service()
+    matcher = await offload(get_name_matcher_service)
+    area_map, project_map, unit_type_map = await _catalog_maps(state)
+    prompt = build_analysis_prompt(state, build_workflow_hint(state), area_map, project_map, unit_type_map)
+    
+    try:
+        analysis = await llm_service.agenerate_structured(prompt, TurnAnalysis, system_prompt=ANALYSIS_SYSTEM_PROMPT)
+    except Exception as e:
+        # Output rejected by the schema (or provider without structured output)
+        logger.warning(f"Node [analyze_turn]: Structured analysis failed, using separate calls: {e}")
+        updates = await detect_intent(state)
+        updates.update(await extract_requirements(state))
+        return updates
+    
+    final_intent = refine_intent(analysis.intent, state)
+    updates = {"intent": final_intent}
+    updates.update(await _merge_requirements(state, analysis.requirements.model_dump(exclude_none=True), matcher))
+    if analysis.inquiry is not None:
+        updates["inquiry_classification"] = analysis.inquiry.model_dump()
+    
+    logger.info(f"Node [analyze_turn]: Raw: {analysis.intent} -> Final: {final_intent}, Inquiry: {updates.get('inquiry_classification')}")
+    return updates
 
 
-def check_missing_data(state: ConversationState) -> ConversationState:
+async def check_missing_data(state: ConversationState) -> ConversationState:
     """Check for missing required data.
     
     Args:
@@ -539,7 +613,7 @@ def check_missing_data(state: ConversationState) -> ConversationState:
     if requirements.get("area") and not requirements.get("project") and not state.get("project_suggested"):
         from app.services.backend_api import get_backend_api_service
         backend_api = get_backend_api_service()
-        projects = backend_api.get_projects(requirements.get("area"))
+        projects = await backend_api.aget_projects(requirements.get("area"))
         
         if projects:
             state["should_suggest_projects"] = True
@@ -564,7 +638,7 @@ def check_missing_data(state: ConversationState) -> ConversationState:
     return state
 
 
-def generate_clarification(state: ConversationState) -> ConversationState:
+async def generate_clarification(state: ConversationState) -> ConversationState:
     """Generate a clarification question for missing data.
     
     Args:
@@ -585,7 +659,7 @@ def generate_clarification(state: ConversationState) -> ConversationState:
         area_name = state.get("extracted_requirements", {}).get("area")
         from app.services.backend_api import get_backend_api_service
         backend_api = get_backend_api_service()
-        projects = backend_api.get_projects(area_name)
+        projects = await backend_api.aget_projects(area_name)
         
         logger.info(f"Node [generate_clarification]: Suggesting for area '{area_name}' - Found {len(projects) if projects else 0} projects")
         
@@ -616,7 +690,7 @@ def generate_clarification(state: ConversationState) -> ConversationState:
         if first_missing == "area":
             from app.services.backend_api import get_backend_api_service
             backend_api = get_backend_api_service()
-            areas = backend_api.get_areas()
+            areas = await backend_api.aget_areas()
             state["available_areas"] = areas
             area_list = "\n".join([f"• {a['name']}" for a in areas])
             state["clarification_question"] = f"ممكن تحدد لي المنطقة اللي بتدور عليها؟\n\nالمناطق المتاحة حالياً:\n{area_list}"
@@ -653,7 +727,7 @@ def generate_clarification(state: ConversationState) -> ConversationState:
     return state
 
 
-def requirement_confirmation(state: ConversationState) -> ConversationState:
+async def requirement_confirmation(state: ConversationState) -> ConversationState:
     """Summarize requirements and ask for final confirmation.
     
     Features:
@@ -750,7 +824,7 @@ def requirement_confirmation(state: ConversationState) -> ConversationState:
     return state
 
 
-def generate_response(state: ConversationState) -> ConversationState:
+async def generate_response(state: ConversationState) -> ConversationState:
     """Generate the final response using LLM.
     
     Args:
@@ -781,7 +855,7 @@ def generate_response(state: ConversationState) -> ConversationState:
     if state.get("intent") == "greeting":
         from app.services.backend_api import get_backend_api_service
         backend_api = get_backend_api_service()
-        areas = backend_api.get_areas()
+        areas = await backend_api.aget_areas()
         area_list = "\n".join([f"• {a['name']}" for a in areas])
         
         state["response"] = f"""أهلاً وسهلاً! أنا مساعدك في البحث عن العقارات.
@@ -875,7 +949,7 @@ def generate_response(state: ConversationState) -> ConversationState:
              **تحذير أخير**: أي معلومة غير موجودة في نتائج البحث أعلاه هي اختراع محظور."""
         
         logger.info(f"Node [generate_response]: Source -> Inquiry Results (Anti-Hallucination Mode, Limited Data)")
-        response = llm_service.generate_response(
+        response = await llm_service.agenerate_response(
             user_message=state["user_message"],
             context=context,
             conversation_history=state.get("conversation_history"),
@@ -888,7 +962,7 @@ def generate_response(state: ConversationState) -> ConversationState:
         # Combine acknowledgment with clarification
         llm_service = get_llm_service()
         logger.info(f"Node [generate_response]: Source -> Clarification Question")
-        response = llm_service.generate_response(
+        response = await llm_service.agenerate_response(
             user_message=state["user_message"],
             context=context,
             conversation_history=state.get("conversation_history"),
@@ -941,7 +1015,7 @@ def generate_response(state: ConversationState) -> ConversationState:
         {units_context}"""
         
         logger.info(f"Node [generate_response]: Source -> Generic Fallback")
-        response = llm_service.generate_response(
+        response = await llm_service.agenerate_response(
             user_message=state["user_message"],
             context=context,
             conversation_history=state.get("conversation_history"),
@@ -966,7 +1040,7 @@ def generate_response(state: ConversationState) -> ConversationState:
 3. لا تختلق أي بيانات (مثل "اسم الكمباوند" أو "السعر").
 4. اسأل العميل إذا كان يريد حجز أي منها.
 """
-             response = llm_service.generate_response(
+             response = await llm_service.agenerate_response(
                 user_message=state["user_message"],
                 context=context,
                 conversation_history=state.get("conversation_history"),
@@ -999,7 +1073,7 @@ def generate_response(state: ConversationState) -> ConversationState:
         
         else:
             # Generate regular response
-            response = llm_service.generate_response(
+            response = await llm_service.agenerate_response(
                 user_message=state["user_message"],
                 context=context,
                 conversation_history=state.get("conversation_history")
@@ -1052,44 +1126,61 @@ def format_units_for_display(units: list) -> str:
     return "\n\n".join(formatted)
 
 
-def persist_conversation(state: ConversationState) -> ConversationState:
+async def persist_conversation(state: ConversationState) -> ConversationState:
     """Persist the conversation to vector store.
     
+    With write-behind enabled the messages are journaled and embedded/stored
+    in the background, so the reply does not wait on embedding or commit.
+    
     Args:
         state: Current conversation state.
         
     Returns:
         Same state (final node).
     """
-    vector_store = get_vector_store()
-    
-    # Store user message
-    vector_store.store_message(
-        phone_number=state["phone_number"],
-        message_type="user",
-        message_text=state["user_message"],
-        metadata={
+    records = [{
+        "phone_number": state["phone_number"],
+        "message_type": "user",
+        "message_text": state["user_message"],
+        "metadata": {
             "intent": state.get("intent"),
             "requirements": state.get("extracted_requirements"),
             "timestamp": state.get("timestamp")
         }
-    )
-    
-    # Store assistant response
+    }]
     if state.get("response"):
-        vector_store.store_message(
-            phone_number=state["phone_number"],
-            message_type="assistant",
-            message_text=state["response"],
-            metadata={
+        records.append({
+            "phone_number": state["phone_number"],
+            "message_type": "assistant",
+            "message_text": state["response"],
+            "metadata": {
                 "timestamp": state.get("timestamp")
             }
-        )
+        })
+    
+    memo = current_memo()
+    if memo is not None:
+        state["embedding_stats"] = memo.get_stats()
+    
+    if get_settings().persist_write_behind:
+        # Hand over vectors already computed this turn (e.g. the user message in retrieve_context)
+        if memo is not None:
+            namespace = get_embedding_service().memo_namespace
+            for record in records:
+                embedding = memo.get(namespace, record["message_text"])
+                if embedding is not None:
+                    record["embedding"] = embedding
+        await offload(get_turn_persister().submit, records)
+        return state
+    
+    vector_store = get_vector_store()
+    for record in records:
+        await offload(vector_store.store_message, **record)
     
     return state
 
 
-def save_session_state(state: ConversationState) -> ConversationState:
+async def save_session_state(state: ConversationState) -> ConversationState:
     """Save current session state to database.
     
     Args:
@@ -1098,21 +1189,20 @@ def save_session_state(state: ConversationState) -> ConversationState:
     Returns:
         Same state.
     """
-    vector_store = get_vector_store()
-    vector_store.save_customer_session(
-        phone_number=state["phone_number"],
-        extracted_requirements=state.get("extracted_requirements", {}),
-        last_intent=state.get("intent", "unknown"),
-        is_complete=state.get("is_complete", False),
-        confirmed=state.get("confirmed", False),
-        awaiting_confirmation=state.get("awaiting_confirmation", False),
-        confirmation_attempt=state.get("confirmation_attempt", 0)
-    )
+    # Written once at the end of the turn (and skipped if unchanged)
+    await get_session_store().asave(state["phone_number"], {
+        "extracted_requirements": state.get("extracted_requirements", {}),
+        "last_intent": state.get("intent", "unknown"),
+        "is_complete": state.get("is_complete", False),
+        "confirmed": state.get("confirmed", False),
+        "awaiting_confirmation": state.get("awaiting_confirmation", False),
+        "confirmation_attempt": state.get("confirmation_attempt", 0)
+    })
     logger.debug(f"Node [save_session_state]: Session saved for {state['phone_number']} (confirmed: {state.get('confirmed')})")
     return state
 
 
-def search_units(state: ConversationState) -> ConversationState:
+async def search_units(state: ConversationState) -> ConversationState:
     """Search for matching units from backend.
     
     Args:
@@ -1129,7 +1219,7 @@ def search_units(state: ConversationState) -> ConversationState:
     reqs = state.get("extracted_requirements", {})
     
     try:
-        units = backend_api.search_units(
+        units = await backend_api.asearch_units(
             area_name=reqs.get("area"),
             project_name=reqs.get("project"),
             unit_type=reqs.get("unit_type"),
@@ -1147,7 +1237,7 @@ def search_units(state: ConversationState) -> ConversationState:
     return state
 
 
-def create_customer_request(state: ConversationState) -> ConversationState:
+async def create_customer_request(state: ConversationState) -> ConversationState:
     """Create formal request in backend CRM.
     
     Args:
@@ -1171,7 +1261,7 @@ def create_customer_request(state: ConversationState) -> ConversationState:
             "email": reqs.get("customer_email")
         }
         
-        customer_id = backend_api.get_or_create_customer(
+        customer_id = await backend_api.aget_or_create_customer(
             phone=state["phone_number"],
             name=customer_data["name"]
         )
@@ -1184,10 +1274,10 @@ def create_customer_request(state: ConversationState) -> ConversationState:
         # Get area ID
         area_name = reqs.get("area")
         if area_name:
-            area_id = backend_api.get_area_id_by_name(area_name)
+            area_id = await backend_api.aget_area_id_by_name(area_name)
             if area_id:
                 # Create request
-                request_id = backend_api.create_request(
+                request_id = await backend_api.acreate_request(
                     customer_id=customer_id,
                     area_id=area_id,
                     requirements=reqs
@@ -1201,7 +1291,7 @@ def create_customer_request(state: ConversationState) -> ConversationState:
                 try:
                     vector_store = get_vector_store()
                     # Fetch recent history (last 20 messages)
-                    history = vector_store.get_conversation_history(state["phone_number"], limit=20)
+                    history = await vector_store.aget_conversation_history(state["phone_number"], limit=20)
                     
                     synced_count = 0
                     for msg in history:
@@ -1214,7 +1304,7 @@ def create_customer_request(state: ConversationState) -> ConversationState:
                             actor_type = 'ai'
                             actor_id_val = None
                             
-                        success = backend_api.save_conversation(
+                        success = await backend_api.asave_conversation(
                             request_id=request_id,
                             actor_type=actor_type,
                             message=msg['content'],
@@ -1231,7 +1321,7 @@ def create_customer_request(state: ConversationState) -> ConversationState:
             else:
                 # Area not found - fetch all available areas to suggest
                 logger.warning(f"Node [create_request]: Area '{area_name}' not found - fetching alternatives")
-                all_areas = backend_api.get_areas()
+                all_areas = await backend_api.aget_areas()
                 state["available_areas"] = all_areas
                 state["area_not_found"] = area_name
                 state["request_id"] = None  # Ensure request_id is None
@@ -1245,7 +1335,7 @@ def create_customer_request(state: ConversationState) -> ConversationState:
     return state
 
 
-def classify_inquiry_logic(user_message: str, context_str: str = "") -> dict:
+async def classify_inquiry_logic(user_message: str, context_str: str = "") -> dict:
     """Classify user inquiry using a lightweight LLM router.
     
     Uses Cohere command-r7b-12-2024 for speed.
@@ -1276,7 +1366,7 @@ def classify_inquiry_logic(user_message: str, context_str: str = "") -> dict:
     """
     
     try:
-        response = llm_service.generate_response(
+        response = await llm_service.agenerate_response(
             user_message=router_prompt,
             system_prompt="You are a JSON-only classification router. Output valid JSON."
         )
@@ -1293,14 +1383,14 @@ def classify_inquiry_logic(user_message: str, context_str: str = "") -> dict:
         return {"type": "general_qa", "entities": {}}
 
 
-def handle_inquiry(state: ConversationState) -> ConversationState:
+async def handle_inquiry(state: ConversationState) -> ConversationState:
     """Handle general inquiry requests using Smart LLM Routing.
     
     Replaces keyword matching with semantic classification.
     """
     backend_api = get_backend_api_service()
     from app.services.name_matcher import get_name_matcher_service
-    matcher = get_name_matcher_service()
+    matcher = await offload(get_name_matcher_service)
     
     message = state["user_message"]
     reqs = state.get("extracted_requirements", {})
@@ -1308,8 +1398,8 @@ def handle_inquiry(state: ConversationState) -> ConversationState:
     # Context for extraction (e.g. if we know they are looking in New Capital)
     context_str = f"Current Focus: Area={reqs.get('area')}, Project={reqs.get('project')}"
     
-    # 1. CLASSIFY
-    classification = classify_inquiry_logic(message, context_str)
+    # 1. CLASSIFY (already done by analyze_turn in combined mode)
+    classification = state.get("inquiry_classification") or await classify_inquiry_logic(message, context_str)
     inquiry_type = classification.get("type", "general_qa")
     entities = classification.get("entities", {})
     
@@ -1329,13 +1419,13 @@ def handle_inquiry(state: ConversationState) -> ConversationState:
         target_area_id = reqs.get("area_id")
 
         if target_project_name and not target_project_id:
-             p_match = matcher.match_project(target_project_name)
+             p_match = await offload(matcher.match_project, target_project_name)
              if p_match.matched:
                  target_project_id = p_match.id
                  target_project_name = p_match.value # Canonical name
         
         if target_area_name and not target_area_id:
-             a_match = matcher.match_area(target_area_name)
+             a_match = await offload(matcher.match_area, target_area_name)
              if a_match.matched:
                  target_area_id = a_match.id
                  target_area_name = a_match.value
@@ -1358,7 +1448,7 @@ def handle_inquiry(state: ConversationState) -> ConversationState:
         # --- ROUTING LOGIC ---
         
         if inquiry_type == "price_check":
-            price_data = backend_api.get_price_range(
+            price_data = await backend_api.aget_price_range(
                 project_id=target_project_id,
                 area_id=target_area_id,
                 unit_type=target_unit
@@ -1375,7 +1465,7 @@ def handle_inquiry(state: ConversationState) -> ConversationState:
              if target_project_id or target_area_id:
                  if target_project_id:
                      # Check specific project units
-                     units = backend_api.search_units(
+                     units = await backend_api.asearch_units(
                          project_id=target_project_id, 
                          unit_type=target_unit,
                          limit=5
@@ -1386,7 +1476,7 @@ def handle_inquiry(state: ConversationState) -> ConversationState:
                      # List projects in area (using ID)
                      # Note: get_projects currently takes area_name, let's see if we can use ID or name
                      # backend_api.get_projects takes area_name string.
-                     projects = backend_api.get_projects(target_area_name) 
+                     projects = await backend_api.aget_projects(target_area_name) 
                      results["type"] = "projects"
                      results["data"] = projects[:10]
                      results["area_filter"] = target_area_name
@@ -1399,7 +1489,7 @@ def handle_inquiry(state: ConversationState) -> ConversationState:
                   results["type"] = "general_qa" 
                   results["context_note"] = f"User asking about location of {target_area_name}"
              else:
-                 areas = backend_api.get_all_areas()
+                 areas = await backend_api.aget_all_areas()
                  results["type"] = "areas"
                  results["data"] = areas
 
@@ -1416,7 +1506,7 @@ def handle_inquiry(state: ConversationState) -> ConversationState:
     return state
 
 
-def validate_names(state: ConversationState) -> ConversationState:
+async def validate_names(state: ConversationState) -> ConversationState:
     """Validate and correct area, project, and unit type names against DB.
     
     Uses NameMatcherService for dynamic DB matching with:
@@ -1429,13 +1519,13 @@ def validate_names(state: ConversationState) -> ConversationState:
     """
     from app.services.name_matcher import get_name_matcher_service
     
-    matcher = get_name_matcher_service()
+    matcher = await offload(get_name_matcher_service)
     reqs = state.get("extracted_requirements", {})
     pending_correction = None
     
     # Validate Area
     if reqs.get("area") and not reqs.get("area_id"):
-        result = matcher.match_area(reqs["area"])
+        result = await offload(matcher.match_area, reqs["area"])
         if result.matched:
             reqs["area"] = result.value
             reqs["area_id"] = result.id
@@ -1451,7 +1541,7 @@ def validate_names(state: ConversationState) -> ConversationState:
     
     # Validate Project (only if area resolved)
     if not pending_correction and reqs.get("project") and not reqs.get("project_id"):
-        result = matcher.match_project(reqs["project"], area_id=reqs.get("area_id"))
+        result = await offload(matcher.match_project, reqs["project"], area_id=reqs.get("area_id"))
         if result.matched:
             reqs["project"] = result.value
             reqs["project_id"] = result.id
@@ -1468,7 +1558,7 @@ def validate_names(state: ConversationState) -> ConversationState:
     
     # Validate Unit Type
     if not pending_correction and reqs.get("unit_type") and not reqs.get("unit_type_validated"):
-        result = matcher.match_unit_type(reqs["unit_type"])
+        result = await offload(matcher.match_unit_type, reqs["unit_type"])
         if result.matched:
             reqs["unit_type"] = result.value
             reqs["unit_type_validated"] = True
@@ -1488,7 +1578,7 @@ def validate_names(state: ConversationState) -> ConversationState:
     return state
 
 
-def generate_correction_prompt(state: ConversationState) -> ConversationState:
+async def generate_correction_prompt(state: ConversationState) -> ConversationState:
     """Generate Arabic prompt for name correction confirmation.
     
     Shows LLM-converted Franco names and lists projects filtered by area.
@@ -1500,7 +1590,7 @@ def generate_correction_prompt(state: ConversationState) -> ConversationState:
         return state
     
     reqs = state.get("extracted_requirements", {})
-    matcher = get_name_matcher_service()
+    matcher = await offload(get_name_matcher_service)
     
     field = pending.get("field")
     suggested = pending.get("suggested", "")
@@ -1516,7 +1606,7 @@ def generate_correction_prompt(state: ConversationState) -> ConversationState:
     elif field == "project":
         area_id = reqs.get("area_id")
         if area_id:
-            area_projects = matcher.get_projects_for_area(area_id)
+            area_projects = await offload(matcher.get_projects_for_area, area_id)
             project_names = [p.get('name', '') for p in area_projects[:10]]
             area_name = reqs.get("area", "المنطقة")
             projects_list = "\n".join([f"• {p}" for p in project_names if p])
@@ -89,3 +89,4 @@ class ConversationState(TypedDict, total=False):
     # Metadata
     timestamp: str
     error: Optional[str]
+    embedding_stats: Optional[dict]  # Per-turn embedding memo counters (model calls made/avoided)
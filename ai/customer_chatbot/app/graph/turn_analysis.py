@@ -0,0 +1,121 @@
+"""
+Combined turn analysis (TURN_ANALYSIS=combined).
+One structured LLM call returns what detect_intent, extract_requirements and
+the inquiry router (classify_inquiry_logic) otherwise ask for in three
+separate prompts: the intent, the requirements mentioned in the message and,
+for questions, the inquiry type with its entities.
+"""
+
+from typing import Literal, Optional
+import json
+
+from pydantic import BaseModel, Field
+
+from app.graph.state import ConversationState
+
+Intent = Literal[
+    "new_search", "update_requirements", "inquiry", "follow_up", "greeting",
+    "confirm", "edit", "correction", "cancel", "unknown"
+]
+InquiryType = Literal["price_check", "availability_check", "project_comparison", "location_info", "general_qa"]
+
+
+class RequirementsExtraction(BaseModel):
+    """Requirements mentioned in the message (names translated to English)."""
+
+    customer_name: Optional[str] = None
+    customer_phone: Optional[str] = None
+    customer_email: Optional[str] = None
+    area: Optional[str] = None
+    area_id: Optional[str] = Field(None, description="Area ID from the list above")
+    project: Optional[str] = None
+    project_id: Optional[str] = Field(None, description="Project ID from the list above")
+    unit_type: Optional[str] = Field(None, description="Apartment / Villa / Duplex / Studio / ...")
+    budget_min: Optional[float] = None
+    budget_max: Optional[float] = None
+    size_min: Optional[float] = None
+    size_max: Optional[float] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[int] = None
+    floor_preference: Optional[Literal["ground_floor", "high_floor", "any"]] = None
+    needs_garden: Optional[bool] = None
+    needs_roof: Optional[bool] = None
+    additional_notes: Optional[str] = None
+
+
+class InquiryEntities(BaseModel):
+    project: Optional[str] = None
+    area: Optional[str] = None
+    unit_type: Optional[str] = None
+
+
+class InquiryClassification(BaseModel):
+    """Smart router result (same shape as ``classify_inquiry_logic``)."""
+
+    type: InquiryType = "general_qa"
+    entities: InquiryEntities = Field(default_factory=InquiryEntities)
+
+
+class TurnAnalysis(BaseModel):
+    """Everything the workflow needs to know about the message, in one call."""
+
+    intent: Intent
+    requirements: RequirementsExtraction = Field(default_factory=RequirementsExtraction)
+    inquiry: Optional[InquiryClassification] = Field(None, description="Only when intent is inquiry")
+
+
+ANALYSIS_SYSTEM_PROMPT = "أنت محلل محادثات عقارية. أرجع التحليل بالهيكل المطلوب فقط مع ترجمة الأسماء للإنجليزية."
+
+
+def build_analysis_prompt(
+    state: ConversationState,
+    workflow_hint: str,
+    area_map: str,
+    project_map: str,
+    unit_type_map: str
+) -> str:
+    """Prompt for the combined analysis (the three separate prompts' rules, once)."""
+    return f"""حلل رسالة العميل التالية.
+
+الرسالة: {state["user_message"]}
+{workflow_hint}
+سياق المحادثة السابقة:
+{json.dumps(state.get("conversation_history", [])[-3:], ensure_ascii=False)}
+
+سياق سابق مشابه:
+{json.dumps(state.get("retrieved_context", []), ensure_ascii=False)}
+
+**المناطق المتاحة:**
+{area_map}
+
+**المشاريع المتاحة (عينة):**
+{project_map}
+
+**أنواع الوحدات:**
+{unit_type_map}
+
+1. intent - نية المستخدم:
+- new_search: يبحث عن وحدة عقارية جديدة (ويذكر مواصفات أو يطلب البدء)
+- update_requirements: يريد تعديل متطلباته المسجلة
+- inquiry: يسأل عن معلومات (مشاريع، أسعار، مناطق، مقارنة) - أولوية قصوى إذا سأل عن "مشاريع" أو "أسعار"
+- follow_up: متابعة لطلب سابق (بدون طلب معلومات جديدة)
+- greeting: تحية فقط
+- confirm: تأكيد البيانات أو الموافقة
+- edit: يريد تعديل أثناء مرحلة التأكيد
+- correction: يصحح اسم منطقة/مشروع/نوع وحدة
+- cancel: يريد إلغاء الطلب أو البدء من جديد
+- unknown: غير واضح
+
+2. requirements - المتطلبات المذكورة في الرسالة فقط (null لغير المذكور):
+- استخرج المنطقة/المشروع حتى لو كان السؤال استعلامي ("المشاريع في الساحل الشمالي" → area: "North Coast")
+- ترجم الأسماء للإنجليزية واستخدم المعرفات (area_id, project_id) من القوائم أعلاه
+- Floor: "دور أرضي" → ground_floor | "دور عالي" → high_floor
+- "حديقة" → needs_garden=true | "روف"/"سطح" → needs_roof=true
+
+3. inquiry - فقط إذا كانت النية inquiry:
+- price_check: سعر، مقدم، أقساط
+- availability_check: الوحدات المتاحة أو أنواعها
+- project_comparison: مقارنة مشروعين أو أكثر
+- location_info: عن منطقة أو موقع
+- general_qa: أسئلة عامة
+مع entities: project / area / unit_type المذكورة في السؤال."""
@@ -1,13 +1,22 @@
 """
 LangGraph workflow builder.
-Defines the conversation flow as a directed graph.
+Defines the conversation flow as a directed graph. Independent steps run as
+parallel branches: session, history and similar-context loading, then intent
+detection and requirement extraction (two LLM calls on the same message),
+joined before name validation. With TURN_ANALYSIS=combined a single
+analyze_turn call replaces the two.
 """
 
 from langgraph.graph import StateGraph, END
 from typing import Literal
 
+from app.config import get_settings
 from app.graph.state import ConversationState
 from app.graph import nodes
+from app.core.io_mode import sync_variant
+
+WORKFLOW_MODES = ("async", "sync")
+TURN_ANALYSES = ("separate", "combined")
 
 
 def should_search_or_clarify(state: ConversationState) -> Literal["search", "clarify"]:
@@ -24,45 +33,85 @@ def should_search_or_clarify(state: ConversationState) -> Literal["search", "cla
     return "clarify"
 
 
-def build_conversation_workflow() -> StateGraph:
+def build_conversation_workflow(mode: str = "async", fan_out: bool = True, analysis: str = None) -> StateGraph:
     """Build and compile the conversation workflow graph.
     
+    Args:
+        mode: "async" compiles the coroutine nodes (run with ``ainvoke``);
+            "sync" wraps them to use blocking clients (run with ``invoke``).
+        fan_out: Run independent steps as parallel branches. False chains
+            them one after the other (the previous linear flow, kept for
+            benchmarks).
+        analysis: "separate" (detect_intent + extract_requirements) or
+            "combined" (analyze_turn); defaults to TURN_ANALYSIS.
+    
     Returns:
         Compiled LangGraph workflow.
     """
+    if mode not in WORKFLOW_MODES:
+        raise ValueError(f"Unknown workflow mode {mode!r}; expected one of {WORKFLOW_MODES}")
+    analysis = analysis or get_settings().turn_analysis
+    if analysis not in TURN_ANALYSES:
+        raise ValueError(f"Unknown turn analysis {analysis!r}; expected one of {TURN_ANALYSES}")
+    
     # Create the graph
     workflow = StateGraph(ConversationState)
+    node = (lambda fn: fn) if mode == "async" else sync_variant
     
     # Add all nodes
-    workflow.add_node("receive_message", nodes.receive_message)
-    workflow.add_node("load_session_state", nodes.load_session_state)
-    workflow.add_node("retrieve_context", nodes.retrieve_context)
-    workflow.add_node("detect_intent", nodes.detect_intent)
-    workflow.add_node("extract_requirements", nodes.extract_requirements)
-    workflow.add_node("validate_names", nodes.validate_names)
-    workflow.add_node("generate_correction_prompt", nodes.generate_correction_prompt)
-    workflow.add_node("check_missing_data", nodes.check_missing_data)
-    workflow.add_node("generate_clarification", nodes.generate_clarification)
-    workflow.add_node("search_units", nodes.search_units)
-    workflow.add_node("requirement_confirmation", nodes.requirement_confirmation)
-    workflow.add_node("create_request", nodes.create_customer_request)
-    workflow.add_node("handle_inquiry", nodes.handle_inquiry)
-    workflow.add_node("generate_response", nodes.generate_response)
-    workflow.add_node("save_session_state", nodes.save_session_state)
-    workflow.add_node("persist_conversation", nodes.persist_conversation)
-    
-    # Define linear flow with conditional routing
+    workflow.add_node("receive_message", node(nodes.receive_message))
+    workflow.add_node("load_session_state", node(nodes.load_session_state))
+    workflow.add_node("retrieve_history", node(nodes.retrieve_history))
+    workflow.add_node("retrieve_context", node(nodes.retrieve_context))
+    if analysis == "combined":
+        workflow.add_node("analyze_turn", node(nodes.analyze_turn))
+    else:
+        workflow.add_node("detect_intent", node(nodes.detect_intent))
+        workflow.add_node("extract_requirements", node(nodes.extract_requirements))
+    workflow.add_node("validate_names", node(nodes.validate_names))
+    workflow.add_node("generate_correction_prompt", node(nodes.generate_correction_prompt))
+    workflow.add_node("check_missing_data", node(nodes.check_missing_data))
+    workflow.add_node("generate_clarification", node(nodes.generate_clarification))
+    workflow.add_node("search_units", node(nodes.search_units))
+    workflow.add_node("requirement_confirmation", node(nodes.requirement_confirmation))
+    workflow.add_node("create_request", node(nodes.create_customer_request))
+    workflow.add_node("handle_inquiry", node(nodes.handle_inquiry))
+    workflow.add_node("generate_response", node(nodes.generate_response))
+    workflow.add_node("save_session_state", node(nodes.save_session_state))
+    workflow.add_node("persist_conversation", node(nodes.persist_conversation))
+    
+    # Define the flow with conditional routing
     workflow.set_entry_point("receive_message")
     
-    workflow.add_edge("receive_message", "load_session_state")
-    workflow.add_edge("load_session_state", "retrieve_context")
-    workflow.add_edge("retrieve_context", "detect_intent")
-    workflow.add_edge("detect_intent", "extract_requirements")
-    
+    loaders = ["load_session_state", "retrieve_history", "retrieve_context"]
+    if fan_out:
+        # Fan out: the loaders do not depend on each other
+        for loader in loaders:
+            workflow.add_edge("receive_message", loader)
+    else:
+        workflow.add_edge("receive_message", loaders[0])
+        for previous, loader in zip(loaders, loaders[1:]):
+            workflow.add_edge(previous, loader)
+    
+    if analysis == "combined":
+        # One structured call needs everything the two separate calls read
+        workflow.add_edge(loaders if fan_out else loaders[-1], "analyze_turn")
+        workflow.add_edge("analyze_turn", "validate_names")
+    elif fan_out:
+        # Intent detection needs the session and the history; extraction needs the
+        # session and the similar context. Neither reads what the other writes.
+        workflow.add_edge(["load_session_state", "retrieve_history"], "detect_intent")
+        workflow.add_edge(["load_session_state", "retrieve_context"], "extract_requirements")
+        
+        # Join: validation (and the routing after it) sees both the intent and the requirements
+        workflow.add_edge(["detect_intent", "extract_requirements"], "validate_names")
+    else:
+        workflow.add_edge(loaders[-1], "detect_intent")
+        workflow.add_edge("detect_intent", "extract_requirements")
+        workflow.add_edge("extract_requirements", "validate_names")
     
     # CRITICAL FIX: Inquiry intent should also validate names to set area_id/project_id
     # This prevents re-validation errors in handle_inquiry
-    workflow.add_edge("extract_requirements", "validate_names")
     
     # Check if names are valid or need correction
     def route_after_validation(state: ConversationState) -> Literal["correction", "inquiry", "check_missing"]:
@@ -131,17 +180,19 @@ def build_conversation_workflow() -> StateGraph:
     return workflow.compile()
 
 
-# Singleton workflow instance
-_workflow_instance = None
+# Singleton workflow instances, one per mode
+_workflow_instances = {}
 
 
-def get_workflow():
+def get_workflow(mode: str = "async"):
     """Get or create the workflow instance.
     
+    Args:
+        mode: Workflow mode (see ``build_conversation_workflow``).
+    
     Returns:
         Compiled LangGraph workflow.
     """
-    global _workflow_instance
-    if _workflow_instance is None:
-        _workflow_instance = build_conversation_workflow()
-    return _workflow_instance
+    if mode not in _workflow_instances:
+        _workflow_instances[mode] = build_conversation_workflow(mode)
+    return _workflow_instances[mode]
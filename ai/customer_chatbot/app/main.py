@@ -20,11 +20,17 @@ if sys.version_info < (3, 10):
     if not hasattr(importlib.metadata, 'packages_distributions'):
         importlib.metadata.packages_distributions = importlib_metadata.packages_distributions
 
-from app.api.routes import webhook
+from app.api.routes import webhook, catalog, embeddings
+from app.config import get_settings
 from app.models.schemas import HealthCheck
 from app.core.vector_store import get_vector_store
+from app.core.session_store import get_session_store
+from app.services.conversation_scheduler import get_conversation_scheduler
+from app.core.turn_persister import get_turn_persister
 from app.core.embeddings import get_embedding_service
 from app.core.llm import get_llm_service
+from app.services.backend_api import get_backend_api_service
+from app.services.catalog import get_catalog_service
 from app.core.logging_config import setup_logging, get_logger
 
 # Setup logging
@@ -49,10 +55,28 @@ async def lifespan(app: FastAPI):
         vector_store = get_vector_store()
         vector_store.initialize()
         logger.info("✅ Vector store initialized and pgvector extension verified")
+        session_store = get_session_store()
+        session_store.initialize()
+        logger.info(f"✅ Session store ready (cache: {session_store.backend})")
     except Exception as e:
         logger.error(f"⚠️ Warning: Could not initialize vector store: {e}", exc_info=True)
     
-    # 2. Pre-load embedding model
+    # 2. Start the write-behind persister (replays turns journaled before a restart)
+    if get_settings().persist_write_behind:
+        try:
+            get_turn_persister()
+            logger.info("✅ Write-behind persister started")
+        except Exception as e:
+            logger.error(f"⚠️ Warning: Could not start write-behind persister: {e}", exc_info=True)
+    
+    # 3. Fetch the catalog snapshot (areas / projects / unit types for prompts)
+    try:
+        snapshot = await get_catalog_service().arefresh()
+        logger.info(f"✅ Catalog snapshot v{snapshot.version} loaded ({len(snapshot.areas)} areas, {len(snapshot.projects)} projects)")
+    except Exception as e:
+        logger.error(f"⚠️ Warning: Could not load the catalog snapshot: {e}", exc_info=True)
+    
+    # 4. Pre-load embedding model
     try:
         embedding_service = get_embedding_service()
         embedding_service.initialize()
@@ -61,7 +85,7 @@ async def lifespan(app: FastAPI):
         logger.critical(f"❌ Critical Error: Could not load embedding model: {e}", exc_info=True)
         # In production we might want to exit, but for now we continue
     
-    # 3. Validate Gemini API
+    # 5. Validate Gemini API
     try:
         llm_service = get_llm_service()
         llm_service.validate_connectivity()
@@ -73,8 +97,24 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("👋 Shutting down Customer Chatbot service...")
+    try:
+        # Let in-flight turns finish before their storage goes away
+        get_conversation_scheduler().shutdown()
+    except Exception as e:
+        logger.error(f"Could not stop the conversation scheduler: {e}")
+    if get_settings().persist_write_behind:
+        try:
+            # Store journaled turns before the database connection goes away
+            get_turn_persister().close()
+        except Exception as e:
+            logger.error(f"Could not flush pending conversation turns: {e}")
+    try:
+        await get_backend_api_service().aclose()
+    except Exception as e:
+        logger.error(f"Could not close the backend API clients: {e}")
     try:
         vector_store = get_vector_store()
+        await vector_store.aclose()
         vector_store.close()
     except:
         pass
@@ -114,6 +154,8 @@ async def get_ui():
 
 # Include routers
 app.include_router(webhook.router, prefix="/api")
+app.include_router(catalog.router, prefix="/api")
+app.include_router(embeddings.router, prefix="/api")
 
 
 @app.get("/", response_model=HealthCheck)
@@ -30,6 +30,8 @@ class ChatResponse(BaseModel):
     is_complete: Optional[bool] = None
     confirmation_buttons: Optional[List[Dict[str, str]]] = None
     should_ask_clarification: Optional[bool] = None
+    embedding_stats: Optional[Dict[str, int]] = None  # Embedding model calls made/avoided this turn
+    llm_stats: Optional[Dict[str, float]] = None  # LLM calls, input/output tokens and latency this turn
     timestamp: str
 
 
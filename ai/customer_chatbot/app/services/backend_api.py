@@ -6,13 +6,19 @@ Handles customer management, unit search, and request creation.
 from typing import List, Dict, Optional
 import httpx
 from app.config import get_settings
+from app.core.io_mode import is_blocking_io, sync_variant
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
 class BackendAPIService:
-    """Service for communicating with the Real Estate CRM backend."""
+    """Service for communicating with the Real Estate CRM backend.
+    
+    Each call is implemented once as a coroutine (``a``-prefixed) on
+    httpx.AsyncClient; the blocking method of the same name runs it on
+    httpx.Client (see app/core/io_mode.py).
+    """
     
     def __init__(self, base_url: str = None):
         """Initialize the backend API service.
@@ -23,9 +29,17 @@ class BackendAPIService:
         settings = get_settings()
         self.base_url = base_url or settings.backend_api_url
         self.client = httpx.Client(timeout=30.0)
+        self.async_client = httpx.AsyncClient(timeout=30.0)
         logger.info(f"Backend API service initialized with base URL: {self.base_url}")
     
-    def get_or_create_customer(self, phone: str, name: Optional[str] = None) -> int:
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request on the blocking or the async client, depending on the I/O mode."""
+        url = f"{self.base_url}{path}"
+        if is_blocking_io():
+            return self.client.request(method, url, **kwargs)
+        return await self.async_client.request(method, url, **kwargs)
+    
+    async def aget_or_create_customer(self, phone: str, name: Optional[str] = None) -> int:
         """Get existing customer by phone or create new one.
         
         Args:
@@ -37,8 +51,8 @@ class BackendAPIService:
         """
         try:
             # Use public chatbot endpoint
-            response = self.client.post(
-                f"{self.base_url}/chatbot/customers",
+            response = await self._request(
+                "POST", "/chatbot/customers",
                 json={"phone": phone, "name": name}
             )
             response.raise_for_status()
@@ -50,7 +64,7 @@ class BackendAPIService:
             logger.error(f"Error in get_or_create_customer: {e}")
             raise
     
-    def search_units(
+    async def asearch_units(
         self,
         area_id: str = None,  # NEW: Use ID instead of name
         project_id: str = None,  # NEW: Use ID instead of name
@@ -127,8 +141,8 @@ class BackendAPIService:
             
             logger.info(f"Searching units with params: {params}")
             
-            response = self.client.get(
-                f"{self.base_url}/chatbot/units/search",
+            response = await self._request(
+                "GET", "/chatbot/units/search",
                 params=params
             )
             response.raise_for_status()
@@ -142,7 +156,7 @@ class BackendAPIService:
             # Return empty list on error to allow graceful degradation
             return []
     
-    def create_request(
+    async def acreate_request(
         self,
         customer_id: str,
         area_id: str,
@@ -174,8 +188,8 @@ class BackendAPIService:
             
             logger.info(f"Creating request for customer {customer_id} in area {area_id} with requirements: {requirements}")
             
-            response = self.client.post(
-                f"{self.base_url}/chatbot/requests",
+            response = await self._request(
+                "POST", "/chatbot/requests",
                 json=payload
             )
             response.raise_for_status()
@@ -189,14 +203,14 @@ class BackendAPIService:
             logger.error(f"Error creating request: {e}")
             raise
     
-    def get_areas(self) -> List[Dict]:
+    async def aget_areas(self) -> List[Dict]:
         """Get all available areas.
         
         Returns:
             List of area dictionaries with id and name.
         """
         try:
-            response = self.client.get(f"{self.base_url}/areas")
+            response = await self._request("GET", "/areas")
             response.raise_for_status()
             
             areas = response.json()
@@ -207,7 +221,7 @@ class BackendAPIService:
             logger.error(f"Error fetching areas: {e}")
             return []
     
-    def get_area_id_by_name(self, area_name: str) -> Optional[str]:
+    async def aget_area_id_by_name(self, area_name: str) -> Optional[str]:
         """Get area ID by area name.
         
         Args:
@@ -216,7 +230,7 @@ class BackendAPIService:
         Returns:
             Area ID or None if not found.
         """
-        areas = self.get_areas()
+        areas = await self.aget_areas()
         for area in areas:
             if area['name'].strip().lower() == area_name.strip().lower():
                 return area['areaId']
@@ -224,7 +238,7 @@ class BackendAPIService:
         logger.warning(f"Area '{area_name}' not found")
         return None
     
-    def get_projects(self, area_name: str = None) -> List[Dict]:
+    async def aget_projects(self, area_name: str = None) -> List[Dict]:
         """Get all available projects, optionally filtered by area.
         
         Args:
@@ -238,8 +252,8 @@ class BackendAPIService:
             if area_name:
                 params['area'] = area_name
                 
-            response = self.client.get(
-                f"{self.base_url}/chatbot/projects",
+            response = await self._request(
+                "GET", "/chatbot/projects",
                 params=params
             )
             response.raise_for_status()
@@ -254,25 +268,25 @@ class BackendAPIService:
     
     # ========== New Chatbot Endpoints ==========
     
-    def get_all_areas(self) -> List[Dict]:
+    async def aget_all_areas(self) -> List[Dict]:
         """Get all areas via chatbot endpoint."""
         try:
-            response = self.client.get(f"{self.base_url}/chatbot/areas")
+            response = await self._request("GET", "/chatbot/areas")
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"Error fetching all areas: {e}")
             return []
     
-    def fuzzy_search_area(self, query: str) -> Dict:
+    async def afuzzy_search_area(self, query: str) -> Dict:
         """Fuzzy search for area by name.
         
         Returns:
             Dict with 'area' (matched area or null) and 'suggestions' (list of alternatives)
         """
         try:
-            response = self.client.get(
-                f"{self.base_url}/chatbot/areas/search",
+            response = await self._request(
+                "GET", "/chatbot/areas/search",
                 params={"q": query}
             )
             response.raise_for_status()
@@ -281,7 +295,7 @@ class BackendAPIService:
             logger.error(f"Error fuzzy searching area: {e}")
             return {"area": None, "suggestions": []}
     
-    def fuzzy_search_project(self, query: str, area_id: str = None) -> List[Dict]:
+    async def afuzzy_search_project(self, query: str, area_id: str = None) -> List[Dict]:
         """Fuzzy search for project by name.
         
         Args:
@@ -296,8 +310,8 @@ class BackendAPIService:
             if area_id:
                 params["area_id"] = area_id
                 
-            response = self.client.get(
-                f"{self.base_url}/chatbot/projects/search",
+            response = await self._request(
+                "GET", "/chatbot/projects/search",
                 params=params
             )
             response.raise_for_status()
@@ -306,17 +320,17 @@ class BackendAPIService:
             logger.error(f"Error fuzzy searching project: {e}")
             return []
     
-    def get_unit_types(self) -> List[str]:
+    async def aget_unit_types(self) -> List[str]:
         """Get distinct unit types from database."""
         try:
-            response = self.client.get(f"{self.base_url}/chatbot/units/types")
+            response = await self._request("GET", "/chatbot/units/types")
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"Error fetching unit types: {e}")
             return []
     
-    def get_price_range(
+    async def aget_price_range(
         self,
         area_id: str = None,  # Use ID instead of name
         project_id: str = None,  # NEW: Support project filtering
@@ -341,8 +355,8 @@ class BackendAPIService:
             if unit_type:
                 params["unit_type"] = unit_type
                 
-            response = self.client.get(
-                f"{self.base_url}/chatbot/units/price-range",
+            response = await self._request(
+                "GET", "/chatbot/units/price-range",
                 params=params
             )
             response.raise_for_status()
@@ -351,15 +365,15 @@ class BackendAPIService:
             logger.error(f"Error fetching price range: {e}")
             return {"min": None, "max": None, "count": 0}
     
-    def compare_projects(self, project_names: List[str]) -> List[Dict]:
+    async def acompare_projects(self, project_names: List[str]) -> List[Dict]:
         """Compare multiple projects.
         
         Returns:
             List of project comparison data
         """
         try:
-            response = self.client.post(
-                f"{self.base_url}/chatbot/projects/compare",
+            response = await self._request(
+                "POST", "/chatbot/projects/compare",
                 json={"projects": project_names}
             )
             response.raise_for_status()
@@ -368,7 +382,7 @@ class BackendAPIService:
             logger.error(f"Error comparing projects: {e}")
             return []
     
-    def save_conversation(
+    async def asave_conversation(
         self,
         request_id: Optional[str],
         actor_type: str,
@@ -395,8 +409,8 @@ class BackendAPIService:
                 "context_type": "customer"  # All customer chatbot conversations are customer context
             }
             
-            response = self.client.post(
-                f"{self.base_url}/chatbot/conversations",
+            response = await self._request(
+                "POST", "/chatbot/conversations",
                 json=payload
             )
             response.raise_for_status()
@@ -407,9 +421,29 @@ class BackendAPIService:
             logger.error(f"Error saving conversation: {e}")
             return False
 
+    # Blocking variants (catalog loading in the matchers, WORKFLOW_MODE=sync)
+    get_or_create_customer = sync_variant(aget_or_create_customer)
+    search_units = sync_variant(asearch_units)
+    create_request = sync_variant(acreate_request)
+    get_areas = sync_variant(aget_areas)
+    get_area_id_by_name = sync_variant(aget_area_id_by_name)
+    get_projects = sync_variant(aget_projects)
+    get_all_areas = sync_variant(aget_all_areas)
+    fuzzy_search_area = sync_variant(afuzzy_search_area)
+    fuzzy_search_project = sync_variant(afuzzy_search_project)
+    get_unit_types = sync_variant(aget_unit_types)
+    get_price_range = sync_variant(aget_price_range)
+    compare_projects = sync_variant(acompare_projects)
+    save_conversation = sync_variant(asave_conversation)
+
     def close(self):
-        """Close the HTTP client."""
+        """Close the blocking HTTP client."""
+        self.client.close()
+    
+    async def aclose(self):
+        """Close both HTTP clients."""
         self.client.close()
+        await self.async_client.aclose()
 
 
 # Singleton instance
@@ -0,0 +1,280 @@
+"""
+Catalog snapshot service.
+Areas, projects and unit types are fetched from the backend once and shared by
+every turn as an immutable, versioned snapshot. The snapshot is refreshed when
+its TTL expires or when the backend reports a change (POST /api/catalog/invalidate),
+and prebuilds the prompt lines used to translate names in extraction prompts.
+Each prompt only lists the entities relevant to the message, found by a lexical
+prefilter (rapidfuzz partial ratio over normalized English and Arabic names).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+
+from rapidfuzz import fuzz, process
+
+from app.config import get_settings
+from app.core.io_mode import sync_variant
+from app.core.logging_config import get_logger
+from app.utils.arabic_utils import clean_for_matching
+
+logger = get_logger(__name__)
+
+# Prompt fragments when the catalog could not be fetched
+FALLBACK_AREA_MAP = "- North Coast, New Capital, Tagamoo, Madinty, Sharm El Sheikh"
+FALLBACK_PROJECT_MAP = "- Hawabay, Crystal Resort, etc."
+FALLBACK_UNIT_TYPE_MAP = "- Apartment, Villa, Duplex, Studio"
+
+NO_PROJECT_MAP = "- (no project mentioned)"
+
+# Arabic names of the common unit types, shown next to the catalog's
+UNIT_TYPE_ARABIC = {
+    "Apartment": "شقة", "Villa": "فيلا", "Duplex": "دوبلكس", "Studio": "استوديو",
+    "Penthouse": "بنتهاوس", "Townhouse": "تاون هاوس", "Twin House": "توين هاوس", "Chalet": "شاليه",
+}
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """An area or project with its matching keys and prebuilt prompt line."""
+    id: str
+    name: str
+    area_id: Optional[str]
+    keys: Tuple[str, ...]   # normalized names (English, Arabic)
+    line: str
+    name_ar: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable catalog as of ``version``; replaced as a whole on refresh."""
+    version: int
+    digest: str
+    fetched_at: float
+    areas: Tuple[CatalogEntry, ...]
+    projects: Tuple[CatalogEntry, ...]
+    unit_type_map: str
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.areas
+
+    def prompt_fragments(self, message: str, area_id: Optional[str] = None,
+                         max_projects: int = 15, cutoff: float = 80.0) -> Tuple[str, str, str]:
+        """Area / project / unit type listings for an extraction prompt.
+
+        Args:
+            message: User message; entities it mentions are listed first.
+            area_id: Area already known for the conversation; its projects fill
+                the remaining project slots.
+            max_projects: Project lines at most.
+            cutoff: Minimum rapidfuzz partial ratio (0-100) for a mention.
+
+        Returns:
+            (area_map, project_map, unit_type_map)
+        """
+        if self.is_empty:
+            return FALLBACK_AREA_MAP, FALLBACK_PROJECT_MAP, FALLBACK_UNIT_TYPE_MAP
+
+        query = clean_for_matching(message or "")
+        mentioned_areas = _mentioned(query, self.areas, len(self.areas), cutoff)
+        areas = mentioned_areas or list(self.areas)
+
+        projects = _mentioned(query, self.projects, max_projects, cutoff)
+        area_ids = {a.id for a in mentioned_areas}
+        if area_id is not None:
+            area_ids.add(str(area_id))
+        for project in self.projects:
+            if len(projects) >= max_projects:
+                break
+            if project.area_id in area_ids and project not in projects:
+                projects.append(project)
+
+        return (
+            "\n".join(a.line for a in areas),
+            "\n".join(p.line for p in projects) or NO_PROJECT_MAP,
+            self.unit_type_map,
+        )
+
+    def get_stats(self) -> Dict:
+        return {"version": self.version, "digest": self.digest, "areas": len(self.areas),
+                "projects": len(self.projects), "age_s": round(time.monotonic() - self.fetched_at, 1)}
+
+
+def _mentioned(query: str, entries: Tuple[CatalogEntry, ...], limit: int, cutoff: float) -> List[CatalogEntry]:
+    """Entries whose English or Arabic name appears (fuzzily) in the query, best first."""
+    if not query or not entries:
+        return []
+    keys = [(key, i) for i, entry in enumerate(entries) for key in entry.keys]
+    matches = process.extract(query, [key for key, _ in keys], scorer=fuzz.partial_ratio,
+                              score_cutoff=cutoff, limit=None)
+    found: List[CatalogEntry] = []
+    for _, _, key_index in matches:
+        entry = entries[keys[key_index][1]]
+        if entry not in found:
+            found.append(entry)
+            if len(found) >= limit:
+                break
+    return found
+
+
+def _field(record: dict, *names):
+    """First present field (the backend uses camelCase; older endpoints snake_case)."""
+    for name in names:
+        value = record.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def _keys(*names) -> Tuple[str, ...]:
+    keys = []
+    for name in names:
+        key = clean_for_matching(name) if name else ""
+        if len(key) >= 3 and key not in keys:
+            keys.append(key)
+    return tuple(keys)
+
+
+def build_snapshot(areas: List[dict], projects: List[dict], unit_types: List[str],
+                   version: int = 1) -> CatalogSnapshot:
+    """Build a snapshot (entries, keys and prompt lines) from backend responses."""
+    area_entries = []
+    area_names = {}
+    for a in areas:
+        area_id, name = _field(a, "areaId", "area_id"), a.get("name")
+        if not name or area_id is None:
+            continue
+        name_ar = _field(a, "nameAr", "name_ar")
+        area_names[str(area_id)] = name
+        area_entries.append(CatalogEntry(
+            id=str(area_id), name=name, area_id=str(area_id), keys=_keys(name, name_ar),
+            line=f"- Arabic: '{name_ar or name}' → English: '{name}' (ID: {area_id})", name_ar=name_ar,
+        ))
+
+    project_entries = []
+    for p in projects:
+        project_id, name = _field(p, "projectId", "project_id"), p.get("name")
+        if not name or project_id is None:
+            continue
+        area = p.get("area") or {}
+        area_id = _field(p, "areaId", "area_id") or _field(area, "areaId", "area_id")
+        area_name = area.get("name") or area_names.get(str(area_id), "N/A")
+        name_ar = _field(p, "nameAr", "name_ar")
+        arabic = f", Arabic: '{name_ar}'" if name_ar else ""
+        project_entries.append(CatalogEntry(
+            id=str(project_id), name=name, area_id=str(area_id) if area_id is not None else None,
+            keys=_keys(name, name_ar),
+            line=f"- '{name}' (ID: {project_id}, Area: {area_name}{arabic})", name_ar=name_ar,
+        ))
+
+    unit_type_map = "\n".join(
+        f"- Arabic: '{UNIT_TYPE_ARABIC[ut]}' → '{ut}'" if ut in UNIT_TYPE_ARABIC else f"- '{ut}'"
+        for ut in sorted(set(unit_types or []))
+    ) or FALLBACK_UNIT_TYPE_MAP
+
+    digest = hashlib.sha1(json.dumps(
+        [[e.line for e in area_entries], [e.line for e in project_entries], unit_type_map],
+        ensure_ascii=False,
+    ).encode("utf-8")).hexdigest()[:12]
+    return CatalogSnapshot(
+        version=version, digest=digest, fetched_at=time.monotonic(),
+        areas=tuple(area_entries), projects=tuple(project_entries), unit_type_map=unit_type_map,
+    )
+
+
+class CatalogService:
+    """Holds the current catalog snapshot and refreshes it.
+
+    A stale snapshot keeps being served while one turn refreshes it; only the
+    very first turn (or the one after an empty fetch) waits for the backend.
+    """
+
+    def __init__(self, ttl_s: float = None, retry_s: float = None):
+        settings = get_settings()
+        self.ttl_s = ttl_s if ttl_s is not None else settings.catalog_ttl_s
+        self.retry_s = retry_s if retry_s is not None else settings.catalog_retry_s
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    def invalidate(self):
+        """Mark the snapshot stale; the next turn refreshes it."""
+        self._expires_at = 0.0
+        logger.info("Catalog snapshot invalidated")
+
+    async def aget(self) -> CatalogSnapshot:
+        """Current snapshot, refreshed first when missing or stale."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            return snapshot
+        with self._lock:
+            if self._refreshing and snapshot is not None:
+                return snapshot
+            self._refreshing = True
+        try:
+            return await self.arefresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    async def arefresh(self) -> CatalogSnapshot:
+        """Fetch the catalog and install it as a new version if it changed."""
+        from app.services.backend_api import get_backend_api_service
+        backend_api = get_backend_api_service()
+
+        areas = await backend_api.aget_areas()
+        projects = await backend_api.aget_projects()
+        unit_types = await backend_api.aget_unit_types()
+
+        current = self._snapshot
+        fresh = build_snapshot(areas, projects, unit_types, version=(current.version + 1) if current else 1)
+        if fresh.is_empty:
+            # The backend API returns [] on errors: keep what we have and retry soon
+            logger.warning("Catalog fetch returned no areas; keeping the previous snapshot")
+            self._expires_at = time.monotonic() + self.retry_s
+            if current is None:
+                self._snapshot = current = fresh
+            return current
+
+        if current is not None and current.digest == fresh.digest:
+            fresh = build_snapshot(areas, projects, unit_types, version=current.version)
+        self._snapshot = fresh
+        self._expires_at = time.monotonic() + self.ttl_s
+        if current is None or current.version != fresh.version:
+            logger.info(f"Catalog snapshot v{fresh.version}: {len(fresh.areas)} areas, "
+                        f"{len(fresh.projects)} projects")
+        return fresh
+
+    get = sync_variant(aget)
+    
+    def get_stats(self) -> Dict:
+        snapshot = self._snapshot
+        stats = snapshot.get_stats() if snapshot else {"version": 0}
+        stats["expires_in_s"] = round(max(0.0, self._expires_at - time.monotonic()), 1)
+        return stats
+
+
+# Singleton instance
+_catalog_service: Optional[CatalogService] = None
+
+
+def get_catalog_service() -> CatalogService:
+    """Get or create the catalog service singleton.
+
+    Returns:
+        CatalogService instance.
+    """
+    global _catalog_service
+    if _catalog_service is None:
+        _catalog_service = CatalogService()
+    return _catalog_service
@@ -6,10 +6,15 @@ Orchestrates the LangGraph workflow execution.
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from app.config import get_settings
 from app.graph.workflow import get_workflow
 from app.graph.state import ConversationState
 from app.core.vector_store import get_vector_store
+from app.core.session_store import get_session_store
+from app.core.turn_embeddings import turn_scope
+from app.core.llm import llm_usage_scope
 from app.core.logging_config import get_logger
+from app.services.conversation_scheduler import get_conversation_scheduler
 
 logger = get_logger(__name__)
 
@@ -17,9 +22,16 @@ logger = get_logger(__name__)
 class ConversationService:
     """Service for managing customer conversations."""
     
-    def __init__(self):
-        """Initialize the conversation service."""
-        self.workflow = get_workflow()
+    def __init__(self, mode: str = None):
+        """Initialize the conversation service.
+        
+        Args:
+            mode: Workflow mode, "async" or "sync" (defaults to WORKFLOW_MODE).
+        """
+        self.mode = mode or get_settings().workflow_mode
+        self.workflow = get_workflow(self.mode)
+        self.scheduler = get_conversation_scheduler()
+        logger.info(f"Conversation workflow mode: {self.mode}")
     
     async def process_message(
         self,
@@ -28,6 +40,53 @@ class ConversationService:
     ) -> Dict[str, Any]:
         """Process an incoming message and generate a response.
         
+        Messages from the same phone number are processed one at a time, in
+        arrival order. In async mode the turn runs on the event loop; in sync
+        mode it runs on the scheduler's worker pool.
+        
+        Args:
+            phone_number: Customer phone number.
+            message: Message content.
+            
+        Returns:
+            Dictionary containing response and metadata.
+        """
+        if self.mode == "async":
+            return await self.scheduler.arun(phone_number, self.arun_turn, phone_number, message)
+        return await self.scheduler.run(phone_number, self.run_turn, phone_number, message)
+    
+    async def arun_turn(
+        self,
+        phone_number: str,
+        message: str
+    ) -> Dict[str, Any]:
+        """Run one conversation turn with non-blocking LLM, HTTP and database calls.
+        
+        Args:
+            phone_number: Customer phone number.
+            message: Message content.
+            
+        Returns:
+            Dictionary containing response and metadata.
+        """
+        initial_state = self._initial_state(phone_number, message)
+        try:
+            # Each distinct text is embedded at most once per turn, and the
+            # session is written once when the turn completes
+            with turn_scope() as memo, llm_usage_scope() as llm_usage:
+                async with get_session_store().awrite_scope():
+                    final_state = await self.workflow.ainvoke(initial_state)
+            return self._result(phone_number, final_state, memo.get_stats(), llm_usage.get_stats())
+        except Exception as e:
+            return self._error_result(phone_number, message, initial_state, e)
+    
+    def run_turn(
+        self,
+        phone_number: str,
+        message: str
+    ) -> Dict[str, Any]:
+        """Run one conversation turn synchronously (blocks on LLM and database calls).
+        
         Args:
             phone_number: Customer phone number.
             message: Message content.
@@ -35,8 +94,18 @@ class ConversationService:
         Returns:
             Dictionary containing response and metadata.
         """
-        # Initialize state
-        initial_state: ConversationState = {
+        initial_state = self._initial_state(phone_number, message)
+        try:
+            with turn_scope() as memo, llm_usage_scope() as llm_usage, get_session_store().write_scope():
+                final_state = self.workflow.invoke(initial_state)
+            return self._result(phone_number, final_state, memo.get_stats(), llm_usage.get_stats())
+        except Exception as e:
+            return self._error_result(phone_number, message, initial_state, e)
+    
+    def _initial_state(self, phone_number: str, message: str) -> ConversationState:
+        logger.info(f"Executing LangGraph workflow for {phone_number}")
+        logger.info(f"Input Message: {message}")
+        return {
             "phone_number": phone_number,
             "user_message": message,
             "conversation_history": [],
@@ -51,36 +120,54 @@ class ConversationService:
             "timestamp": datetime.now().isoformat(),
             "error": None
         }
-        
-        # Execute the workflow
-        logger.info(f"Executing LangGraph workflow for {phone_number}")
-        logger.info(f"Input Message: {message}")
-        try:
-            final_state = self.workflow.invoke(initial_state)
-            logger.info(f"Workflow execution complete for {phone_number} - Intent: {final_state.get('intent')}, Complete: {final_state.get('is_complete')}")
-            
-            return {
-                "phone_number": phone_number,
-                "response": final_state.get("response", "عذراً، حدث خطأ. حاول مرة أخرى."),
-                "intent": final_state.get("intent"),
-                "extracted_requirements": final_state.get("extracted_requirements"),
-                "is_complete": final_state.get("is_complete"),
-                "confirmation_buttons": final_state.get("confirmation_buttons"),
-                "should_ask_clarification": final_state.get("should_ask_clarification"),
-                "timestamp": final_state.get("timestamp")
-            }
-        except Exception as e:
-            logger.error(f"Error processing message for {phone_number}: {e}", exc_info=True)
-            logger.debug(f"Failed message details - Phone: {phone_number}, Message: {message}, Initial State: {initial_state}")
-            return {
-                "phone_number": phone_number,
-                "response": "عذراً، حدث خطأ في معالجة رسالتك. سيتواصل معك أحد موظفينا قريباً.",
-                "intent": None,
-                "extracted_requirements": None,
-                "is_complete": False,
-                "timestamp": datetime.now().isoformat(),
-                "error": str(e)
-            }
+    
+    def _result(
+        self,
+        phone_number: str,
+        final_state: ConversationState,
+        embedding_stats: dict,
+        llm_stats: dict
+    ) -> Dict[str, Any]:
+        logger.info(f"Workflow execution complete for {phone_number} - Intent: {final_state.get('intent')}, Complete: {final_state.get('is_complete')}")
+        logger.info(
+            f"Turn embeddings for {phone_number}: {embedding_stats['model_calls']} model calls, "
+            f"{embedding_stats['model_calls_avoided']} avoided, {embedding_stats['texts_reused']} texts reused"
+        )
+        logger.info(
+            f"Turn LLM usage for {phone_number}: {llm_stats['calls']} calls, {llm_stats['input_tokens']} input / "
+            f"{llm_stats['output_tokens']} output tokens, {llm_stats['latency_ms']} ms"
+        )
+        return {
+            "phone_number": phone_number,
+            "response": final_state.get("response", "عذراً، حدث خطأ. حاول مرة أخرى."),
+            "intent": final_state.get("intent"),
+            "extracted_requirements": final_state.get("extracted_requirements"),
+            "is_complete": final_state.get("is_complete"),
+            "confirmation_buttons": final_state.get("confirmation_buttons"),
+            "should_ask_clarification": final_state.get("should_ask_clarification"),
+            "embedding_stats": embedding_stats,
+            "llm_stats": llm_stats,
+            "timestamp": final_state.get("timestamp")
+        }
+    
+    def _error_result(
+        self,
+        phone_number: str,
+        message: str,
+        initial_state: ConversationState,
+        error: Exception
+    ) -> Dict[str, Any]:
+        logger.error(f"Error processing message for {phone_number}: {error}", exc_info=True)
+        logger.debug(f"Failed message details - Phone: {phone_number}, Message: {message}, Initial State: {initial_state}")
+        return {
+            "phone_number": phone_number,
+            "response": "عذراً، حدث خطأ في معالجة رسالتك. سيتواصل معك أحد موظفينا قريباً.",
+            "intent": None,
+            "extracted_requirements": None,
+            "is_complete": False,
+            "timestamp": datetime.now().isoformat(),
+            "error": str(error)
+        }
     
     def get_history(
         self,
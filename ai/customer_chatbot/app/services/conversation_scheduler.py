@@ -0,0 +1,194 @@
+"""
+Conversation scheduler.
+Serializes turns per phone number: two messages from the same customer are
+processed one after the other (in arrival order), while different customers
+run in parallel. Async turns run on the event loop, bounded by a semaphore;
+blocking turns (WORKFLOW_MODE=sync) run on a worker pool so a slow LLM call
+does not block the event loop.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import weakref
+
+from app.config import get_settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConversationScheduler:
+    """Per-phone serialized execution of conversation turns.
+
+    Each phone number has an ``asyncio.Lock`` (created on demand and dropped
+    when no turn for that phone is queued); asyncio locks are FIFO, so turns
+    run in arrival order.
+    """
+
+    def __init__(self, max_workers: int = None, metrics_window: int = None, max_concurrent: int = None):
+        """
+        Args:
+            max_workers: Blocking turns processed concurrently (threads).
+            metrics_window: Number of recent turns kept for wait/run percentiles.
+            max_concurrent: Async turns in flight on the event loop.
+        """
+        settings = get_settings()
+        self.max_workers = max_workers or settings.conversation_workers
+        self.max_concurrent = max_concurrent or settings.conversation_max_concurrent
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="conversation")
+        self._slots = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+        self._phone_locks: Dict[str, asyncio.Lock] = {}
+        self._phone_refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        window = metrics_window or settings.conversation_metrics_window
+        self._wait_ms = deque(maxlen=window)
+        self._run_ms = deque(maxlen=window)
+        self._queued = 0
+        self._running = 0
+        self._stats = {"completed": 0, "failed": 0, "max_queue_depth": 0}
+
+    async def run(self, phone_number: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool once earlier turns of this phone are done.
+
+        Args:
+            phone_number: Serialization key.
+            fn: Blocking turn function.
+
+        Returns:
+            The result of ``fn``.
+        """
+        async with self._phone_turn(phone_number) as turn:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(self._timed, turn, fn, *args, **kwargs)
+            # Carry request-scoped context variables into the worker thread
+            future = loop.run_in_executor(self._executor, contextvars.copy_context().run, call)
+            turn["submitted"] = True
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The turn keeps running in its thread: keep the phone locked until it ends
+                await asyncio.wait([future])
+                raise
+
+    async def arun(self, phone_number: str, coro_fn: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """Await ``coro_fn(*args, **kwargs)`` once earlier turns of this phone are done.
+
+        Args:
+            phone_number: Serialization key.
+            coro_fn: Async turn function.
+
+        Returns:
+            The result of ``coro_fn``.
+        """
+        async with self._phone_turn(phone_number) as turn:
+            async with self._slot():
+                turn["submitted"] = True
+                started_at = self._started(turn)
+                failed = True
+                try:
+                    result = await coro_fn(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    self._finished(started_at, failed)
+
+    def get_stats(self) -> dict:
+        """Queue depth, concurrency and wait/run time percentiles (ms)."""
+        with self._lock:
+            waits, runs = sorted(self._wait_ms), sorted(self._run_ms)
+            return {
+                **self._stats,
+                "workers": self.max_workers,
+                "max_concurrent": self.max_concurrent,
+                "queued": self._queued,
+                "running": self._running,
+                "phones_active": len(self._phone_refs),
+                "wait_ms_p50": _percentile(waits, 0.50),
+                "wait_ms_p95": _percentile(waits, 0.95),
+                "run_ms_p50": _percentile(runs, 0.50),
+                "run_ms_p95": _percentile(runs, 0.95),
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting turns; optionally wait for the running ones."""
+        logger.info(f"Stopping conversation scheduler ({self._running} running, {self._queued} queued)")
+        self._executor.shutdown(wait=wait)
+
+    @asynccontextmanager
+    async def _phone_turn(self, phone_number: str):
+        """Hold the phone's lock for one turn; the turn counts as queued until submitted."""
+        turn = {"enqueued_at": time.monotonic(), "submitted": False}
+        lock = self._phone_locks.setdefault(phone_number, asyncio.Lock())
+        self._phone_refs[phone_number] = self._phone_refs.get(phone_number, 0) + 1
+        with self._lock:
+            self._queued += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+        try:
+            async with lock:
+                yield turn
+        finally:
+            if not turn["submitted"]:
+                # Cancelled (or rejected) before it started
+                with self._lock:
+                    self._queued -= 1
+            self._phone_refs[phone_number] -= 1
+            if not self._phone_refs[phone_number]:
+                del self._phone_refs[phone_number]
+                del self._phone_locks[phone_number]
+
+    def _slot(self) -> asyncio.Semaphore:
+        """Limit on async turns in flight (semaphores are bound to their event loop)."""
+        loop = asyncio.get_running_loop()
+        slot = self._slots.get(loop)
+        if slot is None:
+            slot = self._slots[loop] = asyncio.Semaphore(self.max_concurrent)
+        return slot
+
+    def _timed(self, turn: dict, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        started_at = self._started(turn)
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self._finished(started_at, failed)
+
+    def _started(self, turn: dict) -> float:
+        started_at = time.monotonic()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_ms.append((started_at - turn["enqueued_at"]) * 1000)
+        return started_at
+
+    def _finished(self, started_at: float, failed: bool):
+        with self._lock:
+            self._running -= 1
+            self._run_ms.append((time.monotonic() - started_at) * 1000)
+            self._stats["failed" if failed else "completed"] += 1
+
+
+def _percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of sorted values (0.0 when empty)."""
+    if not values:
+        return 0.0
+    return round(values[min(len(values) - 1, int(q * len(values)))], 2)
+
+
+_scheduler_instance = None
+
+
+def get_conversation_scheduler() -> ConversationScheduler:
+    """Get or create the conversation scheduler instance."""
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        _scheduler_instance = ConversationScheduler()
+    return _scheduler_instance
@@ -1,46 +1,257 @@
 """
 Embedding API Client for Customer Chatbot.
 Uses the embedding microservice for embedding operations with fallback to local model.
+Requests share a keep-alive connection pool (HTTP/2 when the h2 package is
+installed) and have per-attempt timeouts; transient failures are retried within
+a retry budget. A circuit breaker sends calls to the local model while the
+service is down and probes /ready before going back to it. Optionally, a local
+computation is hedged against a slow remote call.
 """
 
-from typing import List, Dict, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Callable, List, Dict, Optional, Tuple
+import threading
+import time
 import httpx
 import logging
 
+import numpy as np
+
 from app.config import get_settings
 from app.core.logging_config import get_logger
+from app.core.turn_embeddings import memoized_embed
+from shared.embedding_wire import decode_embeddings
 
 logger = get_logger(__name__)
 
+# Status codes worth retrying (and counted against the breaker)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class EmbeddingServiceError(Exception):
+    """The embedding service did not answer a request successfully."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+    
+    Closed: calls go to the service. After ``failure_threshold`` failed calls in
+    a row it opens and calls skip the service. Once ``reset_s`` has passed it is
+    half-open: one caller probes the service and closes it again on success.
+    """
+    
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+    
+    def __init__(self, failure_threshold: int, reset_s: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_s = reset_s
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.times_opened = 0
+    
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.clock() - self._opened_at >= self.reset_s:
+            return self.HALF_OPEN
+        return self.OPEN
+    
+    def acquire_probe(self) -> bool:
+        """True for the one caller that should probe a half-open breaker."""
+        with self._lock:
+            if self.state != self.HALF_OPEN or self._probing:
+                return False
+            self._probing = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Embedding service circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+    
+    def record_failure(self, probe: bool = False):
+        """Count a failed call; ``probe`` marks the failure of the half-open probe.
+        
+        Only the closed -> open and probe -> open transitions restart the
+        reset period, so late failures of calls already in flight when the
+        circuit opened do not push the next probe out.
+        """
+        with self._lock:
+            self._failures += 1
+            if probe:
+                self._opened_at = self.clock()
+                self._probing = False
+            elif self._opened_at is None and self._failures >= self.failure_threshold:
+                self.times_opened += 1
+                logger.warning(f"Embedding service circuit opened after {self._failures} failures")
+                self._opened_at = self.clock()
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of calls.
+    
+    Each call deposits ``ratio`` tokens (up to ``cap``); each retry spends one,
+    so an outage cannot multiply the load on the service.
+    """
+    
+    def __init__(self, ratio: float, cap: float = 10.0):
+        self.ratio = ratio
+        self.cap = cap
+        self._tokens = cap
+        self._lock = threading.Lock()
+    
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.cap, self._tokens + self.ratio)
+    
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
 
 class EmbeddingAPIClient:
     """Client for embedding microservice with local fallback."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        transport: Optional[httpx.BaseTransport] = None,
+        timeout_s: float = None,
+        max_retries: int = None,
+        breaker_failures: int = None,
+        breaker_reset_s: float = None,
+        hedge_after_ms: float = None
+    ):
         self.settings = get_settings()
         self.base_url = self.settings.embedding_service_url
         self._local_model = None  # Lazy-loaded fallback
-        self._use_remote = True
-        self._client = httpx.Client(timeout=10.0)
+        
+        self.timeout_s = timeout_s if timeout_s is not None else self.settings.embedding_timeout_s
+        self.max_retries = max_retries if max_retries is not None else self.settings.embedding_max_retries
+        hedge_after_ms = hedge_after_ms if hedge_after_ms is not None else self.settings.embedding_hedge_after_ms
+        self.hedge_after_s = hedge_after_ms / 1000
+        self.breaker = CircuitBreaker(
+            breaker_failures if breaker_failures is not None else self.settings.embedding_breaker_failures,
+            breaker_reset_s if breaker_reset_s is not None else self.settings.embedding_breaker_reset_s,
+        )
+        self.retry_budget = RetryBudget(self.settings.embedding_retry_budget_ratio)
+        
+        self.http2 = self.settings.embedding_http2 and transport is None and _h2_available()
+        self._client = httpx.Client(
+            http2=self.http2,
+            transport=transport,
+            timeout=httpx.Timeout(self.timeout_s, connect=self.settings.embedding_connect_timeout_s),
+            limits=httpx.Limits(
+                max_connections=self.settings.embedding_pool_size,
+                max_keepalive_connections=self.settings.embedding_pool_size,
+            ),
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"remote_calls": 0, "local_calls": 0, "fallback_calls": 0, "hedged_calls": 0,
+                       "hedge_local_wins": 0, "retries": 0, "retries_denied": 0, "failed_calls": 0, "probes": 0}
+    
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self._stats[key] += n
+    
+    def get_stats(self) -> Dict:
+        """Call counters, breaker state and pool settings."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(breaker_state=self.breaker.state, breaker_opened=self.breaker.times_opened,
+                     http2=self.http2, hedge_after_ms=self.hedge_after_s * 1000)
+        return stats
+    
+    def _remote_available(self) -> bool:
+        """Whether to call the service: breaker closed, or a half-open /ready probe succeeded."""
+        state = self.breaker.state
+        if state == CircuitBreaker.CLOSED:
+            return True
+        if not self.breaker.acquire_probe():
+            return False
+        self._count("probes")
+        if self._check_service_available():
+            self.breaker.record_success()
+            return True
+        self.breaker.record_failure(probe=True)
+        return False
     
     def _check_service_available(self) -> bool:
         """Check if embedding service is available."""
         try:
-            response = self._client.get(f"{self.base_url}/ready")
+            response = self._client.get(f"{self.base_url}/ready", timeout=self.settings.embedding_connect_timeout_s)
             return response.status_code == 200
         except Exception as e:
             logger.warning(f"Embedding service unavailable: {e}")
             return False
     
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """One service call: per-attempt timeout, budgeted retries, breaker accounting.
+        
+        Raises:
+            EmbeddingServiceError: The call failed (after any retries) or the
+                breaker is open.
+        """
+        if not self._remote_available():
+            raise EmbeddingServiceError("circuit open")
+        self.retry_budget.deposit()
+        
+        attempt = 0
+        while True:
+            try:
+                response = self._client.request(method, f"{self.base_url}{path}", **kwargs)
+                if response.status_code == 200:
+                    self.breaker.record_success()
+                    return response
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRYABLE_STATUS:
+                    # The service is up; the request itself was rejected
+                    self.breaker.record_success()
+                    raise EmbeddingServiceError(error)
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            
+            if attempt >= self.max_retries:
+                break
+            if not self.retry_budget.withdraw():
+                self._count("retries_denied")
+                break
+            attempt += 1
+            self._count("retries")
+            time.sleep(self.settings.embedding_retry_backoff_s * 2 ** (attempt - 1))
+        
+        self._count("failed_calls")
+        self.breaker.record_failure()
+        raise EmbeddingServiceError(f"{method} {path} failed after {attempt + 1} attempts: {error}")
+    
     def _get_local_model(self):
         """Get local embedding model as fallback."""
         if self._local_model is None:
             logger.info("Loading local embedding model as fallback...")
-            from sentence_transformers import SentenceTransformer
-            self._local_model = SentenceTransformer(self.settings.embedding_model_name)
+            from app.core.embeddings import get_embedding_service
+            # Shares the model (and configured inference backend) with EmbeddingService
+            self._local_model = get_embedding_service().model
             logger.info("Local embedding model loaded")
         return self._local_model
     
+    def _format_options(self):
+        """Query params and headers requesting the configured wire format."""
+        params = {"encoding": self.settings.embedding_wire_format}
+        if self.settings.embedding_wire_format != "json":
+            params["dtype"] = self.settings.embedding_wire_dtype
+        headers = {"Accept": "application/octet-stream"} if self.settings.embedding_wire_format == "binary" else {}
+        return params, headers
+    
     def embed_text(self, text: str) -> List[float]:
         """Embed text using remote service or local fallback.
         
@@ -50,54 +261,118 @@ class EmbeddingAPIClient:
         Returns:
             Embedding vector.
         """
-        if self._use_remote:
-            try:
-                response = self._client.post(
-                    f"{self.base_url}/embed/text",
-                    json={"text": text}
-                )
-                if response.status_code == 200:
-                    return response.json()["embedding"]
-                else:
-                    logger.warning(f"Embedding API error: {response.status_code}")
-            except Exception as e:
-                logger.warning(f"Embedding API call failed: {e}")
-                self._use_remote = False
-                logger.info("Falling back to local model")
-        
-        # Local fallback
-        model = self._get_local_model()
-        embedding = model.encode([text], normalize_embeddings=True)[0]
-        return embedding.tolist()
+        return self.embed_text_array(text).tolist()
     
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """Batch embed texts using remote service or local fallback."""
-        if self._use_remote:
-            try:
-                response = self._client.post(
-                    f"{self.base_url}/embed/batch",
-                    json={"texts": texts}
-                )
-                if response.status_code == 200:
-                    return response.json()["embeddings"]
-            except Exception as e:
-                logger.warning(f"Batch embedding API call failed: {e}")
-                self._use_remote = False
+        return self.embed_texts_array(texts).tolist()
+    
+    @property
+    def memo_namespace(self) -> str:
+        """Identity of the vectors the service produces (per-turn memo key)."""
+        return f"api:{self.base_url}"
+    
+    @property
+    def local_memo_namespace(self) -> str:
+        """Identity of the vectors the local fallback model produces."""
+        from app.core.embeddings import get_embedding_service
+        return get_embedding_service().memo_namespace
+    
+    def embed_text_array(self, text: str) -> np.ndarray:
+        """Embed text straight into a float32 NumPy vector.
+        
+        Within a conversation turn, texts already embedded are reused.
+        
+        Args:
+            text: Input text to embed.
+            
+        Returns:
+            Embedding vector of shape (dimension,).
+        """
+        return memoized_embed(self.memo_namespace, [text], lambda missing: self._fetch_text(missing[0]))[0]
+    
+    def embed_texts_array(self, texts: List[str]) -> np.ndarray:
+        """Batch embed texts straight into a (count, dimension) float32 array.
         
-        # Local fallback
+        Within a conversation turn, texts already embedded are reused.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(memoized_embed(self.memo_namespace, texts, self._fetch_texts))
+    
+    def _fetch_text(self, text: str) -> Tuple[str, np.ndarray]:
+        """Embed one text via the service, falling back to the local model."""
+        return self._fetch("/embed/text", {"text": text}, [text])
+    
+    def _fetch_texts(self, texts: List[str]) -> Tuple[str, np.ndarray]:
+        """Embed a batch via the service, falling back to the local model."""
+        return self._fetch("/embed/batch", {"texts": texts}, texts)
+    
+    def _fetch(self, path: str, payload: Dict, texts: List[str]) -> Tuple[str, np.ndarray]:
+        """Vectors for ``texts`` and the memo namespace of the model that produced them."""
+        if self.hedge_after_s > 0:
+            return self._fetch_hedged(path, payload, texts)
+        try:
+            vectors = self._fetch_remote(path, payload, len(texts))
+            self._count("remote_calls")
+            return self.memo_namespace, vectors
+        except EmbeddingServiceError as e:
+            logger.warning(f"Embedding API call failed, using the local model: {e}")
+            self._count("fallback_calls")
+            return self.local_memo_namespace, self._encode_local(texts)
+    
+    def _fetch_remote(self, path: str, payload: Dict, count: int) -> np.ndarray:
+        """Service call for ``count`` vectors; an undecodable answer counts as a failed call."""
+        params, headers = self._format_options()
+        response = self._request("POST", path, json=payload, params=params, headers=headers)
+        try:
+            vectors = decode_embeddings(response)
+            if vectors.ndim != 2 or vectors.shape[0] != count:
+                raise ValueError(f"expected {count} vectors, got shape {vectors.shape}")
+        except Exception as e:
+            self._count("failed_calls")
+            self.breaker.record_failure()
+            raise EmbeddingServiceError(f"POST {path} returned an invalid body: {type(e).__name__}: {e}") from e
+        return vectors
+    
+    def _fetch_hedged(self, path: str, payload: Dict, texts: List[str]) -> Tuple[str, np.ndarray]:
+        """Remote call, racing a local computation once it exceeds the hedge delay."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="embedding-hedge")
+        remote = self._executor.submit(self._fetch_remote, path, payload, len(texts))
+        try:
+            vectors = remote.result(timeout=self.hedge_after_s)
+            self._count("remote_calls")
+            return self.memo_namespace, vectors
+        except FutureTimeout:
+            pass
+        except EmbeddingServiceError as e:
+            logger.warning(f"Embedding API call failed, using the local model: {e}")
+            self._count("fallback_calls")
+            return self.local_memo_namespace, self._encode_local(texts)
+        
+        self._count("hedged_calls")
+        local = self._executor.submit(self._encode_local, texts)
+        done, _ = wait([remote, local], return_when=FIRST_COMPLETED)
+        if remote in done and remote.exception() is None:
+            self._count("remote_calls")
+            return self.memo_namespace, remote.result()
+        self._count("hedge_local_wins")
+        return self.local_memo_namespace, local.result()
+    
+    def _encode_local(self, texts: List[str]) -> np.ndarray:
+        self._count("local_calls")
         model = self._get_local_model()
-        embeddings = model.encode(texts, normalize_embeddings=True)
-        return embeddings.tolist()
+        return model.encode(texts, normalize_embeddings=True).astype(np.float32)
     
     def search_area(self, query: str, threshold: float = 0.45, top_k: int = 5) -> Dict:
         """Search for area using embedding service."""
         try:
-            response = self._client.get(
-                f"{self.base_url}/search/area",
+            response = self._request(
+                "GET", "/search/area",
                 params={"q": query, "threshold": threshold, "top_k": top_k}
             )
-            if response.status_code == 200:
-                return response.json()
+            return response.json()
         except Exception as e:
             logger.warning(f"Area search API call failed: {e}")
         return {"matched": False, "alternatives": []}
@@ -109,12 +384,8 @@ class EmbeddingAPIClient:
             params = {"q": query, "threshold": threshold, "top_k": top_k}
             if area_id:
                 params["area_id"] = area_id
-            response = self._client.get(
-                f"{self.base_url}/search/project",
-                params=params
-            )
-            if response.status_code == 200:
-                return response.json()
+            response = self._request("GET", "/search/project", params=params)
+            return response.json()
         except Exception as e:
             logger.warning(f"Project search API call failed: {e}")
         return {"matched": False, "alternatives": []}
@@ -122,12 +393,11 @@ class EmbeddingAPIClient:
     def search_unit_type(self, query: str, threshold: float = 0.4, top_k: int = 3) -> Dict:
         """Search for unit type using embedding service."""
         try:
-            response = self._client.get(
-                f"{self.base_url}/search/unit-type",
+            response = self._request(
+                "GET", "/search/unit-type",
                 params={"q": query, "threshold": threshold, "top_k": top_k}
             )
-            if response.status_code == 200:
-                return response.json()
+            return response.json()
         except Exception as e:
             logger.warning(f"Unit type search API call failed: {e}")
         return {"matched": False}
@@ -135,6 +405,18 @@ class EmbeddingAPIClient:
     def close(self):
         """Close HTTP client."""
         self._client.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def _h2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.info("h2 not installed; embedding service connections use HTTP/1.1 keep-alive")
+        return False
 
 
 # Singleton instance
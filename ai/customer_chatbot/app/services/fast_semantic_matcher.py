@@ -2,142 +2,267 @@
 Fast Semantic Matcher using pgvector for similarity search.
 10-100x faster than in-memory matching.
 Now uses embedding microservice API with local fallback.
+The embedding tables are populated in bulk from the catalog snapshot: changed
+entities are embedded in chunks and upserted one transaction per chunk, rows
+whose source hash is unchanged are skipped, and the digest of the populated
+catalog is recorded so an up-to-date database is recognized with one lookup.
 """
 
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 from functools import lru_cache
+import hashlib
+import threading
+import time
+
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import errors
+from psycopg2.extras import RealDictCursor, execute_values
+from pgvector.psycopg2 import register_vector
 
 from app.services.embedding_api_client import get_embedding_api_client
-from app.services.backend_api import get_backend_api_service
+from app.services.catalog import CatalogSnapshot, get_catalog_service
 from app.core.logging_config import get_logger
 from app.config import get_settings
 
 logger = get_logger(__name__)
 
+# Row in embedding_catalog_state holding the digest of the populated catalog
+STATE_KEY = "fast_semantic_matcher"
+
+# entity -> embeddings table, key column and columns written besides embedding/embedding_hash
+ENTITY_TABLES = {
+    "areas": {"table": "areas_embeddings", "key": "area_id", "columns": ["area_id", "name", "name_ar"]},
+    "projects": {"table": "projects_embeddings", "key": "project_id", "columns": ["project_id", "name", "area_id"]},
+    "unit_types": {"table": "unit_types_embeddings", "key": "unit_type_id", "columns": ["unit_type_id"]},
+}
+
+SCHEMA_SQL = """
+    ALTER TABLE areas_embeddings ADD COLUMN IF NOT EXISTS embedding_hash VARCHAR(64);
+    ALTER TABLE projects_embeddings ADD COLUMN IF NOT EXISTS embedding_hash VARCHAR(64);
+    ALTER TABLE unit_types_embeddings ADD COLUMN IF NOT EXISTS embedding_hash VARCHAR(64);
+    CREATE TABLE IF NOT EXISTS embedding_catalog_state (
+        key VARCHAR(64) PRIMARY KEY,
+        digest VARCHAR(64) NOT NULL,
+        entities INTEGER,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+@dataclass(frozen=True)
+class EmbeddingRow:
+    """An entity to embed: the text, the non-vector column values and their source hash."""
+    key: str
+    text: str
+    values: Tuple[Any, ...]
+    source_hash: str
+
+
+def compute_source_hash(model: str, text: str, *fields) -> str:
+    """Hash everything an embedding row is derived from (model identity included)."""
+    parts = [model, text] + ["" if f is None else str(f) for f in fields]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+def catalog_rows(snapshot: CatalogSnapshot, model: str) -> Dict[str, List[EmbeddingRow]]:
+    """Area and project rows for a catalog snapshot."""
+    areas = []
+    for a in snapshot.areas:
+        # Bilingual area text
+        text = f"{a.name} {a.name_ar or a.name}"
+        areas.append(EmbeddingRow(a.id, text, (a.id, a.name, a.name_ar or a.name),
+                                  compute_source_hash(model, text)))
+    projects = [
+        EmbeddingRow(p.id, p.name, (p.id, p.name, p.area_id), compute_source_hash(model, p.name, p.area_id))
+        for p in snapshot.projects
+    ]
+    return {"areas": areas, "projects": projects}
+
+
+def catalog_digest(rows: Dict[str, List[EmbeddingRow]]) -> str:
+    """Digest of the rows the tables should hold."""
+    digest = hashlib.sha256()
+    for entity in sorted(rows):
+        for row in sorted(rows[entity], key=lambda r: r.key):
+            digest.update(f"{entity}\x00{row.key}\x00{row.source_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
 
 class FastSemanticMatcher:
     """Match user queries to DB entities using pgvector similarity search."""
     
-    def __init__(self):
+    def __init__(self, chunk_size: int = None):
         self.embedding_client = get_embedding_api_client()
-        self.backend_api = get_backend_api_service()
+        self.catalog = get_catalog_service()
         self.settings = get_settings()
+        self.chunk_size = max(1, chunk_size or self.settings.fast_matcher_chunk_size)
         self._conn = None
+        self._lock = threading.Lock()
+        # Catalog snapshot version the tables are known to match
+        self._populated_version = None
     
     @property
     def conn(self):
         """Lazy database connection."""
         if self._conn is None or self._conn.closed:
             self._conn = psycopg2.connect(self.settings.database_url)
+            register_vector(self._conn)
         return self._conn
     
+    @property
+    def model_identity(self) -> str:
+        """Identity of the vectors written; part of every source hash."""
+        return f"{self.settings.embedding_model_name}@{self.embedding_client.memo_namespace}"
+    
     def _ensure_embeddings_populated(self):
-        """Populate embeddings tables if empty."""
+        """Bring the embeddings tables in line with the catalog snapshot.
+        
+        Runs once per snapshot version; when the recorded digest matches the
+        snapshot that is a single primary-key lookup.
+        """
+        snapshot = self.catalog.get()
+        if snapshot.is_empty or self._populated_version == snapshot.version:
+            return
+        with self._lock:
+            if self._populated_version == snapshot.version:
+                return
+            try:
+                rows = catalog_rows(snapshot, self.model_identity)
+                digest = catalog_digest(rows)
+                if self._recorded_digest() != digest:
+                    logger.info(f"Populating embeddings tables for catalog v{snapshot.version}...")
+                    self.populate(rows, digest)
+                self._populated_version = snapshot.version
+            except Exception as e:
+                self.conn.rollback()
+                logger.error(f"Error ensuring embeddings populated: {e}")
+    
+    def _recorded_digest(self) -> Optional[str]:
+        """Digest of the last populated catalog (creates the bookkeeping schema on first use)."""
         try:
             with self.conn.cursor() as cur:
-                # Check if areas_embeddings is empty
-                cur.execute("SELECT COUNT(*) FROM areas_embeddings")
-                count = cur.fetchone()[0]
-                
-                if count == 0:
-                    logger.info("Populating areas_embeddings table...")
-                    self._populate_area_embeddings()
-                
-                # Check if projects_embeddings is empty
-                cur.execute("SELECT COUNT(*) FROM projects_embeddings")
-                count = cur.fetchone()[0]
-                
-                if count == 0:
-                    logger.info("Populating projects_embeddings table...")
-                    self._populate_project_embeddings()
-                
-                # Check if unit_types_embeddings needs embeddings
-                cur.execute("SELECT COUNT(*) FROM unit_types_embeddings WHERE embedding IS NULL")
-                count = cur.fetchone()[0]
-                
-                if count > 0:
-                    logger.info("Populating unit_types_embeddings...")
-                    self._populate_unit_type_embeddings()
-                    
-        except Exception as e:
-            logger.error(f"Error ensuring embeddings populated: {e}")
+                cur.execute("SELECT digest FROM embedding_catalog_state WHERE key = %s", (STATE_KEY,))
+                row = cur.fetchone()
+            self.conn.commit()
+            return row[0] if row else None
+        except errors.UndefinedTable:
+            self.conn.rollback()
+            with self.conn.cursor() as cur:
+                cur.execute(SCHEMA_SQL)
+            self.conn.commit()
+            return None
     
-    def _populate_area_embeddings(self):
-        """Fetch areas from backend and compute embeddings."""
-        areas = self.backend_api.get_areas()
+    def populate(self, rows: Dict[str, List[EmbeddingRow]], digest: str, force: bool = False) -> Dict[str, Dict]:
+        """Embed and write the rows that changed, then record ``digest``.
         
-        with self.conn.cursor() as cur:
-            for area in areas:
-                area_id = area.get('areaId') or area.get('area_id')
-                name = area['name']
-                name_ar = area.get('name_ar', name)
-                
-                # Compute embedding for bilingual text
-                text = f"{name} {name_ar}"
-                embedding = self.embedding_client.embed_text(text)
-                
-                # Insert into database
-                cur.execute("""
-                    INSERT INTO areas_embeddings (area_id, name, name_ar, embedding)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (area_id) DO UPDATE 
-                    SET name = EXCLUDED.name, 
-                        name_ar = EXCLUDED.name_ar,
-                        embedding = EXCLUDED.embedding,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (area_id, name, name_ar, embedding))
+        Args:
+            rows: Area and project rows (see catalog_rows)
+            digest: Catalog digest recorded once every chunk is written
+            force: Re-embed rows even if their hash is unchanged
             
-            self.conn.commit()
-            logger.info(f"Populated {len(areas)} area embeddings")
-    
-    def _populate_project_embeddings(self):
-        """Fetch projects from backend and compute embeddings."""
-        projects = self.backend_api.get_projects()
+        Returns:
+            Per-entity statistics.
+        """
+        stats = {entity: self._sync_entity(entity, entity_rows, force) for entity, entity_rows in rows.items()}
+        stats["unit_types"] = self._sync_entity("unit_types", self._unit_type_rows(), force)
         
+        entities = sum(len(entity_rows) for entity_rows in rows.values())
         with self.conn.cursor() as cur:
-            for project in projects:
-                project_id = project.get('projectId') or project.get('project_id')
-                name = project['name']
-                area_id = project.get('area', {}).get('areaId') or project.get('area', {}).get('area_id')
-                
-                # Compute embedding
-                embedding = self.embedding_client.embed_text(name)
-                
-                # Insert into database
-                cur.execute("""
-                    INSERT INTO projects_embeddings (project_id, name, area_id, embedding)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (project_id) DO UPDATE 
-                    SET name = EXCLUDED.name,
-                        area_id = EXCLUDED.area_id,
-                        embedding = EXCLUDED.embedding,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (project_id, name, area_id, embedding))
-            
-            self.conn.commit()
-            logger.info(f"Populated {len(projects)} project embeddings")
+            cur.execute("""
+                INSERT INTO embedding_catalog_state (key, digest, entities)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (key) DO UPDATE
+                SET digest = EXCLUDED.digest,
+                    entities = EXCLUDED.entities,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (STATE_KEY, digest, entities))
+        self.conn.commit()
+        
+        for entity, s in stats.items():
+            logger.info(f"Populated {entity} embeddings: {s['embedded']} embedded, {s['skipped']} unchanged, "
+                        f"{s['removed']} removed in {s['chunks']} chunks ({s['entities_per_sec']} entities/s)")
+        return stats
     
-    def _populate_unit_type_embeddings(self):
-        """Compute embeddings for unit types."""
+    def _unit_type_rows(self) -> List[EmbeddingRow]:
+        """Unit types seeded in unit_types_embeddings."""
         with self.conn.cursor() as cur:
             cur.execute("SELECT unit_type_id, name, name_ar FROM unit_types_embeddings")
             unit_types = cur.fetchall()
-            
-            for unit_type_id, name, name_ar in unit_types:
-                # Compute embedding for bilingual text
-                text = f"{name} {name_ar}"
-                embedding = self.embedding_client.embed_text(text)
-                
-                cur.execute("""
-                    UPDATE unit_types_embeddings 
-                    SET embedding = %s, updated_at = CURRENT_TIMESTAMP
-                    WHERE unit_type_id = %s
-                """, (embedding, unit_type_id))
-            
+        rows = []
+        for unit_type_id, name, name_ar in unit_types:
+            # Bilingual unit type text
+            text = f"{name} {name_ar}"
+            rows.append(EmbeddingRow(str(unit_type_id), text, (unit_type_id,),
+                                     compute_source_hash(self.model_identity, text)))
+        return rows
+    
+    def _stored_hashes(self, entity: str) -> Dict[str, Optional[str]]:
+        """Source hash of every stored row, by key (as text); NULL where no embedding."""
+        spec = ENTITY_TABLES[entity]
+        with self.conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT {spec['key']}::text, CASE WHEN embedding IS NULL THEN NULL ELSE embedding_hash END
+                FROM {spec['table']}
+            """)
+            return dict(cur.fetchall())
+    
+    def _sync_entity(self, entity: str, rows: List[EmbeddingRow], force: bool) -> Dict:
+        """Embed changed rows chunk by chunk; one embedding call and one transaction per chunk.
+        
+        Area and project rows no longer in the catalog are deleted first.
+        """
+        spec = ENTITY_TABLES[entity]
+        started = time.perf_counter()
+        stored = self._stored_hashes(entity)
+        changed = [row for row in rows if force or stored.get(row.key) != row.source_hash]
+        
+        removed = []
+        if entity != "unit_types":
+            removed = sorted(set(stored) - {row.key for row in rows})
+        if removed:
+            with self.conn.cursor() as cur:
+                cur.execute(f"DELETE FROM {spec['table']} WHERE {spec['key']}::text = ANY(%s)", (removed,))
             self.conn.commit()
-            logger.info(f"Populated {len(unit_types)} unit type embeddings")
+        
+        if entity == "unit_types":
+            # Seeded rows: only the embedding is written
+            query = """
+                UPDATE unit_types_embeddings AS t
+                SET embedding = v.embedding::vector, embedding_hash = v.embedding_hash
+                FROM (VALUES %s) AS v (unit_type_id, embedding, embedding_hash)
+                WHERE t.unit_type_id = v.unit_type_id
+            """
+        else:
+            columns = spec["columns"] + ["embedding", "embedding_hash"]
+            updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != spec["key"])
+            query = f"""
+                INSERT INTO {spec['table']} ({", ".join(columns)})
+                VALUES %s
+                ON CONFLICT ({spec['key']}) DO UPDATE
+                SET {updates}, updated_at = CURRENT_TIMESTAMP
+            """
+        
+        chunks = 0
+        for start in range(0, len(changed), self.chunk_size):
+            chunk = changed[start:start + self.chunk_size]
+            vectors = self.embedding_client.embed_texts_array([row.text for row in chunk])
+            with self.conn.cursor() as cur:
+                execute_values(cur, query, [row.values + (vector, row.source_hash) for row, vector in zip(chunk, vectors)],
+                               page_size=len(chunk))
+            self.conn.commit()
+            chunks += 1
+        
+        elapsed = time.perf_counter() - started
+        return {
+            "entities": len(rows),
+            "embedded": len(changed),
+            "skipped": len(rows) - len(changed),
+            "removed": len(removed),
+            "chunks": chunks,
+            "elapsed_s": round(elapsed, 3),
+            "entities_per_sec": round(len(rows) / elapsed, 1) if elapsed else 0.0,
+        }
     
     def match_area(self, query: str, top_k: int = 5, threshold: float = 0.45) -> Dict:
         """Find top K most relevant areas using pgvector similarity.
@@ -154,7 +279,7 @@ class FastSemanticMatcher:
             self._ensure_embeddings_populated()
             
             # Compute query embedding
-            query_embedding = self.embedding_client.embed_text(query)
+            query_embedding = self.embedding_client.embed_text_array(query)
             
             # pgvector cosine similarity search
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -218,7 +343,7 @@ class FastSemanticMatcher:
             self._ensure_embeddings_populated()
             
             # Compute query embedding
-            query_embedding = self.embedding_client.embed_text(query)
+            query_embedding = self.embedding_client.embed_text_array(query)
             
             # pgvector cosine similarity search with optional area filter
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -294,7 +419,7 @@ class FastSemanticMatcher:
             self._ensure_embeddings_populated()
             
             # Compute query embedding
-            query_embedding = self.embedding_client.embed_text(query)
+            query_embedding = self.embedding_client.embed_text_array(query)
             
             # pgvector cosine similarity search
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
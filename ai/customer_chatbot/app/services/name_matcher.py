@@ -3,15 +3,16 @@ Dynamic name matching service for bilingual (Arabic/English) entity matching.
 Matches user input against real database values - no hardcoded word lists.
 """
 from dataclasses import dataclass, field
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 
 from app.config import get_settings
 from app.core.logging_config import get_logger
 from app.utils.arabic_utils import normalize_arabic, detect_language, is_arabic_phonetic, clean_for_matching
-from app.utils.franco_converter import convert_franco_to_english
 from app.services.backend_api import get_backend_api_service
+from app.services.transliteration import PhoneticIndex, get_transliteration_service
 
 logger = get_logger(__name__)
 
@@ -28,6 +29,87 @@ class MatchResult:
     area_filtered: bool = False          # True if alternatives filtered by area
 
 
+class EntityIndex:
+    """
+    Names of one entity list, normalized once per cache refresh.
+    
+    Exact lookups are hash-map hits; fuzzy scores for all names are computed
+    in one rapidfuzz ``cdist`` call per scorer instead of a Python loop.
+    """
+    
+    def __init__(self, entities: list, name_key: Optional[str], id_key: Optional[str], group_key=None):
+        """
+        Args:
+            entities: Cached DB records (or plain names when name_key is None).
+            name_key: Field holding the name.
+            id_key: Field holding the DB ID, if any.
+            group_key: Function giving the sub-index key of an entity (e.g. its area ID).
+        """
+        self.source = entities
+        self.id_key = id_key
+        names = entities if name_key is None else [e.get(name_key) for e in entities]
+        positions = [i for i, name in enumerate(names) if name]
+        self.entities = [entities[i] for i in positions]
+        self.names = [names[i] for i in positions]
+        self.lower = [name.lower() for name in self.names]
+        self.normalized = [clean_for_matching(name) for name in self.names]
+        # Franco spellings of these names are resolved against their phonetic keys
+        self.phonetic = PhoneticIndex(self.names)
+        # Shown when nothing matches (first 10 entities, as listed by the backend)
+        self.default_alternatives = [name for name in names[:10] if name]
+        
+        # First entity wins, as in a scan in list order
+        self._by_lower: Dict[str, int] = {}
+        self._by_normalized: Dict[str, int] = {}
+        for i, (lower, normalized) in enumerate(zip(self.lower, self.normalized)):
+            self._by_lower.setdefault(lower, i)
+            self._by_normalized.setdefault(normalized, i)
+        
+        # Per-group sub-index (projects by area)
+        self.groups: Dict[object, List[int]] = {}
+        if group_key is not None:
+            for i, entity in enumerate(entities):
+                self.groups.setdefault(group_key(entity), []).append(i)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def exact(self, user_input: str, input_normalized: str, input_english: Optional[str]):
+        """(position, confidence) of the first exact match, or None."""
+        direct = [i for i in (self._by_lower.get(user_input.lower()), self._by_normalized.get(input_normalized))
+                  if i is not None]
+        english = self._by_lower.get(input_english.lower()) if input_english else None
+        if direct and (english is None or min(direct) <= english):
+            return min(direct), 1.0
+        if english is not None:
+            return english, 0.95
+        return None
+    
+    def scores(self, input_normalized: str, input_english: Optional[str]) -> np.ndarray:
+        """Best of ratio / partial ratio (and ratio to the English conversion) per name, 0-1."""
+        scores = np.maximum(
+            process.cdist([input_normalized], self.normalized, scorer=fuzz.ratio, dtype=np.float64)[0],
+            process.cdist([input_normalized], self.normalized, scorer=fuzz.partial_ratio, dtype=np.float64)[0],
+        )
+        if input_english:
+            scores = np.maximum(
+                scores,
+                process.cdist([input_english.lower()], self.lower, scorer=fuzz.ratio, dtype=np.float64)[0],
+            )
+        return scores / 100
+    
+    def entity_id(self, position: int):
+        return self.entities[position].get(self.id_key) if self.id_key else None
+    
+    def ranked(self, scores: np.ndarray) -> np.ndarray:
+        """Positions by descending score; ties keep DB order."""
+        return np.argsort(-scores, kind="stable")
+
+
+def _project_area_id(project: dict):
+    return (project.get('area') or {}).get('areaId')
+
+
 class NameMatcherService:
     """
     Dynamic name matching service.
@@ -36,7 +118,7 @@ class NameMatcherService:
     
     Matching Flow:
     1. Normalize Arabic input
-    2. If Arabic phonetic → LLM converts to English
+    2. If Arabic phonetic → converted to English (catalog keys, memo, then LLM)
     3. Try exact match against DB
     4. Try fuzzy match against DB
     5. Return suggestions from DB
@@ -49,17 +131,34 @@ class NameMatcherService:
         self.SUGGEST_THRESHOLD = settings.fuzzy_suggest_threshold
         
         self.backend = get_backend_api_service()
+        self.transliteration = get_transliteration_service()
         
         # Cache for DB values (refreshed on each session start)
         self._areas_cache: Optional[List[dict]] = None
         self._projects_cache: Optional[List[dict]] = None
         self._unit_types_cache: Optional[List[str]] = None
+        # Indexes of the cached lists, rebuilt when a list is replaced
+        self._indexes: Dict[str, EntityIndex] = {}
     
     def refresh_cache(self):
         """Force refresh of cached DB values."""
         self._areas_cache = None
         self._projects_cache = None
         self._unit_types_cache = None
+        self._indexes = {}
+    
+    def _index(self, kind: str, entities: list, name_key: str, id_key: Optional[str], group_key=None) -> EntityIndex:
+        """Index of a cached entity list (built on first use after a refresh)."""
+        index = self._indexes.get(kind)
+        if index is None or index.source is not entities:
+            index = EntityIndex(entities, name_key, id_key, group_key)
+            self._indexes[kind] = index
+        return index
+    
+    def _projects_index(self) -> EntityIndex:
+        if self._projects_cache is None:
+            self._projects_cache = self.backend.get_projects()
+        return self._index('projects', self._projects_cache, 'name', 'projectId', group_key=_project_area_id)
     
     def match_area(self, user_input: str) -> MatchResult:
         """Match user input to area names from DB."""
@@ -67,12 +166,7 @@ class NameMatcherService:
         if self._areas_cache is None:
             self._areas_cache = self.backend.get_all_areas()
         
-        return self._match_entity(
-            user_input=user_input,
-            entities=self._areas_cache,
-            name_key='name',
-            id_key='areaId'
-        )
+        return self._match_entity(user_input, self._index('areas', self._areas_cache, 'name', 'areaId'))
     
     def match_project(self, user_input: str, area_id: int = None) -> MatchResult:
         """
@@ -80,21 +174,12 @@ class NameMatcherService:
         
         If area_id is provided, alternatives are filtered to that area.
         """
-        # Fetch projects if not cached
-        if self._projects_cache is None:
-            self._projects_cache = self.backend.get_projects()
-        
-        result = self._match_entity(
-            user_input=user_input,
-            entities=self._projects_cache,
-            name_key='name',
-            id_key='projectId'
-        )
+        index = self._projects_index()
+        result = self._match_entity(user_input, index)
         
         # Filter alternatives by area if specified
         if area_id and result.alternatives:
-            area_projects = self.get_projects_for_area(area_id)
-            area_project_names = {p['name'] for p in area_projects}
+            area_project_names = {p['name'] for p in self.get_projects_for_area(area_id)}
             filtered = [alt for alt in result.alternatives if alt in area_project_names]
             if filtered:
                 result.alternatives = filtered
@@ -112,35 +197,19 @@ class NameMatcherService:
         if self._unit_types_cache is None:
             self._unit_types_cache = self.backend.get_unit_types()
         
-        # Convert list of strings to entity format
-        entities = [{'unitType': ut} for ut in self._unit_types_cache]
-        
-        return self._match_entity(
-            user_input=user_input,
-            entities=entities,
-            name_key='unitType',
-            id_key=None
-        )
+        return self._match_entity(user_input, self._index('unit_types', self._unit_types_cache, None, None))
     
     def get_projects_for_area(self, area_id: int) -> List[dict]:
         """Get all projects filtered by area - for listing to customer."""
-        if self._projects_cache is None:
-            self._projects_cache = self.backend.get_projects()
-        
-        return [p for p in self._projects_cache if p.get('area', {}).get('areaId') == area_id]
-    
-    def _match_entity(
-        self,
-        user_input: str,
-        entities: List[dict],
-        name_key: str,
-        id_key: Optional[str]
-    ) -> MatchResult:
-        """Generic entity matching with dynamic DB lookup."""
-        if not user_input or not entities:
+        index = self._projects_index()
+        return [index.source[i] for i in index.groups.get(area_id, [])]
+    
+    def _match_entity(self, user_input: str, index: EntityIndex) -> MatchResult:
+        """Generic entity matching against an index of DB values."""
+        if not user_input or not index.source:
             return MatchResult(
                 matched=False,
-                alternatives=[e.get(name_key) for e in entities[:10] if e.get(name_key)]
+                alternatives=index.default_alternatives
             )
         
         detected_lang = detect_language(user_input)
@@ -148,91 +217,55 @@ class NameMatcherService:
         # Normalize input
         input_normalized = clean_for_matching(user_input)
         
-        # If Arabic phonetic, use LLM to convert to English
+        # If Arabic phonetic, convert to English (the LLM only for names the catalog doesn't explain)
         input_english = None
         if is_arabic_phonetic(user_input):
-            input_english = convert_franco_to_english(user_input)
+            input_english = self.transliteration.to_english(user_input, index.phonetic)
             logger.info(f"Franco conversion: '{user_input}' → '{input_english}'")
         
-        # Step 1: Exact match
-        for entity in entities:
-            name = entity.get(name_key, "")
-            if not name:
-                continue
-                
-            name_lower = name.lower()
-            name_normalized = clean_for_matching(name)
-            
-            # Direct match
-            if name_lower == user_input.lower() or name_normalized == input_normalized:
-                return MatchResult(
-                    matched=True,
-                    value=name,
-                    id=entity.get(id_key) if id_key else None,
-                    confidence=1.0,
-                    language_detected=detected_lang
-                )
-            
-            # Match against LLM-converted English
-            if input_english and name_lower == input_english.lower():
-                return MatchResult(
-                    matched=True,
-                    value=name,
-                    id=entity.get(id_key) if id_key else None,
-                    confidence=0.95,
-                    language_detected=detected_lang
-                )
+        # Step 1: Exact match (direct, normalized or converted English)
+        exact = index.exact(user_input, input_normalized, input_english)
+        if exact:
+            position, confidence = exact
+            return MatchResult(
+                matched=True,
+                value=index.names[position],
+                id=index.entity_id(position),
+                confidence=confidence,
+                language_detected=detected_lang
+            )
         
         # Step 2: Fuzzy match
-        scored_matches = []
-        for entity in entities:
-            name = entity.get(name_key, "")
-            if not name:
-                continue
-                
-            name_lower = name.lower()
-            name_normalized = clean_for_matching(name)
-            
-            # Score against original and normalized
-            score1 = fuzz.ratio(input_normalized, name_normalized) / 100
-            score2 = fuzz.partial_ratio(input_normalized, name_normalized) / 100
-            
-            # Also score against LLM-converted English
-            if input_english:
-                score3 = fuzz.ratio(input_english.lower(), name_lower) / 100
-                score = max(score1, score2, score3)
-            else:
-                score = max(score1, score2)
-            
-            scored_matches.append((entity, name, score))
-        
-        scored_matches.sort(key=lambda x: x[2], reverse=True)
-        
-        if scored_matches:
-            top_entity, top_name, top_score = scored_matches[0]
-            
-            if top_score >= self.EXACT_THRESHOLD:
-                return MatchResult(
-                    matched=True,
-                    value=top_name,
-                    id=top_entity.get(id_key) if id_key else None,
-                    confidence=top_score,
-                    language_detected=detected_lang
-                )
-            elif top_score >= self.SUGGEST_THRESHOLD:
-                return MatchResult(
-                    matched=False,
-                    value=top_name,
-                    confidence=top_score,
-                    language_detected=detected_lang,
-                    alternatives=[m[1] for m in scored_matches[:5]]
-                )
+        if len(index):
+            scores = index.scores(input_normalized, input_english)
+            ranked = index.ranked(scores)
+            top = int(ranked[0])
+            top_score = float(scores[top])
+        else:
+            top_score = 0.0
+        
+        if top_score >= self.EXACT_THRESHOLD:
+            return MatchResult(
+                matched=True,
+                value=index.names[top],
+                id=index.entity_id(top),
+                confidence=top_score,
+                language_detected=detected_lang
+            )
+        elif top_score >= self.SUGGEST_THRESHOLD:
+            return MatchResult(
+                matched=False,
+                value=index.names[top],
+                confidence=top_score,
+                language_detected=detected_lang,
+                alternatives=[index.names[int(i)] for i in ranked[:5]]
+            )
         
         # No match - return all options
         return MatchResult(
             matched=False,
             language_detected=detected_lang,
-            alternatives=[e.get(name_key) for e in entities[:10] if e.get(name_key)]
+            alternatives=index.default_alternatives
         )
 
 
@@ -1,52 +1,130 @@
 """
 Semantic Matcher Service using Embeddings.
 Provides entity matching (areas, projects, unit types) using cosine similarity.
+Entity embeddings are kept as L2-normalized matrices, one per entity type (and
+one per area for projects), rebuilt only when the catalog snapshot changes; a
+lookup embeds the query and takes one matrix-vector product.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from functools import lru_cache
+import threading
+
+import numpy as np
 
 from app.core.embeddings import get_embedding_service
-from app.services.backend_api import get_backend_api_service
+from app.services.catalog import get_catalog_service
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Unit types (hardcoded for now): English name first, then Arabic
+UNIT_TYPES = [
+    "Apartment شقة",
+    "Villa فيلا",
+    "Duplex دوبلكس",
+    "Studio استوديو",
+    "Penthouse بنتهاوس",
+    "Townhouse تاون هاوس"
+]
+
+
+def _normalize_rows(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class EntityMatrix:
+    """Embeddings of one entity list: row i is ``items[i]``."""
+    
+    def __init__(self, items: Sequence, matrix: np.ndarray):
+        self.items = list(items)
+        self.matrix = matrix
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def top_k(self, query_vector: np.ndarray, k: int = 5) -> List[Tuple[object, float]]:
+        """(item, cosine similarity) of the k closest rows, best first."""
+        if not self.items:
+            return []
+        scores = self.matrix @ query_vector
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.items[i], float(scores[i])) for i in best]
+
 
 class SemanticMatcher:
     """Match user queries to DB entities using semantic embeddings."""
     
-    def __init__(self):
+    def __init__(self, top_k: int = 5):
         self.embedding_service = get_embedding_service()
-        self.backend_api = get_backend_api_service()
-        self._area_cache = None
-        self._project_cache = None
-        self._unit_type_cache = None
+        self.catalog = get_catalog_service()
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._catalog_version = None
+        self._areas: Optional[EntityMatrix] = None
+        self._projects: Optional[EntityMatrix] = None
+        self._projects_by_area: Dict[str, EntityMatrix] = {}
+        self._unit_types: Optional[EntityMatrix] = None
+        # Entity text -> normalized vector, so a rebuild only embeds new texts
+        self._vectors: Dict[str, np.ndarray] = {}
+    
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Normalized embeddings of ``texts``, reusing vectors of earlier builds (call under ``_lock``)."""
+        missing = [t for t in dict.fromkeys(texts) if t not in self._vectors]
+        if missing:
+            for text, vector in zip(missing, _normalize_rows(self.embedding_service.embed_texts(missing))):
+                self._vectors[text] = vector
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([self._vectors[t] for t in texts])
+    
+    def _matrices(self):
+        """Entity matrices for the current catalog snapshot (rebuilt when its version changes)."""
+        snapshot = self.catalog.get()
+        with self._lock:
+            if self._catalog_version == snapshot.version and self._areas is not None:
+                return self._areas, self._projects, self._projects_by_area
     
-    def _get_areas(self) -> List[Dict]:
-        """Get cached areas from backend."""
-        if self._area_cache is None:
-            self._area_cache = self.backend_api.get_areas()
-        return self._area_cache
+            # Bilingual area texts
+            areas = list(snapshot.areas)
+            area_matrix = EntityMatrix(areas, self._embed([f"{a.name} {a.name_ar or a.name}" for a in areas]))
+            projects = list(snapshot.projects)
+            project_matrix = EntityMatrix(projects, self._embed([p.name for p in projects]))
+            
+            # Per-area project submatrices
+            rows: Dict[str, List[int]] = {}
+            for i, project in enumerate(projects):
+                rows.setdefault(project.area_id, []).append(i)
+            by_area = {
+                area_id: EntityMatrix([projects[i] for i in indices], project_matrix.matrix[indices])
+                for area_id, indices in rows.items()
+            }
+            
+            live = {f"{a.name} {a.name_ar or a.name}" for a in areas} | {p.name for p in projects} | set(UNIT_TYPES)
+            self._vectors = {t: v for t, v in self._vectors.items() if t in live}
+            self._areas, self._projects, self._projects_by_area = area_matrix, project_matrix, by_area
+            self._catalog_version = snapshot.version
+            logger.info(f"Semantic matcher matrices built for catalog v{snapshot.version}: "
+                        f"{len(areas)} areas, {len(projects)} projects, {len(by_area)} area submatrices")
+            return area_matrix, project_matrix, by_area
     
-    def _get_projects(self) -> List[Dict]:
-        """Get cached projects from backend."""
-        if self._project_cache is None:
-            self._project_cache = self.backend_api.get_projects()
-        return self._project_cache
+    def _unit_type_matrix(self) -> EntityMatrix:
+        unit_types = self._unit_types
+        if unit_types is None:
+            with self._lock:
+                if self._unit_types is None:
+                    self._unit_types = EntityMatrix(UNIT_TYPES, self._embed(UNIT_TYPES))
+                unit_types = self._unit_types
+        return unit_types
     
-    def _get_unit_types(self) -> List[str]:
-        """Get unit types (hardcoded for now)."""
-        if self._unit_type_cache is None:
-            self._unit_type_cache = [
-                "Apartment شقة",
-                "Villa فيلا",
-                "Duplex دوبلكس",
-                "Studio استوديو",
-                "Penthouse بنتهاوس",
-                "Townhouse تاون هاوس"
-            ]
-        return self._unit_type_cache
+    def _query_vector(self, query: str) -> np.ndarray:
+        return _normalize_rows(self.embedding_service.embed_text(query))[0]
     
     def match_area(self, query: str, threshold: float = 0.5) -> Dict:
         """Find most relevant area using embedding similarity.
@@ -59,27 +137,22 @@ class SemanticMatcher:
             Dict with matched=True/False, value, id, score
         """
         try:
-            areas = self._get_areas()
-            if not areas:
+            areas, _, _ = self._matrices()
+            if not len(areas):
                 return {"matched": False}
             
-            # Build bilingual area texts
-            area_texts = [f"{a['name']} {a.get('name_ar', a['name'])}" for a in areas]
+            ranked = areas.top_k(self._query_vector(query), self.top_k)
+            best, best_score = ranked[0]
             
-            # Compute similarity
-            scores = self.embedding_service.compute_similarity(query, area_texts)
-            best_idx = scores.index(max(scores))
-            best_score = scores[best_idx]
-            
-            logger.info(f"Area matching: '{query}' → '{areas[best_idx]['name']}' (score: {best_score:.3f})")
+            logger.info(f"Area matching: '{query}' → '{best.name}' (score: {best_score:.3f})")
             
             if best_score >= threshold:
                 return {
                     "matched": True,
-                    "value": areas[best_idx]['name'],
-                    "id": areas[best_idx].get('area_id') or areas[best_idx].get('areaId'),  # Handle both formats
+                    "value": best.name,
+                    "id": best.id,
                     "score": best_score,
-                    "alternatives": []
+                    "alternatives": [a.name for a, score in ranked[1:] if score >= threshold]
                 }
             
             return {"matched": False, "score": best_score}
@@ -100,32 +173,27 @@ class SemanticMatcher:
             Dict with matched=True/False, value, id, score
         """
         try:
-            projects = self._get_projects()
+            _, projects, projects_by_area = self._matrices()
             
             # Filter by area if provided
             if area_id:
-                projects = [p for p in projects if p.get('area', {}).get('area_id') == area_id]
+                projects = projects_by_area.get(str(area_id))
             
             if not projects:
                 return {"matched": False}
             
-            # Build project texts
-            project_texts = [f"{p['name']}" for p in projects]
-            
-            # Compute similarity
-            scores = self.embedding_service.compute_similarity(query, project_texts)
-            best_idx = scores.index(max(scores))
-            best_score = scores[best_idx]
+            ranked = projects.top_k(self._query_vector(query), self.top_k)
+            best, best_score = ranked[0]
             
-            logger.info(f"Project matching: '{query}' → '{projects[best_idx]['name']}' (score: {best_score:.3f})")
+            logger.info(f"Project matching: '{query}' → '{best.name}' (score: {best_score:.3f})")
             
             if best_score >= threshold:
                 return {
                     "matched": True,
-                    "value": projects[best_idx]['name'],
-                    "id": projects[best_idx].get('project_id') or projects[best_idx].get('projectId'),  # Handle both formats
+                    "value": best.name,
+                    "id": best.id,
                     "score": best_score,
-                    "alternatives": []
+                    "alternatives": [p.name for p, score in ranked[1:] if score >= threshold]
                 }
             
             return {"matched": False, "score": best_score}
@@ -145,15 +213,10 @@ class SemanticMatcher:
             Dict with matched=True/False, value (English), score
         """
         try:
-            unit_types = self._get_unit_types()
-            
-            # Compute similarity
-            scores = self.embedding_service.compute_similarity(query, unit_types)
-            best_idx = scores.index(max(scores))
-            best_score = scores[best_idx]
+            best, best_score = self._unit_type_matrix().top_k(self._query_vector(query), 1)[0]
             
             # Extract English name (first word)
-            english_name = unit_types[best_idx].split()[0]
+            english_name = best.split()[0]
             
             logger.info(f"Unit type matching: '{query}' → '{english_name}' (score: {best_score:.3f})")
             
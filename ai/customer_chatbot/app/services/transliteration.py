@@ -0,0 +1,207 @@
+"""
+Transliteration of Franco names (English names written in Arabic script).
+
+Lookups go, in order, to:
+1. the catalog: every catalog name is pre-transliterated to a phonetic key
+   when its index is built, so a name the catalog explains is resolved locally;
+2. the memo table (transliteration_memo), which keeps every LLM answer;
+3. the LLM (Cohere), only for names nothing above explains; without it the
+   rule-based transliteration is used.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import threading
+import time
+
+from rapidfuzz import fuzz, process
+
+from app.config import get_settings
+from app.core.logging_config import get_logger
+from app.utils.arabic_utils import clean_for_matching
+from app.utils.franco_converter import llm_transliterate
+from app.utils.transliteration import phonetic_key, transliterate, transliteration_candidates
+
+logger = get_logger(__name__)
+
+
+class PhoneticIndex:
+    """Phonetic keys of catalog names, computed once per catalog load."""
+
+    def __init__(self, names: List[str], cutoff: float = None, min_key_length: int = 2):
+        """
+        Args:
+            names: Catalog names (English), in DB order.
+            cutoff: Minimum rapidfuzz ratio (0-100) between keys for a fuzzy match.
+            min_key_length: Shorter keys are too ambiguous to match on.
+        """
+        self.names = list(names)
+        self.cutoff = cutoff if cutoff is not None else get_settings().transliteration_key_cutoff
+        self.min_key_length = min_key_length
+        self.keys = [phonetic_key(name) for name in self.names]
+        self._by_key: Dict[str, List[int]] = {}
+        for i, key in enumerate(self.keys):
+            self._by_key.setdefault(key, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def match(self, text: str) -> Optional[str]:
+        """Catalog name whose key matches the Arabic-script text, or None.
+
+        Names with the same key as the text come first; otherwise the keys
+        within ``cutoff``. Among several, the one closest to a candidate
+        spelling wins (ties keep DB order).
+        """
+        key = phonetic_key(text)
+        if len(key) < self.min_key_length or not self.names:
+            return None
+        positions = self._by_key.get(key)
+        if not positions and len(key) >= 4:
+            matches = process.extract(key, self.keys, scorer=fuzz.ratio, score_cutoff=self.cutoff, limit=None)
+            best = max((score for _, score, _ in matches), default=None)
+            positions = sorted(i for _, score, i in matches if score == best)
+        if not positions:
+            return None
+        if len(positions) == 1:
+            return self.names[positions[0]]
+
+        candidates = [c.replace(' ', '') for c in transliteration_candidates(text)]
+        closeness = {
+            i: max(fuzz.ratio(c, self.names[i].lower().replace(' ', '')) for c in candidates)
+            for i in positions
+        }
+        return self.names[max(positions, key=lambda i: (closeness[i], -i))]
+
+
+class TransliterationService:
+    """Franco name -> English spelling: catalog, memo table, then LLM."""
+
+    def __init__(self, store=None, memo_size: int = None, store_retry_s: float = None):
+        """
+        Args:
+            store: Persistence for the memo table (defaults to the vector store).
+            memo_size: Transliterations kept in memory (least recently used dropped).
+            store_retry_s: How long the memo table is skipped after an error.
+        """
+        settings = get_settings()
+        self._store = store
+        self.memo_size = memo_size or settings.transliteration_memo_size
+        self.store_retry_s = (
+            store_retry_s if store_retry_s is not None else settings.transliteration_store_retry_s
+        )
+        self._store_retry_at = 0.0
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"catalog": 0, "memo": 0, "llm": 0, "rules": 0}
+
+    @property
+    def store(self):
+        if self._store is None:
+            from app.core.vector_store import get_vector_store
+            self._store = get_vector_store()
+        return self._store
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict:
+        """Lookups answered by each source, and memo entries held in memory."""
+        with self._lock:
+            return {**self._stats, "memo_entries": len(self._memo)}
+
+    def to_english(self, text: str, catalog: Optional[PhoneticIndex] = None) -> str:
+        """English spelling of a name written in Arabic script.
+
+        Args:
+            text: Arabic-script name.
+            catalog: Phonetic index of the names being matched against.
+
+        Returns:
+            Lowercase English spelling ("" for empty text).
+        """
+        if not text:
+            return ""
+
+        if catalog is not None:
+            name = catalog.match(text)
+            if name:
+                self._count("catalog")
+                return name.lower()
+
+        key = clean_for_matching(text)
+        cached = self._recall(key)
+        if cached:
+            self._count("memo")
+            return cached
+
+        english = llm_transliterate(text)
+        if english:
+            self._count("llm")
+            self._remember(key, english)
+            return english
+
+        self._count("rules")
+        return transliterate(text)
+
+    def _recall(self, key: str) -> Optional[str]:
+        """Memoized transliteration (memory first, then the memo table)."""
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+        if not self._store_available():
+            return None
+        try:
+            cached = self.store.get_transliteration(key)
+        except Exception as e:
+            self._suspend_store(e)
+            return None
+        if cached:
+            self._memoize(key, cached)
+        return cached
+
+    def _remember(self, key: str, english: str):
+        self._memoize(key, english)
+        if not self._store_available():
+            return
+        try:
+            self.store.save_transliteration(key, english, source="llm")
+        except Exception as e:
+            self._suspend_store(e)
+
+    def _memoize(self, key: str, english: str):
+        with self._lock:
+            self._memo[key] = english
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def _store_available(self) -> bool:
+        return time.monotonic() >= self._store_retry_at
+
+    def _suspend_store(self, error: Exception):
+        # Keep memoizing in memory; the table is tried again after the cooldown
+        self._store_retry_at = time.monotonic() + self.store_retry_s
+        logger.warning(
+            f"Transliteration memo table unavailable, memoizing in memory only "
+            f"for {self.store_retry_s:.0f}s: {error}"
+        )
+
+
+# Singleton instance
+_transliteration_service: Optional[TransliterationService] = None
+
+
+def get_transliteration_service() -> TransliterationService:
+    """Get or create the transliteration service singleton.
+
+    Returns:
+        TransliterationService instance.
+    """
+    global _transliteration_service
+    if _transliteration_service is None:
+        _transliteration_service = TransliterationService()
+    return _transliteration_service
@@ -1,9 +1,12 @@
 """
 Arabic text normalization utilities.
-Uses camel-tools for comprehensive Arabic NLP support.
+normalize_arabic folds text with one precompiled str.translate table and is
+memoized; the camel-tools pipeline is kept as normalize_arabic_reference.
 """
+from functools import lru_cache
 import re
-from typing import Literal
+import unicodedata
+from typing import Literal, Tuple
 
 try:
     from camel_tools.utils.normalize import (
@@ -18,9 +21,10 @@ except ImportError:
     CAMEL_TOOLS_AVAILABLE = False
 
 
-def normalize_arabic(text: str) -> str:
+def normalize_arabic_reference(text: str) -> str:
     """
-    Full Arabic text normalization pipeline.
+    Full Arabic text normalization pipeline (camel-tools, one pass per step).
+    Reference implementation for normalize_arabic.
     Apply BEFORE fuzzy matching, DB queries, and embeddings.
     
     Steps:
@@ -48,7 +52,6 @@ def normalize_arabic(text: str) -> str:
         text = normalize_teh_marbuta_ar(text)
     else:
         # Fallback normalization without camel-tools
-        import unicodedata
         text = unicodedata.normalize('NFKC', text)
         
         # Remove common diacritics (basic fallback)
@@ -76,6 +79,51 @@ def normalize_arabic(text: str) -> str:
     return text
 
 
+# Diacritics (tashkeel, superscript alef, Quranic marks) and tatweel removed;
+# alef variants, alef maksura and teh marbuta folded
+ARABIC_DIACRITICS = 'ًٌٍَُِّْٰۖۗۘۙۚۛۜ'
+TATWEEL = 'ـ'
+_ARABIC_FOLD = str.maketrans({
+    **{c: None for c in ARABIC_DIACRITICS + TATWEEL},
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي',
+    'ة': 'ه',
+})
+
+_ARABIC_CHARS = frozenset(chr(c) for c in range(0x0600, 0x0700))
+_ENGLISH_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+# Distinct strings memoized (catalog names and recent user inputs)
+MEMO_SIZE = 65_536
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def normalize_arabic(text: str) -> str:
+    """
+    Full Arabic text normalization pipeline.
+    Apply BEFORE fuzzy matching, DB queries, and embeddings.
+    
+    Steps:
+    1. Unicode normalization (NFKC; skipped for ASCII)
+    2. One translate pass: remove diacritics/tashkeel and elongation (ـ),
+       normalize Alef variants (أ إ آ ٱ → ا), Alef Maksura (ى → ي)
+       and Teh Marbuta (ة → ه)
+    3. Strip extra whitespace
+    """
+    if not text:
+        return ""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text).translate(_ARABIC_FOLD)
+    return ' '.join(text.split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _scripts(text: str) -> Tuple[bool, bool]:
+    """(has Arabic letters, has English letters) from one pass over the text."""
+    chars = frozenset(text)
+    return not chars.isdisjoint(_ARABIC_CHARS), not chars.isdisjoint(_ENGLISH_CHARS)
+
+
 def detect_language(text: str) -> Literal["arabic", "english", "mixed"]:
     """
     Detect if text is Arabic, English, or mixed.
@@ -85,12 +133,11 @@ def detect_language(text: str) -> Literal["arabic", "english", "mixed"]:
     if not text:
         return "english"
     
-    arabic_chars = sum(1 for c in text if '\u0600' <= c <= '\u06FF')
-    english_chars = sum(1 for c in text if c.isascii() and c.isalpha())
+    arabic, english = _scripts(text)
     
-    if arabic_chars > 0 and english_chars == 0:
+    if arabic and not english:
         return "arabic"
-    elif english_chars > 0 and arabic_chars == 0:
+    elif english and not arabic:
         return "english"
     return "mixed"
 
@@ -119,6 +166,7 @@ def is_arabic_phonetic(text: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=MEMO_SIZE)
 def clean_for_matching(text: str) -> str:
     """
     Clean and normalize text for fuzzy matching.
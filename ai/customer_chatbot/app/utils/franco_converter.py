@@ -6,6 +6,7 @@ import os
 from typing import Optional
 
 from app.core.logging_config import get_logger
+from app.utils.transliteration import transliterate
 
 logger = get_logger(__name__)
 
@@ -43,16 +44,25 @@ def convert_franco_to_english(arabic_text: str) -> str:
     - Output: "hawaby"
     
     Uses a lightweight model for cost/speed optimization.
-    Falls back to basic transliteration if Cohere is unavailable.
+    Falls back to rule-based transliteration if Cohere is unavailable.
+    Name matching goes through app/services/transliteration.py, which only
+    calls the LLM for names the catalog and the memo table do not explain.
     """
     if not arabic_text:
         return ""
+    return llm_transliterate(arabic_text) or transliterate(arabic_text)
+
+
+def llm_transliterate(arabic_text: str) -> Optional[str]:
+    """
+    English spelling of an Arabic phonetic name from Cohere.
     
+    Returns None when Cohere is not configured or the call fails.
+    """
     client = get_cohere_client()
     
-    if client is None:
-        # Fallback: basic transliteration
-        return _basic_transliterate(arabic_text)
+    if client is None or not arabic_text:
+        return None
     
     try:
         prompt = f"""Convert this Arabic phonetic name to English letters.
@@ -80,42 +90,11 @@ English name:"""
             logger.info(f"Franco conversion (Cohere): '{arabic_text}' → '{english_name}'")
             return english_name
         
-        return _basic_transliterate(arabic_text)
+        return None
         
     except Exception as e:
         logger.error(f"Franco conversion failed: {e}")
-        return _basic_transliterate(arabic_text)
-
-
-def _basic_transliterate(arabic_text: str) -> str:
-    """
-    Basic Arabic to Latin character mapping fallback.
-    Used when Cohere API is unavailable.
-    """
-    # Basic phonetic mapping for common characters
-    mapping = {
-        'ا': 'a', 'أ': 'a', 'إ': 'e', 'آ': 'a',
-        'ب': 'b', 'ت': 't', 'ث': 'th',
-        'ج': 'g', 'ح': 'h', 'خ': 'kh',
-        'د': 'd', 'ذ': 'z', 'ر': 'r', 'ز': 'z',
-        'س': 's', 'ش': 'sh', 'ص': 's', 'ض': 'd',
-        'ط': 't', 'ظ': 'z', 'ع': 'a', 'غ': 'gh',
-        'ف': 'f', 'ق': 'q', 'ك': 'k', 'ل': 'l',
-        'م': 'm', 'ن': 'n', 'ه': 'h', 'ة': 'a',
-        'و': 'w', 'ي': 'y', 'ى': 'a',
-        'ء': '', 'ئ': 'y', 'ؤ': 'w',
-    }
-    
-    result = []
-    for char in arabic_text:
-        if char in mapping:
-            result.append(mapping[char])
-        elif char.isascii():
-            result.append(char.lower())
-        elif char.isspace():
-            result.append(' ')
-    
-    return ''.join(result).strip()
+        return None
 
 
 def is_cohere_available() -> bool:
@@ -0,0 +1,167 @@
+"""
+Rule-based Arabic to Latin transliteration.
+Used for names written phonetically in Arabic script (Franco names, e.g.
+"هاواباي" for "Hawabay"). Egyptian conventions: ج is "g", ة and final ى are "a".
+
+- transliterate(): the most likely Latin spelling.
+- transliteration_candidates(): likely alternative spellings, best first.
+- phonetic_key(): consonant skeleton of a name in either script, so an English
+  catalog name and its Arabic-script spelling get the same key.
+"""
+import re
+from typing import List, Tuple
+
+from app.utils.arabic_utils import normalize_arabic
+
+# Spellings per letter, most likely first
+LETTER_SPELLINGS = {
+    'ا': ('a',), 'أ': ('a', 'e', 'o'), 'إ': ('e', 'i'), 'آ': ('a',), 'ٱ': ('a',),
+    'ب': ('b', 'p'), 'پ': ('p',), 'ت': ('t',), 'ث': ('th', 's'),
+    'ج': ('g', 'j'), 'ح': ('h',), 'خ': ('kh',), 'د': ('d',), 'ذ': ('z', 'th'),
+    'ر': ('r',), 'ز': ('z',), 'س': ('s',), 'ش': ('sh',), 'ص': ('s',), 'ض': ('d',),
+    'ط': ('t',), 'ظ': ('z',), 'ع': ('a', 'e', ''), 'غ': ('gh',), 'ف': ('f', 'v'), 'ڤ': ('v',),
+    'ق': ('k', 'q'), 'ك': ('k', 'c'), 'گ': ('g',), 'ل': ('l',), 'م': ('m',), 'ن': ('n',),
+    'ه': ('h',), 'ة': ('a',), 'ى': ('a', 'y'), 'ء': ('',), 'ئ': ('e', 'i'), 'ؤ': ('o',),
+}
+
+# و and ي are consonants at the start of a word or after a long vowel, vowels otherwise
+CONSONANT_SPELLINGS = {'و': ('w', 'o'), 'ي': ('y', 'i')}
+VOWEL_SPELLINGS = {'و': ('o', 'u', 'oo', 'w'), 'ي': ('i', 'ee', 'y', 'e')}
+
+# Key classes shared by both scripts: vowels (and the Arabic letters spelling
+# them) are dropped and letters that sound alike share a class. s and z are
+# merged ("Hills" is written هيلز).
+_ARABIC_KEY = str.maketrans({
+    **{c: None for c in 'اأإآٱىءئؤعة'},
+    'ب': 'b', 'پ': 'b', 'ت': 't', 'ط': 't', 'ث': 't', 'د': 'd', 'ض': 'd',
+    'ذ': 's', 'ز': 's', 'ظ': 's', 'س': 's', 'ص': 's', 'ش': 'S', 'ج': 'g', 'گ': 'g',
+    'ح': 'h', 'ه': 'h', 'خ': 'x', 'غ': 'G', 'ف': 'f', 'ڤ': 'f', 'ق': 'k', 'ك': 'k',
+    'ل': 'l', 'م': 'm', 'ن': 'n', 'ر': 'r', 'و': 'w', 'ي': 'y',
+})
+# Medial/final و and ي, and final ه, spell vowels
+_ARABIC_VOWEL_LETTERS = re.compile(r'\B[وي]|\Bه\b')
+
+# Digraphs become uppercase placeholders first, so later steps leave them alone
+_LATIN_DIGRAPHS = re.compile(r'sh|ch|kh|gh|th|ph|ck')
+_LATIN_DIGRAPH_KEY = {'sh': 'S', 'ch': 'S', 'kh': 'X', 'gh': 'G', 'th': 'T', 'ph': 'F', 'ck': 'K'}
+_LATIN_SOFT_C = re.compile(r'c(?=[eiy])')
+# Medial/final w and y spell vowels; a final h is silent
+_LATIN_VOWEL_LETTERS = re.compile(r'\B[wy]|\Bh\b')
+_LATIN_KEY = str.maketrans({
+    **{c: None for c in 'aeiou'},
+    'p': 'b', 'z': 's', 'j': 'g', 'q': 'k', 'c': 'k', 'v': 'f', 'x': 'ks',
+    'X': 'x', 'T': 't', 'F': 'f', 'K': 'k', 'C': 's',
+})
+_NON_KEY_CHARS = re.compile(r'[^a-zA-Z0-9\s]')
+_DOUBLED = re.compile(r'(.)\1+')
+
+_ARTICLE = 'ال'
+_ARTICLE_SPELLINGS = ('el ', 'al ', '')
+
+
+def _is_arabic_letter(char: str) -> bool:
+    return '؀' <= char <= 'ۿ'
+
+
+def _word_options(word: str) -> List[Tuple[str, ...]]:
+    """Spelling options for each letter of an Arabic word."""
+    options: List[Tuple[str, ...]] = []
+    start = 0
+    if word.startswith(_ARTICLE) and len(word) > 3:
+        options.append(_ARTICLE_SPELLINGS)
+        start = 2
+    previous = None
+    for i in range(start, len(word)):
+        char = word[i]
+        if char in CONSONANT_SPELLINGS:
+            after_vowel = previous is None or previous in 'اآى' or (i == start)
+            options.append(CONSONANT_SPELLINGS[char] if after_vowel else VOWEL_SPELLINGS[char])
+        elif char == 'ه' and i == len(word) - 1 and i > start:
+            # Final heh usually spells a vowel ("مدينه")
+            options.append(('a', 'h'))
+        elif char in LETTER_SPELLINGS:
+            options.append(LETTER_SPELLINGS[char])
+        elif char.isascii() and char.isalnum():
+            options.append((char.lower(),))
+        previous = char
+    return options
+
+
+def transliteration_candidates(text: str, limit: int = 8, beam: int = 32) -> List[str]:
+    """Likely Latin spellings of Arabic-script text, best first.
+
+    Each letter's spellings are ranked (most likely first); a spelling's cost
+    is the sum of its letters' ranks, and a beam keeps the cheapest prefixes.
+
+    Args:
+        text: Arabic-script text (Latin characters pass through lowercased).
+        limit: Candidates returned at most.
+        beam: Prefixes kept per letter.
+
+    Returns:
+        Distinct candidate spellings.
+    """
+    words = normalize_arabic(text or "").split()
+    if not words:
+        return []
+
+    options: List[Tuple[str, ...]] = []
+    for n, word in enumerate(words):
+        if n:
+            options.append((' ',))
+        options.extend(_word_options(word))
+
+    states = [(0, "")]
+    for choices in options:
+        expanded = {}
+        for cost, prefix in states:
+            for rank, spelling in enumerate(choices):
+                candidate = prefix + spelling
+                if candidate not in expanded or expanded[candidate] > cost + rank:
+                    expanded[candidate] = cost + rank
+        states = sorted((cost, prefix) for prefix, cost in expanded.items())[:beam]
+
+    candidates = []
+    for _, spelling in states:
+        spelling = re.sub(r'\s+', ' ', spelling).strip()
+        if spelling and spelling not in candidates:
+            candidates.append(spelling)
+            if len(candidates) >= limit:
+                break
+    return candidates
+
+
+def transliterate(text: str) -> str:
+    """Most likely Latin spelling of Arabic-script text."""
+    candidates = transliteration_candidates(text, limit=1)
+    return candidates[0] if candidates else ""
+
+
+def _arabic_key(text: str) -> str:
+    return _ARABIC_VOWEL_LETTERS.sub('', text).translate(_ARABIC_KEY)
+
+
+def _latin_key(text: str) -> str:
+    text = _LATIN_DIGRAPHS.sub(lambda m: _LATIN_DIGRAPH_KEY[m.group()], text)
+    text = _LATIN_SOFT_C.sub('C', text)
+    text = _LATIN_VOWEL_LETTERS.sub('', text)
+    return _NON_KEY_CHARS.sub('', text).translate(_LATIN_KEY)
+
+
+def phonetic_key(text: str) -> str:
+    """Consonant skeleton of a name, comparable across scripts.
+
+    Vowels (and the letters that spell them in Arabic) are dropped, letters
+    that sound alike share a class (p/b, v/f, c/k/q, j/g, s/z, ث/ت, ص/س...),
+    doubled consonants collapse and words are joined, so "Hyde Park" and
+    "هايدبارك" both give "hdbrk".
+    """
+    text = normalize_arabic(text or "").lower()
+    if not any(_is_arabic_letter(c) for c in text):
+        key = _latin_key(text)
+    else:
+        key = ''.join(
+            _arabic_key(word) if any(_is_arabic_letter(c) for c in word) else _latin_key(word)
+            for word in text.split()
+        )
+    return _DOUBLED.sub(r'\1', ''.join(key.split()))
@@ -0,0 +1,16 @@
+-- Migration: Track what each FastSemanticMatcher embedding row was computed from
+-- Purpose: Skip unchanged entities on re-population and make the startup check a single lookup
+-- Source hash per row (the embedding service keeps its own name_hash for embedding_en/embedding_ar)
+ALTER TABLE areas_embeddings
+ADD COLUMN IF NOT EXISTS embedding_hash VARCHAR(64);
+ALTER TABLE projects_embeddings
+ADD COLUMN IF NOT EXISTS embedding_hash VARCHAR(64);
+ALTER TABLE unit_types_embeddings
+ADD COLUMN IF NOT EXISTS embedding_hash VARCHAR(64);
+-- Digest of the catalog the tables were last populated from
+CREATE TABLE IF NOT EXISTS embedding_catalog_state (
+    key VARCHAR(64) PRIMARY KEY,
+    digest VARCHAR(64) NOT NULL,
+    entities INTEGER,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Arabic normalization, reference pipeline vs translate table.
+
+Normalizes every cell and word of the catalog sample (DB/11-15_sample25.csv)
+plus synthetic Arabic names, repeated --rounds times, with:
+- normalize_arabic_reference: the previous pipeline (camel-tools when
+  installed, otherwise one str.replace pass per character);
+- normalize_arabic, cold: the translate table, bypassing the memo;
+- normalize_arabic, memoized: the same inputs again, answered by the memo.
+Also times detect_language's script classification against the previous two
+counting loops, and checks every output matches the reference.
+
+Usage:
+    python tests/benchmark_arabic_normalize.py [--names 10000] [--rounds 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.arabic_utils import (
+    CAMEL_TOOLS_AVAILABLE,
+    _scripts,
+    detect_language,
+    normalize_arabic,
+    normalize_arabic_reference,
+)
+from test_arabic_normalization import catalog_texts, reference_language
+
+ARABIC = ["جرين", "بالم", "كريستال", "فيوتشر", "ليك", "سكاي", "رويال", "جولدن", "بلو", "ريفر",
+          "مَدِينَة", "الـساحل", "إسكندرية", "آمون", "مرسى", "شَقَّة", "فيلّا", "أكتوبر", "الشيخ", "زايد"]
+
+
+def synthetic_names(n: int, rng: random.Random) -> list:
+    return [" ".join(rng.choice(ARABIC) for _ in range(rng.randint(1, 3))) + f" {i}" for i in range(n)]
+
+
+def timed(fn, inputs, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in inputs:
+            fn(text)
+    return time.perf_counter() - started
+
+
+def main(n_names: int, rounds: int):
+    texts = catalog_texts() + synthetic_names(n_names, random.Random(0))
+    mismatches = sum(normalize_arabic(t) != normalize_arabic_reference(t) for t in texts)
+    mismatches += sum(detect_language(t) != reference_language(t) for t in texts)
+
+    results = [
+        ("normalize (reference)", timed(normalize_arabic_reference, texts, rounds)),
+        ("normalize (translate, cold)", timed(normalize_arabic.__wrapped__, texts, rounds)),
+        ("normalize (translate, memoized)", timed(normalize_arabic, texts, rounds)),
+        ("detect_language (counting loops)", timed(reference_language, texts, rounds)),
+        ("detect_language (one pass, cold)", timed(_scripts.__wrapped__, texts, rounds)),
+        ("detect_language (memoized)", timed(detect_language, texts, rounds)),
+    ]
+
+    print(f"{len(texts)} texts x {rounds} rounds; camel-tools {'installed' if CAMEL_TOOLS_AVAILABLE else 'not installed'}; "
+          f"{mismatches} mismatches\n")
+    print(f"{'operation':>34} | {'total ms':>9} | {'us/text':>8}")
+    print("-" * 58)
+    for label, seconds in results:
+        print(f"{label:>34} | {seconds * 1000:>9.1f} | {seconds * 1e6 / (len(texts) * rounds):>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arabic normalization: reference pipeline vs translate table")
+    parser.add_argument("--names", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    main(args.names, args.rounds)
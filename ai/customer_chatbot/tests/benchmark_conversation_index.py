@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark for conversation_embeddings index management.
+
+Loads 10k / 100k / 1M synthetic messages (clustered random vectors, Zipf
+distributed phone numbers) into a scratch table, builds each index plan
+with VectorIndexManager and measures:
+- build time
+- p50 / p95 latency of unfiltered and per-phone similarity queries
+- recall@k against exact (NumPy) nearest neighbours
+
+Needs a Postgres + pgvector instance (DATABASE_* settings). The scratch
+table is dropped at the end.
+
+Usage:
+    python tests/benchmark_conversation_index.py [--sizes 10000 100000 1000000]
+        [--dim 256] [--methods auto none hnsw ivfflat] [--queries 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+from pgvector.psycopg2 import register_vector
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.core.vector_index_manager import IndexPlan, VectorIndexManager
+
+TABLE = "bench_conversation_embeddings"
+
+
+def connect():
+    settings = get_settings()
+    conn = psycopg2.connect(
+        host=settings.database_host,
+        port=settings.database_port,
+        user=settings.database_user,
+        password=settings.database_password,
+        database=settings.database_name
+    )
+    register_vector(conn)
+    return conn
+
+
+def synthetic_messages(n: int, dim: int, phones: int, seed: int = 0):
+    """Clustered unit vectors and Zipf-distributed phone numbers."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(max(8, n // 500), dim)).astype(np.float32)
+    vectors = centroids[rng.integers(0, len(centroids), n)] + 0.35 * rng.normal(size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    phone_ids = np.minimum(rng.zipf(1.3, n), phones) - 1
+    return vectors, np.array([f"+2010{p:08d}" for p in phone_ids])
+
+
+def load_table(conn, vectors: np.ndarray, phone_numbers: np.ndarray, batch: int = 5000):
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cur.execute(f"""
+            CREATE TABLE {TABLE} (
+                id SERIAL PRIMARY KEY,
+                phone_number VARCHAR(50) NOT NULL,
+                message_type VARCHAR(20) NOT NULL,
+                message_text TEXT NOT NULL,
+                embedding vector({vectors.shape[1]}),
+                created_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        for start in range(0, len(vectors), batch):
+            rows = [
+                (phone_numbers[i], "user", str(i), vectors[i])
+                for i in range(start, min(start + batch, len(vectors)))
+            ]
+            execute_values(
+                cur,
+                f"INSERT INTO {TABLE} (phone_number, message_type, message_text, embedding) VALUES %s",
+                rows
+            )
+        cur.execute(f"CREATE INDEX ON {TABLE} (phone_number, created_at DESC)")
+        conn.commit()
+        cur.execute(f"ANALYZE {TABLE}")
+        conn.commit()
+
+
+def exact_top_k(vectors: np.ndarray, mask: Optional[np.ndarray], query: np.ndarray, k: int) -> set:
+    scores = vectors @ query
+    if mask is not None:
+        scores = np.where(mask, scores, -np.inf)
+    top = np.argpartition(-scores, k)[:k]
+    return {int(i) for i in top if np.isfinite(scores[i])}
+
+
+def run_queries(conn, manager: VectorIndexManager, vectors, phone_numbers, phone: Optional[str], queries, k: int):
+    latencies, recalls = [], []
+    mask = phone_numbers == phone if phone is not None else None
+    for query in queries:
+        sql, params = manager.build_search(query, phone, k, columns="message_text")
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            for statement in manager.query_settings(k, phone):
+                cur.execute(statement)
+            cur.execute(sql, params)
+            found = {int(row[0]) for row in cur.fetchall()}
+        conn.commit()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        expected = exact_top_k(vectors, mask, query, k)
+        if expected:
+            recalls.append(len(found & expected) / len(expected))
+    return {
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "recall": float(np.mean(recalls)) if recalls else float("nan"),
+    }
+
+
+def plan_for_method(manager: VectorIndexManager, method: str, rows: int) -> IndexPlan:
+    if method == "auto":
+        return manager.plan_for(rows)
+    if method == "hnsw":
+        return IndexPlan("hnsw", m=manager.hnsw_m, ef_construction=manager.hnsw_ef_construction)
+    if method == "ivfflat":
+        return IndexPlan("ivfflat", lists=max(1, rows // 1000 if rows <= 1_000_000 else int(rows ** 0.5)))
+    return IndexPlan("none")
+
+
+def main(sizes: List[int], dim: int, methods: List[str], n_queries: int, k: int, phones: int):
+    conn = connect()
+    rng = np.random.default_rng(42)
+    print(f"{'rows':>9} | {'plan':>18} | {'build s':>8} | {'all p50/p95 ms':>15} | {'all recall':>10} | "
+          f"{'hot p50/p95 ms':>15} | {'hot recall':>10} | {'cold p50/p95 ms':>15} | {'cold recall':>11}")
+    print("-" * 140)
+    try:
+        for size in sizes:
+            vectors, phone_numbers = synthetic_messages(size, dim, phones)
+            load_table(conn, vectors, phone_numbers)
+            values, counts = np.unique(phone_numbers, return_counts=True)
+            hot, cold = values[np.argmax(counts)], values[np.argmin(counts)]
+            queries = [vectors[i] + 0.1 * rng.normal(size=dim).astype(np.float32) for i in rng.integers(0, size, n_queries)]
+
+            for method in methods:
+                manager = VectorIndexManager(connect, table=TABLE)
+                plan = plan_for_method(manager, method, size)
+                started = time.perf_counter()
+                manager.maintain(plan=plan, concurrently=False)
+                build_s = time.perf_counter() - started
+
+                results: Dict[str, dict] = {
+                    "all": run_queries(conn, manager, vectors, phone_numbers, None, queries, k),
+                    "hot": run_queries(conn, manager, vectors, phone_numbers, hot, queries, k),
+                    "cold": run_queries(conn, manager, vectors, phone_numbers, cold, queries, k),
+                }
+                label = f"{method}:{plan.method}" + (f"({plan.lists})" if plan.lists else "")
+                cells = " | ".join(
+                    f"{r['p50']:>6.2f}/{r['p95']:<8.2f} | {r['recall']:>10.3f}" for r in results.values()
+                )
+                print(f"{size:>9} | {label:>18} | {build_s:>8.1f} | {cells}")
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="conversation_embeddings ANN index benchmark")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256, help="Vector size (1024 in production)")
+    parser.add_argument("--methods", nargs="+", default=["auto", "none", "hnsw", "ivfflat"],
+                        choices=["auto", "none", "hnsw", "ivfflat"])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--phones", type=int, default=5000)
+    args = parser.parse_args()
+
+    main(args.sizes, args.dim, args.methods, args.queries, args.top_k, args.phones)
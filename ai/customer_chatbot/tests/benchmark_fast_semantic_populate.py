@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FastSemanticMatcher table population, row by row vs bulk.
+
+Populates the areas/projects/unit types embedding tables for a synthetic
+catalog over the in-memory connection of test_fast_semantic_populate.py.
+Round trips are simulated: every embedding service request costs
+--http-ms (plus --text-ms per text, 0 by default: model time is the same
+in both paths) and every SQL statement --db-ms. Vectors are serialized
+with pgvector's text format, as on the wire.
+
+"Row by row" is the previous code: one embed_text request and one
+INSERT ... ON CONFLICT per entity, after three COUNT(*) checks. "Bulk" is
+FastSemanticMatcher.populate: chunked embed_texts requests, execute_values
+upserts, rows with an unchanged source hash skipped.
+
+Usage:
+    python tests/benchmark_fast_semantic_populate.py [--projects 5000] [--areas 50] [--chunk-size 256]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+import numpy as np
+from pgvector import Vector
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.catalog import CatalogService, build_snapshot
+from app.services.fast_semantic_matcher import FastSemanticMatcher, catalog_digest, catalog_rows
+from test_fast_semantic_populate import FakeConnection, FakeCursor, fake_execute_values
+
+WORDS = ["Green", "Palm", "Crystal", "Future", "Lake", "Sky", "Royal", "Golden", "Blue", "River"]
+KINDS = ["Heights", "View", "Resort", "Towers", "Park", "Hills", "Residence", "Bay"]
+
+
+class SimulatedEmbeddingClient:
+    memo_namespace = "api:benchmark"
+
+    def __init__(self, http_ms: float, text_ms: float, dim: int = 768):
+        self.http_s, self.text_s, self.dim = http_ms / 1000, text_ms / 1000, dim
+        self.requests = 0
+
+    def embed_texts_array(self, texts):
+        self.requests += 1
+        time.sleep(self.http_s + self.text_s * len(texts))
+        return np.random.default_rng(len(texts)).random((len(texts), self.dim), dtype=np.float32)
+
+    def embed_text(self, text):
+        return self.embed_texts_array([text])[0].tolist()
+
+
+class SimulatedConnection(FakeConnection):
+    def __init__(self, db_ms: float):
+        super().__init__()
+        self.db_s = db_ms / 1000
+
+    def cursor(self, cursor_factory=None):
+        return SimulatedCursor(self)
+
+
+class SimulatedCursor(FakeCursor):
+    def execute(self, sql, params=None):
+        time.sleep(self.conn.db_s)
+        for value in params or ():
+            if isinstance(value, (list, np.ndarray)):
+                Vector(value).to_text()
+        super().execute(sql, params)
+
+
+def simulated_execute_values(cur, sql, rows, page_size=100):
+    time.sleep(cur.conn.db_s * -(-len(rows) // page_size))
+    for row in rows:
+        Vector(row[-2]).to_text()
+    fake_execute_values(cur, sql, rows, page_size)
+
+
+def row_by_row(conn, client, snapshot):
+    """The previous population: one request and one statement per entity."""
+    with conn.cursor() as cur:
+        for table in ("areas_embeddings", "projects_embeddings", "unit_types_embeddings"):
+            cur.execute(f"SELECT COUNT(*) FROM {table}")
+        for area in snapshot.areas:
+            embedding = client.embed_text(f"{area.name} {area.name_ar or area.name}")
+            cur.execute("INSERT INTO areas_embeddings ...", (area.id, area.name, area.name_ar, embedding))
+        for project in snapshot.projects:
+            embedding = client.embed_text(project.name)
+            cur.execute("INSERT INTO projects_embeddings ...", (project.id, project.name, project.area_id, embedding))
+        for name in ("Apartment شقة", "Villa فيلا"):
+            embedding = client.embed_text(name)
+            cur.execute("UPDATE unit_types_embeddings ...", (embedding, name))
+    conn.commit()
+
+
+def catalog(n_projects: int, n_areas: int, rename: int = 0, seed: int = 0):
+    rng = random.Random(seed)
+    areas = [{"areaId": str(i), "name": f"Area {i}", "nameAr": f"منطقة {i}"} for i in range(n_areas)]
+    projects = [{"projectId": str(1000 + i), "name": f"{rng.choice(WORDS)} {rng.choice(KINDS)} {i}",
+                 "areaId": str(rng.randrange(n_areas))} for i in range(n_projects)]
+    for project in projects[:rename]:
+        project["name"] += " II"
+    return areas, projects
+
+
+def main(n_projects: int, n_areas: int, chunk_size: int, http_ms: float, text_ms: float, db_ms: float):
+    service = CatalogService(ttl_s=3600)
+    client = SimulatedEmbeddingClient(http_ms, text_ms)
+    conn = SimulatedConnection(db_ms)
+
+    with patch("app.services.fast_semantic_matcher.get_embedding_api_client", return_value=client), \
+         patch("app.services.fast_semantic_matcher.get_catalog_service", return_value=service), \
+         patch("app.services.fast_semantic_matcher.execute_values", side_effect=simulated_execute_values):
+
+        def matcher():
+            instance = FastSemanticMatcher(chunk_size=chunk_size)
+            instance._conn = conn
+            return instance
+
+        def install(rename: int, version: int):
+            service._snapshot = build_snapshot(*catalog(n_projects, n_areas, rename), [], version=version)
+            service._expires_at = float("inf")
+
+        def timed(label: str, fn) -> tuple:
+            client.requests, conn.statements = 0, []
+            started = time.perf_counter()
+            fn()
+            return label, time.perf_counter() - started, client.requests, len(conn.statements)
+
+        install(rename=0, version=1)
+        entities = len(service._snapshot.areas) + len(service._snapshot.projects) + 2
+        results = [timed("row by row (before)", lambda: row_by_row(conn, client, service._snapshot))]
+        conn.tables["areas_embeddings"].clear()
+        conn.tables["projects_embeddings"].clear()
+        results.append(timed("bulk, empty tables", lambda: matcher()._ensure_embeddings_populated()))
+        results.append(timed("bulk, restart (same catalog)", lambda: matcher()._ensure_embeddings_populated()))
+        results.append(timed("bulk, digest differs (nothing changed)", lambda: matcher().populate(
+            catalog_rows(service._snapshot, matcher().model_identity), "stale")))
+        install(rename=50, version=2)
+        results.append(timed("bulk, 50 projects renamed", lambda: matcher()._ensure_embeddings_populated()))
+        digest = catalog_digest(catalog_rows(service._snapshot, matcher().model_identity))
+        assert conn.state == digest
+
+    print(f"{n_projects} projects, {n_areas} areas, 2 unit types; chunk size {chunk_size}; "
+          f"simulated {http_ms} ms/request + {text_ms} ms/text embedding, {db_ms} ms/statement\n")
+    print(f"{'population':>40} | {'seconds':>8} | {'entities/s':>10} | {'requests':>8} | {'statements':>10}")
+    print("-" * 88)
+    for label, seconds, requests, statements in results:
+        print(f"{label:>40} | {seconds:>8.2f} | {entities / seconds:>10.0f} | {requests:>8} | {statements:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FastSemanticMatcher: bulk vs row-by-row table population")
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--areas", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--http-ms", type=float, default=2.0)
+    parser.add_argument("--text-ms", type=float, default=0.0)
+    parser.add_argument("--db-ms", type=float, default=0.5)
+    args = parser.parse_args()
+    main(args.projects, args.areas, args.chunk_size, args.http_ms, args.text_ms, args.db_ms)
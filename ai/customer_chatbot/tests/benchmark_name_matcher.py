@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NameMatcherService latency on a large synthetic catalog.
+
+Builds N synthetic projects (English names, some with Arabic-script aliases
+as separate projects, spread over areas) and times match_project /
+get_projects_for_area with the entity index against the previous
+implementation: a Python loop that normalizes every name twice per call and
+scores it with fuzz.ratio / fuzz.partial_ratio one by one. Every query's
+result is compared between the two, so the numbers come with an equivalence
+check.
+
+Usage:
+    python tests/benchmark_name_matcher.py [--projects 10000] [--areas 50] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+from rapidfuzz import fuzz
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.name_matcher import MatchResult, NameMatcherService
+from app.utils.arabic_utils import detect_language, normalize_arabic_reference
+
+WORDS = ["Green", "Palm", "Crystal", "Future", "Lake", "Sky", "Royal", "Golden", "Blue", "River",
+         "Hyde", "Mountain", "Sun", "Marina", "Garden", "Cedar", "Ocean", "Silver", "Jasmine", "Oasis"]
+KINDS = ["Heights", "View", "Resort", "Towers", "Park", "Hills", "Residence", "Bay", "Village", "City"]
+ARABIC = ["جرين", "بالم", "كريستال", "فيوتشر", "ليك", "سكاي", "رويال", "جولدن", "بلو", "ريفر"]
+
+
+def clean_for_matching(text: str) -> str:
+    """Previous clean_for_matching: unmemoized, one pass per normalization step."""
+    return normalize_arabic_reference(text).lower().strip()
+
+
+def legacy_match(matcher: NameMatcherService, user_input: str, entities: list, name_key: str, id_key: str) -> MatchResult:
+    """Previous NameMatcherService._match_entity (franco conversion left out)."""
+    if not user_input or not entities:
+        return MatchResult(matched=False, alternatives=[e.get(name_key) for e in entities[:10] if e.get(name_key)])
+    detected_lang = detect_language(user_input)
+    input_normalized = clean_for_matching(user_input)
+    for entity in entities:
+        name = entity.get(name_key, "")
+        if not name:
+            continue
+        if name.lower() == user_input.lower() or clean_for_matching(name) == input_normalized:
+            return MatchResult(matched=True, value=name, id=entity.get(id_key), confidence=1.0,
+                               language_detected=detected_lang)
+    scored_matches = []
+    for entity in entities:
+        name = entity.get(name_key, "")
+        if not name:
+            continue
+        name_normalized = clean_for_matching(name)
+        score = max(fuzz.ratio(input_normalized, name_normalized) / 100,
+                    fuzz.partial_ratio(input_normalized, name_normalized) / 100)
+        scored_matches.append((entity, name, score))
+    scored_matches.sort(key=lambda x: x[2], reverse=True)
+    if scored_matches:
+        top_entity, top_name, top_score = scored_matches[0]
+        if top_score >= matcher.EXACT_THRESHOLD:
+            return MatchResult(matched=True, value=top_name, id=top_entity.get(id_key), confidence=top_score,
+                               language_detected=detected_lang)
+        elif top_score >= matcher.SUGGEST_THRESHOLD:
+            return MatchResult(matched=False, value=top_name, confidence=top_score, language_detected=detected_lang,
+                               alternatives=[m[1] for m in scored_matches[:5]])
+    return MatchResult(matched=False, language_detected=detected_lang,
+                       alternatives=[e.get(name_key) for e in entities[:10] if e.get(name_key)])
+
+
+def synthetic_projects(n: int, areas: int, rng: random.Random) -> list:
+    projects = []
+    for i in range(n):
+        w, k = rng.randrange(len(WORDS)), rng.randrange(len(KINDS))
+        name = f"{WORDS[w]} {KINDS[k]} {i}"
+        if w < len(ARABIC) and rng.random() < 0.1:
+            name = f"{ARABIC[w]} {i}"
+        area_id = f"a{rng.randrange(areas)}"
+        projects.append({"projectId": f"p{i}", "name": name, "area": {"areaId": area_id, "name": f"Area {area_id}"}})
+    return projects
+
+
+def queries(projects: list, count: int, rng: random.Random) -> list:
+    """Exact names, typos, partial names and unknown names, in equal parts."""
+    result = []
+    for i in range(count):
+        name = rng.choice(projects)["name"]
+        kind = i % 4
+        if kind == 1 and len(name) > 4:
+            j = rng.randrange(1, len(name) - 1)
+            name = name[:j] + name[j + 1:]
+        elif kind == 2:
+            name = name.rsplit(" ", 1)[0]
+        elif kind == 3:
+            name = f"{rng.choice(WORDS)}ville {rng.randrange(10**6)}"
+        result.append(name)
+    return result
+
+
+def timed(fn, inputs) -> list:
+    latencies = []
+    for value in inputs:
+        started = time.perf_counter()
+        fn(value)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main(n_projects: int, n_areas: int, n_queries: int):
+    rng = random.Random(0)
+    projects = synthetic_projects(n_projects, n_areas, rng)
+    inputs = queries(projects, n_queries, rng)
+
+    with patch("app.services.name_matcher.get_backend_api_service", return_value=MagicMock()), \
+         patch("app.services.name_matcher.is_arabic_phonetic", return_value=False):
+        matcher = NameMatcherService()
+        matcher._projects_cache = projects
+
+        started = time.perf_counter()
+        matcher.get_projects_for_area("a0")  # builds the index
+        build_ms = (time.perf_counter() - started) * 1000
+
+        mismatches = sum(
+            matcher.match_project(q) != legacy_match(matcher, q, projects, "name", "projectId") for q in inputs
+        )
+        indexed = timed(matcher.match_project, inputs)
+        legacy = timed(lambda q: legacy_match(matcher, q, projects, "name", "projectId"), inputs)
+        area_ids = [f"a{rng.randrange(n_areas)}" for _ in range(n_queries)]
+        by_area = timed(matcher.get_projects_for_area, area_ids)
+        by_area_legacy = timed(lambda a: [p for p in projects if p.get("area", {}).get("areaId") == a], area_ids)
+
+    print(f"{n_projects} projects in {n_areas} areas, {n_queries} queries "
+          f"(index built in {build_ms:.0f} ms, {mismatches} result mismatches)\n")
+    print(f"{'operation':>22} | {'mean ms':>8} | {'p95 ms':>8}")
+    print("-" * 46)
+    for label, latencies in [("match_project (loop)", legacy), ("match_project (index)", indexed),
+                             ("projects_for_area (scan)", by_area_legacy), ("projects_for_area (index)", by_area)]:
+        latencies = sorted(latencies)
+        print(f"{label:>22} | {statistics.mean(latencies):>8.3f} | {latencies[int(0.95 * (len(latencies) - 1))]:>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NameMatcherService: entity index vs per-call loop")
+    parser.add_argument("--projects", type=int, default=10_000)
+    parser.add_argument("--areas", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    main(args.projects, args.areas, args.queries)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SemanticMatcher lookup latency, per-call re-encoding vs cached matrices.
+
+The real EmbeddingService runs with a randomly initialized BERT encoder of the
+Muffakir model's size (768 hidden, 12 layers by default; weights do not
+matter for timing, and the model cannot be downloaded here). Texts are
+tokenized by hashing characters. "Before" is the previous lookup:
+compute_similarity(query, every project name), which encodes the query and
+all entity texts on every call. "After" is the SemanticMatcher: the entity
+matrix is built once per catalog version, and each lookup encodes only the
+query.
+
+Usage:
+    python tests/benchmark_semantic_matcher.py [--projects 300] [--areas 10] [--queries 10] [--layers 12]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+import torch
+from transformers import BertConfig, BertModel
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.embeddings import EmbeddingService
+from app.services.catalog import CatalogService, build_snapshot
+from app.services.semantic_matcher import SemanticMatcher
+
+WORDS = ["Green", "Palm", "Crystal", "Future", "Lake", "Sky", "Royal", "Golden", "Blue", "River"]
+KINDS = ["Heights", "View", "Resort", "Towers", "Park", "Hills", "Residence", "Bay"]
+
+
+class RandomBertEncoder:
+    """BERT-base-sized encoder with random weights; mean pooling, L2-normalized."""
+
+    def __init__(self, layers: int, vocab: int = 30_000):
+        torch.manual_seed(0)
+        self.vocab = vocab
+        self.model = BertModel(BertConfig(vocab_size=vocab, num_hidden_layers=layers)).eval()
+
+    def __call__(self, texts):
+        ids = [[1] + [2 + ord(c) % (self.vocab - 2) for c in text][:62] for text in texts]
+        width = max(len(row) for row in ids)
+        input_ids = torch.tensor([row + [0] * (width - len(row)) for row in ids])
+        mask = (input_ids != 0).long()
+        with torch.no_grad():
+            hidden = self.model(input_ids=input_ids, attention_mask=mask).last_hidden_state
+        pooled = (hidden * mask[..., None]).sum(1) / mask.sum(1, keepdim=True)
+        return torch.nn.functional.normalize(pooled, dim=1).tolist()
+
+
+def timed(fn, inputs) -> list:
+    latencies = []
+    for value in inputs:
+        started = time.perf_counter()
+        fn(value)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main(n_projects: int, n_areas: int, n_queries: int, layers: int):
+    rng = random.Random(0)
+    areas = [{"areaId": f"a{i}", "name": f"Area {i}"} for i in range(n_areas)]
+    projects = [{"projectId": f"p{i}", "name": f"{rng.choice(WORDS)} {rng.choice(KINDS)} {i}",
+                 "areaId": f"a{rng.randrange(n_areas)}"} for i in range(n_projects)]
+    queries = [f"{rng.choice(WORDS).lower()} {rng.choice(KINDS).lower()}" for _ in range(n_queries)]
+    names = [p["name"] for p in projects]
+
+    embeddings = EmbeddingService(model_name="random-bert", backend="torch")
+    catalog = CatalogService(ttl_s=3600)
+    catalog._snapshot = build_snapshot(areas, projects, [])
+    catalog._expires_at = float("inf")
+
+    with patch.object(EmbeddingService, "_encode", staticmethod(RandomBertEncoder(layers))), \
+         patch("app.services.semantic_matcher.get_embedding_service", return_value=embeddings), \
+         patch("app.services.semantic_matcher.get_catalog_service", return_value=catalog):
+        matcher = SemanticMatcher()
+
+        before = timed(lambda q: embeddings.compute_similarity(q, names), queries)
+
+        started = time.perf_counter()
+        matcher._matrices()
+        build_ms = (time.perf_counter() - started) * 1000
+        after = timed(matcher.match_project, queries)
+        after_area = timed(lambda q: matcher.match_project(q, area_id="a0"), queries)
+
+    print(f"{n_projects} projects in {n_areas} areas, {n_queries} queries, {layers}-layer encoder "
+          f"(matrices built once in {build_ms:.0f} ms)\n")
+    print(f"{'lookup':>34} | {'mean ms':>8} | {'p50 ms':>8}")
+    print("-" * 58)
+    for label, latencies in [("compute_similarity (before)", before), ("matrix, all projects", after),
+                             ("matrix, one area", after_area)]:
+        print(f"{label:>34} | {statistics.mean(latencies):>8.1f} | {statistics.median(latencies):>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SemanticMatcher: cached entity matrices vs re-encoding")
+    parser.add_argument("--projects", type=int, default=300)
+    parser.add_argument("--areas", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--layers", type=int, default=12)
+    args = parser.parse_args()
+    main(args.projects, args.areas, args.queries, args.layers)
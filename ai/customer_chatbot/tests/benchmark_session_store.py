@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: database round trips per chatbot turn for customer_sessions.
+
+Replays a synthetic conversation workload (customers sending several
+messages each, the session changing on some turns) through SessionStore
+over an in-memory connection that counts round trips (execute / commit /
+rollback), for each cache backend and both customer_sessions schemas.
+
+For reference, the previous per-query fallback code cost per turn:
+- extended schema: 3 round trips (SELECT, UPSERT, COMMIT)
+- basic schema:    6 round trips (failed SELECT + fallback SELECT,
+                   failed UPSERT + ROLLBACK + fallback UPSERT + COMMIT)
+
+Usage:
+    python tests/benchmark_session_store.py [--customers 200] [--turns 8] [--change-rate 0.5]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.session_store import SessionStore
+from test_session_store import CountingConnection, _vector_store
+
+LEGACY_ROUND_TRIPS = {"extended": 3, "basic": 6}
+
+
+def run(schema: str, backend: str, customers: int, turns: int, change_rate: float, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    conn = CountingConnection(schema)
+    store = SessionStore(vector_store=_vector_store(conn), backend=backend, ttl_s=900, max_entries=10_000)
+    store.initialize()
+    conn.round_trips = 0
+
+    # Interleaved turns, as messages from different customers arrive
+    schedule = [phone for phone in range(customers) for _ in range(turns)]
+    rng.shuffle(schedule)
+    steps = {}
+    for phone in schedule:
+        phone = str(phone)
+        with store.write_scope():
+            session = store.get(phone) or {"extracted_requirements": {}, "last_intent": "unknown", "is_complete": False,
+                                           "confirmed": False, "awaiting_confirmation": False, "confirmation_attempt": 0}
+            if phone not in steps or rng.random() < change_rate:
+                steps[phone] = steps.get(phone, 0) + 1
+                session["extracted_requirements"] = {"step": steps[phone]}
+                session["last_intent"] = "search"
+            store.save(phone, session)
+    return {"round_trips": conn.round_trips / len(schedule), **store.get_stats()}
+
+
+def main(customers: int, turns: int, change_rate: float):
+    print(f"{customers} customers x {turns} turns, session changes on {change_rate:.0%} of turns\n")
+    print(f"{'schema':>9} | {'cache':>7} | {'round trips/turn':>16} | {'legacy':>6} | {'db reads':>8} | "
+          f"{'db writes':>9} | {'skipped':>7}")
+    print("-" * 80)
+    for schema in ("extended", "basic"):
+        for backend in ("none", "memory"):
+            result = run(schema, backend, customers, turns, change_rate)
+            print(f"{schema:>9} | {backend:>7} | {result['round_trips']:>16.2f} | {LEGACY_ROUND_TRIPS[schema]:>6} | "
+                  f"{result['db_reads']:>8} | {result['db_writes']:>9} | {result['writes_skipped']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="customer_sessions round trips per turn")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--change-rate", type=float, default=0.5)
+    args = parser.parse_args()
+
+    main(args.customers, args.turns, args.change_rate)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LLM calls, tokens and latency per turn, separate vs combined analysis.
+
+Replays the conversations recorded in test_results/*.json through the real
+workflow, once with TURN_ANALYSIS=separate (intent detection, requirement
+extraction and the inquiry router as three prompts) and once with
+TURN_ANALYSIS=combined (one structured-output call).
+
+Offline, the LLM is a stub that answers with the recorded intent,
+requirements and response of each turn. Its token counts are an ESTIMATE
+(characters / 4, plus the JSON schema for structured calls) and its latency
+is modelled as a fixed cost per call plus a cost per input and output token,
+so the figures compare the two modes rather than predict production numbers.
+With --live the configured provider is called and the counts come from its
+usage_metadata.
+
+Usage:
+    python tests/benchmark_turn_analysis.py [--scenarios a,b] [--call-ms 250]
+        [--in-token-ms 0.05] [--out-token-ms 8] [--live]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.llm import llm_usage_scope, record_llm_usage
+from app.core.session_store import SessionStore
+from app.services.conversation import ConversationService
+from app.graph.turn_analysis import RequirementsExtraction
+from app.graph.workflow import TURN_ANALYSES, build_conversation_workflow
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_results")
+
+
+def load_scenarios(names=None) -> dict:
+    """Recorded turns per scenario: {name: [message_result, ...]}."""
+    scenarios = {}
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name.startswith("_") or (names and name not in names):
+            continue
+        with open(path, encoding="utf-8") as f:
+            turns = json.load(f).get("message_results", [])
+        if turns:
+            scenarios[name] = turns
+    return scenarios
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StubLLM:
+    """Answers from the recorded turn; estimates tokens and models latency."""
+
+    def __init__(self, call_ms: float, in_token_ms: float, out_token_ms: float):
+        self.call_ms = call_ms
+        self.in_token_ms = in_token_ms
+        self.out_token_ms = out_token_ms
+        self.turn = {}
+
+    async def _reply(self, prompt: str, answer: str) -> str:
+        started = time.monotonic()
+        usage = {"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(answer)}
+        await asyncio.sleep((self.call_ms + usage["input_tokens"] * self.in_token_ms
+                             + usage["output_tokens"] * self.out_token_ms) / 1000)
+        record_llm_usage(SimpleNamespace(usage_metadata=usage), started)
+        return answer
+
+    def _requirements(self) -> dict:
+        recorded = self.turn.get("extracted_requirements") or {}
+        return {k: v for k, v in recorded.items() if k in RequirementsExtraction.model_fields}
+
+    async def agenerate_response(self, user_message, system_prompt=None, **kwargs):
+        system_prompt = system_prompt or ""
+        if "نوايا" in system_prompt:
+            answer = self.turn.get("intent") or "unknown"
+        elif "JSON صالح" in system_prompt:
+            answer = json.dumps(self._requirements(), ensure_ascii=False)
+        elif "router" in system_prompt:
+            answer = json.dumps({"type": "general_qa", "entities": {}})
+        else:
+            answer = self.turn.get("response") or ""
+        return await self._reply(system_prompt + user_message, answer)
+
+    async def agenerate_structured(self, user_message, schema, system_prompt=None):
+        intent = self.turn.get("intent") or "unknown"
+        analysis = schema.model_validate({
+            "intent": intent,
+            "requirements": self._requirements(),
+            "inquiry": {"type": "general_qa"} if intent == "inquiry" else None,
+        })
+        # The schema travels with the request as a tool definition
+        prompt = (system_prompt or "") + user_message + json.dumps(schema.model_json_schema())
+        await self._reply(prompt, analysis.model_dump_json(exclude_none=True))
+        return analysis
+
+
+class StubStore:
+    """Vector store and backend API without I/O; sessions kept in memory."""
+
+    def __init__(self):
+        self.sessions = {}
+
+    async def aget_conversation_history(self, phone_number, limit=10):
+        return []
+
+    async def asearch_similar(self, query, phone_number=None, limit=5):
+        return []
+
+    async def aget_customer_session(self, phone_number):
+        return self.sessions.get(phone_number)
+
+    async def asave_customer_session(self, phone_number, **session):
+        self.sessions[phone_number] = session
+
+    async def aget_areas(self):
+        return [{"area_id": 7, "name": "New Capital"}, {"area_id": 6, "name": "Tagamoo"}]
+
+    aget_all_areas = aget_areas
+
+    async def aget_area_id_by_name(self, area_name):
+        return 7
+
+    async def aget_projects(self, area_name=None):
+        return [{"project_id": 3, "name": "Green Heights 3"}]
+
+    async def aget_unit_types(self):
+        return ["Apartment", "Villa", "Duplex"]
+
+    async def asearch_units(self, **filters):
+        return []
+
+    async def aget_price_range(self, **filters):
+        return {"min": 3000000, "max": 9000000}
+
+    async def aget_or_create_customer(self, phone, name=None):
+        return 1
+
+    async def acreate_request(self, customer_id, area_id, requirements):
+        return 1
+
+    async def asave_conversation(self, *args, **kwargs):
+        return None
+
+    def store_message(self, **record):
+        pass
+
+
+class ExactMatcher:
+    def _match(self, name, **kwargs):
+        return SimpleNamespace(matched=True, value=name, id=7, alternatives=[], confidence=1.0)
+
+    match_area = match_project = match_unit_type = _match
+
+    def get_projects_for_area(self, area_id):
+        return []
+
+
+def replay(analysis: str, scenarios: dict, llm) -> list:
+    """Run every recorded turn; returns the per-turn usage stats."""
+    workflow = build_conversation_workflow("async", analysis=analysis)
+    per_turn = []
+
+    async def run():
+        for name, turns in scenarios.items():
+            phone = f"bench-{analysis}-{name}"
+            for turn in turns:
+                if isinstance(llm, StubLLM):
+                    llm.turn = turn
+                state = ConversationService._initial_state(None, phone, turn["message"])
+                with llm_usage_scope() as usage:
+                    started = time.monotonic()
+                    await workflow.ainvoke(state)
+                    elapsed_ms = (time.monotonic() - started) * 1000
+                per_turn.append({**usage.get_stats(), "turn_ms": elapsed_ms})
+
+    asyncio.run(run())
+    return per_turn
+
+
+def main(args):
+    names = set(args.scenarios.split(",")) if args.scenarios else None
+    scenarios = load_scenarios(names)
+    store = StubStore()
+    targets = [
+        ("app.graph.nodes.get_vector_store", store),
+        ("app.graph.nodes.get_session_store", SessionStore(store, backend="none")),
+        ("app.graph.nodes.get_backend_api_service", store),
+        ("app.services.backend_api.get_backend_api_service", store),
+        ("app.graph.nodes.get_turn_persister", MagicMock()),
+        ("app.services.name_matcher.get_name_matcher_service", ExactMatcher()),
+    ]
+    if args.live:
+        from app.core.llm import get_llm_service
+        llm = get_llm_service()
+    else:
+        llm = StubLLM(args.call_ms, args.in_token_ms, args.out_token_ms)
+    targets.append(("app.graph.nodes.get_llm_service", llm))
+
+    patchers = [patch(target, return_value=value) for target, value in targets]
+    for patcher in patchers:
+        patcher.start()
+    try:
+        total = sum(len(turns) for turns in scenarios.values())
+        source = "provider usage_metadata" if args.live else (
+            f"ESTIMATED tokens (chars/4), modelled latency {args.call_ms:.0f} ms/call + "
+            f"{args.in_token_ms} ms/input token + {args.out_token_ms} ms/output token")
+        print(f"{len(scenarios)} scenarios, {total} turns; {source}\n")
+        print(f"{'analysis':>9} | {'calls':>5} | {'in tok':>7} | {'out tok':>7} | {'LLM ms':>7} | "
+              f"{'turn ms':>7} | {'p95 ms':>7}")
+        print("-" * 66)
+        for analysis in TURN_ANALYSES:
+            per_turn = replay(analysis, scenarios, llm)
+            turn_ms = sorted(t["turn_ms"] for t in per_turn)
+            mean = lambda key: statistics.mean(t[key] for t in per_turn)
+            print(f"{analysis:>9} | {mean('calls'):>5.2f} | {mean('input_tokens'):>7.0f} | "
+                  f"{mean('output_tokens'):>7.0f} | {mean('latency_ms'):>7.0f} | "
+                  f"{statistics.mean(turn_ms):>7.0f} | {turn_ms[int(0.95 * (len(turn_ms) - 1))]:>7.0f}")
+        print("\n(per-turn means; LLM ms is the summed call time, turn ms the wall time)")
+    finally:
+        for patcher in patchers:
+            patcher.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-turn LLM usage, separate vs combined analysis")
+    parser.add_argument("--scenarios", default="", help="Comma-separated test_results names (default: all)")
+    parser.add_argument("--call-ms", type=float, default=250)
+    parser.add_argument("--in-token-ms", type=float, default=0.05)
+    parser.add_argument("--out-token-ms", type=float, default=8)
+    parser.add_argument("--live", action="store_true", help="Call the configured LLM provider")
+    main(parser.parse_args())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark: turn latency of the conversation workflow, linear vs fan-out.
+
+Runs the real LangGraph workflow with stubbed services: every LLM call takes
+a fixed latency and every database read (session, history, similarity
+search) a smaller fixed latency. Compares the previous linear flow
+(session -> history -> context -> intent -> extraction) with the parallel
+branches (loaders together, then intent detection and extraction together),
+in both workflow modes.
+
+Usage:
+    python tests/benchmark_workflow_latency.py [--llm-ms 400] [--db-ms 20] [--turns 9]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.io_mode import is_blocking_io
+from app.core.session_store import SessionStore
+from app.services.conversation import ConversationService
+from app.graph.workflow import build_conversation_workflow
+
+# (message, LLM intent, LLM extraction)
+SCENARIOS = [
+    ("السلام عليكم", "greeting", {}),
+    ("أنا عايز شقة في التجمع", "new_search", {"area": "Tagamoo", "unit_type": "Apartment"}),
+    ("الميزانية 3 مليون", "update_requirements", {"budget_max": 3000000}),
+]
+
+
+async def _wait(seconds: float):
+    if is_blocking_io():
+        time.sleep(seconds)
+    else:
+        await asyncio.sleep(seconds)
+
+
+class StubLLM:
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def _answer(self, user_message, system_prompt):
+        for message, intent, extraction in SCENARIOS:
+            if message in user_message:
+                if "نوايا" in system_prompt:
+                    return intent
+                if "JSON" in system_prompt:
+                    return json.dumps(extraction)
+        return "تمام، محتاج أعرف تفاصيل أكتر"
+
+    async def agenerate_response(self, user_message, system_prompt="", **kwargs):
+        await _wait(self.latency_s)
+        return self._answer(user_message, system_prompt or "")
+
+
+class StubStore:
+    """Vector store and backend API with fixed read latency."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    async def aget_conversation_history(self, phone_number, limit=10):
+        await _wait(self.latency_s)
+        return []
+
+    async def asearch_similar(self, query, phone_number=None, limit=5):
+        await _wait(self.latency_s)
+        return []
+
+    async def aget_customer_session(self, phone_number):
+        await _wait(self.latency_s)
+        return None
+
+    async def asave_customer_session(self, phone_number, **session):
+        await _wait(self.latency_s)
+
+    async def aget_areas(self):
+        return [{"area_id": 6, "name": "Tagamoo"}]
+
+    async def aget_projects(self, area_name=None):
+        return []
+
+    async def aget_unit_types(self):
+        return ["Apartment", "Villa"]
+
+    async def asearch_units(self, **filters):
+        await _wait(self.latency_s)
+        return []
+
+    def store_message(self, **record):
+        pass
+
+
+class ExactMatcher:
+    def _match(self, name, **kwargs):
+        return SimpleNamespace(matched=True, value=name, id=6, alternatives=[], confidence=1.0)
+
+    match_area = match_project = match_unit_type = _match
+
+    def get_projects_for_area(self, area_id):
+        return []
+
+
+def measure(mode: str, fan_out: bool, turns: int) -> list:
+    workflow = build_conversation_workflow(mode, fan_out=fan_out)
+    latencies = []
+    for i in range(turns):
+        message = SCENARIOS[i % len(SCENARIOS)][0]
+        state = ConversationService._initial_state(None, f"2010{i:08d}", message)
+        started = time.monotonic()
+        if mode == "async":
+            asyncio.run(workflow.ainvoke(state))
+        else:
+            workflow.invoke(state)
+        latencies.append((time.monotonic() - started) * 1000)
+    return latencies
+
+
+def main(llm_ms: float, db_ms: float, turns: int):
+    store = StubStore(db_ms / 1000)
+    targets = [
+        ("app.graph.nodes.get_llm_service", StubLLM(llm_ms / 1000)),
+        ("app.graph.nodes.get_vector_store", store),
+        ("app.graph.nodes.get_session_store", SessionStore(store, backend="none")),
+        ("app.graph.nodes.get_backend_api_service", store),
+        ("app.services.backend_api.get_backend_api_service", store),
+        ("app.graph.nodes.get_turn_persister", MagicMock()),
+        ("app.services.name_matcher.get_name_matcher_service", ExactMatcher()),
+    ]
+    patchers = [patch(target, return_value=value) for target, value in targets]
+    for patcher in patchers:
+        patcher.start()
+    try:
+        print(f"LLM {llm_ms:.0f} ms/call, database {db_ms:.0f} ms/read, {turns} turns per row\n")
+        print(f"{'mode':>6} | {'flow':>8} | {'mean ms':>8} | {'p50 ms':>8} | {'max ms':>8}")
+        print("-" * 50)
+        for mode in ("async", "sync"):
+            for fan_out in (False, True):
+                latencies = measure(mode, fan_out, turns)
+                print(f"{mode:>6} | {'fan-out' if fan_out else 'linear':>8} | {statistics.mean(latencies):>8.0f} | "
+                      f"{statistics.median(latencies):>8.0f} | {max(latencies):>8.0f}")
+    finally:
+        for patcher in patchers:
+            patcher.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Workflow turn latency, linear vs fan-out")
+    parser.add_argument("--llm-ms", type=float, default=400)
+    parser.add_argument("--db-ms", type=float, default=20)
+    parser.add_argument("--turns", type=int, default=9)
+    args = parser.parse_args()
+    main(args.llm_ms, args.db_ms, args.turns)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Load test: many simulated WhatsApp users chatting at the same time.
+
+Each user sends several messages with a short think time between them (and
+occasionally two messages back to back, as people do on WhatsApp).
+
+Modes:
+- in-process (default): the workflow is replaced by a turn with LLM-like
+  latency; compares a blocking turn invoked on the event loop, blocking turns
+  on the ConversationScheduler pool (WORKFLOW_MODE=sync) and async turns on
+  the event loop (WORKFLOW_MODE=async), and checks that turns of the same
+  phone never overlap.
+- --url http://localhost:8000: posts WhatsApp webhook payloads to a running
+  chatbot and reads the scheduler metrics from /api/webhook/stats.
+
+Usage:
+    python tests/load_test_conversations.py [--users 40] [--messages 5] [--latency-ms 300]
+    python tests/load_test_conversations.py --users 500 --modes sync,async
+    python tests/load_test_conversations.py --url http://localhost:8000 --users 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable, List
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.conversation_scheduler import ConversationScheduler
+
+MESSAGES = [
+    "السلام عليكم",
+    "أنا عايز شقة في التجمع الخامس",
+    "الميزانية 3 مليون",
+    "3 غرف",
+    "تمام كده",
+]
+
+
+class SimulatedTurn:
+    """Blocking stand-in for workflow.invoke that detects same-phone overlap."""
+
+    def __init__(self, latency_ms: float):
+        self.latency_s = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.active = set()
+        self.overlaps = 0
+
+    def __call__(self, phone: str, message: str) -> dict:
+        with self.lock:
+            if phone in self.active:
+                self.overlaps += 1
+            self.active.add(phone)
+        time.sleep(self.latency_s * random.uniform(0.5, 1.5))
+        with self.lock:
+            self.active.discard(phone)
+        return {"phone_number": phone, "response": "تمام"}
+
+
+class SimulatedAsyncTurn(SimulatedTurn):
+    """Async stand-in for workflow.ainvoke (awaits instead of sleeping)."""
+
+    async def __call__(self, phone: str, message: str) -> dict:
+        if phone in self.active:
+            self.overlaps += 1
+        self.active.add(phone)
+        await asyncio.sleep(self.latency_s * random.uniform(0.5, 1.5))
+        self.active.discard(phone)
+        return {"phone_number": phone, "response": "تمام"}
+
+
+async def simulate_user(phone: str, messages: int, send: Callable, latencies: List[float], think_ms: float):
+    pending = []
+    for i in range(messages):
+        started = time.monotonic()
+        task = asyncio.ensure_future(send(phone, MESSAGES[i % len(MESSAGES)]))
+        task.add_done_callback(lambda _, s=started: latencies.append((time.monotonic() - s) * 1000))
+        pending.append(task)
+        if random.random() < 0.8:
+            # Usually waits for the reply; sometimes sends the next message right away
+            await task
+            await asyncio.sleep(random.uniform(0, think_ms) / 1000)
+    await asyncio.gather(*pending)
+
+
+async def run_load(users: int, messages: int, think_ms: float, send: Callable) -> dict:
+    latencies: List[float] = []
+    started = time.monotonic()
+    await asyncio.gather(*(
+        simulate_user(f"2010{u:08d}", messages, send, latencies, think_ms) for u in range(users)
+    ))
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        "turns": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+    }
+
+
+def print_result(label: str, result: dict, extra: str = ""):
+    print(f"{label:>10} | {result['turns']:>6} | {result['elapsed_s']:>8.1f} | {result['throughput']:>10.1f} | "
+          f"{result['p50']:>8.0f} | {result['p95']:>8.0f} | {extra}")
+
+
+async def in_process(users: int, messages: int, latency_ms: float, think_ms: float, workers: int, max_concurrent: int,
+                     modes: List[str]):
+    print(f"{users} users x {messages} messages, ~{latency_ms:.0f} ms per turn, "
+          f"{workers} workers (sync), {max_concurrent} concurrent turns (async)\n")
+    print(f"{'mode':>10} | {'turns':>6} | {'time s':>8} | {'turns/s':>10} | {'p50 ms':>8} | {'p95 ms':>8} | notes")
+    print("-" * 90)
+
+    if "inline" in modes:
+        # Previous behaviour: the blocking workflow runs on the event loop
+        turn = SimulatedTurn(latency_ms)
+
+        async def inline(phone, message):
+            return turn(phone, message)
+
+        print_result("inline", await run_load(users, messages, think_ms, inline))
+
+    if "sync" in modes:
+        await run_sync_mode(users, messages, latency_ms, think_ms, workers)
+    if "async" in modes:
+        await run_async_mode(users, messages, latency_ms, think_ms, max_concurrent)
+
+
+async def run_sync_mode(users: int, messages: int, latency_ms: float, think_ms: float, workers: int):
+    turn = SimulatedTurn(latency_ms)
+    scheduler = ConversationScheduler(max_workers=workers)
+
+    async def scheduled(phone, message):
+        return await scheduler.run(phone, turn, phone, message)
+
+    result = await run_load(users, messages, think_ms, scheduled)
+    stats = scheduler.get_stats()
+    scheduler.shutdown()
+    print_result("sync", result, f"max queue {stats['max_queue_depth']}, wait p95 {stats['wait_ms_p95']:.0f} ms, "
+                                 f"same-phone overlaps {turn.overlaps}")
+
+
+async def run_async_mode(users: int, messages: int, latency_ms: float, think_ms: float, max_concurrent: int):
+    turn = SimulatedAsyncTurn(latency_ms)
+    scheduler = ConversationScheduler(max_workers=1, max_concurrent=max_concurrent)
+
+    async def awaited(phone, message):
+        return await scheduler.arun(phone, turn, phone, message)
+
+    result = await run_load(users, messages, think_ms, awaited)
+    stats = scheduler.get_stats()
+    scheduler.shutdown()
+    print_result("async", result, f"max queue {stats['max_queue_depth']}, wait p95 {stats['wait_ms_p95']:.0f} ms, "
+                                  f"same-phone overlaps {turn.overlaps}")
+
+
+async def against_service(url: str, users: int, messages: int, think_ms: float):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+        async def send(phone, message):
+            payload = {"entry": [{"changes": [{"value": {"messages": [
+                {"from": phone, "type": "text", "text": {"body": message}}
+            ]}}]}]}
+            response = await client.post("/api/webhook", json=payload)
+            response.raise_for_status()
+
+        print(f"{users} users x {messages} messages against {url}\n")
+        print(f"{'mode':>10} | {'turns':>6} | {'time s':>8} | {'turns/s':>10} | {'p50 ms':>8} | {'p95 ms':>8} | notes")
+        print("-" * 90)
+        result = await run_load(users, messages, think_ms, send)
+        stats = (await client.get("/api/webhook/stats")).json()
+        print_result("service", result, f"max queue {stats['max_queue_depth']}, wait p95 {stats['wait_ms_p95']:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent WhatsApp users load test")
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Simulated turn latency (in-process mode)")
+    parser.add_argument("--think-ms", type=float, default=200, help="Max pause between a reply and the next message")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--max-concurrent", type=int, default=500)
+    parser.add_argument("--modes", default="inline,sync,async", help="In-process modes to compare")
+    parser.add_argument("--url", help="Run against a live chatbot instead of the in-process simulation")
+    args = parser.parse_args()
+
+    random.seed(0)
+    if args.url:
+        asyncio.run(against_service(args.url, args.users, args.messages, args.think_ms))
+    else:
+        asyncio.run(in_process(args.users, args.messages, args.latency_ms, args.think_ms, args.workers,
+                               args.max_concurrent, args.modes.split(",")))
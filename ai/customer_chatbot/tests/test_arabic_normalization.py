@@ -0,0 +1,98 @@
+import unittest
+import csv
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import arabic_utils
+from app.utils.arabic_utils import (
+    CAMEL_TOOLS_AVAILABLE,
+    clean_for_matching,
+    detect_language,
+    is_arabic_phonetic,
+    normalize_arabic,
+    normalize_arabic_reference,
+)
+
+CATALOG_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "DB", "11-15_sample25.csv",
+)
+
+# Spellings the catalog text rarely contains
+VARIANTS = [
+    "مَدِينَةُ نَصْرٍ", "الـــساحل الشمالـي", "إسكندرية", "آمون", "ٱلقاهرة", "مصطفى", "مرسى علم",
+    "شَقَّة", "فيلّا", "ﻻ", "ﷲ", "  هاوا   باي\t", "Hawabay", "Mountain View آي سيتي", "ٰرحمٰن", "٣ غرف",
+]
+
+
+def catalog_texts():
+    """Every cell and word of the catalog sample, plus VARIANTS."""
+    texts = list(VARIANTS)
+    if os.path.exists(CATALOG_CSV):
+        with open(CATALOG_CSV, encoding="utf-8") as f:
+            for row in csv.reader(f):
+                for cell in row:
+                    texts.append(cell)
+                    texts.extend(cell.split())
+    return texts
+
+
+def reference_language(text):
+    arabic = sum(1 for c in text if '؀' <= c <= 'ۿ')
+    english = sum(1 for c in text if c.isascii() and c.isalpha())
+    if not text or (english and not arabic):
+        return "english"
+    return "arabic" if arabic and not english else "mixed"
+
+
+class TestArabicNormalization(unittest.TestCase):
+    def setUp(self):
+        normalize_arabic.cache_clear()
+        self.texts = catalog_texts()
+
+    @unittest.skipUnless(os.path.exists(CATALOG_CSV), "catalog sample not available")
+    def test_matches_reference_on_catalog(self):
+        self.assertGreater(len(self.texts), 1000)
+        for text in self.texts:
+            self.assertEqual(normalize_arabic(text), normalize_arabic_reference(text), text)
+
+    def test_matches_fallback_on_variants(self):
+        # The translate table against the str.replace fallback, with or without camel-tools
+        camel = arabic_utils.CAMEL_TOOLS_AVAILABLE
+        arabic_utils.CAMEL_TOOLS_AVAILABLE = False
+        try:
+            for text in VARIANTS:
+                self.assertEqual(normalize_arabic(text), normalize_arabic_reference(text), text)
+        finally:
+            arabic_utils.CAMEL_TOOLS_AVAILABLE = camel
+
+    @unittest.skipUnless(CAMEL_TOOLS_AVAILABLE, "camel-tools not installed")
+    def test_matches_camel_tools_on_variants(self):
+        for text in VARIANTS:
+            self.assertEqual(normalize_arabic(text), normalize_arabic_reference(text), text)
+
+    def test_folding(self):
+        self.assertEqual(normalize_arabic("أَحْمَــد  مَدِينَة"), "احمد مدينه")
+        self.assertEqual(normalize_arabic("مصطفى"), "مصطفي")
+        self.assertEqual(normalize_arabic(""), "")
+        self.assertEqual(clean_for_matching(" Hawa BAY "), "hawa bay")
+
+    def test_script_detection(self):
+        for text in self.texts + ["", "123", "ـ"]:
+            self.assertEqual(detect_language(text), reference_language(text), text)
+        self.assertTrue(is_arabic_phonetic("هاواباي"))
+        self.assertFalse(is_arabic_phonetic("هاوا باي"))
+        self.assertFalse(is_arabic_phonetic("ـ"))
+
+    def test_repeated_text_is_memoized(self):
+        normalize_arabic("الساحل الشمالي")
+        normalize_arabic("الساحل الشمالي")
+        info = normalize_arabic.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
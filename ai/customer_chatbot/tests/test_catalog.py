@@ -0,0 +1,132 @@
+import unittest
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.routes import catalog as catalog_routes
+from app.services.catalog import CatalogService, NO_PROJECT_MAP, build_snapshot
+
+AREAS = [
+    {"areaId": "a1", "name": "New Capital", "nameAr": "العاصمة الإدارية"},
+    {"areaId": "a2", "name": "North Coast", "nameAr": "الساحل الشمالي"},
+    {"areaId": "a3", "name": "Tagamoo", "nameAr": "التجمع"},
+]
+PROJECTS = [
+    {"projectId": "p1", "name": "Green Heights 3", "areaId": "a1", "area": {"areaId": "a1", "name": "New Capital"}},
+    {"projectId": "p2", "name": "Palm View 11", "areaId": "a1", "area": {"areaId": "a1", "name": "New Capital"}},
+    {"projectId": "p3", "name": "Hawabay", "nameAr": "هاواباي", "areaId": "a2", "area": {"areaId": "a2", "name": "North Coast"}},
+    {"projectId": "p4", "name": "Crystal Resort 2", "areaId": "a2", "area": {"areaId": "a2", "name": "North Coast"}},
+]
+
+
+class CountingBackend:
+    def __init__(self):
+        self.calls = 0
+        self.areas = list(AREAS)
+
+    async def aget_areas(self):
+        self.calls += 1
+        return self.areas
+
+    async def aget_projects(self, area_name=None):
+        return PROJECTS
+
+    async def aget_unit_types(self):
+        return ["Villa", "Apartment"]
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = build_snapshot(AREAS, PROJECTS, ["Villa", "Apartment"])
+
+    def test_only_mentioned_entities_are_listed(self):
+        area_map, project_map, unit_type_map = self.snapshot.prompt_fragments("عايز شقة في هاواباي")
+
+        self.assertIn("Hawabay", project_map)
+        self.assertNotIn("Green Heights", project_map)
+        # No area mentioned: every area stays available for translation
+        self.assertEqual(area_map.count("\n"), len(AREAS) - 1)
+        self.assertIn("'شقة' → 'Apartment'", unit_type_map)
+
+    def test_projects_of_mentioned_or_known_area(self):
+        area_map, project_map, _ = self.snapshot.prompt_fragments("مشاريع الساحل الشمالي")
+        self.assertEqual(area_map, "- Arabic: 'الساحل الشمالي' → English: 'North Coast' (ID: a2)")
+        self.assertIn("Hawabay", project_map)
+        self.assertIn("Crystal Resort 2", project_map)
+        self.assertNotIn("Palm View", project_map)
+
+        _, project_map, _ = self.snapshot.prompt_fragments("3 غرف", area_id="a1")
+        self.assertIn("Green Heights 3", project_map)
+        self.assertNotIn("Hawabay", project_map)
+
+        _, project_map, _ = self.snapshot.prompt_fragments("3 غرف")
+        self.assertEqual(project_map, NO_PROJECT_MAP)
+
+    def test_project_limit(self):
+        _, project_map, _ = self.snapshot.prompt_fragments("Green Heights", area_id="a1", max_projects=1)
+        self.assertEqual(project_map, "- 'Green Heights 3' (ID: p1, Area: New Capital)")
+
+
+class TestCatalogService(unittest.TestCase):
+    def setUp(self):
+        self.backend = CountingBackend()
+        patcher = patch("app.services.backend_api.get_backend_api_service", return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.catalog = CatalogService(ttl_s=60, retry_s=60)
+
+    def test_fetched_once_until_invalidated(self):
+        async def turns():
+            return [await self.catalog.aget() for _ in range(5)]
+
+        snapshots = asyncio.run(turns())
+        self.assertEqual(self.backend.calls, 1)
+        self.assertTrue(all(s is snapshots[0] for s in snapshots))
+
+        self.catalog.invalidate()
+        unchanged = asyncio.run(self.catalog.aget())
+        self.assertEqual(self.backend.calls, 2)
+        self.assertEqual(unchanged.version, 1)
+
+        self.backend.areas = AREAS[:2]
+        self.catalog.invalidate()
+        self.assertEqual(asyncio.run(self.catalog.aget()).version, 2)
+
+    def test_empty_fetch_keeps_previous_snapshot(self):
+        first = asyncio.run(self.catalog.aget())
+        self.backend.areas = []  # backend errors come back as []
+        self.catalog.invalidate()
+
+        self.assertIs(asyncio.run(self.catalog.aget()), first)
+
+
+class TestCatalogRoutes(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(catalog_routes.router, prefix="/api")
+        self.client = TestClient(app)
+        self.catalog = CatalogService(ttl_s=60)
+        self.catalog._expires_at = float("inf")
+        patcher = patch.object(catalog_routes, "get_catalog_service", return_value=self.catalog)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_invalidate_requires_token_when_configured(self):
+        with patch.object(catalog_routes.get_settings(), "catalog_webhook_token", "s3cret"):
+            self.assertEqual(self.client.post("/api/catalog/invalidate").status_code, 403)
+            self.assertEqual(self.catalog._expires_at, float("inf"))
+
+            response = self.client.post("/api/catalog/invalidate", headers={"X-Catalog-Token": "s3cret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.catalog._expires_at, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
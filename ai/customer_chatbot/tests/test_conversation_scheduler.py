@@ -0,0 +1,92 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.conversation_scheduler import ConversationScheduler
+
+
+class TurnRecorder:
+    """Blocking fake turn that records overlap per phone and overall."""
+
+    def __init__(self, duration_s=0.05):
+        self.duration_s = duration_s
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = 0
+        self.overlaps = 0
+        self.order = []
+
+    def __call__(self, phone, seq):
+        with self.lock:
+            if self.active.get(phone):
+                self.overlaps += 1
+            self.active[phone] = self.active.get(phone, 0) + 1
+            self.max_active = max(self.max_active, sum(self.active.values()))
+            self.order.append((phone, seq))
+        time.sleep(self.duration_s)
+        with self.lock:
+            self.active[phone] -= 1
+        return f"{phone}:{seq}"
+
+
+class TestConversationScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = ConversationScheduler(max_workers=8, metrics_window=100)
+        self.addCleanup(self.scheduler.shutdown)
+
+    def _run_all(self, turns, fn):
+        async def main():
+            return await asyncio.gather(*(self.scheduler.run(phone, fn, phone, seq) for phone, seq in turns))
+        return asyncio.run(main())
+
+    def test_same_phone_serialized_in_arrival_order(self):
+        recorder = TurnRecorder(duration_s=0.02)
+        results = self._run_all([("a", i) for i in range(5)], recorder)
+
+        self.assertEqual(results, [f"a:{i}" for i in range(5)])
+        self.assertEqual(recorder.overlaps, 0)
+        self.assertEqual([seq for _, seq in recorder.order], list(range(5)))
+
+    def test_different_phones_run_in_parallel(self):
+        recorder = TurnRecorder(duration_s=0.1)
+        started = time.monotonic()
+        self._run_all([(str(p), 0) for p in range(8)], recorder)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertGreater(recorder.max_active, 1)
+
+    def test_event_loop_not_blocked(self):
+        async def main():
+            turn = asyncio.ensure_future(self.scheduler.run("a", time.sleep, 0.2))
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            responsive_after = time.monotonic() - started
+            await turn
+            return responsive_after
+        self.assertLess(asyncio.run(main()), 0.1)
+
+    def test_stats_and_failures(self):
+        def fail(phone, seq):
+            raise RuntimeError("llm timeout")
+
+        self._run_all([("a", 0), ("b", 0)], TurnRecorder(duration_s=0.01))
+        with self.assertRaises(RuntimeError):
+            self._run_all([("a", 1)], fail)
+
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats["completed"], 2)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["running"], 0)
+        self.assertEqual(stats["phones_active"], 0)  # per-phone locks are released
+        self.assertGreater(stats["run_ms_p95"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
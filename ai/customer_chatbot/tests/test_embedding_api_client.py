@@ -0,0 +1,218 @@
+import unittest
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.turn_embeddings import turn_scope
+from app.services.embedding_api_client import CircuitBreaker, EmbeddingAPIClient
+from shared.embedding_wire import decode_embeddings
+
+
+class FakeService:
+    """Embedding service handler: answers from a script of outcomes, then succeeds."""
+
+    def __init__(self, outcomes=(), ready=True, delay_s=0.0):
+        self.outcomes = list(outcomes)
+        self.ready = ready
+        self.delay_s = delay_s
+        self.embed_requests = 0
+        self.ready_requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/ready":
+            self.ready_requests += 1
+            return httpx.Response(200 if self.ready else 503)
+        self.embed_requests += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else 200
+        if outcome == "timeout":
+            raise httpx.ReadTimeout("timed out", request=request)
+        if outcome == "html":
+            return httpx.Response(200, text="<html>Bad Gateway</html>", headers={"content-type": "text/html"})
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        if outcome != 200:
+            return httpx.Response(outcome)
+        return httpx.Response(200, json={"embeddings": [[1.0, 0.0]]})
+
+
+class FakeLocalModel:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, normalize_embeddings=True):
+        self.calls += 1
+        return np.array([[0.0, 1.0]] * len(texts))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEmbeddingAPIClient(unittest.TestCase):
+    def _client(self, service, **kwargs):
+        kwargs.setdefault("max_retries", 2)
+        kwargs.setdefault("breaker_failures", 3)
+        kwargs.setdefault("breaker_reset_s", 30.0)
+        kwargs.setdefault("hedge_after_ms", 0)
+        client = EmbeddingAPIClient(transport=httpx.MockTransport(service), **kwargs)
+        client.settings = client.settings.model_copy(update={"embedding_retry_backoff_s": 0.0})
+        client.local = FakeLocalModel()
+        client._local_model = client.local
+        self.addCleanup(client.close)
+        return client
+    
+    def _embed(self, client, text):
+        _, vectors = client._fetch_text(text)
+        return vectors[0].tolist()
+
+    def test_transient_failure_is_retried(self):
+        service = FakeService(["timeout", 503])
+        client = self._client(service)
+        self.assertEqual(self._embed(client, "a"), [1.0, 0.0])
+        stats = client.get_stats()
+        self.assertEqual((stats["retries"], stats["remote_calls"], stats["fallback_calls"]), (2, 1, 0))
+        self.assertEqual(client.local.calls, 0)
+
+    def test_one_failed_call_does_not_disable_remote(self):
+        service = FakeService(["timeout"] * 3)
+        client = self._client(service)
+        self.assertEqual(self._embed(client, "a"), [0.0, 1.0])
+        self.assertEqual(self._embed(client, "b"), [1.0, 0.0])
+        stats = client.get_stats()
+        self.assertEqual((stats["fallback_calls"], stats["remote_calls"]), (1, 1))
+        self.assertEqual(stats["breaker_state"], CircuitBreaker.CLOSED)
+
+    def test_breaker_opens_and_probes_ready_before_closing(self):
+        service = FakeService(["timeout"] * 3, ready=False)
+        client = self._client(service, max_retries=0)
+        client.breaker.clock = clock = FakeClock()
+        for text in "abc":
+            self._embed(client, text)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        # Open: straight to the local model
+        requests = service.embed_requests
+        self._embed(client, "d")
+        self.assertEqual(service.embed_requests, requests)
+
+        # Half-open: the failed probe reopens the circuit
+        clock.now = 31
+        self._embed(client, "e")
+        self.assertEqual((service.ready_requests, service.embed_requests), (1, requests))
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        # Service back: probe succeeds and calls go remote again
+        service.ready = True
+        clock.now = 62
+        self.assertEqual(self._embed(client, "f"), [1.0, 0.0])
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(client.get_stats()["breaker_opened"], 1)
+
+    def test_late_failures_do_not_delay_the_probe(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_s=30.0, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # Calls that were in flight when the circuit opened fail later
+        breaker.clock.now = 20
+        breaker.record_failure()
+        breaker.clock.now = 30
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(breaker.times_opened, 1)
+
+        # A failed probe opens it for another reset period
+        self.assertTrue(breaker.acquire_probe())
+        breaker.record_failure(probe=True)
+        breaker.clock.now = 59
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        breaker.clock.now = 60
+        self.assertTrue(breaker.acquire_probe())
+
+    def test_retry_budget_limits_retries(self):
+        service = FakeService(["timeout"] * 100)
+        client = self._client(service, breaker_failures=100)
+        for text in "abcdefgh":
+            self._embed(client, text)
+        stats = client.get_stats()
+        # Bucket of 10 plus 0.2 per call
+        self.assertEqual(stats["retries"], 11)
+        self.assertGreater(stats["retries_denied"], 0)
+
+    def test_client_errors_are_not_retried(self):
+        service = FakeService([422])
+        client = self._client(service, breaker_failures=1)
+        self.assertEqual(self._embed(client, "a"), [0.0, 1.0])
+        self.assertEqual(service.embed_requests, 1)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_undecodable_body_falls_back_and_charges_breaker(self):
+        service = FakeService(["html"])
+        client = self._client(service, breaker_failures=1)
+        self.assertEqual(self._embed(client, "a"), [0.0, 1.0])
+        stats = client.get_stats()
+        self.assertEqual((stats["fallback_calls"], stats["failed_calls"]), (1, 1))
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_undecodable_body_falls_back_when_hedged(self):
+        service = FakeService(["html"])
+        client = self._client(service, hedge_after_ms=500)
+        self.assertEqual(self._embed(client, "a"), [0.0, 1.0])
+        stats = client.get_stats()
+        self.assertEqual((stats["fallback_calls"], stats["failed_calls"]), (1, 1))
+
+    def test_slow_remote_is_hedged_locally(self):
+        service = FakeService(delay_s=0.5)
+        client = self._client(service, hedge_after_ms=20)
+        self.assertEqual(self._embed(client, "a"), [0.0, 1.0])
+        stats = client.get_stats()
+        self.assertEqual((stats["hedged_calls"], stats["hedge_local_wins"]), (1, 1))
+
+        service.delay_s = 0.0
+        self.assertEqual(self._embed(client, "b"), [1.0, 0.0])
+        self.assertEqual(client.get_stats()["hedged_calls"], 1)
+
+    def test_fallback_vectors_are_not_reused_as_remote_ones(self):
+        service = FakeService(["timeout"] * 3)
+        client = self._client(service)
+        with turn_scope() as memo:
+            self.assertEqual(client.embed_text_array("a").tolist(), [0.0, 1.0])
+            self.assertEqual(client.embed_text_array("a").tolist(), [1.0, 0.0])
+            self.assertEqual(client.embed_text_array("a").tolist(), [1.0, 0.0])
+        self.assertIsNotNone(memo.get(client.local_memo_namespace, "a"))
+        self.assertEqual(memo.get_stats()["model_calls"], 2)
+
+
+
+class TestDecodeEmbeddings(unittest.TestCase):
+    def test_empty_batch_in_every_format(self):
+        responses = [
+            httpx.Response(200, content=b"", headers={
+                "content-type": "application/octet-stream", "x-embedding-dimension": "0", "x-embedding-dtype": "float32"}),
+            httpx.Response(200, json={"embeddings_b64": "", "count": 0, "dimension": 0, "dtype": "float16"}),
+            httpx.Response(200, json={"embeddings": [], "count": 0, "dimension": 0}),
+        ]
+        for response in responses:
+            self.assertEqual(decode_embeddings(response).shape, (0, 0))
+
+    def test_binary_batch(self):
+        vectors = np.arange(6, dtype="<f2").reshape(2, 3)
+        response = httpx.Response(200, content=vectors.tobytes(), headers={
+            "content-type": "application/octet-stream", "x-embedding-dimension": "3", "x-embedding-dtype": "float16"})
+        decoded = decode_embeddings(response)
+        self.assertEqual(decoded.dtype, np.float32)
+        self.assertEqual(decoded.tolist(), vectors.astype(np.float32).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
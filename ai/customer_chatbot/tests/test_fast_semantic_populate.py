@@ -0,0 +1,199 @@
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.catalog import CatalogService, build_snapshot
+from app.services.fast_semantic_matcher import FastSemanticMatcher, ENTITY_TABLES, catalog_rows
+
+AREAS = [
+    {"areaId": "1", "name": "New Capital", "nameAr": "العاصمة الإدارية"},
+    {"areaId": "2", "name": "North Coast", "nameAr": "الساحل الشمالي"},
+]
+PROJECTS = [
+    {"projectId": "11", "name": "Green Heights", "areaId": "1"},
+    {"projectId": "12", "name": "Palm View", "areaId": "1"},
+    {"projectId": "21", "name": "Hawabay", "areaId": "2"},
+    {"projectId": "22", "name": "Crystal Resort", "areaId": "2"},
+    {"projectId": "23", "name": "Marina Bay", "areaId": "2"},
+]
+
+
+class FakeEmbeddingClient:
+    memo_namespace = "api:test"
+
+    def __init__(self):
+        self.calls = 0
+        self.texts = []
+
+    def embed_texts_array(self, texts):
+        self.calls += 1
+        self.texts.extend(texts)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+class FakeConnection:
+    """In-memory embeddings tables that count statements."""
+
+    def __init__(self):
+        self.tables = {spec["table"]: {} for spec in ENTITY_TABLES.values()}
+        for key in ("1", "2"):
+            self.tables["unit_types_embeddings"][key] = {"embedding": None, "embedding_hash": None}
+        self.state = None  # None: embedding_catalog_state does not exist yet
+        self.statements = []
+        self.closed = False
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        from psycopg2 import errors
+        self.conn.statements.append(sql)
+        if "SELECT digest FROM embedding_catalog_state" in sql:
+            if self.conn.state is None:
+                raise errors.UndefinedTable()
+            self.result = [(self.conn.state,)] if self.conn.state != "" else []
+        elif "CREATE TABLE IF NOT EXISTS embedding_catalog_state" in sql:
+            self.conn.state = ""
+        elif "INSERT INTO embedding_catalog_state" in sql:
+            self.conn.state = params[1]
+        elif "SELECT unit_type_id, name, name_ar" in sql:
+            names = {"1": ("Apartment", "شقة"), "2": ("Villa", "فيلا")}
+            self.result = [(int(k),) + names[k] for k in self.conn.tables["unit_types_embeddings"]]
+        elif "CASE WHEN embedding IS NULL" in sql:
+            table = sql.split("FROM")[1].split()[0]
+            self.result = [(k, r["embedding_hash"] if r["embedding"] is not None else None)
+                           for k, r in self.conn.tables[table].items()]
+        elif sql.startswith("DELETE FROM"):
+            table = sql.split()[2]
+            for key in params[0]:
+                self.conn.tables[table].pop(key, None)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+def fake_execute_values(cur, sql, rows, page_size=100):
+    cur.conn.statements.append(sql)
+    table = "unit_types_embeddings" if sql.lstrip().startswith("UPDATE") else sql.split("INSERT INTO")[1].split()[0]
+    for row in rows:
+        cur.conn.tables[table][str(row[0])] = {"embedding": row[-2], "embedding_hash": row[-1]}
+
+
+def matcher_rows(matcher):
+    return catalog_rows(matcher.catalog.get(), matcher.model_identity)
+
+
+class TestFastSemanticPopulate(unittest.TestCase):
+    def setUp(self):
+        self.conn = FakeConnection()
+        self.catalog = CatalogService(ttl_s=60)
+        self._install(PROJECTS, version=1)
+        patcher = patch("app.services.fast_semantic_matcher.execute_values", side_effect=fake_execute_values)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _install(self, projects, version):
+        self.catalog._snapshot = build_snapshot(AREAS, projects, [], version=version)
+        self.catalog._expires_at = float("inf")
+
+    def _matcher(self):
+        self.embeddings = FakeEmbeddingClient()
+        with patch("app.services.fast_semantic_matcher.get_embedding_api_client", return_value=self.embeddings), \
+             patch("app.services.fast_semantic_matcher.get_catalog_service", return_value=self.catalog):
+            matcher = FastSemanticMatcher(chunk_size=2)
+        matcher._conn = self.conn
+        return matcher
+
+    def test_first_population_is_chunked(self):
+        self._matcher()._ensure_embeddings_populated()
+        # 2 areas, 5 projects and 2 unit types in chunks of 2
+        self.assertEqual(self.embeddings.calls, 1 + 3 + 1)
+        self.assertEqual(len(self.conn.tables["projects_embeddings"]), 5)
+        self.assertTrue(all(r["embedding"] is not None for r in self.conn.tables["unit_types_embeddings"].values()))
+        self.assertIn("North Coast الساحل الشمالي", self.embeddings.texts)
+        self.assertTrue(self.conn.state)
+
+    def test_restart_with_same_catalog_is_one_lookup(self):
+        self._matcher()._ensure_embeddings_populated()
+        self.conn.statements.clear()
+
+        matcher = self._matcher()
+        matcher._ensure_embeddings_populated()
+        matcher._ensure_embeddings_populated()
+        self.assertEqual(self.embeddings.calls, 0)
+        self.assertEqual(len(self.conn.statements), 1)
+
+    def test_only_changed_entities_reembedded(self):
+        matcher = self._matcher()
+        matcher._ensure_embeddings_populated()
+        previous = self.conn.state
+
+        projects = [dict(p) for p in PROJECTS]
+        projects[2]["name"] = "Hawabay Resort"
+        projects[4]["areaId"] = "1"
+        self._install(projects, version=2)
+        self.embeddings.texts.clear()
+        matcher._ensure_embeddings_populated()
+
+        self.assertEqual(self.embeddings.texts, ["Hawabay Resort", "Marina Bay"])
+        self.assertNotEqual(self.conn.state, previous)
+
+    def test_entities_dropped_from_catalog_are_deleted(self):
+        matcher = self._matcher()
+        matcher._ensure_embeddings_populated()
+
+        self._install([p for p in PROJECTS if p["projectId"] not in ("12", "23")], version=2)
+        self.embeddings.texts.clear()
+        stats = matcher.populate(matcher_rows(matcher), "digest-v2")
+
+        self.assertEqual(sorted(self.conn.tables["projects_embeddings"]), ["11", "21", "22"])
+        self.assertEqual(len(self.conn.tables["unit_types_embeddings"]), 2)
+        self.assertEqual((stats["projects"]["removed"], stats["projects"]["embedded"]), (2, 0))
+        self.assertEqual(self.embeddings.texts, [])
+
+    def test_forced_population_also_deletes_dropped_entities(self):
+        matcher = self._matcher()
+        matcher._ensure_embeddings_populated()
+
+        self._install(PROJECTS[:1], version=2)
+        stats = matcher.populate(matcher_rows(matcher), "digest-v2", force=True)
+
+        self.assertEqual(list(self.conn.tables["projects_embeddings"]), ["11"])
+        self.assertEqual(stats["projects"]["removed"], 4)
+
+    def test_empty_catalog_is_not_populated(self):
+        self.catalog._snapshot = build_snapshot([], [], [], version=1)
+        self._matcher()._ensure_embeddings_populated()
+        self.assertEqual(self.conn.statements, [])
+        self.assertEqual(self.embeddings.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
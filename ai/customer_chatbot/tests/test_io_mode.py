@@ -0,0 +1,176 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.io_mode import blocking_io, is_blocking_io, offload, run_to_completion, sync_variant
+from app.core.session_store import SessionStore
+from app.services.conversation import ConversationService
+from app.services.conversation_scheduler import ConversationScheduler
+from app.graph.workflow import build_conversation_workflow
+
+
+class FakeLLM:
+    """LLM with ~latency_s per call: sleeps in the thread (sync) or awaits (async)."""
+
+    def __init__(self, latency_s=0.05):
+        self.latency_s = latency_s
+        self.calls = {"sync": 0, "async": 0}
+
+    def _answer(self, system_prompt):
+        if "نوايا" in (system_prompt or ""):
+            return "greeting"
+        if "JSON" in (system_prompt or ""):
+            return "{}"
+        return "أهلاً بيك"
+
+    def generate_response(self, user_message, system_prompt=None, **kwargs):
+        self.calls["sync"] += 1
+        time.sleep(self.latency_s)
+        return self._answer(system_prompt)
+
+    async def agenerate_response(self, user_message, system_prompt=None, **kwargs):
+        if is_blocking_io():
+            return self.generate_response(user_message, system_prompt, **kwargs)
+        self.calls["async"] += 1
+        await asyncio.sleep(self.latency_s)
+        return self._answer(system_prompt)
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.sessions = {}
+
+    def get_conversation_history(self, phone_number, limit=10):
+        return []
+
+    def search_similar(self, query, phone_number=None, limit=5):
+        return []
+
+    def get_customer_session(self, phone_number):
+        return self.sessions.get(phone_number)
+
+    def save_customer_session(self, phone_number, **session):
+        self.sessions[phone_number] = session
+
+    async def aget_conversation_history(self, phone_number, limit=10):
+        return self.get_conversation_history(phone_number, limit)
+
+    async def asearch_similar(self, query, phone_number=None, limit=5):
+        return self.search_similar(query, phone_number, limit)
+
+    async def aget_customer_session(self, phone_number):
+        return self.get_customer_session(phone_number)
+
+    async def asave_customer_session(self, phone_number, **session):
+        self.save_customer_session(phone_number, **session)
+
+    def store_message(self, **record):
+        pass
+
+
+class FakeBackend:
+    def get_areas(self):
+        return []
+
+    def get_projects(self, area_name=None):
+        return []
+
+    def get_unit_types(self):
+        return []
+
+    async def aget_areas(self):
+        return self.get_areas()
+
+    async def aget_projects(self, area_name=None):
+        return self.get_projects(area_name)
+
+    async def aget_unit_types(self):
+        return self.get_unit_types()
+
+
+class TestIOMode(unittest.TestCase):
+    def test_run_to_completion(self):
+        async def add(a, b):
+            return a + b
+
+        self.assertEqual(run_to_completion(add(1, 2)), 3)
+        self.assertEqual(sync_variant(add)(2, 3), 5)
+
+    def test_run_to_completion_rejects_suspension(self):
+        with self.assertRaises(RuntimeError):
+            run_to_completion(asyncio.sleep(0))
+
+    def test_offload_inline_when_blocking(self):
+        async def thread_name():
+            return await offload(lambda: threading.current_thread().name)
+
+        with blocking_io():
+            self.assertEqual(run_to_completion(thread_name()), threading.current_thread().name)
+        self.assertNotEqual(asyncio.run(thread_name()), threading.current_thread().name)
+
+
+class TestWorkflowModes(unittest.TestCase):
+    def setUp(self):
+        self.llm = FakeLLM()
+        self.vector_store = FakeVectorStore()
+        self.session_store = SessionStore(self.vector_store, backend="memory", ttl_s=60, max_entries=100)
+        backend = FakeBackend()
+        for target, value in [
+            ("app.graph.nodes.get_llm_service", self.llm),
+            ("app.graph.nodes.get_vector_store", self.vector_store),
+            ("app.graph.nodes.get_session_store", self.session_store),
+            ("app.graph.nodes.get_backend_api_service", backend),
+            ("app.services.backend_api.get_backend_api_service", backend),
+            ("app.graph.nodes.get_turn_persister", MagicMock()),
+            ("app.services.name_matcher.get_name_matcher_service", MagicMock()),
+            ("app.services.conversation.get_session_store", self.session_store),
+        ]:
+            patcher = patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _state(self, phone):
+        return ConversationService._initial_state(None, phone, "السلام عليكم")
+
+    def test_sync_and_async_modes_agree(self):
+        sync_state = build_conversation_workflow("sync").invoke(self._state("a"))
+        async_state = asyncio.run(build_conversation_workflow("async").ainvoke(self._state("b")))
+
+        for key in ("intent", "response", "is_complete", "extracted_requirements"):
+            self.assertEqual(sync_state.get(key), async_state.get(key), key)
+        self.assertEqual(sync_state["intent"], "greeting")
+        self.assertGreater(self.llm.calls["sync"], 0)
+        self.assertGreater(self.llm.calls["async"], 0)
+        self.assertEqual(self.vector_store.sessions["a"], self.vector_store.sessions["b"])
+
+    def test_concurrent_async_turns_overlap(self):
+        self.llm.latency_s = 0.2
+        service = ConversationService(mode="async")
+        service.scheduler = ConversationScheduler(max_workers=1, max_concurrent=100)
+        self.addCleanup(service.scheduler.shutdown)
+
+        async def main():
+            return await asyncio.gather(*(
+                service.process_message(f"20100000{i:04d}", "السلام عليكم") for i in range(50)
+            ))
+
+        started = time.monotonic()
+        results = asyncio.run(main())
+        elapsed = time.monotonic() - started
+
+        self.assertTrue(all(r.get("intent") == "greeting" and "error" not in r for r in results))
+        # Far less than the 50 turns back to back
+        serial_s = self.llm.latency_s * self.llm.calls["async"]
+        self.assertLess(elapsed, serial_s / 5)
+        self.assertEqual(service.scheduler.get_stats()["completed"], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,6 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.name_matcher import NameMatcherService, MatchResult
 from app.utils.arabic_utils import normalize_arabic, is_arabic_phonetic
-from app.utils.franco_converter import convert_franco_to_english
 
 class TestArabicUtils(unittest.TestCase):
     def test_normalize_arabic(self):
@@ -103,7 +102,7 @@ class TestNameMatcher(unittest.TestCase):
         self.assertTrue(result.matched)
         self.assertEqual(result.value, "Zed Towers")
 
-    @patch('app.services.name_matcher.convert_franco_to_english')
+    @patch('app.services.transliteration.llm_transliterate')
     def test_match_franco_arabic(self, mock_converter):
         # Setup mock
         mock_converter.return_value = "hyde park"
@@ -118,6 +117,39 @@ class TestNameMatcher(unittest.TestCase):
             
             self.assertTrue(result.matched)
             self.assertEqual(result.value, "Hyde Park")
+        
+        # Explained by the catalog's phonetic keys: no LLM call
+        mock_converter.assert_not_called()
+
+    def test_projects_for_area_uses_sub_index(self):
+        self.matcher._projects_cache = [
+            {'projectId': 1, 'name': 'Hyde Park', 'area': {'areaId': 1}},
+            {'projectId': 2, 'name': 'Zed Towers', 'area': {'areaId': 2}},
+            {'projectId': 3, 'name': 'Mountain View', 'area': {'areaId': 1}},
+        ]
+        self.assertEqual([p['projectId'] for p in self.matcher.get_projects_for_area(1)], [1, 3])
+        self.assertEqual(self.matcher.get_projects_for_area(9), [])
+
+        # A refreshed cache gets a new index
+        self.matcher._projects_cache = [{'projectId': 4, 'name': 'Palm Hills', 'area': {'areaId': 1}}]
+        self.assertEqual([p['projectId'] for p in self.matcher.get_projects_for_area(1)], [4])
+
+    def test_suggestions_ranked_by_score_then_db_order(self):
+        self.matcher._areas_cache = [
+            {'areaId': 1, 'name': 'Madinaty East'},
+            {'areaId': 2, 'name': 'Madinaty West'},
+            {'areaId': 3, 'name': 'Mokattam'},
+        ]
+        result = self.matcher.match_area("Madinat")
+        self.assertTrue(result.matched)
+        self.assertEqual(result.id, 1)  # tie with 'Madinaty West': first in DB order
+
+    def test_unit_types_match_plain_names(self):
+        self.matcher._unit_types_cache = ['Apartment', 'Villa']
+        result = self.matcher.match_unit_type("villa")
+        self.assertTrue(result.matched)
+        self.assertEqual(result.value, "Villa")
+        self.assertIsNone(result.id)
 
 if __name__ == '__main__':
     unittest.main()
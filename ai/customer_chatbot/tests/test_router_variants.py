@@ -19,6 +19,7 @@ load_dotenv(env_path)
 os.environ["GENERATOR_TYPE"] = "cohere"
 
 from app.graph.nodes import classify_inquiry_logic
+from app.core.io_mode import sync_variant
 from app.core.logging_config import setup_logging
 
 # Setup logging
@@ -101,7 +102,7 @@ def run_tests():
         try:
             # Call the actual Router Logic
             context_str = test.get("context", "")
-            result = classify_inquiry_logic(test['msg'], context_str=context_str)
+            result = sync_variant(classify_inquiry_logic)(test['msg'], context_str=context_str)
             classification = result.get("type")
             entities = result.get("entities", {})
             
@@ -0,0 +1,107 @@
+import unittest
+import os
+import sys
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.catalog import CatalogService, build_snapshot
+from app.services.semantic_matcher import SemanticMatcher
+
+AREAS = [
+    {"areaId": "a1", "name": "New Capital", "nameAr": "العاصمة الإدارية"},
+    {"areaId": "a2", "name": "North Coast", "nameAr": "الساحل الشمالي"},
+]
+PROJECTS = [
+    {"projectId": "p1", "name": "Green Heights 3", "areaId": "a1"},
+    {"projectId": "p2", "name": "Palm View 11", "areaId": "a1"},
+    {"projectId": "p3", "name": "Hawabay", "areaId": "a2"},
+    {"projectId": "p4", "name": "Crystal Resort 2", "areaId": "a2"},
+]
+
+
+class TrigramEmbeddings:
+    """Deterministic stand-in for the model: hashed character trigrams, L2-normalized."""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.texts_embedded = 0
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim)
+        padded = f"  {text.lower()}  "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode()) % self.dim] += 1
+        return vector / np.linalg.norm(vector)
+
+    def embed_texts(self, texts):
+        self.texts_embedded += len(texts)
+        return [self._vector(t).tolist() for t in texts]
+
+    def embed_text(self, text):
+        return self.embed_texts([text])[0]
+
+    def compute_similarity(self, query, passages):
+        vectors = np.array(self.embed_texts([query] + list(passages)))
+        return (vectors[1:] @ vectors[0]).tolist()
+
+
+class TestSemanticMatcher(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = TrigramEmbeddings()
+        self.catalog = CatalogService(ttl_s=60)
+        self.catalog._snapshot = build_snapshot(AREAS, PROJECTS, [])
+        self.catalog._expires_at = float("inf")
+        with patch("app.services.semantic_matcher.get_embedding_service", return_value=self.embeddings), \
+             patch("app.services.semantic_matcher.get_catalog_service", return_value=self.catalog):
+            self.matcher = SemanticMatcher()
+
+    def test_entities_embedded_once(self):
+        for query in ("north cost", "new capitl", "الساحل"):
+            self.matcher.match_area(query)
+            self.matcher.match_project(query)
+        # 2 areas + 4 projects once, plus one vector per lookup
+        self.assertEqual(self.embeddings.texts_embedded, 6 + 6)
+
+    def test_same_answers_as_pairwise_similarity(self):
+        texts = [p["name"] for p in PROJECTS]
+        for query in ("green hights", "crystal resort", "palm", "hawa bay"):
+            scores = self.embeddings.compute_similarity(query, texts)
+            best = int(np.argmax(scores))
+            result = self.matcher.match_project(query, threshold=0.0)
+            self.assertEqual(result["value"], texts[best], query)
+            self.assertAlmostEqual(result["score"], scores[best], places=5)
+
+    def test_area_submatrix(self):
+        result = self.matcher.match_project("Crystal Resort 2", area_id="a1", threshold=0.0)
+        self.assertIn(result["value"], {"Green Heights 3", "Palm View 11"})
+        self.assertEqual(self.matcher.match_project("Crystal Resort 2", area_id="a2")["id"], "p4")
+        self.assertEqual(self.matcher.match_project("x", area_id="a9"), {"matched": False})
+
+    def test_rebuilt_only_when_catalog_changes(self):
+        self.matcher.match_area("north coast")
+        embedded = self.embeddings.texts_embedded
+
+        # Same content, new fetch: version unchanged, nothing rebuilt
+        self.catalog._snapshot = build_snapshot(AREAS, PROJECTS, [], version=1)
+        self.matcher.match_area("north coast")
+        self.assertEqual(self.embeddings.texts_embedded, embedded + 1)
+
+        # New project: only its name is embedded
+        projects = PROJECTS + [{"projectId": "p5", "name": "Marina Bay", "areaId": "a2"}]
+        self.catalog._snapshot = build_snapshot(AREAS, projects, [], version=2)
+        self.assertEqual(self.matcher.match_project("marina bay", area_id="a2")["id"], "p5")
+        self.assertEqual(self.embeddings.texts_embedded, embedded + 1 + 2)
+
+    def test_unit_type(self):
+        result = self.matcher.match_unit_type("فيلا")
+        self.assertTrue(result["matched"])
+        self.assertEqual(result["value"], "Villa")
+
+
+if __name__ == '__main__':
+    unittest.main()
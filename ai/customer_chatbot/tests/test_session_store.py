@@ -0,0 +1,148 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import time
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.session_store import LocalSessionCache, SessionStore
+from app.core.vector_store import VectorStoreService
+
+
+class CountingConnection:
+    """In-memory customer_sessions table that counts database round trips."""
+
+    def __init__(self, schema="extended"):
+        self.schema = schema
+        self.rows = {}
+        self.round_trips = 0
+        self.closed = False
+
+    def cursor(self):
+        return CountingCursor(self)
+
+    def commit(self):
+        self.round_trips += 1
+
+    def rollback(self):
+        self.round_trips += 1
+
+
+class CountingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.round_trips += 1
+        if "information_schema" in sql:
+            workflow = params[0] if self.conn.schema == "extended" else []
+            self.result = [(c,) for c in workflow]
+        elif sql.lstrip().startswith("SELECT"):
+            row = self.conn.rows.get(params[0])
+            self.result = [row[:sql.count(",") + 1]] if row else []
+        else:
+            self.conn.rows[params[0]] = tuple(params[1:]) + (False, False, 0)[len(params) - 4:]
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+def _vector_store(conn):
+    with patch("app.core.vector_store.VectorIndexManager"):
+        store = VectorStoreService()
+    store._initialized = True
+    store.connection = conn
+    return store
+
+
+def _session(**overrides):
+    session = {"extracted_requirements": {"location": "التجمع"}, "last_intent": "search", "is_complete": False,
+               "confirmed": False, "awaiting_confirmation": False, "confirmation_attempt": 0}
+    session.update(overrides)
+    return session
+
+
+class TestSessionSchema(unittest.TestCase):
+    def test_schema_probed_once(self):
+        conn = CountingConnection("basic")
+        vector_store = _vector_store(conn)
+        vector_store.save_customer_session("1", **_session(confirmed=True))
+        conn.round_trips = 0
+
+        session = vector_store.get_customer_session("1")
+        vector_store.get_customer_session("1")
+        self.assertEqual(conn.round_trips, 2)  # no failed extended query, no fallback
+        self.assertEqual(session["last_intent"], "search")
+        self.assertFalse(session["confirmed"])  # not stored by the basic schema
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.conn = CountingConnection()
+        self.store = SessionStore(vector_store=_vector_store(self.conn), backend="memory", ttl_s=60, max_entries=100)
+        self.store.initialize()
+        self.conn.round_trips = 0
+
+    def test_hot_session_served_from_cache(self):
+        self.assertIsNone(self.store.get("1"))
+        self.assertIsNone(self.store.get("1"))  # new customers are cached too
+        self.store.save("1", _session())
+        reads = self.conn.round_trips
+
+        session = self.store.get("1")
+        session["extracted_requirements"]["location"] = "mutated"  # callers get copies
+        self.assertEqual(self.store.get("1"), _session())
+        self.assertEqual(self.conn.round_trips, reads)
+        self.assertEqual(self.store.get_stats()["db_reads"], 1)
+
+    def test_saves_in_one_turn_become_one_upsert(self):
+        with self.store.write_scope():
+            self.store.save("1", _session(last_intent="greeting"))
+            self.store.save("1", _session(is_complete=True))
+            self.assertTrue(self.store.get("1")["is_complete"])  # read-your-writes within the turn
+            self.assertEqual(self.conn.round_trips, 0)
+        self.assertEqual(self.conn.round_trips, 2)  # UPSERT + commit
+        self.assertEqual(self.store.get_stats()["writes_coalesced"], 1)
+
+        # An unchanged session is not written again
+        with self.store.write_scope():
+            self.store.save("1", _session(is_complete=True))
+        self.assertEqual(self.conn.round_trips, 2)
+        self.assertEqual(self.store.get_stats()["writes_skipped"], 1)
+
+    def test_failed_write_drops_cached_session(self):
+        self.store.save("1", _session())
+        with patch.object(self.store.vector_store, "save_customer_session", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                self.store.save("1", _session(confirmed=True))
+        self.assertIsNone(self.store.cache.get("1"))
+
+
+class TestLocalSessionCache(unittest.TestCase):
+    def test_ttl_and_lru_eviction(self):
+        cache = LocalSessionCache(ttl_s=0.05, max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        self.assertIsNone(cache.get("b"))  # least recently used
+        self.assertEqual(cache.get("a"), "1")
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.vector_store import VectorStoreService
+from app.services.transliteration import PhoneticIndex, TransliterationService
+from app.utils.transliteration import phonetic_key, transliterate, transliteration_candidates
+
+CATALOG = ["Hawabay", "Hyde Park", "Mountain View", "Crystal Resort", "Palm Hills", "Sodic", "Mivida", "Taj City"]
+
+
+class MemoStore:
+    """Stand-in for the transliteration_memo table."""
+
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.reads = 0
+        self.down = False
+
+    def get_transliteration(self, text):
+        self.reads += 1
+        if self.down:
+            raise psycopg2.OperationalError("server closed the connection")
+        return self.rows.get(text)
+
+    def save_transliteration(self, text, transliteration, source):
+        if self.down:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.rows[text] = transliteration
+
+
+class TestRuleBasedTransliteration(unittest.TestCase):
+    def test_candidates(self):
+        self.assertEqual(transliterate("هاواباي"), "hawabay")
+        self.assertIn("mivida", transliteration_candidates("ميفيدا"))
+        self.assertIn("palm hilz", transliteration_candidates("بالم هيلز"))
+        self.assertEqual(transliterate("الجونة"), "el gona")
+
+    def test_phonetic_key_matches_across_scripts(self):
+        for arabic, english in [("هاواي باي", "Hawabay"), ("هايدبارك", "Hyde Park"), ("ماونتن فيو", "Mountain View"),
+                                ("كريستال ريزورت", "Crystal Resort"), ("سوديك", "Sodic"), ("تاج سيتي", "Taj City")]:
+            self.assertEqual(phonetic_key(arabic), phonetic_key(english), arabic)
+
+
+class TestTransliterationService(unittest.TestCase):
+    def setUp(self):
+        self.catalog = PhoneticIndex(CATALOG, cutoff=85.0)
+        self.store = MemoStore()
+        self.service = TransliterationService(store=self.store)
+
+    @patch("app.services.transliteration.llm_transliterate")
+    def test_catalog_names_resolved_locally(self, llm):
+        for arabic, english in [("هاواباي", "hawabay"), ("ميفيدا", "mivida"), ("بالم هيلز", "palm hills"),
+                                ("كريستال ريسورت", "crystal resort")]:
+            self.assertEqual(self.service.to_english(arabic, self.catalog), english)
+        llm.assert_not_called()
+        self.assertEqual(self.store.reads, 0)
+
+    @patch("app.services.transliteration.llm_transliterate", return_value="zayed dunes")
+    def test_llm_answers_are_memoized(self, llm):
+        self.assertEqual(self.service.to_english("زايدديونز", self.catalog), "zayed dunes")
+        self.assertEqual(self.service.to_english("زايدديونز", self.catalog), "zayed dunes")
+        self.assertEqual(llm.call_count, 1)
+        self.assertEqual(self.store.rows, {"زايدديونز": "zayed dunes"})
+
+        # A new process reads the memo table
+        service = TransliterationService(store=self.store)
+        self.assertEqual(service.to_english("زايدديونز"), "zayed dunes")
+        self.assertEqual(llm.call_count, 1)
+        self.assertEqual(service.get_stats()["memo"], 1)
+
+    @patch("app.services.transliteration.llm_transliterate", return_value=None)
+    def test_rules_without_llm(self, llm):
+        self.assertEqual(self.service.to_english("زد"), "zd")
+        self.assertEqual(self.store.rows, {})
+        self.assertEqual(self.service.get_stats()["rules"], 1)
+
+    @patch("app.services.transliteration.llm_transliterate", return_value="zayed dunes")
+    def test_memo_table_retried_after_cooldown(self, llm):
+        service = TransliterationService(store=self.store, store_retry_s=60.0)
+        self.store.down = True
+        self.assertEqual(service.to_english("زايدديونز"), "zayed dunes")
+        reads = self.store.reads
+
+        # Within the cooldown the table is not touched
+        service.to_english("نيو زايد")
+        self.assertEqual(self.store.reads, reads)
+
+        self.store.down = False
+        service._store_retry_at = 0.0
+        service.to_english("سيتي جيت")
+        self.assertEqual(self.store.reads, reads + 1)
+        self.assertIn("سيتي جيت", self.store.rows)
+
+    @patch("app.services.transliteration.llm_transliterate", side_effect=lambda text: f"name {len(text)}")
+    def test_memory_memo_is_bounded(self, llm):
+        service = TransliterationService(store=self.store, memo_size=2)
+        for name in ("اا", "ااا", "اااا"):
+            service.to_english(name)
+        self.assertEqual(service.get_stats()["memo_entries"], 2)
+
+
+class TestTransliterationMemoTable(unittest.TestCase):
+    def _store(self):
+        store = VectorStoreService()
+        store._initialized = True
+        store._local.connection = self.conn = MagicMock(closed=False)
+        self.cursor = self.conn.cursor.return_value.__enter__.return_value
+        return store
+
+    def test_errors_roll_back(self):
+        store = self._store()
+        self.cursor.execute.side_effect = psycopg2.OperationalError("timeout")
+        with self.assertRaises(psycopg2.Error):
+            store.get_transliteration("هاواباي")
+        with self.assertRaises(psycopg2.Error):
+            store.save_transliteration("هاواباي", "hawabay", source="llm")
+        self.assertEqual(self.conn.rollback.call_count, 2)
+
+    def test_lookup_and_save_truncate_alike(self):
+        store = self._store()
+        self.cursor.fetchone.return_value = None
+        key = "ب" * 300
+        store.save_transliteration(key, "b", source="llm")
+        store.get_transliteration(key)
+        saved, looked_up = (call.args[1][0] for call in self.cursor.execute.call_args_list)
+        self.assertEqual(saved, looked_up)
+        self.assertEqual(len(saved), 255)
+
+
+if __name__ == '__main__':
+    unittest.main()
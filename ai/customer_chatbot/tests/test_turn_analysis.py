@@ -0,0 +1,178 @@
+import unittest
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from pydantic import ValidationError
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.llm import ILLMService, llm_usage_scope
+from app.core.session_store import SessionStore
+from app.services.conversation import ConversationService
+from app.graph import nodes
+from app.graph.turn_analysis import TurnAnalysis
+from app.graph.workflow import build_conversation_workflow
+from test_io_mode import FakeBackend, FakeVectorStore
+
+
+class AnalysisLLM:
+    """Returns a fixed TurnAnalysis and counts the calls of each kind."""
+
+    def __init__(self, analysis=None, error=None):
+        self.analysis = analysis
+        self.error = error
+        self.calls = {"structured": 0, "intent": 0, "extraction": 0, "router": 0, "response": 0}
+
+    async def agenerate_structured(self, user_message, schema, system_prompt=None):
+        self.calls["structured"] += 1
+        if self.error:
+            raise self.error
+        return schema.model_validate(self.analysis)
+
+    async def agenerate_response(self, user_message, system_prompt=None, **kwargs):
+        system_prompt = system_prompt or ""
+        if "نوايا" in system_prompt:
+            self.calls["intent"] += 1
+            return "greeting"
+        if "JSON صالح" in system_prompt:
+            self.calls["extraction"] += 1
+            return "{}"
+        if "router" in system_prompt:
+            self.calls["router"] += 1
+            return '{"type": "general_qa", "entities": {}}'
+        self.calls["response"] += 1
+        return "أهلاً"
+
+
+class ExactMatcher:
+    def _match(self, name, **kwargs):
+        return SimpleNamespace(matched=True, value=name, id=6, alternatives=[], confidence=1.0)
+
+    match_area = match_project = match_unit_type = _match
+
+
+class TestTurnAnalysisSchema(unittest.TestCase):
+    def test_validates_output(self):
+        analysis = TurnAnalysis.model_validate({
+            "intent": "inquiry",
+            "requirements": {"area": "New Capital", "bedrooms": "3"},
+            "inquiry": {"type": "price_check", "entities": {"project": "Green Heights 3"}},
+        })
+        self.assertEqual(analysis.requirements.bedrooms, 3)
+        self.assertEqual(analysis.inquiry.entities.project, "Green Heights 3")
+
+    def test_keeps_catalog_string_ids(self):
+        # Backend area/project ids are varchar nanoids
+        analysis = TurnAnalysis.model_validate({
+            "intent": "new_search",
+            "requirements": {"area": "New Capital", "area_id": "V1StGXR8_Z5jdHi6B-myT",
+                             "project": "Green Heights", "project_id": "3kTMd0_Rn2Ql8Ytd-xyzA"},
+        })
+        self.assertEqual(analysis.requirements.area_id, "V1StGXR8_Z5jdHi6B-myT")
+        self.assertEqual(analysis.requirements.project_id, "3kTMd0_Rn2Ql8Ytd-xyzA")
+
+    def test_rejects_unknown_intent(self):
+        with self.assertRaises(ValidationError):
+            TurnAnalysis.model_validate({"intent": "buy_now"})
+
+    def test_structured_output_errors_raise(self):
+        with self.assertRaises(ValueError):
+            ILLMService._parsed({"raw": None, "parsed": None, "parsing_error": "bad json"}, TurnAnalysis)
+
+
+class TestLLMUsage(unittest.TestCase):
+    def test_usage_is_accounted_per_turn(self):
+        runnable = MagicMock()
+        runnable.invoke.return_value = SimpleNamespace(content="ok", usage_metadata={"input_tokens": 120, "output_tokens": 8})
+
+        with llm_usage_scope() as usage:
+            ILLMService._invoke(runnable, [])
+            ILLMService._invoke(runnable, [])
+        ILLMService._invoke(runnable, [])  # outside the turn: not counted
+
+        stats = usage.get_stats()
+        self.assertEqual((stats["calls"], stats["input_tokens"], stats["output_tokens"]), (2, 240, 16))
+
+
+class TestAnalyzeTurn(unittest.TestCase):
+    def setUp(self):
+        self.llm = AnalysisLLM()
+        self.vector_store = FakeVectorStore()
+        backend = FakeBackend()
+        backend.aget_price_range = MagicMock(side_effect=lambda **kwargs: asyncio.sleep(0, {"min": 1, "max": 2}))
+        for target, value in [
+            ("app.graph.nodes.get_llm_service", self.llm),
+            ("app.graph.nodes.get_vector_store", self.vector_store),
+            ("app.graph.nodes.get_session_store", SessionStore(self.vector_store, backend="none")),
+            ("app.graph.nodes.get_backend_api_service", backend),
+            ("app.services.backend_api.get_backend_api_service", backend),
+            ("app.graph.nodes.get_turn_persister", MagicMock()),
+            ("app.services.name_matcher.get_name_matcher_service", ExactMatcher()),
+        ]:
+            patcher = patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _state(self, message, **session):
+        state = ConversationService._initial_state(None, "201000000001", message)
+        state.update(session)
+        return state
+
+    def test_refine_intent_still_applies(self):
+        self.llm.analysis = {"intent": "follow_up"}
+        state = self._state("تمام", awaiting_confirmation=True, extracted_requirements={"area": "Tagamoo"})
+
+        updates = asyncio.run(nodes.analyze_turn(state))
+
+        self.assertEqual(updates["intent"], "confirm")
+        self.assertEqual(updates["extracted_requirements"], {"area": "Tagamoo"})
+
+    def test_requirements_merged_and_inquiry_kept(self):
+        self.llm.analysis = {
+            "intent": "inquiry",
+            "requirements": {"area": "New Capital", "needs_garden": False},
+            "inquiry": {"type": "price_check", "entities": {"area": "New Capital"}},
+        }
+        updates = asyncio.run(nodes.analyze_turn(self._state("بكام الشقق في العاصمة؟")))
+
+        self.assertEqual(updates["extracted_requirements"], {"area": "New Capital", "area_id": 6, "needs_garden": False})
+        self.assertEqual(updates["inquiry_classification"]["type"], "price_check")
+
+    def test_string_ids_do_not_fall_back(self):
+        self.llm.analysis = {
+            "intent": "new_search",
+            "requirements": {"area": "New Capital", "area_id": "V1StGXR8_Z5jdHi6B-myT"},
+        }
+        asyncio.run(nodes.analyze_turn(self._state("عايز شقة في العاصمة")))
+
+        self.assertEqual(self.llm.calls["structured"], 1)
+        self.assertEqual((self.llm.calls["intent"], self.llm.calls["extraction"]), (0, 0))
+
+    def test_falls_back_to_separate_calls(self):
+        self.llm.error = ValueError("LLM output does not match TurnAnalysis")
+        updates = asyncio.run(nodes.analyze_turn(self._state("السلام عليكم")))
+
+        self.assertEqual(updates["intent"], "greeting")
+        self.assertEqual((self.llm.calls["intent"], self.llm.calls["extraction"]), (1, 1))
+
+    def test_combined_workflow_makes_one_analysis_call(self):
+        self.llm.analysis = {
+            "intent": "inquiry",
+            "requirements": {"area": "New Capital"},
+            "inquiry": {"type": "price_check", "entities": {"area": "New Capital"}},
+        }
+        workflow = build_conversation_workflow("async", analysis="combined")
+        final_state = asyncio.run(workflow.ainvoke(self._state("بكام الشقق في العاصمة؟")))
+
+        self.assertEqual(final_state["intent"], "inquiry")
+        self.assertEqual(final_state["inquiry_results"]["type"], "price_range")
+        self.assertEqual(self.llm.calls["structured"], 1)
+        self.assertEqual((self.llm.calls["intent"], self.llm.calls["extraction"], self.llm.calls["router"]), (0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.embeddings import EmbeddingService
+from app.core.turn_embeddings import current_memo, turn_scope
+from app.core.turn_persister import TurnJournal, TurnPersister
+
+
+class FakeModel:
+    """Counts encode() calls; vectors derived from the text length."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, convert_to_tensor=False, normalize_embeddings=True):
+        import torch
+        self.calls.append(list(texts))
+        return torch.tensor([[float(len(t)), 1.0] for t in texts])
+
+
+class TestTurnEmbeddingMemo(unittest.TestCase):
+    def setUp(self):
+        self.service = EmbeddingService(model_name="fake-model", backend="torch")
+        self.model = FakeModel()
+        self.service._model = self.model
+
+    def test_each_text_embedded_once_per_turn(self):
+        with turn_scope() as memo:
+            first = self.service.embed_text("شقة في التجمع")
+            again = self.service.embed_text("شقة في التجمع")
+            batch = self.service.embed_texts(["شقة في التجمع", "villa"])
+            self.service.embed_texts(["villa", "villa"])
+
+        self.assertEqual(first, again)
+        self.assertEqual(batch[0], first)
+        self.assertEqual(self.model.calls, [["شقة في التجمع"], ["villa"]])
+        stats = memo.get_stats()
+        self.assertEqual(stats["model_calls"], 2)
+        self.assertEqual(stats["model_calls_avoided"], 2)
+        self.assertEqual(stats["texts_reused"], 4)
+
+    def test_no_memo_outside_a_turn(self):
+        self.assertIsNone(current_memo())
+        self.service.embed_text("villa")
+        self.service.embed_text("villa")
+        self.assertEqual(len(self.model.calls), 2)
+
+    def test_turns_do_not_share_vectors(self):
+        with turn_scope():
+            self.service.embed_text("villa")
+        with turn_scope():
+            self.service.embed_text("villa")
+        self.assertEqual(len(self.model.calls), 2)
+
+    def test_compute_similarity_reuses_turn_vectors(self):
+        with turn_scope():
+            self.service.compute_similarity("villa", ["Villa", "Duplex"])
+            scores = self.service.compute_similarity("villa", ["Villa", "Duplex"])
+        self.assertEqual(len(self.model.calls), 1)
+        self.assertEqual(len(scores), 2)
+
+    def test_persister_uses_vectors_from_the_turn(self):
+        store = MagicMock()
+        embedder = MagicMock()
+        embedder.embed_texts.side_effect = lambda texts: [[0.0, 0.0] for _ in texts]
+        persister = TurnPersister(vector_store=store, journal=TurnJournal(":memory:"), batch_size=8)
+        records = [
+            {"phone_number": "1", "message_type": "user", "message_text": "hi", "metadata": {}, "embedding": [2.0, 1.0]},
+            {"phone_number": "1", "message_type": "assistant", "message_text": "hello", "metadata": {}},
+        ]
+        with patch("app.core.turn_persister.get_embedding_service", return_value=embedder):
+            persister.submit(records)  # no worker: stored inline
+
+        embedder.embed_texts.assert_called_once_with(["hello"])
+        _, embeddings = store.store_messages.call_args[0][:2]
+        self.assertEqual(embeddings, [[2.0, 1.0], [0.0, 0.0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+from unittest.mock import MagicMock, create_autospec, patch
+import os
+import sys
+import tempfile
+import threading
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.turn_persister import TurnJournal, TurnPersister
+from app.core.vector_store import VectorStoreService
+
+
+class FakeVectorStore:
+    """Records bulk inserts instead of writing to Postgres."""
+
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def connect(self):
+        return MagicMock(closed=False)
+
+    def store_messages(self, records, embeddings, conn=None):
+        with self.lock:
+            self.calls += 1
+            if any("\x00" in r["message_text"] for r in records):
+                # What psycopg2 raises for a NUL byte in a text parameter
+                raise ValueError("A string literal cannot contain NUL (0x00) characters.")
+            if self.fail_times:
+                self.fail_times -= 1
+                raise RuntimeError("database down")
+            self.batches.append((records, embeddings))
+        return len(records)
+
+    @property
+    def stored(self):
+        return [r for records, _ in self.batches for r in records]
+
+    def as_vector_store(self):
+        """Mock with VectorStoreService's interface that delegates to this fake."""
+        store = create_autospec(VectorStoreService, instance=True)
+        store.connect.side_effect = self.connect
+        store.store_messages.side_effect = self.store_messages
+        return store
+
+
+def _records(n, phone="201000000000"):
+    return [{"phone_number": phone, "message_type": "user", "message_text": f"message {i}", "metadata": {}} for i in range(n)]
+
+
+class TestTurnPersister(unittest.TestCase):
+    def setUp(self):
+        embedder = MagicMock()
+        embedder.embed_texts.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        patcher = patch("app.core.turn_persister.get_embedding_service", return_value=embedder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.embedder = embedder
+
+    def _persister(self, store, journal=None, **kwargs):
+        options = {"batch_size": 8, "flush_interval_s": 0.01, "max_pending": 1000, "enqueue_timeout_s": 0.5}
+        options.update(kwargs)
+        return TurnPersister(vector_store=store.as_vector_store(), journal=journal if journal is not None else TurnJournal(":memory:"), **options)
+
+    def test_messages_are_batched_in_order(self):
+        store = FakeVectorStore()
+        persister = self._persister(store)
+        persister.start()
+        for i in range(10):
+            persister.submit(_records(2, phone=str(i)))
+        self.assertTrue(persister.flush(timeout=5))
+        persister.close()
+
+        self.assertEqual(len(store.stored), 20)
+        self.assertEqual([r["phone_number"] for r in store.stored[::2]], [str(i) for i in range(10)])
+        self.assertTrue(all(len(records) <= 8 for records, _ in store.batches))
+        self.assertTrue(all("created_at" in r for r in store.stored))
+        # Embeddings are computed per batch, not per message
+        self.assertEqual(self.embedder.embed_texts.call_count, len(store.batches))
+
+    def test_failed_batches_are_retried(self):
+        store = FakeVectorStore(fail_times=2)
+        persister = self._persister(store)
+        persister.start()
+        persister.submit(_records(3))
+        self.assertTrue(persister.flush(timeout=10))
+        persister.close()
+
+        self.assertEqual(len(store.stored), 3)
+        self.assertEqual(persister.get_stats()["failures"], 2)
+
+    def test_journal_survives_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), "journal.sqlite3")
+        store = FakeVectorStore(fail_times=100)
+
+        # Database unreachable: nothing is stored, messages stay journaled
+        first = self._persister(store, journal=TurnJournal(path))
+        first.start()
+        first.submit(_records(5))
+        first.close(timeout=0.2)
+        self.assertEqual(len(TurnJournal(path)), 5)
+
+        store.fail_times = 0
+        second = self._persister(store, journal=TurnJournal(path))
+        second.start()
+        self.assertTrue(second.flush(timeout=5))
+        second.close()
+        self.assertEqual(len(store.stored), 5)
+
+    def test_full_journal_applies_backpressure(self):
+        store = FakeVectorStore()
+        # No worker running: the submitter has to store a batch itself
+        persister = self._persister(store, max_pending=4, enqueue_timeout_s=0.01)
+        persister.submit(_records(6))
+        self.assertEqual(len(store.stored), 6)
+        self.assertEqual(persister.get_stats()["inline_flushes"], 1)
+        self.assertEqual(persister.get_stats()["pending"], 0)
+
+    def test_poison_message_is_dead_lettered(self):
+        store = FakeVectorStore()
+        journal = TurnJournal(":memory:")
+        persister = self._persister(store, journal=journal, max_attempts=2)
+        records = _records(3)
+        records[1]["message_text"] = "bad\x00text"
+        journal.append(records)
+
+        # The bulk insert fails twice, then the batch is stored message by message
+        self.assertFalse(persister._flush_batch())
+        self.assertFalse(persister._flush_batch())
+        self.assertTrue(persister._flush_batch())
+
+        self.assertEqual([r["message_text"] for r in store.stored], ["message 0", "message 2"])
+        self.assertEqual(len(journal), 0)
+        (row_id, record, error), = journal.dead_letters()
+        self.assertEqual(record["message_text"], "bad\x00text")
+        self.assertIn("NUL", error)
+        self.assertEqual(persister.get_stats()["dead_lettered"], 1)
+
+    def test_poison_message_does_not_block_later_turns(self):
+        store = FakeVectorStore()
+        persister = self._persister(store, max_pending=2, enqueue_timeout_s=0.01, max_attempts=2)
+        poison = _records(1)
+        poison[0]["message_text"] = "\x00"
+        persister.submit(poison)
+        for i in range(4):
+            persister.submit(_records(1, phone=str(i)))
+
+        self.assertEqual([r["phone_number"] for r in store.stored], ["0", "1", "2", "3"])
+        self.assertEqual(persister.get_stats()["pending"], 0)
+        self.assertEqual(len(persister.journal.dead_letters()), 1)
+
+    def test_outage_is_not_dead_lettered(self):
+        store = FakeVectorStore(fail_times=100)
+        journal = TurnJournal(":memory:")
+        persister = self._persister(store, journal=journal, max_attempts=1)
+        journal.append(_records(2))
+
+        for _ in range(3):
+            self.assertFalse(persister._flush_batch())
+        self.assertEqual(len(journal), 2)
+        self.assertEqual(journal.dead_letters(), [])
+
+
+class TestStoreMessages(unittest.TestCase):
+    def test_bulk_insert_is_one_statement(self):
+        store = VectorStoreService()
+        store._initialized = True
+        store.index_manager = MagicMock()
+        conn = MagicMock()
+        records = _records(3)
+        records[0]["created_at"] = "2026-01-01T10:00:00"
+        with patch("app.core.vector_store.execute_values") as execute_values:
+            stored = store.store_messages(records, [[0.5, 0.25]] * 3, conn=conn)
+
+        self.assertEqual(stored, 3)
+        execute_values.assert_called_once()
+        rows = execute_values.call_args.args[2]
+        self.assertEqual([row[2] for row in rows], ["message 0", "message 1", "message 2"])
+        self.assertEqual((rows[0][5], rows[1][5]), ("2026-01-01T10:00:00", None))
+        self.assertEqual(rows[0][3].tolist(), [0.5, 0.25])
+        conn.commit.assert_called_once()
+        store.index_manager.note_inserts.assert_called_once_with(3)
+
+    def test_mismatched_embeddings_are_rejected(self):
+        store = VectorStoreService()
+        with self.assertRaises(ValueError):
+            store.store_messages(_records(2), [[0.1]], conn=MagicMock())
+
+
+if __name__ == '__main__':
+    unittest.main()
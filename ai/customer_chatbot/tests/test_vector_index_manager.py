@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.vector_index_manager import IndexPlan, IndexState, VectorIndexManager, parse_version
+
+
+class TestIndexPolicy(unittest.TestCase):
+    def setUp(self):
+        self.manager = VectorIndexManager(MagicMock())
+        self.manager.min_rows = 10_000
+        self.manager.hnsw_max_rows = 2_000_000
+
+    def test_small_tables_get_no_ann_index(self):
+        self.assertEqual(self.manager.plan_for(0).method, "none")
+        self.assertEqual(self.manager.plan_for(9_999).method, "none")
+
+    def test_hnsw_then_ivfflat_by_row_count(self):
+        self.assertEqual(self.manager.plan_for(100_000).method, "hnsw")
+        big = self.manager.plan_for(4_000_000)
+        self.assertEqual(big.method, "ivfflat")
+        self.assertEqual(big.lists, 2000)  # sqrt(rows) past 1M rows
+
+    def test_old_pgvector_falls_back_to_ivfflat(self):
+        plan = self.manager.plan_for(100_000, parse_version("0.4.4"))
+        self.assertEqual(plan.method, "ivfflat")
+        self.assertEqual(plan.lists, 100)
+
+    def test_ivfflat_rebuilt_when_lists_drift(self):
+        state = IndexState(method="ivfflat", lists=100)
+        self.assertFalse(self.manager.needs_rebuild(state, IndexPlan("ivfflat", lists=150)))
+        self.assertTrue(self.manager.needs_rebuild(state, IndexPlan("ivfflat", lists=400)))
+        self.assertTrue(self.manager.needs_rebuild(state, IndexPlan("hnsw", m=16, ef_construction=64)))
+        # The old fixed-lists index on a near-empty table gets dropped
+        self.assertTrue(self.manager.needs_rebuild(state, IndexPlan("none")))
+
+    def test_probe_settings_follow_index_type(self):
+        self.manager.state = IndexState(rows=1_000_000, method="hnsw")
+        self.assertEqual(self.manager.query_settings(5), ["SET LOCAL hnsw.ef_search = 80"])
+        self.assertEqual(self.manager.ef_search(100), 200)
+
+        self.manager.state = IndexState(rows=4_000_000, method="ivfflat", lists=2000)
+        self.assertEqual(self.manager.query_settings(5), ["SET LOCAL ivfflat.probes = 45"])
+
+
+class TestFilteredSearch(unittest.TestCase):
+    def setUp(self):
+        self.manager = VectorIndexManager(MagicMock())
+        self.manager.state = IndexState(rows=500_000, method="hnsw", partial_phones=frozenset({"hot"}))
+
+    def test_regular_phone_uses_exact_scan(self):
+        sql, params = self.manager.build_search([0.1], "cold", 5)
+        self.assertIn("MATERIALIZED", sql)
+        self.assertEqual(params, ("cold", [0.1], [0.1], 5))
+        self.assertEqual(self.manager.query_settings(5, "cold"), [])
+
+    def test_hot_phone_uses_partial_index(self):
+        sql, params = self.manager.build_search([0.1], "hot", 5)
+        self.assertNotIn("MATERIALIZED", sql)
+        self.assertIn("WHERE phone_number = %s", sql)
+        self.assertEqual(params, ([0.1], "hot", [0.1], 5))
+
+    def test_unfiltered_search(self):
+        sql, params = self.manager.build_search([0.1], None, 3)
+        self.assertNotIn("WHERE", sql)
+        self.assertEqual(params, ([0.1], [0.1], 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
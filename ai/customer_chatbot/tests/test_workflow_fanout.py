@@ -0,0 +1,125 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.session_store import SessionStore
+from app.core.vector_store import VectorStoreService
+from app.services.conversation import ConversationService
+from app.graph.workflow import build_conversation_workflow
+from test_io_mode import FakeBackend, FakeLLM, FakeVectorStore
+from test_session_store import CountingConnection
+
+
+class TimedLLM(FakeLLM):
+    """FakeLLM that records when each kind of call ran."""
+
+    def __init__(self, latency_s=0.1):
+        super().__init__(latency_s)
+        self.spans = {}
+
+    def generate_response(self, user_message, system_prompt=None, **kwargs):
+        started = time.monotonic()
+        answer = super().generate_response(user_message, system_prompt, **kwargs)
+        self.spans.setdefault(self._answer(system_prompt), []).append((started, time.monotonic()))
+        return answer
+
+    async def agenerate_response(self, user_message, system_prompt=None, **kwargs):
+        started = time.monotonic()
+        answer = await super().agenerate_response(user_message, system_prompt, **kwargs)
+        self.spans.setdefault(self._answer(system_prompt), []).append((started, time.monotonic()))
+        return answer
+
+
+class ExactMatcher:
+    """Name matcher that accepts every name as is."""
+
+    def match_area(self, name):
+        return SimpleNamespace(matched=True, value=name, id=6, alternatives=[], confidence=1.0)
+
+
+def _overlap(a, b):
+    return a[0] < b[1] and b[0] < a[1]
+
+
+class TestWorkflowFanOut(unittest.TestCase):
+    def setUp(self):
+        self.llm = TimedLLM()
+        self.vector_store = FakeVectorStore()
+        self.vector_store.sessions["s"] = {
+            "extracted_requirements": {"area": "Tagamoo"}, "last_intent": "new_search", "is_complete": False,
+            "confirmed": False, "awaiting_confirmation": False, "confirmation_attempt": 0,
+        }
+        session_store = SessionStore(self.vector_store, backend="none")
+        backend = FakeBackend()
+        for target, value in [
+            ("app.graph.nodes.get_llm_service", self.llm),
+            ("app.graph.nodes.get_vector_store", self.vector_store),
+            ("app.graph.nodes.get_session_store", session_store),
+            ("app.graph.nodes.get_backend_api_service", backend),
+            ("app.services.backend_api.get_backend_api_service", backend),
+            ("app.graph.nodes.get_turn_persister", MagicMock()),
+            ("app.services.name_matcher.get_name_matcher_service", ExactMatcher()),
+        ]:
+            patcher = patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self, mode, fan_out=True, phone="s"):
+        state = ConversationService._initial_state(None, phone, "السلام عليكم")
+        workflow = build_conversation_workflow(mode, fan_out=fan_out)
+        if mode == "async":
+            return asyncio.run(workflow.ainvoke(state))
+        return workflow.invoke(state)
+
+    def test_intent_and_extraction_run_concurrently(self):
+        for mode in ("async", "sync"):
+            with self.subTest(mode=mode):
+                self.llm.spans.clear()
+                self._run(mode)
+                self.assertTrue(_overlap(self.llm.spans["greeting"][0], self.llm.spans["{}"][0]))
+
+    def test_linear_flow_runs_them_in_order(self):
+        self._run("async", fan_out=False)
+        self.assertFalse(_overlap(self.llm.spans["greeting"][0], self.llm.spans["{}"][0]))
+
+    def test_join_sees_both_branches(self):
+        parallel = self._run("async")
+        linear = self._run("async", fan_out=False)
+
+        for key in ("intent", "extracted_requirements", "is_complete", "missing_fields", "response"):
+            self.assertEqual(parallel.get(key), linear.get(key), key)
+        self.assertEqual(parallel["intent"], "greeting")
+        # Loaded session merged with the (empty) extraction
+        self.assertEqual(parallel["extracted_requirements"], {"area": "Tagamoo", "area_id": 6})
+
+
+class TestConnectionReuse(unittest.TestCase):
+    def test_connection_of_finished_thread_is_reused(self):
+        conn = CountingConnection()
+        with patch("app.core.vector_store.VectorIndexManager"):
+            vector_store = VectorStoreService()
+
+        def first():
+            vector_store.connection = conn
+
+        seen = []
+        worker = threading.Thread(target=first)
+        worker.start()
+        worker.join()
+        worker = threading.Thread(target=lambda: seen.append(vector_store.connection))
+        worker.start()
+        worker.join()
+
+        self.assertEqual(seen, [conn])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,12 +3,14 @@ Embed API Routes.
 Endpoints for text embedding operations.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Union
 import logging
 
 from app.core.embeddings import get_embedding_service
+from app.core.batcher import get_embedding_batcher
+from app.utils.wire_format import binary_response, encode_base64, negotiate_format
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -37,46 +39,96 @@ class EmbedBatchResponse(BaseModel):
     dimension: int
 
 
-@router.post("/text", response_model=EmbedTextResponse)
-async def embed_text(request: EmbedTextRequest):
+class EmbedTextBase64Response(BaseModel):
+    """Response with a base64-encoded little-endian vector."""
+    embedding_b64: str
+    dimension: int
+    dtype: str
+
+
+class EmbedBatchBase64Response(BaseModel):
+    """Response with base64-encoded vectors as one row-major matrix."""
+    embeddings_b64: str
+    count: int
+    dimension: int
+    dtype: str
+
+
+def _wire_format(accept: Optional[str], encoding: Optional[str], dtype: Optional[str]):
+    """Negotiate the response format, rejecting unknown values."""
+    try:
+        return negotiate_format(accept, encoding, dtype)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/text", response_model=Union[EmbedTextResponse, EmbedTextBase64Response])
+async def embed_text(
+    request: EmbedTextRequest,
+    encoding: Optional[str] = Query(None, description="json (default), base64 or binary"),
+    dtype: Optional[str] = Query(None, description="float32 (default) or float16 for base64/binary"),
+    accept: Optional[str] = Header(None)
+):
     """
     Convert single text to embedding vector.
     
     Args:
         request: Text to embed
+        encoding: Response encoding; 'Accept: application/octet-stream' selects binary
+        dtype: Element type for the compact encodings
         
     Returns:
-        Embedding vector with dimension
+        Embedding vector with dimension (JSON list, base64 or raw bytes)
     """
     try:
+        encoding, dtype = _wire_format(accept, encoding, dtype)
         embedding_service = get_embedding_service()
         
         if not embedding_service.is_ready:
             raise HTTPException(status_code=503, detail="Model not ready")
         
-        embedding = embedding_service.embed_text(request.text)
+        embedding = await get_embedding_batcher().embed(request.text)
+        
+        if encoding == "binary":
+            return binary_response([embedding], dtype)
+        if encoding == "base64":
+            return EmbedTextBase64Response(
+                embedding_b64=encode_base64([embedding], dtype),
+                dimension=len(embedding),
+                dtype=dtype
+            )
         
         return EmbedTextResponse(
             embedding=embedding,
             dimension=len(embedding)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error embedding text: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/batch", response_model=EmbedBatchResponse)
-async def embed_batch(request: EmbedBatchRequest):
+@router.post("/batch", response_model=Union[EmbedBatchResponse, EmbedBatchBase64Response])
+async def embed_batch(
+    request: EmbedBatchRequest,
+    encoding: Optional[str] = Query(None, description="json (default), base64 or binary"),
+    dtype: Optional[str] = Query(None, description="float32 (default) or float16 for base64/binary"),
+    accept: Optional[str] = Header(None)
+):
     """
     Convert multiple texts to embedding vectors.
     
     Args:
         request: List of texts to embed
+        encoding: Response encoding; 'Accept: application/octet-stream' selects binary
+        dtype: Element type for the compact encodings
         
     Returns:
-        List of embedding vectors
+        List of embedding vectors (JSON lists, base64 matrix or raw bytes)
     """
     try:
+        encoding, dtype = _wire_format(accept, encoding, dtype)
         embedding_service = get_embedding_service()
         
         if not embedding_service.is_ready:
@@ -85,7 +137,17 @@ async def embed_batch(request: EmbedBatchRequest):
         if len(request.texts) > 100:
             raise HTTPException(status_code=400, detail="Maximum 100 texts per batch")
         
-        embeddings = embedding_service.embed_texts(request.texts)
+        embeddings = await get_embedding_batcher().embed_many(request.texts)
+        
+        if encoding == "binary":
+            return binary_response(embeddings, dtype)
+        if encoding == "base64":
+            return EmbedBatchBase64Response(
+                embeddings_b64=encode_base64(embeddings, dtype),
+                count=len(embeddings),
+                dimension=len(embeddings[0]) if embeddings else 0,
+                dtype=dtype
+            )
         
         return EmbedBatchResponse(
             embeddings=embeddings,
@@ -1,15 +1,22 @@
 """
 Search API Routes.
-Endpoints for semantic similarity search using pgvector.
+Endpoints for semantic similarity search.
+Served from the in-memory vector index when it is loaded, pgvector otherwise.
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Tuple
+import asyncio
 import logging
 
-from app.core.embeddings import get_embedding_service
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.core.batcher import get_embedding_batcher
 from app.core.database import get_database
+from app.core.embeddings import get_embedding_service
+from app.core.vector_index import FUSIONS, SEARCH_MODES, get_vector_index
 from app.utils.language_detection import detect_language
 
 logger = logging.getLogger(__name__)
@@ -32,11 +39,141 @@ class SearchResponse(BaseModel):
     alternatives: List[SearchMatch]
 
 
+class ResolveSpan(BaseModel):
+    """A candidate span to resolve against one entity type."""
+    text: str
+    entity: Literal["area", "project", "unit_type"]
+    area_id: Optional[int] = None
+    top_k: Optional[int] = Field(None, ge=1, le=20)
+    threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+class ResolveRequest(BaseModel):
+    """Batch of spans resolved with a single embedding pass."""
+    spans: List[ResolveSpan] = Field(..., max_length=64)
+    mode: Optional[Literal["single", "fused"]] = None
+    fusion: Optional[Literal["max", "rrf"]] = None
+
+
+class ResolveResponse(BaseModel):
+    """Per-span search responses, in request order."""
+    results: List[SearchResponse]
+
+
+# entity -> (index attribute, id field, default top_k, default threshold)
+ENTITY_SEARCH = {
+    "area": ("areas", "area_id", 5, 0.45),
+    "project": ("projects", "project_id", 5, 0.45),
+    "unit_type": ("unit_types", None, 3, 0.4),
+}
+
+
+def _require_model():
+    """Reject searches while the model is still loading."""
+    if not get_embedding_service().is_ready:
+        raise HTTPException(status_code=503, detail="Model not ready")
+
+
+def _search_options(mode: Optional[str], fusion: Optional[str]) -> Tuple[str, str]:
+    """Resolve the search mode/fusion, falling back to the configured defaults."""
+    settings = get_settings()
+    mode = mode or settings.search_mode
+    fusion = fusion or settings.search_fusion
+    if mode not in SEARCH_MODES or fusion not in FUSIONS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid search mode/fusion '{mode}'/'{fusion}', expected {SEARCH_MODES} / {FUSIONS}"
+        )
+    return mode, fusion
+
+
+async def _search_entities(
+    entity: str,
+    query_embedding: List[float],
+    language: str,
+    top_k: int,
+    area_id: Optional[int] = None,
+    mode: str = "single",
+    fusion: str = "max"
+) -> List[dict]:
+    """Top-k entity search, preferring the in-memory index.
+    
+    Args:
+        entity: 'areas', 'projects' or 'unit_types'
+        query_embedding: Query embedding vector
+        language: 'en' or 'ar' (ignored in fused mode)
+        top_k: Number of results to return
+        area_id: Optional area filter (projects only)
+        mode: 'single' (detected-language column) or 'fused' (both columns)
+        fusion: 'max' or 'rrf' (fused mode only)
+    """
+    index = get_vector_index()
+    if index is not None and index.is_loaded:
+        return getattr(index, entity).search(
+            query_embedding, language, top_k=top_k, area_id=area_id, mode=mode, fusion=fusion
+        )
+    
+    db = get_database()
+    if mode == "fused":
+        return await run_in_threadpool(
+            db.search_fused, entity, query_embedding, top_k=top_k, fusion=fusion, area_id=area_id
+        )
+    if entity == "areas":
+        return await run_in_threadpool(db.search_areas_by_language, query_embedding, language, top_k=top_k)
+    if entity == "projects":
+        return await run_in_threadpool(
+            db.search_projects_by_language, query_embedding, language, area_id=area_id, top_k=top_k
+        )
+    return await run_in_threadpool(db.search_unit_types_by_language, query_embedding, language, top_k=top_k)
+
+
+def _format_response(results: List[dict], id_field: Optional[str], threshold: float) -> SearchResponse:
+    """Build a SearchResponse from ranked rows.
+    
+    Args:
+        results: Rows with 'name', 'similarity' and optionally an id field
+        id_field: Row key holding the entity ID (None for unit types)
+        threshold: Minimum similarity for the best row to count as a match
+    """
+    if not results:
+        return SearchResponse(matched=False, alternatives=[])
+    
+    # Format alternatives
+    alternatives = [
+        SearchMatch(
+            value=r['name'],
+            id=r[id_field] if id_field else None,
+            score=float(r['similarity'])
+        )
+        for r in results
+    ]
+    
+    # Check if best match meets threshold
+    best = alternatives[0]
+    
+    if best.score >= threshold:
+        return SearchResponse(
+            matched=True,
+            value=best.value,
+            id=best.id,
+            score=best.score,
+            alternatives=alternatives[1:] if len(alternatives) > 1 else []
+        )
+    
+    return SearchResponse(
+        matched=False,
+        score=best.score,
+        alternatives=alternatives
+    )
+
+
 @router.get("/area", response_model=SearchResponse)
 async def search_area(
     q: str = Query(..., description="Query text to search"),
     top_k: int = Query(5, ge=1, le=20, description="Number of top matches"),
-    threshold: float = Query(0.45, ge=0.0, le=1.0, description="Minimum similarity score")
+    threshold: float = Query(0.45, ge=0.0, le=1.0, description="Minimum similarity score"),
+    mode: Optional[str] = Query(None, description="'single' or 'fused' (default: SEARCH_MODE)"),
+    fusion: Optional[str] = Query(None, description="'max' or 'rrf' (default: SEARCH_FUSION)")
 ):
     """
     Search for similar areas using semantic similarity.
@@ -45,51 +182,23 @@ async def search_area(
         q: Query text (can be Arabic or English)
         top_k: Number of top matches to return
         threshold: Minimum similarity score for a match
+        mode: Search mode override
+        fusion: Fusion method override
         
     Returns:
         Top matches with similarity scores
     """
+    _require_model()
+    mode, fusion = _search_options(mode, fusion)
     try:
-        embedding_service = get_embedding_service()
-        db = get_database()
-        
         # Detect query language and generate embedding
         query_lang = detect_language(q)
-        query_embedding = embedding_service.embed_text(q)
-        
-        # Search using language-specific vector
-        results = db.search_areas_by_language(query_embedding, query_lang, top_k=top_k)
+        query_embedding = await get_embedding_batcher().embed(q)
         
-        if not results:
-            return SearchResponse(matched=False, alternatives=[])
+        # Search the detected-language vector, or both when fused
+        results = await _search_entities("areas", query_embedding, query_lang, top_k, mode=mode, fusion=fusion)
         
-        # Format alternatives
-        alternatives = [
-            SearchMatch(
-                value=r['name'],
-                id=r['area_id'],
-                score=float(r['similarity'])
-            )
-            for r in results
-        ]
-        
-        # Check if best match meets threshold
-        best = alternatives[0]
-        
-        if best.score >= threshold:
-            return SearchResponse(
-                matched=True,
-                value=best.value,
-                id=best.id,
-                score=best.score,
-                alternatives=alternatives[1:] if len(alternatives) > 1 else []
-            )
-        
-        return SearchResponse(
-            matched=False,
-            score=best.score,
-            alternatives=alternatives
-        )
+        return _format_response(results, 'area_id', threshold)
         
     except Exception as e:
         logger.error(f"Error searching areas: {e}")
@@ -101,7 +210,9 @@ async def search_project(
     q: str = Query(..., description="Query text to search"),
     area_id: Optional[int] = Query(None, description="Filter by area ID"),
     top_k: int = Query(5, ge=1, le=20, description="Number of top matches"),
-    threshold: float = Query(0.45, ge=0.0, le=1.0, description="Minimum similarity score")
+    threshold: float = Query(0.45, ge=0.0, le=1.0, description="Minimum similarity score"),
+    mode: Optional[str] = Query(None, description="'single' or 'fused' (default: SEARCH_MODE)"),
+    fusion: Optional[str] = Query(None, description="'max' or 'rrf' (default: SEARCH_FUSION)")
 ):
     """
     Search for similar projects using semantic similarity.
@@ -111,51 +222,26 @@ async def search_project(
         area_id: Optional area filter
         top_k: Number of top matches
         threshold: Minimum similarity score
+        mode: Search mode override
+        fusion: Fusion method override
         
     Returns:
         Top matches with similarity scores
     """
+    _require_model()
+    mode, fusion = _search_options(mode, fusion)
     try:
-        embedding_service = get_embedding_service()
-        db = get_database()
-        
         # Detect query language and generate embedding
         query_lang = detect_language(q)
-        query_embedding = embedding_service.embed_text(q)
-        
-        # Search using language-specific vector
-        results = db.search_projects_by_language(query_embedding, query_lang, area_id=area_id, top_k=top_k)
-        
-        if not results:
-            return SearchResponse(matched=False, alternatives=[])
+        query_embedding = await get_embedding_batcher().embed(q)
         
-        # Format alternatives
-        alternatives = [
-            SearchMatch(
-                value=r['name'],
-                id=r['project_id'],
-                score=float(r['similarity'])
-            )
-            for r in results
-        ]
-        
-        best = alternatives[0]
-        
-        if best.score >= threshold:
-            return SearchResponse(
-                matched=True,
-                value=best.value,
-                id=best.id,
-                score=best.score,
-                alternatives=alternatives[1:] if len(alternatives) > 1 else []
-            )
-        
-        return SearchResponse(
-            matched=False,
-            score=best.score,
-            alternatives=alternatives
+        # Search the detected-language vector, or both when fused
+        results = await _search_entities(
+            "projects", query_embedding, query_lang, top_k, area_id=area_id, mode=mode, fusion=fusion
         )
         
+        return _format_response(results, 'project_id', threshold)
+        
     except Exception as e:
         logger.error(f"Error searching projects: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -165,7 +251,9 @@ async def search_project(
 async def search_unit_type(
     q: str = Query(..., description="Query text to search"),
     top_k: int = Query(3, ge=1, le=10, description="Number of top matches"),
-    threshold: float = Query(0.4, ge=0.0, le=1.0, description="Minimum similarity score")
+    threshold: float = Query(0.4, ge=0.0, le=1.0, description="Minimum similarity score"),
+    mode: Optional[str] = Query(None, description="'single' or 'fused' (default: SEARCH_MODE)"),
+    fusion: Optional[str] = Query(None, description="'max' or 'rrf' (default: SEARCH_FUSION)")
 ):
     """
     Search for similar unit types using semantic similarity.
@@ -174,49 +262,72 @@ async def search_unit_type(
         q: Query text (e.g., "شقة", "villa", "duplex")
         top_k: Number of top matches
         threshold: Minimum similarity score
+        mode: Search mode override
+        fusion: Fusion method override
         
     Returns:
         Top matches with similarity scores
     """
+    _require_model()
+    mode, fusion = _search_options(mode, fusion)
     try:
-        embedding_service = get_embedding_service()
-        db = get_database()
-        
         # Detect query language and generate embedding
         query_lang = detect_language(q)
-        query_embedding = embedding_service.embed_text(q)
+        query_embedding = await get_embedding_batcher().embed(q)
         
-        # Search using language-specific vector
-        results = db.search_unit_types_by_language(query_embedding, query_lang, top_k=top_k)
+        # Search the detected-language vector, or both when fused
+        results = await _search_entities("unit_types", query_embedding, query_lang, top_k, mode=mode, fusion=fusion)
         
-        if not results:
-            return SearchResponse(matched=False, alternatives=[])
+        return _format_response(results, None, threshold)
         
-        # Format alternatives
-        alternatives = [
-            SearchMatch(
-                value=r['name'],
-                score=float(r['similarity'])
-            )
-            for r in results
-        ]
+    except Exception as e:
+        logger.error(f"Error searching unit types: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/resolve", response_model=ResolveResponse)
+async def resolve_entities(request: ResolveRequest):
+    """
+    Resolve several candidate spans in one request.
+    
+    All span texts are embedded in a single batch, then each span is
+    searched against its entity type (projects optionally scoped to an area).
+    
+    Args:
+        request: Spans with text, entity type and optional area_id/top_k/threshold,
+            plus optional mode/fusion overrides for every span
         
-        best = alternatives[0]
+    Returns:
+        One search response per span, in request order
+    """
+    _require_model()
+    mode, fusion = _search_options(request.mode, request.fusion)
+    try:
+        if not request.spans:
+            return ResolveResponse(results=[])
         
-        if best.score >= threshold:
-            return SearchResponse(
-                matched=True,
-                value=best.value,
-                score=best.score,
-                alternatives=alternatives[1:] if len(alternatives) > 1 else []
+        # One forward pass for every span
+        embeddings = await get_embedding_batcher().embed_many([span.text for span in request.spans])
+        
+        async def resolve(span: ResolveSpan, embedding: List[float]) -> SearchResponse:
+            entity, id_field, default_top_k, default_threshold = ENTITY_SEARCH[span.entity]
+            results = await _search_entities(
+                entity,
+                embedding,
+                detect_language(span.text),
+                span.top_k or default_top_k,
+                area_id=span.area_id if span.entity == "project" else None,
+                mode=mode,
+                fusion=fusion
             )
+            threshold = span.threshold if span.threshold is not None else default_threshold
+            return _format_response(results, id_field, threshold)
         
-        return SearchResponse(
-            matched=False,
-            score=best.score,
-            alternatives=alternatives
+        results = await asyncio.gather(
+            *(resolve(span, embedding) for span, embedding in zip(request.spans, embeddings))
         )
+        return ResolveResponse(results=list(results))
         
     except Exception as e:
-        logger.error(f"Error searching unit types: {e}")
+        logger.error(f"Error resolving entities: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -5,11 +5,15 @@ Endpoints for syncing embeddings on CRUD operations.
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 import logging
 
-from app.core.embeddings import get_embedding_service
+from starlette.concurrency import run_in_threadpool
+
+from app.core.batcher import get_embedding_batcher
+from app.core.bulk_sync import BulkSyncService, compute_name_hash
 from app.core.database import get_database
+from app.core.vector_index import get_vector_index
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -47,6 +51,34 @@ class DeleteResponse(BaseModel):
     message: str
 
 
+class BulkSyncRequest(BaseModel):
+    """Request to sync many entities at once."""
+    areas: List[SyncAreaRequest] = []
+    projects: List[SyncProjectRequest] = []
+    unit_types: List[SyncUnitTypeRequest] = []
+    force: bool = False
+
+
+class BulkSyncResponse(BaseModel):
+    """Response for bulk sync with per-entity statistics."""
+    success: bool
+    message: str
+    stats: Dict[str, dict]
+
+
+async def _embed_names(name: str, name_ar: Optional[str]):
+    """Embed English and Arabic names together.
+    
+    Falls back to the English vector when no Arabic name is given.
+    """
+    batcher = get_embedding_batcher()
+    if not name_ar:
+        embedding_en = await batcher.embed(name)
+        return embedding_en, embedding_en
+    embedding_en, embedding_ar = await batcher.embed_many([name, name_ar])
+    return embedding_en, embedding_ar
+
+
 @router.post("/area", response_model=SyncResponse)
 async def sync_area(request: SyncAreaRequest):
     """
@@ -60,23 +92,30 @@ async def sync_area(request: SyncAreaRequest):
         Success status
     """
     try:
-        embedding_service = get_embedding_service()
         db = get_database()
         
-        # Generate separate embeddings for English and Arabic
-        embedding_en = embedding_service.embed_text(request.name)
-        embedding_ar = embedding_service.embed_text(request.name_ar) if request.name_ar else embedding_en
+        # Generate separate embeddings for English and Arabic (one batch)
+        embedding_en, embedding_ar = await _embed_names(request.name, request.name_ar)
         
         # Upsert to database with dual vectors
-        success = db.upsert_area_embedding(
+        success = await run_in_threadpool(
+            db.upsert_area_embedding,
             area_id=request.area_id,
             name=request.name,
             embedding_en=embedding_en,
             embedding_ar=embedding_ar,
-            name_ar=request.name_ar
+            name_ar=request.name_ar,
+            name_hash=compute_name_hash(request.name, request.name_ar)
         )
         
         if success:
+            index = get_vector_index()
+            if index is not None:
+                await run_in_threadpool(
+                    index.areas.upsert,
+                    {"area_id": request.area_id, "name": request.name, "name_ar": request.name_ar},
+                    embedding_en, embedding_ar
+                )
             logger.info(f"Synced area embedding: {request.name} (ID: {request.area_id})")
             return SyncResponse(success=True, message=f"Area '{request.name}' synced")
         else:
@@ -102,24 +141,31 @@ async def sync_project(request: SyncProjectRequest):
         Success status
     """
     try:
-        embedding_service = get_embedding_service()
         db = get_database()
         
-        # Generate separate embeddings for English and Arabic
-        embedding_en = embedding_service.embed_text(request.name)
-        embedding_ar = embedding_service.embed_text(request.name_ar) if request.name_ar else embedding_en
+        # Generate separate embeddings for English and Arabic (one batch)
+        embedding_en, embedding_ar = await _embed_names(request.name, request.name_ar)
         
         # Upsert to database with dual vectors
-        success = db.upsert_project_embedding(
+        success = await run_in_threadpool(
+            db.upsert_project_embedding,
             project_id=request.project_id,
             name=request.name,
             embedding_en=embedding_en,
             embedding_ar=embedding_ar,
             area_id=request.area_id,
-            name_ar=request.name_ar
+            name_ar=request.name_ar,
+            name_hash=compute_name_hash(request.name, request.name_ar, area_id=request.area_id)
         )
         
         if success:
+            index = get_vector_index()
+            if index is not None:
+                await run_in_threadpool(
+                    index.projects.upsert,
+                    {"project_id": request.project_id, "name": request.name, "area_id": request.area_id},
+                    embedding_en, embedding_ar
+                )
             logger.info(f"Synced project embedding: {request.name} (ID: {request.project_id})")
             return SyncResponse(success=True, message=f"Project '{request.name}' synced")
         else:
@@ -144,22 +190,29 @@ async def sync_unit_type(request: SyncUnitTypeRequest):
         Success status
     """
     try:
-        embedding_service = get_embedding_service()
         db = get_database()
         
-        # Generate separate embeddings for English and Arabic
-        embedding_en = embedding_service.embed_text(request.name)
-        embedding_ar = embedding_service.embed_text(request.name_ar) if request.name_ar else embedding_en
+        # Generate separate embeddings for English and Arabic (one batch)
+        embedding_en, embedding_ar = await _embed_names(request.name, request.name_ar)
         
         # Upsert to database with dual vectors
-        success = db.upsert_unit_type_embedding(
+        success = await run_in_threadpool(
+            db.upsert_unit_type_embedding,
             name=request.name,
             embedding_en=embedding_en,
             embedding_ar=embedding_ar,
-            name_ar=request.name_ar
+            name_ar=request.name_ar,
+            name_hash=compute_name_hash(request.name, request.name_ar)
         )
         
         if success:
+            index = get_vector_index()
+            if index is not None:
+                await run_in_threadpool(
+                    index.unit_types.upsert,
+                    {"name": request.name, "name_ar": request.name_ar},
+                    embedding_en, embedding_ar
+                )
             return SyncResponse(success=True, message=f"Unit type '{request.name}' synced")
         else:
             raise HTTPException(status_code=500, detail="Failed to sync unit type embedding")
@@ -171,6 +224,47 @@ async def sync_unit_type(request: SyncUnitTypeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk", response_model=BulkSyncResponse)
+async def sync_bulk(request: BulkSyncRequest):
+    """
+    Sync many entities at once (catalog imports, model changes).
+    
+    Names are embedded in large batches and written one transaction per
+    chunk; rows whose name hash did not change are skipped unless force is set.
+    
+    Args:
+        request: Lists of areas, projects and unit types
+        
+    Returns:
+        Per-entity rows, embedded/skipped counts and rows/sec
+    """
+    try:
+        service = BulkSyncService()
+        stats = {}
+        for entity, items in (
+            ("areas", request.areas),
+            ("projects", request.projects),
+            ("unit_types", request.unit_types),
+        ):
+            if items:
+                stats[entity] = await service.sync_rows(
+                    entity, [item.model_dump() for item in items], force=request.force
+                )
+        
+        total = sum(s["rows"] for s in stats.values())
+        embedded = sum(s["embedded"] for s in stats.values())
+        logger.info(f"Bulk sync complete: {total} rows, {embedded} embedded")
+        return BulkSyncResponse(
+            success=True,
+            message=f"Synced {total} entities ({embedded} re-embedded)",
+            stats=stats
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in bulk sync: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/area/{area_id}", response_model=DeleteResponse)
 async def delete_area(area_id: str):
     """
@@ -185,9 +279,12 @@ async def delete_area(area_id: str):
     """
     try:
         db = get_database()
-        success = db.delete_area_embedding(area_id)
+        success = await run_in_threadpool(db.delete_area_embedding, area_id)
         
         if success:
+            index = get_vector_index()
+            if index is not None:
+                await run_in_threadpool(index.areas.remove, area_id)
             logger.info(f"Deleted area embedding: ID {area_id}")
             return DeleteResponse(success=True, message=f"Area {area_id} deleted")
         else:
@@ -214,9 +311,12 @@ async def delete_project(project_id: str):
     """
     try:
         db = get_database()
-        success = db.delete_project_embedding(project_id)
+        success = await run_in_threadpool(db.delete_project_embedding, project_id)
         
         if success:
+            index = get_vector_index()
+            if index is not None:
+                await run_in_threadpool(index.projects.remove, project_id)
             logger.info(f"Deleted project embedding: ID {project_id}")
             return DeleteResponse(success=True, message=f"Project {project_id} deleted")
         else:
@@ -18,10 +18,46 @@ class Settings(BaseSettings):
     database_password: str = "password"
     database_name: str = "real_estate_crm"
     
+    # Database connection pool
+    database_pool_min_size: int = 1
+    database_pool_max_size: int = 10
+    database_pool_timeout_s: float = 5.0
+    database_pool_ping_interval_s: float = 30.0
+    
     # Embedding Model
     embedding_model_name: str = "mohamed2811/Muffakir_Embedding_V2"
     embedding_dimension: int = 768
     
+    # Local snapshot of tokenizer + safetensors weights (torch backend), "" to disable
+    embedding_snapshot_dir: Optional[str] = ".cache/snapshot"
+    
+    # Inference backend: "torch", "onnx" or "onnx-int8" (dynamic int8 quantization)
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: str = ".cache/onnx"
+    embedding_quantization_config: str = "avx2"  # arm64 | avx2 | avx512 | avx512_vnni
+    
+    # Micro-batching (concurrent requests are merged into one forward pass)
+    batch_max_size: int = 32
+    batch_max_wait_ms: float = 5.0
+    
+    # Embedding cache (keyed by model name + normalized text)
+    embedding_cache_enabled: bool = True
+    embedding_cache_memory_mb: int = 64
+    embedding_cache_dir: Optional[str] = ".cache/embeddings"
+    embedding_cache_disk_max_entries: int = 1_000_000
+    
+    # In-memory vector index for entity search (Postgres stays the source of truth)
+    vector_index_enabled: bool = True
+    vector_index_refresh_interval_s: float = 300.0
+    
+    # Entity search: "single" (detected-language column) or "fused" (EN + AR
+    # columns in one pass, merged by "max" cosine or "rrf")
+    search_mode: str = "single"
+    search_fusion: str = "max"
+    
+    # Bulk sync / reindex (entities embedded and written per transaction)
+    bulk_sync_chunk_size: int = 500
+    
     # Server
     host: str = "0.0.0.0"
     port: int = 8001
@@ -0,0 +1,212 @@
+"""
+Micro-batching scheduler for embedding inference.
+Merges concurrent embedding requests into a single forward pass.
+"""
+
+from typing import List, Optional, Tuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+
+from app.config import get_settings
+from app.core.embeddings import EmbeddingService, get_embedding_service
+from app.core.embedding_cache import EmbeddingCache, get_embedding_cache
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Queue concurrent embedding requests and run them as batches.
+
+    Requests wait at most ``max_wait_ms`` for other requests to arrive,
+    are merged into one batch of up to ``max_batch_size`` texts and run
+    on a dedicated inference thread, so the event loop is never blocked
+    by a forward pass. Texts already in the embedding cache never reach
+    the queue.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService = None,
+        max_batch_size: int = None,
+        max_wait_ms: float = None,
+        cache: Optional[EmbeddingCache] = None
+    ):
+        settings = get_settings()
+        self.embedding_service = embedding_service or get_embedding_service()
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.max_batch_size = max(1, max_batch_size or settings.batch_max_size)
+        self.max_wait = (settings.batch_max_wait_ms if max_wait_ms is None else max_wait_ms) / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Stats
+        self._batches = 0
+        self._texts = 0
+        self._largest_batch = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the scheduler loop is running."""
+        return self._worker_task is not None and not self._worker_task.done()
+
+    async def start(self):
+        """Start the scheduler loop and the inference worker."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-inference")
+        self._worker_task = asyncio.create_task(self._run())
+        logger.info(
+            f"Embedding batcher started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f})"
+        )
+
+    async def stop(self):
+        """Stop the scheduler and fail any request still waiting."""
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Embedding batcher stopped"))
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info("Embedding batcher stopped")
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text through the batching queue.
+
+        Args:
+            text: Input text to embed.
+
+        Returns:
+            Embedding vector.
+        """
+        embeddings = await self.embed_many([text])
+        return embeddings[0]
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts through the batching queue.
+
+        Args:
+            texts: Input texts to embed.
+
+        Returns:
+            Embedding vectors in the same order as ``texts``.
+        """
+        if not texts:
+            return []
+
+        results = await self.cache.aget_many(texts) if self.cache is not None else [None] * len(texts)
+
+        # Compute each distinct missing text once
+        missing = list(dict.fromkeys(text for text, hit in zip(texts, results) if hit is None))
+        if not missing:
+            return results
+
+        computed = await self._compute(missing)
+        if self.cache is not None:
+            await self.cache.aput_many(missing, computed)
+
+        by_text = dict(zip(missing, computed))
+        return [hit if hit is not None else by_text[text] for text, hit in zip(texts, results)]
+
+    async def _compute(self, texts: List[str]) -> List[List[float]]:
+        """Run texts through the model via the batching queue."""
+        loop = asyncio.get_running_loop()
+
+        if not self.is_running:
+            # Scheduler not started (e.g. scripts) - run inline off the event loop
+            return await loop.run_in_executor(None, self.embedding_service.embed_texts, list(texts))
+
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+
+        return list(await asyncio.gather(*futures))
+
+    def get_stats(self) -> dict:
+        """Get batching statistics."""
+        return {
+            "running": self.is_running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self._batches,
+            "texts": self._texts,
+            "avg_batch_size": round(self._texts / self._batches, 2) if self._batches else 0.0,
+            "largest_batch": self._largest_batch,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+    async def _run(self):
+        """Scheduler loop: collect a batch, run it, repeat."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued without waiting
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Run one batch on the inference worker and resolve its futures."""
+        # Skip requests whose caller already went away
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+
+        texts = [text for text, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            embeddings = await loop.run_in_executor(
+                self._executor, self.embedding_service.embed_texts, texts
+            )
+        except Exception as e:
+            logger.error(f"Batch inference failed ({len(texts)} texts): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._batches += 1
+        self._texts += len(texts)
+        self._largest_batch = max(self._largest_batch, len(texts))
+        logger.debug(f"Ran embedding batch of {len(texts)} texts")
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+
+@lru_cache()
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Get cached embedding batcher instance."""
+    return EmbeddingBatcher()
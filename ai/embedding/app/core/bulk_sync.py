@@ -0,0 +1,181 @@
+"""
+Bulk sync pipeline for entity embeddings.
+Embeds EN+AR names for whole chunks of entities in one batch and writes
+each chunk in a single transaction, skipping rows whose source hash is
+unchanged. Used by /sync/bulk and the reindex.py CLI.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import hashlib
+import logging
+import time
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.core.batcher import EmbeddingBatcher, get_embedding_batcher
+from app.core.database import DatabaseService, get_database
+from app.core.embeddings import get_embedding_service
+from app.core.vector_index import VectorIndexService, get_vector_index
+
+logger = logging.getLogger(__name__)
+
+# entity -> embeddings table, key column and written columns
+ENTITY_TABLES = {
+    "areas": {
+        "table": "areas_embeddings",
+        "key": "area_id",
+        "columns": ["area_id", "name", "name_ar", "embedding_en", "embedding_ar", "name_hash"],
+    },
+    "projects": {
+        "table": "projects_embeddings",
+        "key": "project_id",
+        "columns": ["project_id", "name", "area_id", "embedding_en", "embedding_ar", "name_hash"],
+    },
+    "unit_types": {
+        "table": "unit_types_embeddings",
+        "key": "name",
+        "columns": ["name", "name_ar", "embedding_en", "embedding_ar", "name_hash"],
+    },
+}
+
+
+def compute_name_hash(
+    name: str,
+    name_ar: Optional[str] = None,
+    area_id: Optional[Any] = None,
+    model_name: Optional[str] = None
+) -> str:
+    """Hash the fields an embedding row is derived from.
+
+    The model identity (name + inference backend) is part of the hash so
+    switching models or backends re-embeds everything.
+    """
+    model_name = model_name or get_embedding_service().model_identity
+    parts = [model_name, name or "", name_ar or "", "" if area_id is None else str(area_id)]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class BulkSyncService:
+    """Chunked, hash-skipping bulk upsert of entity embeddings."""
+
+    def __init__(
+        self,
+        db: DatabaseService = None,
+        batcher: EmbeddingBatcher = None,
+        vector_index: Optional[VectorIndexService] = None,
+        chunk_size: int = None
+    ):
+        settings = get_settings()
+        self.db = db or get_database()
+        self.batcher = batcher or get_embedding_batcher()
+        self.vector_index = vector_index if vector_index is not None else get_vector_index()
+        self.chunk_size = max(1, chunk_size or settings.bulk_sync_chunk_size)
+
+    async def sync_rows(self, entity: str, rows: List[Dict[str, Any]], force: bool = False) -> dict:
+        """Sync a list of entities, chunk by chunk.
+
+        Args:
+            entity: 'areas', 'projects' or 'unit_types'
+            rows: Dicts shaped like the /sync/* request bodies
+            force: Re-embed rows even if their hash is unchanged
+
+        Returns:
+            Sync statistics.
+        """
+        chunks = (rows[i:i + self.chunk_size] for i in range(0, len(rows), self.chunk_size))
+        return await self.sync_chunks(entity, chunks, force=force)
+
+    async def sync_chunks(self, entity: str, chunks: Iterable[List[Dict[str, Any]]], force: bool = False) -> dict:
+        """Sync entities from an iterable of chunks (e.g. a database stream).
+
+        Args:
+            entity: 'areas', 'projects' or 'unit_types'
+            chunks: Iterable yielding lists of row dicts
+            force: Re-embed rows even if their hash is unchanged
+
+        Returns:
+            Sync statistics.
+        """
+        if entity not in ENTITY_TABLES:
+            raise ValueError(f"Unknown entity type: {entity}")
+
+        stats = {"entity": entity, "rows": 0, "embedded": 0, "skipped": 0, "chunks": 0}
+        started = time.perf_counter()
+        iterator = iter(chunks)
+
+        while True:
+            # Fetching a chunk may hit the database
+            chunk = await run_in_threadpool(next, iterator, None)
+            if chunk is None:
+                break
+            await self._sync_chunk(entity, chunk, force, stats)
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Bulk sync {entity}: {stats['rows']} rows "
+                f"({stats['embedded']} embedded, {stats['skipped']} unchanged) "
+                f"- {stats['rows'] / elapsed if elapsed else 0:.1f} rows/s"
+            )
+
+        elapsed = time.perf_counter() - started
+        stats["elapsed_s"] = round(elapsed, 3)
+        stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed else 0.0
+        return stats
+
+    async def _sync_chunk(self, entity: str, rows: List[Dict[str, Any]], force: bool, stats: dict):
+        """Embed and write one chunk in a single transaction."""
+        spec = ENTITY_TABLES[entity]
+        key = spec["key"]
+        stats["rows"] += len(rows)
+        stats["chunks"] += 1
+        # A key repeated in the request keeps its last row (embedded once)
+        rows = list({str(row[key]): row for row in rows}.values())
+
+        hashes = [
+            compute_name_hash(
+                row["name"], row.get("name_ar"),
+                area_id=row.get("area_id") if entity == "projects" else None
+            )
+            for row in rows
+        ]
+
+        stored = {}
+        if not force:
+            stored = await run_in_threadpool(
+                self.db.get_name_hashes, spec["table"], key, [str(row[key]) for row in rows]
+            )
+        changed = [
+            (row, name_hash) for row, name_hash in zip(rows, hashes)
+            if force or stored.get(str(row[key])) != name_hash
+        ]
+        stats["skipped"] += len(rows) - len(changed)
+        if not changed:
+            return
+
+        # EN and AR names of the whole chunk in one embedding call
+        texts = []
+        for row, _ in changed:
+            texts.append(row["name"])
+            if row.get("name_ar"):
+                texts.append(row["name_ar"])
+        embeddings = iter(await self.batcher.embed_many(texts))
+
+        records = []
+        for row, name_hash in changed:
+            embedding_en = np.asarray(next(embeddings), dtype=np.float32)
+            embedding_ar = np.asarray(next(embeddings), dtype=np.float32) if row.get("name_ar") else embedding_en
+            records.append({**row, "embedding_en": embedding_en, "embedding_ar": embedding_ar, "name_hash": name_hash})
+
+        await run_in_threadpool(
+            self.db.bulk_upsert_embeddings,
+            spec["table"],
+            key,
+            spec["columns"],
+            [tuple(record.get(c) for c in spec["columns"]) for record in records]
+        )
+        stats["embedded"] += len(records)
+
+        if self.vector_index is not None and self.vector_index.is_loaded:
+            await run_in_threadpool(getattr(self.vector_index, entity).upsert_many, records)
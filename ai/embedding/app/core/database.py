@@ -4,43 +4,250 @@ Handles embedding storage and similarity search.
 """
 
 from typing import List, Dict, Optional, Any
-from functools import lru_cache
+from collections import deque
+from contextlib import contextmanager
+import threading
+import time
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor, execute_values
 from pgvector.psycopg2 import register_vector
 import logging
 
 from app.config import get_settings
+from app.core.vector_index import RRF_K
 
 logger = logging.getLogger(__name__)
 
 
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe psycopg2 connection pool.
+    
+    Connections are handed out per request and returned afterwards.
+    Idle connections are health-checked on checkout, and callers wait
+    (up to a timeout) when every connection is in use.
+    """
+    
+    def __init__(
+        self,
+        connect,
+        max_size: int,
+        min_size: int = 1,
+        timeout: float = 5.0,
+        ping_interval: float = 30.0
+    ):
+        self._connect = connect
+        self.max_size = max(1, max_size)
+        self.min_size = max(0, min(min_size, self.max_size))
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, last_used) pairs, most recent last
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        
+        # Metrics
+        self._checkouts = 0
+        self._waited_checkouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+        self._health_check_failures = 0
+    
+    def warm_up(self):
+        """Open the minimum number of connections ahead of time."""
+        while True:
+            # Reserve one slot per connect so a failure only gives back its own
+            with self._cond:
+                if self._closed or self._open >= self.min_size:
+                    return
+                self._open += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+    
+    def acquire(self):
+        """Check out a healthy connection, waiting if the pool is exhausted."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        conn, last_used = None, None
+        
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available within {self.timeout:.1f}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._waiting += 1
+                self._cond.wait(remaining)
+                self._waiting -= 1
+            
+            waited = time.monotonic() - started
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            if waited > 0.001:
+                self._waited_checkouts += 1
+            self._in_use += 1
+        
+        try:
+            if conn is not None and not self._is_healthy(conn, last_used):
+                with self._cond:
+                    self._health_check_failures += 1
+                logger.warning("Discarding unhealthy pooled database connection")
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+    
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool (or close it if broken)."""
+        if not discard and not conn.closed:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+        
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed or self._closed:
+                self._open -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+    
+    def close_all(self):
+        """Close every idle connection and refuse new checkouts."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._open -= 1
+                self._close_quietly(conn)
+            self._cond.notify_all()
+    
+    def get_stats(self) -> dict:
+        """Get pool size and wait-time metrics."""
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "open": self._open,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "waited_checkouts": self._waited_checkouts,
+                "avg_wait_ms": round(self._total_wait / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+                "timeouts": self._timeouts,
+                "health_check_failures": self._health_check_failures
+            }
+    
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        """Ping connections that sat idle longer than the ping interval."""
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.ping_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 class DatabaseService:
     """Service for pgvector database operations."""
     
     def __init__(self):
         self.settings = get_settings()
-        self._conn = None
-    
-    @property
-    def conn(self):
-        """Get database connection (lazy, auto-reconnect)."""
-        if self._conn is None or self._conn.closed:
-            logger.info("Connecting to database...")
-            self._conn = psycopg2.connect(
-                host=self.settings.database_host,
-                port=self.settings.database_port,
-                user=self.settings.database_user,
-                password=self.settings.database_password,
-                database=self.settings.database_name
-            )
-            register_vector(self._conn)
-            logger.info("Database connection established")
-        return self._conn
+        self.pool = ConnectionPool(
+            connect=self._create_connection,
+            max_size=self.settings.database_pool_max_size,
+            min_size=self.settings.database_pool_min_size,
+            timeout=self.settings.database_pool_timeout_s,
+            ping_interval=self.settings.database_pool_ping_interval_s
+        )
+    
+    def _create_connection(self):
+        """Open a new database connection with pgvector support."""
+        logger.info("Connecting to database...")
+        conn = psycopg2.connect(
+            host=self.settings.database_host,
+            port=self.settings.database_port,
+            user=self.settings.database_user,
+            password=self.settings.database_password,
+            database=self.settings.database_name
+        )
+        register_vector(conn)
+        logger.info("Database connection established")
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Check out a pooled connection for the duration of a block.
+        
+        Uncommitted work is rolled back when the connection is returned.
+        """
+        conn = self.pool.acquire()
+        discard = False
+        try:
+            yield conn
+        except psycopg2.InterfaceError:
+            discard = True
+            raise
+        finally:
+            self.pool.release(conn, discard=discard)
     
     def ensure_tables_exist(self):
         """Create embedding tables if they don't exist."""
-        with self.conn.cursor() as cur:
+        with self.connection() as conn, conn.cursor() as cur:
             # Areas embeddings
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS areas_embeddings (
@@ -69,14 +276,18 @@ class DatabaseService:
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS unit_types_embeddings (
                     unit_type_id SERIAL PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
+                    name VARCHAR(100) NOT NULL UNIQUE,
                     name_ar VARCHAR(100),
                     embedding vector(768),
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
             
-            self.conn.commit()
+            # Source hash used by bulk sync to skip unchanged rows
+            for table in ("areas_embeddings", "projects_embeddings", "unit_types_embeddings"):
+                cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS name_hash VARCHAR(64)")
+            
+            conn.commit()
         logger.info("Database tables verified/created")
     
     # ==================== Area Operations ====================
@@ -87,40 +298,40 @@ class DatabaseService:
         name: str, 
         embedding_en: List[float],
         embedding_ar: List[float],
-        name_ar: Optional[str] = None
+        name_ar: Optional[str] = None,
+        name_hash: Optional[str] = None
     ) -> bool:
         """Insert or update area embedding with dual vectors."""
         try:
-            with self.conn.cursor() as cur:
+            with self.connection() as conn, conn.cursor() as cur:
                 cur.execute("""
-                    INSERT INTO areas_embeddings (area_id, name, name_ar, embedding_en, embedding_ar, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                    INSERT INTO areas_embeddings (area_id, name, name_ar, embedding_en, embedding_ar, name_hash, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
                     ON CONFLICT (area_id) DO UPDATE SET
                         name = EXCLUDED.name,
                         name_ar = EXCLUDED.name_ar,
                         embedding_en = EXCLUDED.embedding_en,
                         embedding_ar = EXCLUDED.embedding_ar,
+                        name_hash = EXCLUDED.name_hash,
                         updated_at = CURRENT_TIMESTAMP
-                """, (area_id, name, name_ar, embedding_en, embedding_ar))
-                self.conn.commit()
+                """, (area_id, name, name_ar, embedding_en, embedding_ar, name_hash))
+                conn.commit()
             logger.info(f"Upserted area dual embeddings: {name} (ID: {area_id})")
             return True
         except Exception as e:
             logger.error(f"Failed to upsert area embedding: {e}")
-            self.conn.rollback()
             return False
     
     def delete_area_embedding(self, area_id: str) -> bool:
         """Delete area embedding."""
         try:
-            with self.conn.cursor() as cur:
+            with self.connection() as conn, conn.cursor() as cur:
                 cur.execute("DELETE FROM areas_embeddings WHERE area_id = %s", (area_id,))
-                self.conn.commit()
+                conn.commit()
             logger.info(f"Deleted area embedding: ID {area_id}")
             return True
         except Exception as e:
             logger.error(f"Failed to delete area embedding: {e}")
-            self.conn.rollback()
             return False
     
     def search_areas(
@@ -129,7 +340,7 @@ class DatabaseService:
         top_k: int = 5
     ) -> List[Dict[str, Any]]:
         """Search for similar areas using pgvector."""
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("""
                 SELECT 
                     area_id,
@@ -160,7 +371,7 @@ class DatabaseService:
         """
         embedding_column = 'embedding_en' if language == 'en' else 'embedding_ar'
         
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             query = f"""
                 SELECT 
                     area_id,
@@ -187,40 +398,40 @@ class DatabaseService:
         embedding_en: List[float],
         embedding_ar: List[float],
         area_id: Optional[str] = None,
-        name_ar: Optional[str] = None
+        name_ar: Optional[str] = None,
+        name_hash: Optional[str] = None
     ) -> bool:
         """Insert or update project embedding with dual vectors."""
         try:
-            with self.conn.cursor() as cur:
+            with self.connection() as conn, conn.cursor() as cur:
                 cur.execute("""
-                    INSERT INTO projects_embeddings (project_id, name, area_id, embedding_en, embedding_ar, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                    INSERT INTO projects_embeddings (project_id, name, area_id, embedding_en, embedding_ar, name_hash, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
                     ON CONFLICT (project_id) DO UPDATE SET
                         name = EXCLUDED.name,
                         area_id = EXCLUDED.area_id,
                         embedding_en = EXCLUDED.embedding_en,
                         embedding_ar = EXCLUDED.embedding_ar,
+                        name_hash = EXCLUDED.name_hash,
                         updated_at = CURRENT_TIMESTAMP
-                """, (project_id, name, area_id, embedding_en, embedding_ar))
-                self.conn.commit()
+                """, (project_id, name, area_id, embedding_en, embedding_ar, name_hash))
+                conn.commit()
             logger.info(f"Upserted project dual embeddings: {name} (ID: {project_id})")
             return True
         except Exception as e:
             logger.error(f"Failed to upsert project embedding: {e}")
-            self.conn.rollback()
             return False
     
     def delete_project_embedding(self, project_id: str) -> bool:
         """Delete project embedding."""
         try:
-            with self.conn.cursor() as cur:
+            with self.connection() as conn, conn.cursor() as cur:
                 cur.execute("DELETE FROM projects_embeddings WHERE project_id = %s", (project_id,))
-                self.conn.commit()
+                conn.commit()
             logger.info(f"Deleted project embedding: ID {project_id}")
             return True
         except Exception as e:
             logger.error(f"Failed to delete project embedding: {e}")
-            self.conn.rollback()
             return False
     
     def search_projects(
@@ -230,7 +441,7 @@ class DatabaseService:
         top_k: int = 5
     ) -> List[Dict[str, Any]]:
         """Search for similar projects using pgvector."""
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             if area_id:
                 cur.execute("""
                     SELECT 
@@ -276,7 +487,7 @@ class DatabaseService:
         """
         embedding_column = 'embedding_en' if language == 'en' else 'embedding_ar'
         
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             if area_id:
                 query = f"""
                     SELECT 
@@ -315,11 +526,12 @@ class DatabaseService:
         name: str, 
         embedding_en: List[float],
         embedding_ar: List[float],
-        name_ar: Optional[str] = None
+        name_ar: Optional[str] = None,
+        name_hash: Optional[str] = None
     ) -> bool:
         """Insert or update unit type embedding with dual vectors."""
         try:
-            with self.conn.cursor() as cur:
+            with self.connection() as conn, conn.cursor() as cur:
                 # Check if exists by name
                 cur.execute("SELECT unit_type_id FROM unit_types_embeddings WHERE name = %s", (name,))
                 existing = cur.fetchone()
@@ -327,21 +539,20 @@ class DatabaseService:
                 if existing:
                     cur.execute("""
                         UPDATE unit_types_embeddings
-                        SET name_ar = %s, embedding_en = %s, embedding_ar = %s
+                        SET name_ar = %s, embedding_en = %s, embedding_ar = %s, name_hash = %s
                         WHERE name = %s
-                    """, (name_ar, embedding_en, embedding_ar, name))
+                    """, (name_ar, embedding_en, embedding_ar, name_hash, name))
                 else:
                     cur.execute("""
-                        INSERT INTO unit_types_embeddings (name, name_ar, embedding_en, embedding_ar)
-                        VALUES (%s, %s, %s, %s)
-                    """, (name, name_ar, embedding_en, embedding_ar))
+                        INSERT INTO unit_types_embeddings (name, name_ar, embedding_en, embedding_ar, name_hash)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """, (name, name_ar, embedding_en, embedding_ar, name_hash))
                 
-                self.conn.commit()
+                conn.commit()
             logger.info(f"Upserted unit type dual embeddings: {name}")
             return True
         except Exception as e:
             logger.error(f"Failed to upsert unit type embedding: {e}")
-            self.conn.rollback()
             return False
     
     def search_unit_types(
@@ -350,7 +561,7 @@ class DatabaseService:
         top_k: int = 3
     ) -> List[Dict[str, Any]]:
         """Search for similar unit types using pgvector."""
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("""
                 SELECT 
                     name,
@@ -380,7 +591,7 @@ class DatabaseService:
         """
         embedding_column = 'embedding_en' if language == 'en' else 'embedding_ar'
         
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             query = f"""
                 SELECT 
                     name,
@@ -397,11 +608,215 @@ class DatabaseService:
         
         return [dict(r) for r in results]
     
+    # ==================== Fused (EN + AR) Search ====================
+    
+    # entity -> (table, key column, returned columns)
+    FUSED_SEARCH_TABLES = {
+        "areas": ("areas_embeddings", "area_id", ["area_id", "name", "name_ar"]),
+        "projects": ("projects_embeddings", "project_id", ["project_id", "name", "area_id"]),
+        "unit_types": ("unit_types_embeddings", "name", ["name", "name_ar"]),
+    }
+    
+    def search_fused(
+        self,
+        entity: str,
+        query_embedding: List[float],
+        top_k: int = 5,
+        fusion: str = "max",
+        area_id: Optional[str] = None,
+        candidates: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Search both language vectors in one query and merge the results.
+        
+        Each column contributes its own nearest-neighbour candidate list
+        (index-friendly ORDER BY ... LIMIT), the lists are joined per row and
+        ranked by the best cosine ('max') or reciprocal-rank fusion ('rrf').
+        
+        Args:
+            entity: 'areas', 'projects' or 'unit_types'
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+            fusion: 'max' or 'rrf'
+            area_id: Optional area filter (projects only)
+            candidates: Candidates taken from each column
+            
+        Returns:
+            Rows with the entity columns and ``similarity`` (best cosine).
+        """
+        table, key, columns = self.FUSED_SEARCH_TABLES[entity]
+        area_filter = "AND area_id = %(area_id)s" if area_id and entity == "projects" else ""
+        order = "rrf_score DESC, similarity DESC" if fusion == "rrf" else "similarity DESC"
+        select = ", ".join(f"t.{c}" for c in columns)
+        
+        def ranked(column: str) -> str:
+            return f"""
+                SELECT {key} AS key, ROW_NUMBER() OVER (ORDER BY {column} <=> %(q)s::vector) AS rank
+                FROM (
+                    SELECT {key}, {column} FROM {table}
+                    WHERE {column} IS NOT NULL {area_filter}
+                    ORDER BY {column} <=> %(q)s::vector
+                    LIMIT %(candidates)s
+                ) nearest
+            """
+        
+        query = f"""
+            WITH en AS ({ranked("embedding_en")}),
+                 ar AS ({ranked("embedding_ar")}),
+                 fused AS (
+                    SELECT COALESCE(en.key, ar.key) AS key, en.rank AS rank_en, ar.rank AS rank_ar
+                    FROM en FULL OUTER JOIN ar ON en.key = ar.key
+                 )
+            SELECT
+                {select},
+                GREATEST(1 - (t.embedding_en <=> %(q)s::vector), 1 - (t.embedding_ar <=> %(q)s::vector)) AS similarity,
+                COALESCE(1.0 / (%(rrf_k)s + fused.rank_en), 0) + COALESCE(1.0 / (%(rrf_k)s + fused.rank_ar), 0) AS rrf_score
+            FROM fused
+            JOIN {table} t ON t.{key} = fused.key
+            ORDER BY {order}
+            LIMIT %(top_k)s
+        """
+        params = {
+            "q": query_embedding,
+            "area_id": area_id,
+            "candidates": max(candidates, top_k),
+            "rrf_k": RRF_K,
+            "top_k": top_k,
+        }
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            results = cur.fetchall()
+        
+        return [{c: r[c] for c in columns + ["similarity"]} for r in results]
+    
+    # ==================== Bulk Sync ====================
+    
+    def get_name_hashes(self, table: str, key_column: str, keys: List[str]) -> Dict[str, Optional[str]]:
+        """Get the stored source hash for a set of entity keys.
+        
+        Args:
+            table: Embeddings table name
+            key_column: Entity key column (area_id, project_id or name)
+            keys: Entity keys (compared as text)
+            
+        Returns:
+            Mapping of key (as text) to stored hash for rows that exist.
+        """
+        if not keys:
+            return {}
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"SELECT {key_column}::text, name_hash FROM {table} WHERE {key_column}::text = ANY(%s)",
+                (list(keys),)
+            )
+            return dict(cur.fetchall())
+    
+    def bulk_upsert_embeddings(
+        self,
+        table: str,
+        key_column: str,
+        columns: List[str],
+        rows: List[tuple],
+        page_size: int = 500
+    ) -> int:
+        """Upsert many embedding rows in a single transaction.
+        
+        Args:
+            table: Embeddings table name
+            key_column: Conflict target column
+            columns: Column names matching each row tuple
+            rows: Row tuples (vectors as numpy arrays or lists); for a
+                repeated key the last row wins
+            page_size: Rows per INSERT statement
+            
+        Returns:
+            Number of rows written.
+        """
+        if not rows:
+            return 0
+        # ON CONFLICT DO UPDATE cannot touch the same row twice in one
+        # statement, so a key repeated in the batch keeps its last row
+        key_index = columns.index(key_column)
+        rows = list({row[key_index]: row for row in rows}.values())
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != key_column)
+        timestamp = ", updated_at = CURRENT_TIMESTAMP" if table != "unit_types_embeddings" else ""
+        query = f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES %s
+            ON CONFLICT ({key_column}) DO UPDATE SET {updates}{timestamp}
+        """
+        with self.connection() as conn, conn.cursor() as cur:
+            execute_values(cur, query, rows, page_size=page_size)
+            conn.commit()
+        return len(rows)
+    
+    def iter_source_entities(self, entity: str, chunk_size: int = 500):
+        """Stream catalog entities from the CRM tables in chunks.
+        
+        Uses a server-side cursor so the full catalog is never held in memory.
+        
+        Args:
+            entity: 'areas', 'projects' or 'unit_types'
+            chunk_size: Rows per yielded chunk
+            
+        Yields:
+            Lists of row dicts shaped like the /sync/* request bodies.
+        """
+        queries = {
+            "areas": "SELECT area_id, name, name_ar FROM areas ORDER BY area_id",
+            "projects": "SELECT project_id, name, area_id FROM projects WHERE is_active ORDER BY project_id",
+            "unit_types": "SELECT DISTINCT unit_type AS name, NULL AS name_ar FROM units ORDER BY unit_type",
+        }
+        with self.connection() as conn:
+            with conn.cursor(name=f"reindex_{entity}", cursor_factory=RealDictCursor) as cur:
+                cur.itersize = chunk_size
+                cur.execute(queries[entity])
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [dict(r) for r in rows]
+            conn.rollback()
+    
+    # ==================== Bulk Loading ====================
+    
+    def load_area_embeddings(self) -> List[Dict[str, Any]]:
+        """Load every area with its language-specific vectors."""
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT area_id, name, name_ar, embedding_en, embedding_ar
+                FROM areas_embeddings
+                ORDER BY area_id
+            """)
+            return [dict(r) for r in cur.fetchall()]
+    
+    def load_project_embeddings(self) -> List[Dict[str, Any]]:
+        """Load every project with its language-specific vectors."""
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT project_id, name, area_id, embedding_en, embedding_ar
+                FROM projects_embeddings
+                ORDER BY project_id
+            """)
+            return [dict(r) for r in cur.fetchall()]
+    
+    def load_unit_type_embeddings(self) -> List[Dict[str, Any]]:
+        """Load every unit type with its language-specific vectors."""
+        with self.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT name, name_ar, embedding_en, embedding_ar
+                FROM unit_types_embeddings
+                ORDER BY name
+            """)
+            return [dict(r) for r in cur.fetchall()]
+    
+    def get_pool_stats(self) -> dict:
+        """Get connection pool metrics."""
+        return self.pool.get_stats()
+    
     def close(self):
-        """Close database connection."""
-        if self._conn and not self._conn.closed:
-            self._conn.close()
-            logger.info("Database connection closed")
+        """Close all pooled database connections."""
+        self.pool.close_all()
+        logger.info("Database connections closed")
 
 
 _db_instance = None
@@ -418,4 +833,5 @@ def get_database() -> DatabaseService:
 def initialize_database():
     """Initialize database and create tables."""
     db = get_database()
+    db.pool.warm_up()
     db.ensure_tables_exist()
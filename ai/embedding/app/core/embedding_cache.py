@@ -0,0 +1,346 @@
+"""
+Content-addressed embedding cache.
+Two tiers keyed by (model name, normalized text): an in-memory LRU with a
+byte budget and a persistent on-disk store of float32 vectors.
+"""
+
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.core.embeddings import get_embedding_service
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# index.tsv: "<sha256 hex key>\t<row>" per line
+_INDEX_KEY_RE = re.compile(r"[0-9a-f]{64}")
+_INDEX_LINE_RE = re.compile(rb"([0-9a-f]{64})\t([0-9]+)")
+
+
+def normalize_cache_text(text: str) -> str:
+    """Normalize text for cache keys.
+
+    Only applies transformations that do not change the model output
+    (Unicode NFKC and whitespace collapsing); casing is preserved.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class DiskVectorStore:
+    """Append-only float32 vector file with a text index.
+
+    Layout inside ``directory``:
+    - ``vectors.f32``: row-major little-endian float32 matrix (memory-mapped)
+    - ``index.tsv``: one ``<key>\\t<row>`` line per vector
+    - ``meta.json``: model name and vector dimension
+
+    Reads and appends are serialized by the store's own lock, so callers do
+    not need to hold theirs while the disk is accessed.
+    """
+
+    def __init__(self, directory: str, model_name: str, max_entries: int = 0):
+        self.directory = directory
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.dimension: Optional[int] = None
+        self._index: Dict[str, int] = {}
+        self._mmap: Optional[np.memmap] = None
+        self._rows = 0
+        self._full_logged = False
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._index_path = os.path.join(directory, "index.tsv")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _load(self):
+        """Load the index and map the vector file."""
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("model_name") != self.model_name:
+                logger.warning(f"Disk cache at {self.directory} belongs to another model, ignoring it")
+                return
+            self.dimension = int(meta["dimension"])
+
+        if self.dimension is None or not os.path.exists(self._vectors_path):
+            return
+
+        row_bytes = self.dimension * 4
+        size = os.path.getsize(self._vectors_path)
+        self._rows = size // row_bytes
+        if size != self._rows * row_bytes:
+            # Torn write: drop the partial row so later appends stay aligned
+            logger.warning(f"Truncating partial vector at the end of {self._vectors_path}")
+            os.truncate(self._vectors_path, self._rows * row_bytes)
+
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "rb") as f:
+                data = f.read()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                # Torn write: a partial last line may hold a valid-looking
+                # but wrong row number, so drop it before appending
+                logger.warning(f"Truncating partial index line at the end of {self._index_path}")
+                os.truncate(self._index_path, complete)
+            for line in data[:complete].splitlines():
+                match = _INDEX_LINE_RE.fullmatch(line)
+                if match is None:
+                    continue
+                row = int(match.group(2))
+                # Vectors are written before their index line, so rows
+                # beyond the file end only appear after a torn write
+                if row < self._rows:
+                    self._index[match.group(1).decode("ascii")] = row
+
+        logger.info(f"Loaded disk embedding cache: {len(self._index)} vectors from {self.directory}")
+
+    def _vector_view(self) -> Optional[np.memmap]:
+        """Get a memory map covering every row written so far."""
+        if self._rows == 0:
+            return None
+        if self._mmap is None or self._mmap.shape[0] < self._rows:
+            self._mmap = np.memmap(
+                self._vectors_path, dtype="<f4", mode="r", shape=(self._rows, self.dimension)
+            )
+        return self._mmap
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Read a vector by key."""
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                return None
+            view = self._vector_view()
+            return np.array(view[row], dtype=np.float32)
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """Append vectors that are not stored yet."""
+        with self._lock:
+            self._append(items)
+
+    def _append(self, items: Dict[str, np.ndarray]):
+        new_items = [(k, v) for k, v in items.items() if k not in self._index]
+        invalid = [k for k, _ in new_items if not _INDEX_KEY_RE.fullmatch(k)]
+        if invalid:
+            raise ValueError(f"Disk cache keys must be SHA-256 hex digests, got {invalid[0]!r}")
+        if not new_items:
+            return
+
+        if self.max_entries and len(self._index) + len(new_items) > self.max_entries:
+            new_items = new_items[:max(0, self.max_entries - len(self._index))]
+            if not self._full_logged:
+                logger.warning(f"Disk embedding cache is full ({self.max_entries} entries), not storing new vectors")
+                self._full_logged = True
+            if not new_items:
+                return
+
+        if self.dimension is None:
+            self.dimension = int(new_items[0][1].shape[0])
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model_name": self.model_name, "dimension": self.dimension}, f)
+
+        matrix = np.stack([v for _, v in new_items]).astype("<f4", copy=False)
+        with open(self._vectors_path, "ab") as f:
+            f.write(matrix.tobytes())
+
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            for offset, (key, _) in enumerate(new_items):
+                f.write(f"{key}\t{self._rows + offset}\n")
+
+        for offset, (key, _) in enumerate(new_items):
+            self._index[key] = self._rows + offset
+        self._rows += len(new_items)
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache (memory LRU + persistent disk store).
+    
+    Entries are keyed by the model identity (model name + inference
+    backend), so switching backends never serves stale vectors.
+    """
+
+    def __init__(
+        self,
+        model_name: str = None,
+        memory_budget_bytes: int = None,
+        disk_dir: Optional[str] = None,
+        disk_max_entries: int = None
+    ):
+        settings = get_settings()
+        self.model_name = model_name or get_embedding_service().model_identity
+        self.memory_budget_bytes = (
+            memory_budget_bytes if memory_budget_bytes is not None
+            else settings.embedding_cache_memory_mb * 1024 * 1024
+        )
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+
+        self._disk: Optional[DiskVectorStore] = None
+        disk_dir = disk_dir if disk_dir is not None else settings.embedding_cache_dir
+        if disk_dir:
+            model_dir = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name)
+            try:
+                self._disk = DiskVectorStore(
+                    os.path.join(disk_dir, model_dir),
+                    self.model_name,
+                    max_entries=(
+                        disk_max_entries if disk_max_entries is not None
+                        else settings.embedding_cache_disk_max_entries
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Disk embedding cache unavailable, using memory only: {e}")
+
+        # Stats
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def make_key(self, text: str) -> str:
+        """Build the content-addressed key for a text."""
+        payload = f"{self.model_name}\x00{normalize_cache_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up texts; returns None for every miss."""
+        keys = [self.make_key(text) for text in texts]
+        vectors = self._get_memory(keys)
+        return self._resolve(keys, vectors, self._read_disk([k for k, v in zip(keys, vectors) if v is None]))
+
+    async def aget_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """``get_many`` for the event loop: disk reads run in the threadpool."""
+        keys = [self.make_key(text) for text in texts]
+        vectors = self._get_memory(keys)
+        pending = [k for k, v in zip(keys, vectors) if v is None]
+        found = await run_in_threadpool(self._read_disk, pending) if pending and self._disk is not None else {}
+        return self._resolve(keys, vectors, found)
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        """Store freshly computed embeddings in both tiers."""
+        items = self._remember_many(texts, embeddings)
+        self._write_disk(items)
+
+    async def aput_many(self, texts: List[str], embeddings: List[List[float]]):
+        """``put_many`` for the event loop: the disk append runs in the threadpool."""
+        items = self._remember_many(texts, embeddings)
+        if self._disk is not None:
+            await run_in_threadpool(self._write_disk, items)
+
+    def _get_memory(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Memory-tier lookups (None for keys the memory tier does not hold)."""
+        vectors = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._memory_hits += 1
+                vectors.append(vector)
+        return vectors
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Disk-tier lookups; called without holding the memory lock."""
+        if self._disk is None:
+            return {}
+        found = {}
+        for key in keys:
+            vector = self._disk.get(key)
+            if vector is not None:
+                found[key] = vector
+        return found
+
+    def _resolve(
+        self, keys: List[str], vectors: List[Optional[np.ndarray]], found: Dict[str, np.ndarray]
+    ) -> List[Optional[List[float]]]:
+        """Merge memory and disk results, promoting disk hits to memory."""
+        results: List[Optional[List[float]]] = []
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                if vector is None:
+                    vector = found.get(key)
+                    if vector is not None:
+                        self._disk_hits += 1
+                        self._remember(key, vector)
+                    else:
+                        self._misses += 1
+                results.append(vector.tolist() if vector is not None else None)
+        return results
+
+    def _remember_many(self, texts: List[str], embeddings: List[List[float]]) -> Dict[str, np.ndarray]:
+        items = {
+            self.make_key(text): np.asarray(embedding, dtype=np.float32)
+            for text, embedding in zip(texts, embeddings)
+        }
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+        return items
+
+    def _write_disk(self, items: Dict[str, np.ndarray]):
+        if self._disk is None:
+            return
+        try:
+            self._disk.put_many(items)
+        except Exception as e:
+            logger.error(f"Failed to write embeddings to disk cache: {e}")
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the memory tier and evict down to the byte budget."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        size = vector.nbytes + len(key)
+        if size > self.memory_budget_bytes:
+            return
+        self._memory[key] = vector
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_budget_bytes:
+            old_key, old_vector = self._memory.popitem(last=False)
+            self._memory_bytes -= old_vector.nbytes + len(old_key)
+            self._evictions += 1
+
+    def get_stats(self) -> dict:
+        """Get cache hit/miss/eviction counters."""
+        lookups = self._memory_hits + self._disk_hits + self._misses
+        return {
+            "memory_hits": self._memory_hits,
+            "disk_hits": self._disk_hits,
+            "misses": self._misses,
+            "hit_rate": round((self._memory_hits + self._disk_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "disk_entries": len(self._disk) if self._disk is not None else 0
+        }
+
+
+@lru_cache()
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get cached embedding cache instance (None when disabled)."""
+    settings = get_settings()
+    if not settings.embedding_cache_enabled:
+        return None
+    return EmbeddingCache()
@@ -3,40 +3,149 @@ Embedding Service using Muffakir_Embedding_V2 model.
 Provides text-to-vector conversion for semantic search.
 """
 
-from typing import List
+from typing import List, Optional
 from functools import lru_cache
 from sentence_transformers import SentenceTransformer
 import torch
 import logging
+import os
+import re
+import threading
+import time
 
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Representative inputs used to warm the model (Arabic, English, mixed; short and long)
+WARMUP_TEXTS = [
+    "التجمع",
+    "villa",
+    "عايز اعرف اي ارخص شقة في التجمع الخامس",
+    "I am looking for a 3 bedroom apartment with a garden in New Cairo",
+    "شقة في العاصمة الادارية near the monorail",
+]
+
 
 class EmbeddingService:
     """Service for generating text embeddings using Muffakir model."""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, backend: str = None):
         """Initialize the embedding model.
         
         Args:
             model_name: HuggingFace model name. Defaults to config value.
+            backend: 'torch', 'onnx' or 'onnx-int8'. Defaults to config value.
         """
         settings = get_settings()
         self.model_name = model_name or settings.embedding_model_name
+        self.backend = backend or settings.embedding_backend
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{self.backend}', expected one of {BACKENDS}")
+        self.onnx_dir = settings.embedding_onnx_dir
+        self.quantization_config = settings.embedding_quantization_config
+        self.snapshot_dir = settings.embedding_snapshot_dir
         self._model = None
         self._initialized = False
+        self._warmed = False
+        self._load_lock = threading.Lock()
+    
+    @property
+    def model_identity(self) -> str:
+        """Model name plus inference backend.
+        
+        Backends produce slightly different vectors, so caches and stored
+        hashes are keyed by this rather than the bare model name.
+        """
+        if self.backend == "torch":
+            return self.model_name
+        if self.backend == "onnx-int8":
+            return f"{self.model_name}#onnx-qint8-{self.quantization_config}"
+        return f"{self.model_name}#onnx"
     
     @property
     def model(self) -> SentenceTransformer:
-        """Lazy-load the embedding model."""
+        """Lazy-load the embedding model (once, even with concurrent callers)."""
         if self._model is None:
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self._model = SentenceTransformer(self.model_name)
-            logger.info("Embedding model loaded successfully")
+            with self._load_lock:
+                if self._model is None:
+                    logger.info(f"Loading embedding model: {self.model_name} (backend: {self.backend})")
+                    started = time.perf_counter()
+                    self._model = self._load_model()
+                    logger.info(f"Embedding model loaded successfully in {time.perf_counter() - started:.2f}s")
         return self._model
     
+    def _snapshot_path(self) -> Optional[str]:
+        """Local snapshot directory for this model, if snapshots are enabled."""
+        if not self.snapshot_dir:
+            return None
+        return os.path.join(self.snapshot_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name))
+    
+    def _load_torch_model(self) -> SentenceTransformer:
+        """Load the PyTorch model from the local snapshot, creating it on first run.
+        
+        The snapshot holds the tokenizer and safetensors weights, which are
+        memory-mapped on load and need no hub lookups.
+        """
+        snapshot = self._snapshot_path()
+        if snapshot and os.path.exists(os.path.join(snapshot, "modules.json")):
+            try:
+                return SentenceTransformer(snapshot, local_files_only=True)
+            except Exception as e:
+                logger.warning(f"Model snapshot at {snapshot} unusable, reloading from {self.model_name}: {e}")
+        
+        model = SentenceTransformer(self.model_name)
+        if snapshot:
+            try:
+                model.save_pretrained(snapshot, safe_serialization=True)
+                logger.info(f"Saved model snapshot to {snapshot}")
+            except Exception as e:
+                logger.warning(f"Failed to save model snapshot: {e}")
+        return model
+    
+    def _load_model(self) -> SentenceTransformer:
+        """Load the model for the configured backend.
+        
+        ONNX exports (and int8 quantized variants) are written once to
+        ``embedding_onnx_dir`` and reused on later startups.
+        """
+        if self.backend == "torch":
+            return self._load_torch_model()
+        
+        export_dir = os.path.join(self.onnx_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name))
+        if not os.path.exists(os.path.join(export_dir, "onnx", "model.onnx")):
+            logger.info(f"Exporting {self.model_name} to ONNX at {export_dir}")
+            SentenceTransformer(self.model_name, backend="onnx").save_pretrained(export_dir)
+        
+        if self.backend == "onnx":
+            return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": "onnx/model.onnx"})
+        
+        file_name = self._find_quantized_model(export_dir)
+        if file_name is None:
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+            logger.info(f"Quantizing ONNX model to int8 ({self.quantization_config})")
+            export_dynamic_quantized_onnx_model(
+                SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": "onnx/model.onnx"}),
+                self.quantization_config,
+                export_dir
+            )
+            file_name = self._find_quantized_model(export_dir)
+        return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": f"onnx/{file_name}"})
+    
+    def _find_quantized_model(self, export_dir: str):
+        """Find the int8 export for the configured quantization target."""
+        onnx_dir = os.path.join(export_dir, "onnx")
+        if not os.path.isdir(onnx_dir):
+            return None
+        # Named model_qint8_<config>.onnx or model_quint8_<config>.onnx depending on the target
+        suffix = f"int8_{self.quantization_config}.onnx"
+        for name in sorted(os.listdir(onnx_dir)):
+            if name.startswith("model_q") and name.endswith(suffix):
+                return name
+        return None
+    
     def initialize(self):
         """Pre-load the model to memory."""
         logger.info("Initializing embedding service")
@@ -49,6 +158,29 @@ class EmbeddingService:
         """Check if model is loaded and ready."""
         return self._initialized
     
+    @property
+    def is_warmed(self) -> bool:
+        """Check if the model has run its warm-up inputs."""
+        return self._warmed
+    
+    def warmup(self, texts: List[str] = None) -> float:
+        """Run representative inputs through the model.
+        
+        The first forward passes allocate buffers and pick kernels; doing
+        this up front keeps that cost out of the first real request.
+        
+        Returns:
+            Warm-up duration in seconds.
+        """
+        texts = texts or WARMUP_TEXTS
+        started = time.perf_counter()
+        self.embed_texts(texts[:1])
+        self.embed_texts(texts)
+        self._warmed = True
+        elapsed = time.perf_counter() - started
+        logger.info(f"Embedding model warmed up in {elapsed:.2f}s")
+        return elapsed
+    
     def embed_text(self, text: str) -> List[float]:
         """Convert a single text to embedding vector.
         
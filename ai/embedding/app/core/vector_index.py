@@ -0,0 +1,414 @@
+"""
+In-memory vector index for entity embeddings.
+Keeps one L2-normalized NumPy matrix per (entity, language) so entity
+searches are a single matrix-vector product instead of a pgvector scan.
+Postgres remains the source of truth; the index is loaded from it at
+startup and kept current by the sync routes.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from datetime import datetime
+import logging
+import threading
+
+import numpy as np
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ("en", "ar")
+SEARCH_MODES = ("single", "fused")
+FUSIONS = ("max", "rrf")
+# Reciprocal-rank fusion constant (Cormack et al.)
+RRF_K = 60
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class _LanguageView:
+    """Compacted matrix of the rows that have a vector for one language."""
+
+    def __init__(self, matrix: np.ndarray, row_ids: np.ndarray, area_positions: Dict[str, np.ndarray]):
+        self.matrix = matrix                  # (m, d) normalized float32
+        self.row_ids = row_ids                # (m,) positions into the row metadata
+        self.area_positions = area_positions  # area_id -> positions into matrix
+
+
+class _Snapshot:
+    """Immutable index content: rows, vectors and everything derived from them.
+
+    Searches read ``EntityIndex._snapshot`` once, so the row positions in the
+    views always refer to the rows of the same snapshot.
+    """
+
+    def __init__(
+        self,
+        rows: Tuple[Dict[str, Any], ...],
+        vectors: Dict[str, Tuple[Optional[np.ndarray], ...]],
+        positions: Dict[str, int],
+        area_rows: Dict[str, np.ndarray],
+        views: Dict[str, _LanguageView]
+    ):
+        self.rows = rows
+        self.vectors = vectors
+        self.positions = positions
+        self.area_rows = area_rows
+        self.views = views
+
+
+class EntityIndex:
+    """Copy-on-write vector index for one entity type.
+
+    Writers build a new snapshot and swap it in with one assignment under a
+    lock; readers use whatever snapshot is current without locking. Building
+    a snapshot restacks the matrices, so callers on the event loop should run
+    writes in a thread.
+    """
+
+    def __init__(self, entity: str, key_field: str, fields: List[str], area_field: Optional[str] = None):
+        """
+        Args:
+            entity: Entity name (for logging/stats).
+            key_field: Row field that identifies an entity (id or name).
+            fields: Metadata fields returned with each match.
+            area_field: Field used to precompute per-area masks.
+        """
+        self.entity = entity
+        self.key_field = key_field
+        self.fields = fields
+        self.area_field = area_field
+
+        self._lock = threading.Lock()
+        # Writes made while a load reads the database, replayed onto its rows
+        self._recorders: List[List[tuple]] = []
+        self._snapshot = self._build([], {lang: [] for lang in LANGUAGES})
+
+    def __len__(self) -> int:
+        return len(self._snapshot.rows)
+
+    def begin_load(self) -> List[tuple]:
+        """Start recording writes before reading rows for ``load``.
+
+        A sync that lands while the rows are read is replayed onto them, so a
+        reload cannot undo it.
+        """
+        recorder: List[tuple] = []
+        with self._lock:
+            self._recorders.append(recorder)
+        return recorder
+
+    def load_aborted(self, recorder: List[tuple]):
+        """Stop recording for a load whose rows could not be read."""
+        with self._lock:
+            self._recorders = [r for r in self._recorders if r is not recorder]
+
+    def load(self, rows: List[Dict[str, Any]], recorder: Optional[List[tuple]] = None):
+        """Replace the index content with rows loaded from the database.
+
+        Each row holds the metadata fields plus ``embedding_en`` and
+        ``embedding_ar`` (either may be None).
+
+        Args:
+            rows: Rows read from the database.
+            recorder: Token from ``begin_load`` taken before the rows were read.
+        """
+        metas = [{f: row.get(f) for f in self.fields} for row in rows]
+        vectors = {
+            lang: [self._as_vector(row.get(f"embedding_{lang}")) for row in rows]
+            for lang in LANGUAGES
+        }
+        with self._lock:
+            if recorder is not None:
+                self._recorders = [r for r in self._recorders if r is not recorder]
+                for op, payload in recorder:
+                    if op == "upsert":
+                        self._apply_upserts(metas, vectors, payload)
+                    else:
+                        self._apply_remove(metas, vectors, payload)
+            self._snapshot = self._build(metas, vectors)
+
+    def upsert(self, row: Dict[str, Any], embedding_en: Optional[List[float]], embedding_ar: Optional[List[float]]):
+        """Insert or replace one entity."""
+        self.upsert_many([{**row, "embedding_en": embedding_en, "embedding_ar": embedding_ar}])
+
+    def upsert_many(self, rows: List[Dict[str, Any]]):
+        """Insert or replace several entities with a single rebuild.
+
+        Each row holds the metadata fields plus ``embedding_en`` and
+        ``embedding_ar``.
+        """
+        if not rows:
+            return
+        with self._lock:
+            snapshot = self._snapshot
+            metas = list(snapshot.rows)
+            vectors = {lang: list(vs) for lang, vs in snapshot.vectors.items()}
+            self._apply_upserts(metas, vectors, rows)
+            self._record(("upsert", rows))
+            self._snapshot = self._build(metas, vectors)
+
+    def remove(self, key: Any) -> bool:
+        """Remove one entity by key."""
+        with self._lock:
+            self._record(("remove", key))
+            snapshot = self._snapshot
+            if str(key) not in snapshot.positions:
+                return False
+            metas = list(snapshot.rows)
+            vectors = {lang: list(vs) for lang, vs in snapshot.vectors.items()}
+            self._apply_remove(metas, vectors, key)
+            self._snapshot = self._build(metas, vectors)
+            return True
+
+    def _record(self, write: tuple):
+        for recorder in self._recorders:
+            recorder.append(write)
+
+    def _apply_upserts(self, metas: List[Dict[str, Any]], vectors: Dict[str, list], rows: List[Dict[str, Any]]):
+        positions = {str(meta[self.key_field]): i for i, meta in enumerate(metas)}
+        for row in rows:
+            meta = {f: row.get(f) for f in self.fields}
+            key = str(meta[self.key_field])
+            position = positions.get(key)
+            if position is None:
+                positions[key] = len(metas)
+                metas.append(meta)
+                for lang in LANGUAGES:
+                    vectors[lang].append(self._as_vector(row.get(f"embedding_{lang}")))
+            else:
+                metas[position] = meta
+                for lang in LANGUAGES:
+                    vectors[lang][position] = self._as_vector(row.get(f"embedding_{lang}"))
+
+    def _apply_remove(self, metas: List[Dict[str, Any]], vectors: Dict[str, list], key: Any):
+        key = str(key)
+        for position, meta in enumerate(metas):
+            if str(meta[self.key_field]) == key:
+                del metas[position]
+                for lang in LANGUAGES:
+                    del vectors[lang][position]
+                return
+
+    def search(
+        self,
+        query_embedding: List[float],
+        language: str,
+        top_k: int = 5,
+        area_id: Optional[Any] = None,
+        mode: str = "single",
+        fusion: str = "max"
+    ) -> List[Dict[str, Any]]:
+        """Top-k cosine search.
+
+        ``single`` mode searches the column picked by language detection;
+        ``fused`` mode scores both columns in the same pass and merges
+        them with ``fusion`` ('max' cosine or reciprocal-rank fusion).
+
+        Returns rows in the same shape as the pgvector queries
+        (metadata fields plus ``similarity``).
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+        if fusion not in FUSIONS:
+            raise ValueError(f"Unknown fusion '{fusion}', expected one of {FUSIONS}")
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        snapshot = self._snapshot
+        if mode == "fused":
+            return self._search_fused(snapshot, query, top_k, area_id, fusion)
+
+        # Same column choice as the SQL path: anything but 'en' uses Arabic
+        view = snapshot.views.get("en" if language == "en" else "ar")
+        rows = snapshot.rows
+        if view is None or view.matrix.shape[0] == 0:
+            return []
+
+        if area_id is not None and self.area_field:
+            positions = view.area_positions.get(str(area_id))
+            if positions is None or positions.size == 0:
+                return []
+            scores = view.matrix[positions] @ query
+        else:
+            positions = None
+            scores = view.matrix @ query
+
+        top = self._top_k(scores, top_k)
+        results = []
+        for i in top:
+            matrix_position = positions[i] if positions is not None else i
+            row = rows[view.row_ids[matrix_position]]
+            results.append({**row, "similarity": float(scores[i])})
+        return results
+
+    def _search_fused(
+        self, snapshot: _Snapshot, query: np.ndarray, top_k: int, area_id: Optional[Any], fusion: str
+    ) -> List[Dict[str, Any]]:
+        """Score both language columns and merge per row.
+
+        ``similarity`` is always the best cosine over both columns so
+        thresholds keep their meaning; with RRF only the order changes.
+        """
+        rows, views = snapshot.rows, snapshot.views
+        if not rows or not views:
+            return []
+
+        # (languages, rows) cosine matrix, -inf where a row has no vector
+        scores = np.full((len(LANGUAGES), len(rows)), -np.inf, dtype=np.float32)
+        for i, lang in enumerate(LANGUAGES):
+            view = views[lang]
+            if view.matrix.shape[0]:
+                scores[i, view.row_ids] = view.matrix @ query
+
+        if area_id is not None and self.area_field:
+            candidates = snapshot.area_rows.get(str(area_id))
+            if candidates is None or candidates.size == 0:
+                return []
+        else:
+            candidates = np.arange(len(rows))
+        scores = scores[:, candidates]
+
+        best = scores.max(axis=0)
+        present = np.isfinite(best)
+        candidates, scores, best = candidates[present], scores[:, present], best[present]
+        if candidates.size == 0:
+            return []
+
+        if fusion == "rrf":
+            fused = np.zeros(candidates.size, dtype=np.float64)
+            for lang_scores in scores:
+                order = np.argsort(-lang_scores, kind="stable")
+                ranks = np.empty(order.size, dtype=np.float64)
+                ranks[order] = np.arange(1, order.size + 1)
+                fused += np.where(np.isfinite(lang_scores), 1.0 / (RRF_K + ranks), 0.0)
+            # Break RRF ties with the best cosine
+            top = np.lexsort((-best, -fused))[:top_k]
+        else:
+            top = self._top_k(best, top_k)
+
+        return [{**rows[candidates[i]], "similarity": float(best[i])} for i in top]
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first."""
+        k = min(top_k, scores.shape[0])
+        if k <= 0:
+            return np.arange(0)
+        top = np.argpartition(-scores, k - 1)[:k] if k < scores.shape[0] else np.arange(scores.shape[0])
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def _build(self, metas: List[Dict[str, Any]], vectors: Dict[str, list]) -> _Snapshot:
+        """Positions, per-language matrices and area masks for a set of rows."""
+        positions = {str(row[self.key_field]): i for i, row in enumerate(metas)}
+
+        area_keys = (
+            np.array([str(row.get(self.area_field)) for row in metas], dtype=object)
+            if self.area_field else None
+        )
+        area_rows = (
+            {area: np.flatnonzero(area_keys == area) for area in set(area_keys)}
+            if area_keys is not None else {}
+        )
+
+        views = {}
+        for lang in LANGUAGES:
+            lang_vectors = vectors[lang]
+            row_ids = np.array([i for i, v in enumerate(lang_vectors) if v is not None], dtype=np.int64)
+            if row_ids.size:
+                matrix = _normalize_rows(np.stack([lang_vectors[i] for i in row_ids]).astype(np.float32))
+            else:
+                matrix = np.zeros((0, 0), dtype=np.float32)
+
+            area_positions: Dict[str, np.ndarray] = {}
+            if area_keys is not None and row_ids.size:
+                view_areas = area_keys[row_ids]
+                for area in set(view_areas):
+                    area_positions[area] = np.flatnonzero(view_areas == area)
+
+            views[lang] = _LanguageView(matrix, row_ids, area_positions)
+
+        return _Snapshot(
+            tuple(metas),
+            {lang: tuple(vs) for lang, vs in vectors.items()},
+            positions,
+            area_rows,
+            views
+        )
+
+    @staticmethod
+    def _as_vector(value) -> Optional[np.ndarray]:
+        if value is None:
+            return None
+        return np.asarray(value, dtype=np.float32)
+
+
+class VectorIndexService:
+    """In-memory indexes for areas, projects and unit types."""
+
+    def __init__(self):
+        self.areas = EntityIndex("areas", "area_id", ["area_id", "name", "name_ar"])
+        self.projects = EntityIndex(
+            "projects", "project_id", ["project_id", "name", "area_id"], area_field="area_id"
+        )
+        self.unit_types = EntityIndex("unit_types", "name", ["name", "name_ar"])
+        self._loaded = False
+        self._loaded_at: Optional[str] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Check if the index was loaded from the database."""
+        return self._loaded
+
+    def load_from_database(self, db):
+        """(Re)load every entity matrix from Postgres.
+
+        Args:
+            db: DatabaseService instance.
+        """
+        for index, load_rows in (
+            (self.areas, db.load_area_embeddings),
+            (self.projects, db.load_project_embeddings),
+            (self.unit_types, db.load_unit_type_embeddings),
+        ):
+            recorder = index.begin_load()
+            try:
+                rows = load_rows()
+            except Exception:
+                index.load_aborted(recorder)
+                raise
+            index.load(rows, recorder)
+        self._loaded = True
+        self._loaded_at = datetime.now().isoformat()
+        logger.info(
+            f"Vector index loaded: {len(self.areas)} areas, "
+            f"{len(self.projects)} projects, {len(self.unit_types)} unit types"
+        )
+
+    def get_stats(self) -> dict:
+        """Get index sizes and load time."""
+        return {
+            "loaded": self._loaded,
+            "loaded_at": self._loaded_at,
+            "areas": len(self.areas),
+            "projects": len(self.projects),
+            "unit_types": len(self.unit_types)
+        }
+
+
+@lru_cache()
+def get_vector_index() -> Optional[VectorIndexService]:
+    """Get cached vector index instance (None when disabled)."""
+    settings = get_settings()
+    if not settings.vector_index_enabled:
+        return None
+    return VectorIndexService()
@@ -5,12 +5,19 @@ FastAPI server for centralized embedding operations.
 
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 import logging
+import time
 
 from app.config import get_settings
-from app.core.embeddings import get_embedding_service
+from app.core.embeddings import WARMUP_TEXTS, get_embedding_service
+from app.core.batcher import get_embedding_batcher
+from app.core.embedding_cache import get_embedding_cache
 from app.core.database import get_database, initialize_database
+from app.core.vector_index import get_vector_index
 from app.api.routes import embed, sync, search
 
 # Configure logging
@@ -18,33 +25,118 @@ settings = get_settings()
 # Logging is configured in run.py or via uvicorn defaults
 logger = logging.getLogger(__name__)
 
+# Stages that must complete before /ready returns 200
+READY_STAGES = ("database", "model_loaded", "warmed")
+DATABASE_RETRY_S = 5.0
+
+
+async def refresh_vector_index(interval_s: float):
+    """Periodically reload the vector index so out-of-band DB writes show up."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await run_in_threadpool(get_vector_index().load_from_database, get_database())
+        except Exception as e:
+            logger.error(f"Vector index refresh failed: {e}")
+
+
+async def initialize_database_stage(app: FastAPI):
+    """Connect to the database (retrying until it is reachable) and load the vector index."""
+    stages, timings = app.state.stages, app.state.timings
+    started = time.perf_counter()
+    while True:
+        try:
+            await run_in_threadpool(initialize_database)
+            break
+        except Exception as e:
+            logger.error(f"Database not available, retrying in {DATABASE_RETRY_S:.0f}s: {e}")
+            await asyncio.sleep(DATABASE_RETRY_S)
+    stages["database"] = True
+    timings["database_s"] = round(time.perf_counter() - started, 3)
+    logger.info("✅ Database initialized")
+    
+    # Load entity vectors into memory (searches fall back to pgvector if this fails)
+    vector_index = get_vector_index()
+    if vector_index is not None:
+        try:
+            await run_in_threadpool(vector_index.load_from_database, get_database())
+            stages["vector_index"] = True
+            logger.info("✅ Vector index loaded")
+        except Exception as e:
+            logger.error(f"Failed to load vector index, using pgvector search: {e}")
+
+
+async def load_model_stage(app: FastAPI):
+    """Load the model from its local snapshot and warm it up."""
+    stages, timings = app.state.stages, app.state.timings
+    embedding_service = get_embedding_service()
+    
+    started = time.perf_counter()
+    await run_in_threadpool(embedding_service.initialize)
+    stages["model_loaded"] = True
+    timings["model_load_s"] = round(time.perf_counter() - started, 3)
+    logger.info("✅ Embedding model loaded")
+    
+    await run_in_threadpool(embedding_service.embed_text, WARMUP_TEXTS[0])
+    timings["time_to_first_embedding_s"] = round(time.perf_counter() - app.state.started_at, 3)
+    logger.info(f"⏱️ Time to first embedding: {timings['time_to_first_embedding_s']:.2f}s")
+    
+    timings["warmup_s"] = round(await run_in_threadpool(embedding_service.warmup), 3)
+    stages["warmed"] = True
+
+
+async def warm_start(app: FastAPI):
+    """Bring up the database and the model concurrently, in the background."""
+    results = await asyncio.gather(
+        initialize_database_stage(app), load_model_stage(app), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Startup stage failed: {result}")
+    
+    if all(app.state.stages[stage] for stage in READY_STAGES):
+        app.state.ready = True
+        app.state.timings["ready_s"] = round(time.perf_counter() - app.state.started_at, 3)
+        logger.info(f"✅ Embedding service ready on port {settings.port} ({app.state.timings['ready_s']:.2f}s)")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan - startup and shutdown."""
+    """Application lifespan - startup and shutdown.
+    
+    The server starts accepting requests immediately; the database and
+    the model come up in the background and /ready reports each stage.
+    """
     # Startup
     logger.info("🚀 Starting Embedding Microservice...")
+    app.state.started_at = time.perf_counter()
+    app.state.ready = False
+    app.state.stages = {"database": False, "model_loaded": False, "warmed": False, "vector_index": False}
+    app.state.timings = {}
     
-    # Initialize database
-    logger.info("Initializing database connection...")
-    initialize_database()
-    logger.info("✅ Database initialized")
+    # Start micro-batching scheduler (runs inference off the event loop)
+    batcher = get_embedding_batcher()
+    await batcher.start()
+    logger.info("✅ Embedding batcher started")
     
-    # Pre-load embedding model (this takes ~8-10 seconds)
-    logger.info("Loading embedding model (this may take a moment)...")
-    embedding_service = get_embedding_service()
-    embedding_service.initialize()
-    logger.info("✅ Embedding model loaded and ready")
+    startup_task = asyncio.create_task(warm_start(app))
     
-    # Mark as ready
-    app.state.ready = True
-    logger.info(f"✅ Embedding service ready on port {settings.port}")
+    refresh_task = None
+    if get_vector_index() is not None and settings.vector_index_refresh_interval_s > 0:
+        refresh_task = asyncio.create_task(
+            refresh_vector_index(settings.vector_index_refresh_interval_s)
+        )
     
     yield
     
     # Shutdown
     logger.info("👋 Shutting down Embedding Microservice...")
     app.state.ready = False
+    for task in (startup_task, refresh_task):
+        if task is not None:
+            task.cancel()
+    await get_embedding_batcher().stop()
+    get_database().close()
 
 
 # Create FastAPI app
@@ -73,15 +165,32 @@ app.include_router(search.router, prefix="/search", tags=["Search"])
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "embedding"}
+    cache = get_embedding_cache()
+    vector_index = get_vector_index()
+    return {
+        "status": "healthy",
+        "service": "embedding",
+        "startup": {
+            "stages": getattr(app.state, "stages", {}),
+            "timings": getattr(app.state, "timings", {})
+        },
+        "batcher": get_embedding_batcher().get_stats(),
+        "cache": cache.get_stats() if cache is not None else {"enabled": False},
+        "database_pool": get_database().get_pool_stats(),
+        "vector_index": vector_index.get_stats() if vector_index is not None else {"enabled": False}
+    }
 
 
 @app.get("/ready")
 async def readiness_check():
-    """Readiness check - returns 200 only when model is loaded."""
+    """Readiness check - returns 200 only when the database is up and the model is loaded and warmed."""
+    body = {
+        "stages": getattr(app.state, "stages", {}),
+        "timings": getattr(app.state, "timings", {})
+    }
     if getattr(app.state, "ready", False):
-        return {"status": "ready", "model": settings.embedding_model_name}
-    return {"status": "not_ready"}, 503
+        return {"status": "ready", "model": settings.embedding_model_name, **body}
+    return JSONResponse(status_code=503, content={"status": "not_ready", **body})
 
 
 if __name__ == "__main__":
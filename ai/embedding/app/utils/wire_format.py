@@ -0,0 +1,62 @@
+"""
+Compact wire formats for embedding responses.
+
+Besides the default JSON float lists, /embed/* can return vectors as
+little-endian float32/float16 bytes, either base64-encoded inside JSON or
+as a raw application/octet-stream body.
+"""
+
+from typing import List, Optional, Tuple
+import base64
+
+import numpy as np
+from fastapi import Response
+
+OCTET_STREAM = "application/octet-stream"
+ENCODINGS = ("json", "base64", "binary")
+DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def negotiate_format(accept: Optional[str], encoding: Optional[str], dtype: Optional[str]) -> Tuple[str, str]:
+    """Pick the response encoding and dtype.
+
+    An explicit ``encoding`` query flag wins; otherwise an Accept header
+    asking for application/octet-stream selects the binary encoding.
+
+    Returns:
+        (encoding, dtype) tuple.
+
+    Raises:
+        ValueError: Unknown encoding or dtype.
+    """
+    if encoding is None:
+        encoding = "binary" if accept and OCTET_STREAM in accept else "json"
+    dtype = dtype or "float32"
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}', expected one of {ENCODINGS}")
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}', expected one of {tuple(DTYPES)}")
+    return encoding, dtype
+
+
+def pack_vectors(embeddings: List[List[float]], dtype: str) -> bytes:
+    """Serialize vectors as one row-major little-endian matrix."""
+    return np.asarray(embeddings, dtype=DTYPES[dtype]).tobytes()
+
+
+def encode_base64(embeddings: List[List[float]], dtype: str) -> str:
+    """Serialize vectors to a base64 string."""
+    return base64.b64encode(pack_vectors(embeddings, dtype)).decode("ascii")
+
+
+def binary_response(embeddings: List[List[float]], dtype: str) -> Response:
+    """Raw octet-stream response; shape and dtype travel in headers."""
+    return Response(
+        content=pack_vectors(embeddings, dtype),
+        media_type=OCTET_STREAM,
+        headers={
+            "X-Embedding-Count": str(len(embeddings)),
+            "X-Embedding-Dimension": str(len(embeddings[0]) if embeddings else 0),
+            "X-Embedding-Dtype": dtype,
+        }
+    )
@@ -0,0 +1,11 @@
+-- Phase 3.2: Source hashes for bulk sync / reindex
+-- name_hash = sha256(model + source fields); rows whose hash is unchanged
+-- are skipped by /sync/bulk and reindex.py.
+ALTER TABLE areas_embeddings
+ADD COLUMN IF NOT EXISTS name_hash VARCHAR(64);
+ALTER TABLE projects_embeddings
+ADD COLUMN IF NOT EXISTS name_hash VARCHAR(64);
+ALTER TABLE unit_types_embeddings
+ADD COLUMN IF NOT EXISTS name_hash VARCHAR(64);
+-- Bulk upserts of unit types conflict on name
+CREATE UNIQUE INDEX IF NOT EXISTS unit_types_embeddings_name_key ON unit_types_embeddings (name);
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Reindex CLI for entity embeddings.
+Streams areas, projects and unit types from the CRM tables, embeds EN+AR
+names in large batches and bulk-upserts them into the embedding tables.
+Rows whose name hash is unchanged are skipped unless --force is given.
+
+Usage:
+    python reindex.py                      # all entities, skip unchanged
+    python reindex.py --entity projects    # one entity type
+    python reindex.py --force              # re-embed everything (e.g. after a model change)
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.config import get_settings
+from app.core.batcher import EmbeddingBatcher
+from app.core.bulk_sync import ENTITY_TABLES, BulkSyncService
+from app.core.database import get_database, initialize_database
+from app.core.embeddings import get_embedding_service
+
+
+async def reindex(entities, chunk_size: int, batch_size: int, force: bool) -> int:
+    """Run the bulk sync for the selected entities; returns an exit code."""
+    db = get_database()
+    initialize_database()
+
+    embedding_service = get_embedding_service()
+    embedding_service.initialize()
+
+    batcher = EmbeddingBatcher(embedding_service, max_batch_size=batch_size, max_wait_ms=0)
+    await batcher.start()
+
+    # A running service picks the new rows up on its next vector index refresh
+    service = BulkSyncService(db=db, batcher=batcher, chunk_size=chunk_size)
+    try:
+        for entity in entities:
+            stats = await service.sync_chunks(
+                entity, db.iter_source_entities(entity, chunk_size), force=force
+            )
+            print(
+                f"{entity:>10}: {stats['rows']} rows, {stats['embedded']} embedded, "
+                f"{stats['skipped']} unchanged in {stats['elapsed_s']:.1f}s "
+                f"({stats['rows_per_sec']:.1f} rows/s)"
+            )
+    except Exception as e:
+        logging.getLogger("reindex").error(f"Reindex failed: {e}")
+        return 1
+    finally:
+        await batcher.stop()
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Re-embed areas, projects and unit types")
+    parser.add_argument(
+        "--entity", choices=list(ENTITY_TABLES), action="append",
+        help="Entity type to reindex (repeatable, default: all)"
+    )
+    parser.add_argument("--chunk-size", type=int, default=settings.bulk_sync_chunk_size,
+                        help="Entities per transaction")
+    parser.add_argument("--batch-size", type=int, default=128, help="Texts per model forward pass")
+    parser.add_argument("--force", action="store_true", help="Re-embed rows even if unchanged")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper()),
+        format="%(asctime)s | %(levelname)-8s | %(name)-30s | %(message)s"
+    )
+
+    sys.exit(asyncio.run(reindex(args.entity or list(ENTITY_TABLES), args.chunk_size, args.batch_size, args.force)))
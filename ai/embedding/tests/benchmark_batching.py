@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Load Benchmark for the Embedding Micro-Batching Scheduler
+Measures throughput and p50/p99 latency of /embed/text at several concurrency levels.
+
+Usage:
+    python tests/benchmark_batching.py [--url http://localhost:8001] [--requests 256]
+
+Compare runs with batching enabled and effectively disabled
+(BATCH_MAX_SIZE=1 BATCH_MAX_WAIT_MS=0) on the server side.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+BASE_URL = "http://localhost:8001"
+CONCURRENCY_LEVELS = [1, 16, 64]
+
+# Representative chatbot queries (Arabic, English and mixed)
+PHRASES = [
+    "عايز اعرف اي ارخص شقة في التجمع",
+    "villa in North Coast",
+    "شقة في العاصمة الادارية",
+    "Hawabay",
+    "دوبلكس في مدينتي",
+    "studio near New Capital",
+    "فيلا في الساحل الشمالي",
+    "apartment with garden في التجمع الخامس",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_level(client: httpx.AsyncClient, base_url: str, concurrency: int, total_requests: int) -> dict:
+    """Run `total_requests` requests spread over `concurrency` concurrent clients."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total_requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            text = f"{PHRASES[i % len(PHRASES)]} {i}"
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{base_url}/embed/text", json={"text": text})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+async def main(base_url: str, total_requests: int):
+    limits = httpx.Limits(max_connections=max(CONCURRENCY_LEVELS), max_keepalive_connections=max(CONCURRENCY_LEVELS))
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        # Warm-up so model/JIT initialization does not skew the first level
+        await client.post(f"{base_url}/embed/text", json={"text": "warm up"})
+
+        print(f"{'clients':>8} | {'requests':>8} | {'errors':>6} | {'req/s':>8} | {'p50 ms':>8} | {'p99 ms':>8}")
+        print("-" * 62)
+        for concurrency in CONCURRENCY_LEVELS:
+            result = await run_level(client, base_url, concurrency, total_requests)
+            print(
+                f"{result['concurrency']:>8} | {result['requests']:>8} | {result['errors']:>6} | "
+                f"{result['throughput_rps']:>8.1f} | {result['p50_ms']:>8.1f} | {result['p99_ms']:>8.1f}"
+            )
+
+        health = (await client.get(f"{base_url}/health")).json()
+        if "batcher" in health:
+            print(f"\nBatcher stats: {health['batcher']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding service batching load benchmark")
+    parser.add_argument("--url", default=BASE_URL, help="Embedding service base URL")
+    parser.add_argument("--requests", type=int, default=256, help="Requests per concurrency level")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.url, args.requests))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Parity check and throughput benchmark for the embedding inference backends
+Compares the ONNX (fp32) and ONNX int8 backends against the PyTorch vectors
+on the repo's test phrases (complex_test_results.json + known_entities.json).
+
+Reports per backend:
+- cosine drift vs torch (mean / p1 / min cosine)
+- nearest-known-entity agreement with torch
+- load time and texts/sec at batch size 1 and 32
+
+Usage:
+    python tests/benchmark_inference_backends.py [--backends torch onnx onnx-int8] [--rounds 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.embeddings import BACKENDS, EmbeddingService
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_phrases() -> Dict[str, List[str]]:
+    """Collect queries, chunks and known entity names from the test fixtures."""
+    with open(os.path.join(TESTS_DIR, "complex_test_results.json"), encoding="utf-8") as f:
+        details = json.load(f)["details"]
+    with open(os.path.join(TESTS_DIR, "known_entities.json"), encoding="utf-8") as f:
+        known = json.load(f)
+
+    queries = []
+    for case in details:
+        queries.append(case["query"])
+        queries.extend(case.get("chunks", []))
+    entities = [name for names in known.values() for name in names]
+    return {
+        "queries": list(dict.fromkeys(queries)),
+        "entities": list(dict.fromkeys(entities)),
+    }
+
+
+def throughput(service: EmbeddingService, texts: List[str], batch_size: int, rounds: int) -> float:
+    """Texts embedded per second at a given batch size."""
+    service.embed_texts(texts[:batch_size])  # warm-up
+    started = time.perf_counter()
+    count = 0
+    for _ in range(rounds):
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            service.embed_texts(batch)
+            count += len(batch)
+    return count / (time.perf_counter() - started)
+
+
+def main(backends: List[str], rounds: int):
+    phrases = load_phrases()
+    texts = phrases["queries"] + phrases["entities"]
+    print(f"{len(phrases['queries'])} queries/chunks, {len(phrases['entities'])} known entities\n")
+
+    vectors: Dict[str, np.ndarray] = {}
+    rows = []
+    for backend in backends:
+        started = time.perf_counter()
+        service = EmbeddingService(backend=backend)
+        service.initialize()
+        load_s = time.perf_counter() - started
+
+        vectors[backend] = np.asarray(service.embed_texts(texts), dtype=np.float32)
+        rows.append({
+            "backend": backend,
+            "load_s": load_s,
+            "tps_1": throughput(service, texts, 1, rounds),
+            "tps_32": throughput(service, texts, 32, rounds),
+        })
+
+    print(f"{'backend':>10} | {'load s':>7} | {'texts/s @1':>10} | {'texts/s @32':>11}")
+    print("-" * 48)
+    for row in rows:
+        print(f"{row['backend']:>10} | {row['load_s']:>7.1f} | {row['tps_1']:>10.1f} | {row['tps_32']:>11.1f}")
+
+    if "torch" not in vectors:
+        return
+
+    reference = vectors["torch"]
+    n_queries = len(phrases["queries"])
+
+    def nearest_entities(matrix: np.ndarray) -> np.ndarray:
+        return np.argmax(matrix[:n_queries] @ matrix[n_queries:].T, axis=1)
+
+    reference_nearest = nearest_entities(reference)
+    print(f"\n{'backend':>10} | {'mean cos':>9} | {'p1 cos':>9} | {'min cos':>9} | {'nearest agree':>13}")
+    print("-" * 64)
+    for backend, matrix in vectors.items():
+        if backend == "torch":
+            continue
+        cosines = np.sum(reference * matrix, axis=1)  # vectors are L2-normalized
+        agree = np.mean(nearest_entities(matrix) == reference_nearest)
+        print(
+            f"{backend:>10} | {cosines.mean():>9.5f} | {np.percentile(cosines, 1):>9.5f} | "
+            f"{cosines.min():>9.5f} | {agree:>12.1%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding backend parity and throughput benchmark")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--rounds", type=int, default=5, help="Passes over the phrase set per batch size")
+    args = parser.parse_args()
+
+    main(args.backends, args.rounds)
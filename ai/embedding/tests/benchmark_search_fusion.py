@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Offline recall benchmark: single-column vs fused (EN + AR) entity search
+Embeds the catalog (known_entities.json, Arabic names from
+DB/migration_001_add_arabic_names.sql) with the local model, loads it into
+the in-memory index and replays the complex test phrases
+(complex_test_results.json) chunk by chunk, like complex_multi_word_test.py.
+
+Reports per mode:
+- top-1 accuracy and recall@5 for expected entities that exist
+- the same on mixed Arabic/English queries
+- false matches (best score over threshold) for entities not in the catalog
+
+No server or database needed.
+
+Usage:
+    python tests/benchmark_search_fusion.py [--backend torch] [--top-k 5]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.embeddings import BACKENDS, EmbeddingService
+from app.core.vector_index import VectorIndexService
+from app.utils.language_detection import detect_language
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ARABIC_NAMES_SQL = os.path.join(TESTS_DIR, "..", "..", "..", "DB", "migration_001_add_arabic_names.sql")
+
+UNIT_TYPES_AR = {
+    "apartment": "شقة",
+    "villa": "فيلا",
+    "duplex": "دوبلكس",
+    "penthouse": "بنتهاوس",
+    "townhouse": "تاون هاوس",
+    "garden villa": "فيلا بحديقة",
+    "sky villa": "سكاي فيلا",
+    "studio": "استوديو",
+    "chalet": "شاليه",
+    "twin house": "توين هاوس",
+}
+
+# expectation key -> (index attribute, match threshold used by the routes)
+ENTITIES = {
+    "area": ("areas", 0.45),
+    "project": ("projects", 0.45),
+    "unit": ("unit_types", 0.4),
+}
+
+MODES = [("single", "max"), ("fused", "max"), ("fused", "rrf")]
+
+
+def load_arabic_names() -> Dict[str, str]:
+    """English name -> Arabic name, from the migration's UPDATE statements."""
+    try:
+        with open(ARABIC_NAMES_SQL, encoding="utf-8") as f:
+            sql = f.read()
+    except OSError:
+        return {}
+    pattern = re.compile(r"SET name_ar = '([^']+)'\s+WHERE \w+ = \d+;\s*--\s*(.+)")
+    return {english.strip().lower(): arabic for arabic, english in pattern.findall(sql)}
+
+
+def build_index(service: EmbeddingService):
+    """Embed EN + AR names of the known catalog into a fresh index.
+
+    Returns:
+        (index, entity -> catalog names) tuple.
+    """
+    with open(os.path.join(TESTS_DIR, "known_entities.json"), encoding="utf-8") as f:
+        known = json.load(f)
+    arabic = {**load_arabic_names(), **UNIT_TYPES_AR}
+
+    index = VectorIndexService()
+    catalog = {}
+    for entity, key in (("areas", "area_id"), ("projects", "project_id"), ("unit_types", "name")):
+        names = [name.title() for name in known[entity]]
+        names_ar = [arabic.get(name.lower()) for name in names]
+        vectors_en = service.embed_texts(names)
+        # Same fallback as /sync/*: no Arabic name -> reuse the English vector
+        vectors_ar = service.embed_texts([ar or en for en, ar in zip(names, names_ar)])
+        rows = []
+        for i, (name, name_ar) in enumerate(zip(names, names_ar)):
+            rows.append({
+                key: name if key == "name" else str(i),
+                "name": name,
+                "name_ar": name_ar,
+                "area_id": None,
+                "embedding_en": vectors_en[i],
+                "embedding_ar": vectors_ar[i],
+            })
+        getattr(index, entity).load(rows)
+        catalog[entity] = names
+    return index, catalog
+
+
+def is_mixed(text: str) -> bool:
+    """Both Arabic and Latin letters in one query."""
+    return bool(re.search(r"[\u0600-\u06FF]", text)) and bool(re.search(r"[A-Za-z]", text))
+
+
+def merged_top(index: VectorIndexService, entity: str, texts: List[str], vectors, mode: str, fusion: str, top_k: int):
+    """Best score per entity over all chunks, highest first (as in the test suite)."""
+    best: Dict[str, float] = {}
+    for text, vector in zip(texts, vectors):
+        results = getattr(index, entity).search(
+            vector, detect_language(text), top_k=top_k, mode=mode, fusion=fusion
+        )
+        for r in results:
+            best[r["name"]] = max(best.get(r["name"], -1.0), r["similarity"])
+    return sorted(best.items(), key=lambda item: -item[1])[:top_k]
+
+
+def matches(expected: str, value: Optional[str]) -> bool:
+    return bool(value) and value.lower().startswith(expected.lower())
+
+
+def main(backend: str, top_k: int):
+    service = EmbeddingService(backend=backend)
+    service.initialize()
+    index, catalog = build_index(service)
+
+    with open(os.path.join(TESTS_DIR, "complex_test_results.json"), encoding="utf-8") as f:
+        details = json.load(f)["details"]
+
+    cases = []
+    for case in details:
+        texts = case.get("chunks") or [case["query"]]
+        cases.append((case, texts, service.embed_texts(texts)))
+    print(f"{len(cases)} queries, {sum(is_mixed(c['query']) for c, _, _ in cases)} mixed Arabic/English\n")
+
+    header = f"{'mode':>10} | {'top-1':>7} | {'recall@' + str(top_k):>9} | {'mixed top-1':>11} | {'mixed r@' + str(top_k):>10} | {'false matches':>13}"
+    print(header)
+    print("-" * len(header))
+    for mode, fusion in MODES:
+        stats = {"n": 0, "top1": 0, "recall": 0, "mixed_n": 0, "mixed_top1": 0, "mixed_recall": 0, "neg_n": 0, "false": 0}
+        for case, texts, vectors in cases:
+            mixed = is_mixed(case["query"])
+            for key, expected in case["expectations"].items():
+                if not expected or key not in ENTITIES:
+                    continue
+                entity, threshold = ENTITIES[key]
+                top = merged_top(index, entity, texts, vectors, mode, fusion, top_k)
+                if not any(matches(expected, name) for name in catalog[entity]):
+                    # Not in the catalog: anything over the threshold is a false match
+                    stats["neg_n"] += 1
+                    stats["false"] += bool(top and top[0][1] >= threshold)
+                    continue
+                hit1 = bool(top) and matches(expected, top[0][0])
+                hitk = any(matches(expected, name) for name, _ in top)
+                stats["n"] += 1
+                stats["top1"] += hit1
+                stats["recall"] += hitk
+                if mixed:
+                    stats["mixed_n"] += 1
+                    stats["mixed_top1"] += hit1
+                    stats["mixed_recall"] += hitk
+
+        def rate(hits: str, total: str) -> str:
+            return f"{stats[hits] / stats[total]:.1%}" if stats[total] else "n/a"
+
+        label = mode if mode == "single" else f"{mode}-{fusion}"
+        print(
+            f"{label:>10} | {rate('top1', 'n'):>7} | {rate('recall', 'n'):>9} | "
+            f"{rate('mixed_top1', 'mixed_n'):>11} | {rate('mixed_recall', 'mixed_n'):>10} | "
+            f"{stats['false']:>6} / {stats['neg_n']:<4}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single vs fused entity search recall (offline)")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.backend, args.top_k)
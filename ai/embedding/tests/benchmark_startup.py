@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for the Embedding Service
+Starts the service in a subprocess and measures, from process spawn:
+- time until /embed/text first succeeds (time-to-first-embedding)
+- time until /ready returns 200
+
+Runs once loading the model from the Hugging Face cache (EMBEDDING_SNAPSHOT_DIR
+disabled, the previous startup path) and once from the local snapshot.
+
+Usage:
+    python tests/benchmark_startup.py [--port 8011] [--runs 3]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "hub cache": {"EMBEDDING_SNAPSHOT_DIR": ""},
+    "snapshot": {},
+}
+
+
+def measure_startup(port: int, env_overrides: dict, timeout_s: float) -> dict:
+    """Spawn the service and poll until it embeds and reports ready."""
+    env = {**os.environ, **env_overrides, "RELOAD": "false"}
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE_DIR,
+        env=env,
+    )
+    result = {"first_embedding_s": None, "ready_s": None, "server_timings": {}}
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(timeout=5.0) as client:
+            while time.perf_counter() - started < timeout_s:
+                try:
+                    if result["first_embedding_s"] is None:
+                        response = client.post(f"{base_url}/embed/text", json={"text": "شقة في التجمع"})
+                        if response.status_code == 200:
+                            result["first_embedding_s"] = time.perf_counter() - started
+                    if result["ready_s"] is None:
+                        response = client.get(f"{base_url}/ready")
+                        if response.status_code == 200:
+                            result["ready_s"] = time.perf_counter() - started
+                            result["server_timings"] = response.json().get("timings", {})
+                    if result["first_embedding_s"] is not None and result["ready_s"] is not None:
+                        break
+                except httpx.TransportError:
+                    pass  # Server not listening yet
+                time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return result
+
+
+def main(port: int, runs: int, timeout_s: float):
+    print(f"{'mode':>10} | {'first embedding s':>17} | {'ready s':>8} | server timings")
+    print("-" * 80)
+    for mode, overrides in MODES.items():
+        results = [measure_startup(port, overrides, timeout_s) for _ in range(runs)]
+        first = [r["first_embedding_s"] for r in results if r["first_embedding_s"] is not None]
+        ready = [r["ready_s"] for r in results if r["ready_s"] is not None]
+        print(
+            f"{mode:>10} | "
+            f"{statistics.median(first) if first else float('nan'):>17.2f} | "
+            f"{statistics.median(ready) if ready else float('nan'):>8.2f} | "
+            f"{results[-1]['server_timings']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding service startup benchmark")
+    parser.add_argument("--port", type=int, default=8011, help="Port for the spawned service")
+    parser.add_argument("--runs", type=int, default=3, help="Startups per mode (median reported)")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Give up on a startup after this many seconds")
+    args = parser.parse_args()
+
+    main(args.port, args.runs, args.timeout)
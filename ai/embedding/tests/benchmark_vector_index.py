@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: in-memory vector index vs pgvector entity search
+Runs the same queries through DatabaseService.search_*_by_language and the
+in-memory EntityIndex, reporting p50/p99 latency and top-1 agreement.
+
+Needs the embedding tables populated (see the README) and the model available.
+
+Usage:
+    python tests/benchmark_vector_index.py [--rounds 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import get_database
+from app.core.embeddings import get_embedding_service
+from app.core.vector_index import VectorIndexService
+from app.utils.language_detection import detect_language
+
+QUERIES = [
+    "التجمع الخامس",
+    "New Cairo",
+    "العاصمة الادارية",
+    "North Coast",
+    "مدينتي",
+    "Hawabay",
+    "شقة",
+    "villa",
+    "دوبلكس",
+    "Sheikh Zayed",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def time_calls(fn: Callable, args_list: List[tuple], rounds: int) -> List[float]:
+    """Call fn for every argument tuple `rounds` times; return per-call seconds."""
+    latencies = []
+    for _ in range(rounds):
+        for args in args_list:
+            start = time.perf_counter()
+            fn(*args)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main(rounds: int, top_k: int):
+    db = get_database()
+    embedding_service = get_embedding_service()
+    embedding_service.initialize()
+
+    print("Loading vector index...")
+    start = time.perf_counter()
+    index = VectorIndexService()
+    index.load_from_database(db)
+    print(f"Loaded in {(time.perf_counter() - start) * 1000:.1f} ms: {index.get_stats()}\n")
+
+    queries = [(embedding_service.embed_text(q), detect_language(q)) for q in QUERIES]
+
+    cases = [
+        ("areas", db.search_areas_by_language, index.areas.search, "area_id"),
+        ("projects", db.search_projects_by_language, index.projects.search, "project_id"),
+        ("unit_types", db.search_unit_types_by_language, index.unit_types.search, "name"),
+    ]
+
+    print(f"{'entity':>10} | {'path':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'top-1 agree':>11}")
+    print("-" * 58)
+    for entity, pg_search, mem_search, key in cases:
+        args = [(embedding, lang, top_k) for embedding, lang in queries]
+
+        agree = 0
+        for embedding, lang, k in args:
+            pg_results = pg_search(embedding, lang, top_k=k)
+            mem_results = mem_search(embedding, lang, top_k=k)
+            pg_top = str(pg_results[0][key]) if pg_results else None
+            mem_top = str(mem_results[0][key]) if mem_results else None
+            agree += pg_top == mem_top
+
+        for path, fn in (("pgvector", lambda e, l, k: pg_search(e, l, top_k=k)),
+                         ("memory", lambda e, l, k: mem_search(e, l, top_k=k))):
+            latencies = time_calls(fn, args, rounds)
+            print(
+                f"{entity:>10} | {path:>8} | {percentile(latencies, 50) * 1000:>8.3f} | "
+                f"{percentile(latencies, 99) * 1000:>8.3f} | {agree:>5}/{len(args):<5}"
+            )
+
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory vector index vs pgvector benchmark")
+    parser.add_argument("--rounds", type=int, default=50, help="Repetitions of the query set")
+    parser.add_argument("--top-k", type=int, default=5, help="Matches per query")
+    args = parser.parse_args()
+
+    main(args.rounds, args.top_k)
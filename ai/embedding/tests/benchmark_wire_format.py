@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Wire Format Benchmark for /embed/* responses (offline, no server needed)
+Compares payload size and client decode time of the JSON float lists
+against base64 and raw binary float32/float16 payloads, plus the float16
+round-trip error.
+
+Usage:
+    python tests/benchmark_wire_format.py [--dimension 1024] [--repeat 50]
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.wire_format import DTYPES, encode_base64, pack_vectors
+
+BATCH_SIZES = [1, 32, 100]
+
+
+def timed(fn, repeat: int) -> float:
+    """Mean milliseconds per call."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main(dimension: int, repeat: int):
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>5} | {'format':>14} | {'bytes':>10} | {'vs json':>7} | {'decode ms':>9} | {'max abs err':>11}")
+    print("-" * 72)
+
+    for batch_size in BATCH_SIZES:
+        vectors = rng.normal(size=(batch_size, dimension)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        embeddings = vectors.tolist()  # What the service holds after inference
+
+        # Baseline: JSON float lists parsed back into Python lists, then NumPy
+        json_body = json.dumps({"embeddings": embeddings, "count": batch_size, "dimension": dimension}).encode()
+        json_ms = timed(lambda: np.asarray(json.loads(json_body)["embeddings"], dtype=np.float32), repeat)
+        rows = [("json", len(json_body), json_ms, 0.0)]
+
+        for dtype in DTYPES:
+            b64_body = json.dumps({
+                "embeddings_b64": encode_base64(embeddings, dtype),
+                "count": batch_size, "dimension": dimension, "dtype": dtype
+            }).encode()
+
+            def decode_b64():
+                data = json.loads(b64_body)
+                raw = np.frombuffer(base64.b64decode(data["embeddings_b64"]), dtype=DTYPES[data["dtype"]])
+                return raw.reshape(-1, data["dimension"]).astype(np.float32)
+
+            raw_body = pack_vectors(embeddings, dtype)
+
+            def decode_raw():
+                return np.frombuffer(raw_body, dtype=DTYPES[dtype]).reshape(-1, dimension).astype(np.float32)
+
+            error = float(np.max(np.abs(decode_raw() - vectors)))
+            rows.append((f"base64-{dtype}", len(b64_body), timed(decode_b64, repeat), error))
+            rows.append((f"binary-{dtype}", len(raw_body), timed(decode_raw, repeat), error))
+
+        for name, size, ms, error in rows:
+            print(
+                f"{batch_size:>5} | {name:>14} | {size:>10,} | {size / len(json_body):>6.1%} | "
+                f"{ms:>9.3f} | {error:>11.2e}"
+            )
+        print("-" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding wire format payload/decode benchmark")
+    parser.add_argument("--dimension", type=int, default=1024, help="Vector dimension")
+    parser.add_argument("--repeat", type=int, default=50, help="Decode repetitions per measurement")
+    args = parser.parse_args()
+
+    main(args.dimension, args.repeat)
@@ -0,0 +1,270 @@
+"""
+Concurrency tests for the pooled DatabaseService.
+
+The Postgres tests need a local Postgres + pgvector instance, e.g.:
+
+    docker run -d --name pgvector-test -p 5433:5432 \
+        -e POSTGRES_USER=admin -e POSTGRES_PASSWORD=password \
+        -e POSTGRES_DB=real_estate_crm pgvector/pgvector:pg16
+
+Connection settings are read from the usual DATABASE_* environment
+variables; the tests are skipped when the database is unreachable.
+"""
+
+import os
+import sys
+import threading
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from psycopg2 import extensions
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import ConnectionPool, DatabaseService, PoolTimeoutError
+
+
+class FakeConnection:
+    """Minimal stand-in for a psycopg2 connection."""
+
+    def __init__(self):
+        self.closed = 0
+        self.info = SimpleNamespace(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+    def cursor(self):
+        conn = self
+
+        class _Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, query):
+                if conn.closed:
+                    raise RuntimeError("connection closed")
+
+        return _Cursor()
+
+
+# ==================== Pool behaviour (no database needed) ====================
+
+def test_pool_never_exceeds_max_size():
+    created = []
+
+    def connect():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    pool = ConnectionPool(connect, max_size=3, timeout=5.0)
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal peak
+        conn = pool.acquire()
+        with lock:
+            peak = max(peak, pool.get_stats()["in_use"])
+        time.sleep(0.02)
+        pool.release(conn)
+
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        list(executor.map(lambda _: work(), range(36)))
+
+    stats = pool.get_stats()
+    assert len(created) <= 3
+    assert peak <= 3
+    assert stats["in_use"] == 0
+    assert stats["checkouts"] == 36
+    assert stats["waited_checkouts"] > 0
+    assert stats["max_wait_ms"] > 0
+
+
+def test_pool_times_out_when_exhausted():
+    pool = ConnectionPool(FakeConnection, max_size=1, timeout=0.05)
+    held = pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    pool.release(held)
+    assert pool.get_stats()["timeouts"] == 1
+    # Released connection is reused
+    assert pool.acquire() is held
+
+
+def test_pool_replaces_broken_connection_on_checkout():
+    pool = ConnectionPool(FakeConnection, max_size=2, ping_interval=0.0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()  # Server dropped the connection while idle
+
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert not replacement.closed
+    assert pool.get_stats()["health_check_failures"] == 1
+    assert pool.get_stats()["open"] == 1
+
+
+def test_failed_warm_up_keeps_full_capacity():
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 2:
+            raise RuntimeError("database starting up")
+        return FakeConnection()
+
+    pool = ConnectionPool(connect, max_size=3, min_size=3, timeout=0.05)
+    with pytest.raises(RuntimeError):
+        pool.warm_up()
+    assert pool.get_stats()["open"] == 1
+
+    # The failed and the never-attempted slots are free again
+    held = [pool.acquire() for _ in range(3)]
+    assert pool.get_stats()["open"] == 3
+    for conn in held:
+        pool.release(conn)
+
+
+def test_pool_rolls_back_open_transaction_on_release():
+    pool = ConnectionPool(FakeConnection, max_size=1)
+    conn = pool.acquire()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    pool.release(conn)
+
+    assert conn.rollbacks == 1
+    assert pool.get_stats()["idle"] == 1
+
+
+def test_bulk_upsert_keeps_last_row_per_key():
+    db = DatabaseService()
+    conn = MagicMock()
+
+    @contextmanager
+    def connection():
+        yield conn
+
+    db.connection = connection
+    rows = [("Villa", "فيلا", [1.0]), ("Duplex", None, [2.0]), ("Villa", "فيلا", [3.0])]
+    with patch("app.core.database.execute_values") as execute_values:
+        written = db.bulk_upsert_embeddings("unit_types_embeddings", "name", ["name", "name_ar", "embedding_en"], rows)
+
+    assert written == 2
+    assert execute_values.call_args.args[2] == [("Villa", "فيلا", [3.0]), ("Duplex", None, [2.0])]
+    conn.commit.assert_called_once()
+
+
+# ==================== Against Postgres + pgvector ====================
+
+def _database_available() -> bool:
+    try:
+        db = DatabaseService()
+        with db.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        db.close()
+        return True
+    except Exception:
+        return False
+
+
+requires_postgres = pytest.mark.skipif(
+    os.getenv("SKIP_DB_TESTS") == "1" or not _database_available(),
+    reason="Postgres + pgvector not reachable"
+)
+
+
+@pytest.fixture
+def db():
+    service = DatabaseService()
+    service.pool.max_size = 4
+    yield service
+    service.close()
+
+
+@requires_postgres
+def test_concurrent_queries_run_in_parallel(db):
+    """8 queries of 200ms on 4 connections should take ~2 rounds, not 8."""
+    def slow_query(_):
+        with db.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_sleep(0.2)")
+            return True
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(slow_query, range(8)))
+    elapsed = time.monotonic() - started
+
+    assert all(results)
+    assert elapsed < 1.2
+    stats = db.get_pool_stats()
+    assert stats["open"] <= 4
+    assert stats["in_use"] == 0
+    assert stats["waited_checkouts"] >= 4
+
+
+@requires_postgres
+def test_pooled_connections_support_vectors(db):
+    """Every pooled connection has the pgvector adapter registered."""
+    def vector_roundtrip(_):
+        with db.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT 1 - ('[1,0,0]'::vector <=> %s::vector)", ([1.0, 0.0, 0.0],))
+            return cur.fetchone()[0]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        similarities = list(executor.map(vector_roundtrip, range(16)))
+
+    assert all(abs(s - 1.0) < 1e-6 for s in similarities)
+
+
+@requires_postgres
+def test_offloaded_queries_do_not_block_event_loop(db):
+    """Queries run through the threadpool keep the event loop responsive."""
+    from starlette.concurrency import run_in_threadpool
+
+    def slow_query():
+        with db.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_sleep(0.3)")
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(run_in_threadpool(slow_query) for _ in range(4)))
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 10
+
+
+@requires_postgres
+def test_failed_query_returns_clean_connection(db):
+    with pytest.raises(Exception):
+        with db.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT * FROM table_that_does_not_exist")
+
+    with db.connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT 1")
+        assert cur.fetchone()[0] == 1
@@ -0,0 +1,126 @@
+"""
+Tests for the two-tier embedding cache (memory LRU + disk vector store).
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.embedding_cache import DiskVectorStore, EmbeddingCache
+
+DIM = 8
+
+
+def _vector(seed):
+    return np.random.default_rng(seed).normal(size=DIM).astype(np.float32)
+
+
+def _key(name):
+    return hashlib.sha256(name.encode("utf-8")).hexdigest()
+
+
+def _cache(disk_dir="", model_name="model-a", memory_budget_bytes=1 << 20):
+    return EmbeddingCache(model_name=model_name, memory_budget_bytes=memory_budget_bytes, disk_dir=disk_dir)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    # Room for two entries: a vector is 32 bytes and a key 64
+    cache = _cache(memory_budget_bytes=2 * (DIM * 4 + 64))
+    cache.put_many(["a", "b"], [_vector(0), _vector(1)])
+    cache.get_many(["a"])
+    cache.put_many(["c"], [_vector(2)])
+
+    a, b, c = cache.get_many(["a", "b", "c"])
+    assert a is not None and c is not None
+    assert b is None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_disk_round_trip_survives_restart():
+    directory = tempfile.mkdtemp()
+    vectors = [_vector(i) for i in range(3)]
+    _cache(directory).put_many(["one", "two", "three"], vectors)
+
+    cache = _cache(directory)
+    results = cache.get_many(["two", "one", "missing"])
+    assert np.allclose(results[0], vectors[1]) and np.allclose(results[1], vectors[0])
+    assert results[2] is None
+    stats = cache.get_stats()
+    assert (stats["disk_hits"], stats["misses"], stats["disk_entries"]) == (2, 1, 3)
+
+    # Disk hits are promoted to memory
+    cache.get_many(["two"])
+    assert cache.get_stats()["memory_hits"] == 1
+
+
+def test_async_lookups_match_sync_lookups():
+    directory = tempfile.mkdtemp()
+    asyncio.run(_cache(directory).aput_many(["one", "two"], [_vector(0), _vector(1)]))
+
+    results = asyncio.run(_cache(directory).aget_many(["one", "missing"]))
+    assert np.allclose(results[0], _vector(0))
+    assert results[1] is None
+
+
+def test_other_model_ignores_disk_store():
+    directory = tempfile.mkdtemp()
+    DiskVectorStore(directory, "model-a").put_many({_key("key"): _vector(0)})
+
+    assert len(DiskVectorStore(directory, "model-a")) == 1
+    assert len(DiskVectorStore(directory, "model-b")) == 0
+
+
+def test_torn_tail_is_truncated_before_appending():
+    directory = tempfile.mkdtemp()
+    store = DiskVectorStore(directory, "model-a")
+    store.put_many({_key("first"): _vector(0)})
+
+    # A crash in the middle of the next append leaves half a row behind
+    with open(store._vectors_path, "ab") as f:
+        f.write(_vector(1).tobytes()[:DIM * 2])
+
+    store = DiskVectorStore(directory, "model-a")
+    assert os.path.getsize(store._vectors_path) == DIM * 4
+    store.put_many({_key("second"): _vector(2)})
+
+    store = DiskVectorStore(directory, "model-a")
+    assert np.allclose(store.get(_key("first")), _vector(0))
+    assert np.allclose(store.get(_key("second")), _vector(2))
+
+
+def test_torn_index_line_is_dropped():
+    directory = tempfile.mkdtemp()
+    store = DiskVectorStore(directory, "model-a")
+    store.put_many({_key(str(i)): _vector(i) for i in range(15)})
+
+    # The index line of row 14 torn after its first digit (reads as row 1)
+    # or right after the tab (no row at all)
+    for torn in (1, 0):
+        with open(store._index_path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            f.truncate(end - len("14\n") + torn)
+        store = DiskVectorStore(directory, "model-a")
+        assert len(store) == 14
+        assert store.get(_key("14")) is None
+        assert np.allclose(store.get(_key("1")), _vector(1))
+
+        # Appends start on a fresh line
+        store.put_many({_key("14"): _vector(14)})
+        store = DiskVectorStore(directory, "model-a")
+        assert len(store) == 15
+        assert np.allclose(store.get(_key("14")), _vector(14))
+
+
+def test_keys_must_be_digests():
+    store = DiskVectorStore(tempfile.mkdtemp(), "model-a")
+    with pytest.raises(ValueError):
+        store.put_many({"plain text": _vector(0)})
@@ -0,0 +1,126 @@
+"""
+Tests for POST /search/resolve against the in-memory vector index.
+The model is replaced by fixed vectors per text, so every span's expected
+match is known.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.routes import search
+from app.core.vector_index import VectorIndexService
+
+DIM = 8
+AXES = np.eye(DIM, dtype=np.float32)
+
+# Query text -> vector: each text points at one indexed entity
+QUERIES = {
+    "New Capital": AXES[0],
+    "North Coast": AXES[1],
+    "Green Heights": AXES[2],
+    "Marina Bay": AXES[3],
+    "villa": AXES[4],
+    "nothing like it": AXES[7],
+}
+
+
+class FakeBatcher:
+    def __init__(self):
+        self.calls = []
+
+    async def embed_many(self, texts):
+        self.calls.append(list(texts))
+        return [QUERIES[text].tolist() for text in texts]
+
+
+def _index():
+    index = VectorIndexService()
+    index.areas.load([
+        {"area_id": 1, "name": "New Capital", "name_ar": "العاصمة", "embedding_en": AXES[0], "embedding_ar": AXES[0]},
+        {"area_id": 2, "name": "North Coast", "name_ar": "الساحل", "embedding_en": AXES[1], "embedding_ar": AXES[1]},
+    ])
+    index.projects.load([
+        {"project_id": 11, "name": "Green Heights", "area_id": 1, "embedding_en": AXES[2], "embedding_ar": AXES[2]},
+        {"project_id": 21, "name": "Marina Bay", "area_id": 2, "embedding_en": AXES[3], "embedding_ar": AXES[3]},
+    ])
+    index.unit_types.load([
+        {"name": "Villa", "name_ar": "فيلا", "embedding_en": AXES[4], "embedding_ar": AXES[4]},
+    ])
+    index._loaded = True
+    return index
+
+
+@pytest.fixture
+def client():
+    batcher = FakeBatcher()
+    app = FastAPI()
+    app.include_router(search.router, prefix="/search")
+    with patch("app.api.routes.search.get_embedding_service", return_value=SimpleNamespace(is_ready=True)), \
+         patch("app.api.routes.search.get_embedding_batcher", return_value=batcher), \
+         patch("app.api.routes.search.get_vector_index", return_value=_index()):
+        test_client = TestClient(app)
+        test_client.batcher = batcher
+        yield test_client
+
+
+def test_spans_resolved_in_order_with_one_embedding_pass(client):
+    response = client.post("/search/resolve", json={"spans": [
+        {"text": "North Coast", "entity": "area"},
+        {"text": "Green Heights", "entity": "project"},
+        {"text": "villa", "entity": "unit_type"},
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["matched"], r["value"], r["id"]) for r in results] == [
+        (True, "North Coast", 2), (True, "Green Heights", 11), (True, "Villa", None)
+    ]
+    assert client.batcher.calls == [["North Coast", "Green Heights", "villa"]]
+
+
+def test_project_spans_are_scoped_to_their_area(client):
+    response = client.post("/search/resolve", json={"spans": [
+        {"text": "Marina Bay", "entity": "project", "area_id": 1},
+        {"text": "Marina Bay", "entity": "project", "area_id": 2},
+    ]})
+
+    scoped_out, scoped_in = response.json()["results"]
+    assert not scoped_out["matched"]
+    assert [a["value"] for a in scoped_out["alternatives"]] == ["Green Heights"]
+    assert (scoped_in["matched"], scoped_in["id"]) == (True, 21)
+
+
+def test_threshold_and_top_k_per_span(client):
+    response = client.post("/search/resolve", json={"spans": [
+        {"text": "nothing like it", "entity": "area"},
+        {"text": "New Capital", "entity": "area", "top_k": 1, "threshold": 0.99},
+    ]})
+
+    miss, hit = response.json()["results"]
+    assert not miss["matched"] and miss["score"] == pytest.approx(0.0)
+    assert hit["matched"] and hit["alternatives"] == []
+
+
+def test_empty_and_invalid_requests(client):
+    assert client.post("/search/resolve", json={"spans": []}).json() == {"results": []}
+    assert client.batcher.calls == []
+
+    assert client.post("/search/resolve", json={"spans": [{"text": "x", "entity": "city"}]}).status_code == 422
+    too_many = [{"text": "villa", "entity": "unit_type"}] * 65
+    assert client.post("/search/resolve", json={"spans": too_many}).status_code == 422
+
+
+def test_model_not_ready(client):
+    with patch("app.api.routes.search.get_embedding_service", return_value=SimpleNamespace(is_ready=False)):
+        response = client.post("/search/resolve", json={"spans": [{"text": "villa", "entity": "unit_type"}]})
+    assert response.status_code == 503
@@ -0,0 +1,227 @@
+"""
+Tests for the in-memory entity vector index.
+Results are compared against a brute-force cosine ranking, which is what
+the pgvector `<=>` queries compute.
+"""
+
+import os
+import random
+import sys
+import threading
+
+import numpy as np
+
+# Add app to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.vector_index import EntityIndex
+
+DIM = 16
+
+
+def _random_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "project_id": str(i),
+            "name": f"Project {i}",
+            "area_id": str(i % 3),
+            "embedding_en": rng.normal(size=DIM).astype(np.float32),
+            # Every fifth project has no Arabic vector
+            "embedding_ar": None if i % 5 == 0 else rng.normal(size=DIM).astype(np.float32),
+        })
+    return rows
+
+
+def _brute_force(rows, query, column, area_id=None, top_k=5):
+    scored = []
+    for row in rows:
+        vector = row[column]
+        if vector is None or (area_id is not None and row["area_id"] != area_id):
+            continue
+        cosine = float(np.dot(vector, query) / (np.linalg.norm(vector) * np.linalg.norm(query)))
+        scored.append((cosine, row["project_id"]))
+    scored.sort(reverse=True)
+    return scored[:top_k]
+
+
+def _project_index(rows):
+    index = EntityIndex("projects", "project_id", ["project_id", "name", "area_id"], area_field="area_id")
+    index.load(rows)
+    return index
+
+
+def test_search_matches_brute_force():
+    rows = _random_rows(200)
+    index = _project_index(rows)
+    query = np.random.default_rng(1).normal(size=DIM)
+
+    for language, column in (("en", "embedding_en"), ("ar", "embedding_ar")):
+        expected = _brute_force(rows, query, column)
+        results = index.search(query.tolist(), language, top_k=5)
+        assert [r["project_id"] for r in results] == [pid for _, pid in expected]
+        assert np.allclose([r["similarity"] for r in results], [s for s, _ in expected], atol=1e-5)
+
+
+def test_area_filter_only_returns_that_area():
+    rows = _random_rows(200)
+    index = _project_index(rows)
+    query = np.random.default_rng(2).normal(size=DIM)
+
+    expected = _brute_force(rows, query, "embedding_en", area_id="1", top_k=10)
+    results = index.search(query.tolist(), "en", top_k=10, area_id=1)
+    assert [r["project_id"] for r in results] == [pid for _, pid in expected]
+    assert index.search(query.tolist(), "en", area_id="missing") == []
+
+
+def test_upsert_and_remove_are_incremental():
+    rows = _random_rows(10)
+    index = _project_index(rows)
+    target = np.ones(DIM, dtype=np.float32)
+
+    index.upsert({"project_id": "new", "name": "New Project", "area_id": "2"}, target.tolist(), None)
+    best = index.search(target.tolist(), "en", top_k=1)[0]
+    assert best["project_id"] == "new"
+    assert best["similarity"] > 0.999
+    assert len(index) == 11
+
+    # Replacing keeps a single row per key
+    index.upsert({"project_id": "new", "name": "Renamed", "area_id": "2"}, target.tolist(), None)
+    assert len(index) == 11
+    assert index.search(target.tolist(), "en", top_k=1)[0]["name"] == "Renamed"
+
+    assert index.remove("new")
+    assert not index.remove("new")
+    assert all(r["project_id"] != "new" for r in index.search(target.tolist(), "en", top_k=11))
+
+
+def test_load_replays_writes_made_while_rows_were_read():
+    rows = _random_rows(10)
+    index = _project_index(rows)
+    target = np.ones(DIM, dtype=np.float32)
+
+    # A refresh starts reading; a sync upserts and deletes before it finishes
+    recorder = index.begin_load()
+    stale_rows = [dict(r) for r in rows]
+    index.upsert({"project_id": "new", "name": "New Project", "area_id": "2"}, target.tolist(), None)
+    index.remove("3")
+    index.load(stale_rows, recorder)
+
+    ids = {r["project_id"] for r in index.search(target.tolist(), "en", top_k=20)}
+    assert "new" in ids and "3" not in ids
+    assert len(index) == 10
+
+    # Recording stops with the load
+    index.remove("new")
+    index.load(stale_rows)
+    assert len(index) == 10
+
+
+def test_search_during_reloads_returns_consistent_rows():
+    # Unit vectors: the best match of row i's vector is row i
+    rows = [{"project_id": str(i), "name": f"Project {i}", "area_id": "0",
+             "embedding_en": np.eye(DIM, dtype=np.float32)[i], "embedding_ar": None} for i in range(DIM)]
+    index = _project_index(rows)
+    stop = threading.Event()
+
+    def reload():
+        rng = random.Random(0)
+        while not stop.is_set():
+            shuffled = list(rows)
+            rng.shuffle(shuffled)
+            index.load(shuffled)
+
+    writer = threading.Thread(target=reload)
+    writer.start()
+    try:
+        for n in range(2000):
+            i = n % DIM
+            best = index.search(np.eye(DIM)[i].tolist(), "en", top_k=1)[0]
+            assert best["project_id"] == str(i)
+    finally:
+        stop.set()
+        writer.join()
+
+
+def test_empty_index_returns_nothing():
+    index = _project_index([])
+    assert index.search([1.0] * DIM, "en") == []
+
+
+def _brute_force_fused(rows, query, area_id=None, top_k=5):
+    scored = []
+    for row in rows:
+        if area_id is not None and row["area_id"] != area_id:
+            continue
+        cosines = [
+            float(np.dot(v, query) / (np.linalg.norm(v) * np.linalg.norm(query)))
+            for v in (row["embedding_en"], row["embedding_ar"]) if v is not None
+        ]
+        scored.append((max(cosines), row["project_id"]))
+    scored.sort(reverse=True)
+    return scored[:top_k]
+
+
+def test_fused_max_matches_brute_force():
+    rows = _random_rows(200)
+    index = _project_index(rows)
+    query = np.random.default_rng(3).normal(size=DIM)
+
+    # The detected language no longer matters
+    for language in ("en", "ar"):
+        expected = _brute_force_fused(rows, query)
+        results = index.search(query.tolist(), language, top_k=5, mode="fused")
+        assert [r["project_id"] for r in results] == [pid for _, pid in expected]
+        assert np.allclose([r["similarity"] for r in results], [s for s, _ in expected], atol=1e-5)
+
+    expected = _brute_force_fused(rows, query, area_id="2", top_k=10)
+    results = index.search(query.tolist(), "en", top_k=10, area_id=2, mode="fused")
+    assert [r["project_id"] for r in results] == [pid for _, pid in expected]
+
+
+def test_fused_search_finds_match_in_other_column():
+    rows = _random_rows(50)
+    target = np.ones(DIM, dtype=np.float32)
+    rows.append({
+        "project_id": "mixed", "name": "Mixed", "area_id": "0",
+        "embedding_en": -target, "embedding_ar": target,
+    })
+    index = _project_index(rows)
+
+    # Detected as English, but only the Arabic vector matches
+    assert index.search(target.tolist(), "en", top_k=1)[0]["project_id"] != "mixed"
+    best = index.search(target.tolist(), "en", top_k=1, mode="fused")[0]
+    assert best["project_id"] == "mixed"
+    assert best["similarity"] > 0.999
+
+
+def test_fused_rrf_prefers_rows_ranked_well_in_both_columns():
+    index = _project_index([
+        # First in EN, last in AR (and the reverse for "c")
+        {"project_id": "a", "name": "A", "area_id": "0",
+         "embedding_en": [1.0, 0.0, 0.0], "embedding_ar": [-1.0, 0.0, 0.0]},
+        {"project_id": "c", "name": "C", "area_id": "0",
+         "embedding_en": [0.0, 1.0, 0.0], "embedding_ar": [1.0, 0.0, 0.0]},
+        # Second and third in both columns
+        {"project_id": "b", "name": "B", "area_id": "0",
+         "embedding_en": [0.9, 0.1, 0.0], "embedding_ar": [0.9, 0.1, 0.0]},
+        {"project_id": "d", "name": "D", "area_id": "0",
+         "embedding_en": [0.5, 0.5, 0.0], "embedding_ar": [0.5, 0.5, 0.0]},
+    ])
+    query = [1.0, 0.0, 0.0]
+
+    assert index.search(query, "en", top_k=4, mode="fused")[0]["project_id"] in ("a", "c")
+    rrf = index.search(query, "en", top_k=4, mode="fused", fusion="rrf")
+    assert rrf[0]["project_id"] == "b"
+    assert len(rrf) == 4
+
+
+def test_unknown_mode_is_rejected():
+    index = _project_index(_random_rows(5))
+    for kwargs in ({"mode": "both"}, {"fusion": "sum"}):
+        try:
+            index.search([1.0] * DIM, "en", **kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"{kwargs} should be rejected")
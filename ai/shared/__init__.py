@@ -0,0 +1 @@
+"""Code shared by the AI services (copied next to each service's app/ package in the images)."""
@@ -0,0 +1,42 @@
+"""
+Client side of the embedding service's /embed/* wire formats.
+Used by the customer and broker chatbots; the service encodes the same
+layouts (see ai/embedding/README.md).
+"""
+
+import base64
+
+import httpx
+import numpy as np
+
+WIRE_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def decode_embeddings(response: httpx.Response) -> np.ndarray:
+    """Decode an /embed/* response into a (count, dimension) float32 array.
+    
+    Handles raw octet-stream bodies, base64 JSON and plain JSON float lists
+    (older services ignore the format flags and still answer with JSON).
+    An empty batch comes back with dimension 0 and decodes to a (0, 0) array.
+    """
+    if response.headers.get("content-type", "").startswith("application/octet-stream"):
+        dtype = WIRE_DTYPES[response.headers.get("x-embedding-dtype", "float32")]
+        dimension = int(response.headers["x-embedding-dimension"])
+        return _unpack_vectors(response.content, dtype, dimension)
+    
+    data = response.json()
+    for key in ("embeddings_b64", "embedding_b64"):
+        if key in data:
+            return _unpack_vectors(base64.b64decode(data[key]), WIRE_DTYPES[data["dtype"]], data["dimension"])
+    if "embeddings" in data:
+        if not data["embeddings"]:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.asarray(data["embeddings"], dtype=np.float32)
+    return np.asarray([data["embedding"]], dtype=np.float32)
+
+
+def _unpack_vectors(raw: bytes, dtype: str, dimension: int) -> np.ndarray:
+    """Row-major little-endian bytes -> (count, dimension) float32 array."""
+    if not dimension:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.frombuffer(raw, dtype=dtype).reshape(-1, dimension).astype(np.float32)
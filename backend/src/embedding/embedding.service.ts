@@ -2,6 +2,7 @@
  * Embedding Service
  * HTTP client for communicating with embedding microservice
  * Provides fire-and-forget async embedding sync on CRUD operations
+ * and tells the customer chatbot to refresh its catalog snapshot
  */
 
 import { Injectable, Logger } from '@nestjs/common';
@@ -14,6 +15,8 @@ import { SyncAreaDto, SyncProjectDto, SyncUnitTypeDto } from './embedding.dto';
 export class EmbeddingService {
   private readonly logger = new Logger(EmbeddingService.name);
   private readonly baseUrl: string;
+  private readonly chatbotUrl: string;
+  private readonly catalogToken?: string;
   private readonly maxRetries = 3;
   private readonly retryDelayMs = 1000;
 
@@ -22,9 +25,24 @@ export class EmbeddingService {
     private readonly configService: ConfigService,
   ) {
     this.baseUrl = this.configService.get<string>('EMBEDDING_SERVICE_URL') || 'http://localhost:8001';
+    this.chatbotUrl = this.configService.get<string>('CUSTOMER_CHATBOT_URL') || 'http://localhost:8000';
+    this.catalogToken = this.configService.get<string>('CATALOG_WEBHOOK_TOKEN');
     this.logger.log(`Embedding service initialized with URL: ${this.baseUrl}`);
   }
 
+  /**
+   * Tell the customer chatbot that areas/projects changed (it refetches its catalog snapshot)
+   * Fire-and-forget: the chatbot also refreshes on a TTL
+   */
+  notifyCatalogChanged(): void {
+    const headers = this.catalogToken ? { 'X-Catalog-Token': this.catalogToken } : {};
+    firstValueFrom(
+      this.httpService.post(`${this.chatbotUrl}/api/catalog/invalidate`, {}, { headers, timeout: 2000 })
+    ).catch(error =>
+      this.logger.warn(`Failed to invalidate chatbot catalog: ${error.message}`)
+    );
+  }
+
   /**
    * Delay helper for retries
    */
@@ -37,6 +55,7 @@ export class EmbeddingService {
    * Fire-and-forget: doesn't block caller
    */
   async syncArea(areaId: string, name: string, nameAr?: string): Promise<void> {
+    this.notifyCatalogChanged();
     const dto: SyncAreaDto = { area_id: areaId, name, name_ar: nameAr };
     
     for (let attempt = 1; attempt <= this.maxRetries; attempt++) {
@@ -62,6 +81,7 @@ export class EmbeddingService {
    * Fire-and-forget: doesn't block caller
    */
   async deleteArea(areaId: string): Promise<void> {
+    this.notifyCatalogChanged();
     for (let attempt = 1; attempt <= this.maxRetries; attempt++) {
       try {
         await firstValueFrom(
@@ -85,6 +105,7 @@ export class EmbeddingService {
    * Fire-and-forget: doesn't block caller
    */
   async syncProject(projectId: string, name: string, nameAr?: string, areaId?: string): Promise<void> {
+    this.notifyCatalogChanged();
     const dto: SyncProjectDto = { project_id: projectId, name, name_ar: nameAr, area_id: areaId };
     
     for (let attempt = 1; attempt <= this.maxRetries; attempt++) {
@@ -110,6 +131,7 @@ export class EmbeddingService {
    * Fire-and-forget: doesn't block caller
    */
   async deleteProject(projectId: string): Promise<void> {
+    this.notifyCatalogChanged();
     for (let attempt = 1; attempt <= this.maxRetries; attempt++) {
       try {
         await firstValueFrom(